@@ -14,9 +14,10 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QThread
 from PyQt6.QtGui import QImage, QPixmap
 
-SERVER_URL = "http://192.168.1.146:5000"
+SERVER_URL = os.environ.get("SLOWMO_SERVER_URL", "http://192.168.1.146:5000")  # e.g. a replay_server.py box
 CHESSBOARD_SIZE = (15,8)
 SQUARE_SIZE = 0.016  # in meters
+FRAME_MAX_RATE_HZ = 10  # Corner detection keeps up with this; the server drops the rest for us
 
 sio = socketio.Client()
 
@@ -653,6 +654,7 @@ def on_connect():
     if win: # Check if GUI window exists
         win.connection_status_label.setText("Socket.IO: Connected")
         win.status_label.setText("Connected. Starting stream...")
+    sio.emit("subscribe_topics", {"topics": {"frame": FRAME_MAX_RATE_HZ}})  # Frames only, no telemetry
     sio.emit("start_camera")
 
 # Add disconnect cleanup to stop camera
@@ -69,6 +69,14 @@ from widgets.adcs import ADCSSection
 from widgets.detector_settings_widget import DetectorSettingsWidget
 from payload.detector4 import detector_instance
 from data_analysis import DataAnalysisTab
+
+# Protocol modules shared with the server (adcs_telemetry, image_transfer, session_recorder)
+COMMON_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+import adcs_telemetry
+from image_transfer import ImageReceiver
+from session_recorder import SessionRecorder, decode_records
 from widgets.lidar_client import LidarWidget
 
 # Theme and styling
@@ -87,7 +95,14 @@ from theme import (
 #                            CONFIGURATION                                  #
 ##############################################################################
 
-SERVER_URL = "http://192.168.1.146:5000"
+SERVER_URL = os.environ.get("SLOWMO_SERVER_URL", "http://192.168.1.146:5000")  # e.g. a replay_server.py box
+# Topics this window displays and the max rate (Hz) wanted for each; None = as fast as the
+# server publishes. The server sends nothing else (i2c_bus has no panel yet)
+TELEMETRY_TOPICS = {
+    "adcs": None, "thermal": None, "power": None, "communication": None, "sensor": None,
+    "lidar": None, "tachometer": None, "camera_payload": None, "lidar_payload": None,
+    "frame": None, "tag_pose": None, "tag_thumbnail": None,
+}
 
 ##############################################################################
 #                        SOCKETIO AND BRIDGE SETUP                         #
@@ -200,6 +215,9 @@ class MainWindow(QWidget):
             if recommendations is not None and 'recommendations' in self.overall_labels:
                 self.overall_labels['recommendations'].setText(recommendations)
     latencyUpdated = pyqtSignal(float)
+    poseLatencyUpdated = pyqtSignal(dict)
+    imageTransferUpdated = pyqtSignal(dict)
+    adcsAutotuneFinished = pyqtSignal(dict)
 
     #=========================================================================
     #                         THEME CONFIGURATION                            
@@ -320,6 +338,8 @@ class MainWindow(QWidget):
         # Initialize state variables
         self.streaming = False
         self.detector_active = False
+        self.onboard_pose_active = False  # Pose from the Pi replaces the video stream
+        self.session_download = None  # Local copy of a Pi session being fetched page by page
         self.frame_queue = queue.Queue()
         self.last_frame = None
         self.shared_start_time = None
@@ -427,6 +447,10 @@ class MainWindow(QWidget):
              self.active_config_for_detector = None
              logging("[WARNING] MainWindow.__init__: camera_settings not available for initial active_config_for_detector.")
 
+        self.image_receiver = ImageReceiver(
+            sio.emit, os.path.join(os.path.dirname(__file__), "captured_images"),
+            on_progress=self.imageTransferUpdated.emit)
+
         print("[DEBUG] Calling setup_socket_events()...")
         self.setup_socket_events()
         print("[DEBUG] setup_socket_events() complete")
@@ -455,6 +479,9 @@ class MainWindow(QWidget):
         bridge.frame_received.connect(self.update_image)
         bridge.analysed_frame.connect(self.update_analysed_image)
         self.latencyUpdated.connect(self.detector_settings.set_latency)
+        self.poseLatencyUpdated.connect(self.detector_settings.set_pose_latency)
+        self.imageTransferUpdated.connect(self.update_image_transfer)
+        self.adcsAutotuneFinished.connect(self.adcs_control_widget.show_autotune_result)
 
         # ── now it's safe to connect the frequency-spinbox signal ──
         self.graph_section.graph_update_frequency_changed.connect(self.spin_plotter.set_redraw_rate)
@@ -1180,6 +1207,8 @@ class MainWindow(QWidget):
             logging.info("Connected to server")
             self.camera_controls.toggle_btn.setEnabled(True)
             self.detector_controls.detector_btn.setEnabled(True)
+            self.camera_controls.onboard_pose_btn.setEnabled(True)
+            self.camera_controls.record_session_btn.setEnabled(True)
             # self.camera_controls.crop_btn.setEnabled(True) # DELETED
             self.camera_controls.capture_btn.setEnabled(True)
 
@@ -1187,6 +1216,8 @@ class MainWindow(QWidget):
             self.print_report_btn.setEnabled(True)
             # ── end patch
 
+            sio.emit("subscribe_topics", {"topics": self.telemetry_topics()})
+            self.image_receiver.resume_pending()
             self.apply_config()
             QTimer.singleShot(100, self.delayed_server_setup)
 
@@ -1196,6 +1227,8 @@ class MainWindow(QWidget):
             logging.info(f"Disconnected from server: {reason}")
             self.camera_controls.toggle_btn.setEnabled(False)
             self.detector_controls.detector_btn.setEnabled(False)
+            self.camera_controls.onboard_pose_btn.setEnabled(False)
+            self.camera_controls.record_session_btn.setEnabled(False)
             # self.camera_controls.crop_btn.setEnabled(False) # DELETED
             self.camera_controls.capture_btn.setEnabled(False)
             self.camera_controls.toggle_btn.setChecked(False)    
@@ -1208,6 +1241,36 @@ class MainWindow(QWidget):
                 print(f"[CLIENT DEBUG] Error handling frame: {e}")
                 logging.error(f"Frame handling error: {e}")
 
+        @sio.on("tag_pose_broadcast")
+        def on_tag_pose(data):
+            try:
+                self.handle_tag_pose(data)
+            except Exception as e:
+                logging.error(f"Tag pose handling error: {e}")
+
+        @sio.on("tag_thumbnail")
+        def on_tag_thumbnail(data):
+            # Only frames the video panel gets while on-board pose replaces the stream
+            if self.onboard_pose_active:
+                self.handle_frame_data(data)
+
+        @sio.on("onboard_pose_status")
+        def on_onboard_pose_status(data):
+            logging.info(f"[ON-BOARD POSE] {data.get('message')}")
+            if data.get("status") == "error" and self.onboard_pose_active:
+                self.camera_controls.onboard_pose_btn.setChecked(False)
+
+        @sio.on("session_recording_status")
+        def on_session_recording_status(data):
+            self.handle_session_recording_status(data)
+
+        @sio.on("session_page")
+        def on_session_page(data):
+            try:
+                self.handle_session_page(data)
+            except Exception as e:
+                logging.error(f"Session download error: {e}")
+
         @sio.on("sensor_broadcast")
         def on_sensor_data(data):
             # update temps/CPU
@@ -1248,11 +1311,28 @@ class MainWindow(QWidget):
         def on_image_download(data):
             self.handle_image_download(data)
 
+        @sio.on("image_transfer_start")
+        def on_image_transfer_start(data):
+            self.image_receiver.on_start(data)
+
+        @sio.on("image_chunk")
+        def on_image_chunk(data):
+            self.image_receiver.on_chunk(data)
+
+        @sio.on("image_transfer_end")
+        def on_image_transfer_end(data):
+            self.image_receiver.on_end(data)
+
         @sio.on("lidar_broadcast")
         def on_lidar_broadcast(data):
             """Handles incoming LIDAR data from the server on 'lidar_broadcast'."""
             try:
                 if isinstance(data, dict):
+                    # Batched samples from the on-board acquisition (lidar_acquisition.py)
+                    if "samples" in data:
+                        if hasattr(self, 'lidar_widget') and self.lidar_widget:
+                            self.lidar_widget.set_batch(data["samples"])
+                        return
                     processed_data = {}
                     # Check if the server is sending the new detailed format
                     if "live_distance_cm" in data:
@@ -1312,8 +1392,17 @@ class MainWindow(QWidget):
 
         @sio.on("adcs_broadcast")
         def on_adcs_data(data):
-            """Handle ADCS subsystem data updates"""
+            """Handle ADCS subsystem data updates (binary telemetry frame or legacy string dict)"""
             try:
+                record = records = None
+                if isinstance(data, (bytes, bytearray)):
+                    # A chunk of full-rate samples: the graph gets all of them, labels the newest
+                    records = adcs_telemetry.decode_frames(data)
+                    if len(records) == 0:
+                        return
+                    record = records[-1]
+                    data = adcs_telemetry.to_display_dict(record)
+
                 if hasattr(self, 'adcs_labels'):
                     # Update individual gyroscope rates (X, Y, Z in °/s)
                     if "gyro_x" in self.adcs_labels:
@@ -1353,7 +1442,9 @@ class MainWindow(QWidget):
                         status = data.get('status', 'Unknown')
                         self.adcs_labels["status"].setText(f"Status: {status}")
                 
-                    if hasattr(self, 'yaw_graph'):
+                    if hasattr(self, 'yaw_graph') and records is not None:
+                        self.yaw_graph.push_batch(records['t'], records['target_yaw'], records['yaw'])  # Control yaw, same frame as the target
+                    elif hasattr(self, 'yaw_graph'):
                         target_yaw = self.adcs_control_widget.get_target_yaw() if hasattr(self.adcs_control_widget, 'get_target_yaw') else 0.0
                         current_yaw = data.get('angle_z', 0.0)
                         self.yaw_graph.push_data(target_yaw, current_yaw)
@@ -1394,7 +1485,9 @@ class MainWindow(QWidget):
                         self.adcs_control_widget.update_sensor_data(adcs_detailed_data)
                 
                 # Update payload temperature in thermal subsystem from ADCS temperature data
-                if hasattr(self, 'thermal_labels') and 'payload_temp' in self.thermal_labels:
+                if hasattr(self, 'thermal_labels') and 'payload_temp' in self.thermal_labels and record is not None:
+                    self.thermal_labels["payload_temp"].setText(f"Payload: {float(record['temp']):.1f}°C")
+                elif hasattr(self, 'thermal_labels') and 'payload_temp' in self.thermal_labels:
                     temperature_str = data.get('temperature', '0.0°C')
                     # Extract numeric value from temperature string (e.g., "25.5°C" -> 25.5)
                     try:
@@ -1412,6 +1505,17 @@ class MainWindow(QWidget):
                 print(f"[CLIENT DEBUG] Error in ADCS broadcast handler: {e}")
                 logging.error(f"Failed to update ADCS data: {e}")
 
+        @sio.on("adcs_command_ack")
+        def on_adcs_command_ack(data):
+            """Result of an ADCS command; auto-tune results go to the ADCS widget"""
+            status, message = data.get("status", "ERROR"), data.get("message", "")
+            if status == "SUCCESS":
+                logging.info(f"ADCS {data.get('command', '')}: {message}")
+            else:
+                logging.error(f"ADCS {data.get('command', '')} failed: {message}")
+            if data.get("command") == "autotune":
+                self.adcsAutotuneFinished.emit(data)
+
         @sio.on("power_broadcast")
         def on_power_data(data):
             """Handle power subsystem data updates with smart status"""
@@ -1423,11 +1527,13 @@ class MainWindow(QWidget):
                     
                     # Handle normal data updates
                     if "current" in data:
-                        self.power_labels["current"].setText(f"Current: {data['current']} A")
+                        peak = f" (peak {data['current_max']})" if "current_max" in data else ""
+                        self.power_labels["current"].setText(f"Current: {data['current']} A{peak}")
                     if "voltage" in data:
                         self.power_labels["voltage"].setText(f"Voltage: {data['voltage']} V")
                     if "power" in data:
-                        self.power_labels["power"].setText(f"Power: {data['power']} W")
+                        peak = f" (peak {data['power_max']})" if "power_max" in data else ""
+                        self.power_labels["power"].setText(f"Power: {data['power']} W{peak}")
                     if "energy" in data:
                         self.power_labels["energy"].setText(f"Energy: {data['energy']} Wh")
                     if "battery_percentage" in data:
@@ -1442,7 +1548,7 @@ class MainWindow(QWidget):
                     if "status" in data:
                         status = data['status']
                         # Apply color coding based on status
-                        if status in ["Battery Critical", "Current Critical", "Overheating"]:
+                        if status in ["Battery Critical", "Current Critical", "Overheating", "Sensor Error"]:
                             status_color = "#ff4444"  # Red for critical
                         elif status in ["Battery Low", "High Current", "High Power", "High Temperature"]:
                             status_color = "#ffaa00"  # Orange for warnings
@@ -1858,7 +1964,10 @@ class MainWindow(QWidget):
         """Handle server response to image capture request"""
         try:
             if data["success"]:
-                logging.info(f"Image captured: {data['path']} ({data['size_mb']} MB)")
+                latency = data.get('latency_ms')
+                latency_info = (f", {latency['total']:.0f} ms to disk (frame {latency['wait_frame']:.0f}, "
+                                f"encode {latency['encode']:.0f}, write {latency['write']:.0f})") if latency else ""
+                logging.info(f"Image captured: {data['path']} ({data['size_mb']} MB{latency_info})")
                 self.download_captured_image(data['path'])
             else:
                 logging.error(f"Image capture failed: {data['error']}")
@@ -1885,6 +1994,21 @@ class MainWindow(QWidget):
         except Exception as e:
             logging.error(f"Failed to save downloaded image: {e}")
 
+    def update_image_transfer(self, info):
+        """Chunked download progress on the capture button; result to the log and the server"""
+        btn = self.camera_controls.capture_btn
+        if not info["done"]:
+            btn.setText(f"Downloading {info['percent']:.0f}% · {info['rate_mbps']:.1f} MB/s")
+            return
+        btn.setText("Capture Image")
+        if info["ok"]:
+            logging.info(f"Image saved: {info['path']} ({info['size']/1024:.1f} KB, {info['rate_mbps']:.2f} MB/s)")
+        else:
+            logging.error(f"Image download failed: {info['filename']}: {info['error']}")
+        if sio.connected:
+            sio.emit("image_transfer_done", {"filename": info["filename"], "success": info["ok"],
+                                             "error": info["error"], "rate_mbps": info["rate_mbps"]})
+
     #=========================================================================
     #                        CAMERA AND DETECTION                           
     #=========================================================================
@@ -1977,6 +2101,98 @@ class MainWindow(QWidget):
         except Exception as e:
             logging.info(f"[ERROR] Calibration update failed: {e}")
 
+    def telemetry_topics(self):
+        """Topics to subscribe to: no video while the Pi streams tag pose instead"""
+        topics = dict(TELEMETRY_TOPICS)
+        if self.onboard_pose_active:
+            topics.pop("frame", None)
+        return topics
+
+    def toggle_onboard_pose(self, checked):
+        """Run AprilTag detection on the Pi; pose telemetry and thumbnails replace the video stream"""
+        if checked == self.onboard_pose_active:
+            return
+        self.onboard_pose_active = checked
+        if checked and self.detector_active:
+            self.camera_controls.detector_btn.setChecked(False)
+            self.toggle_detector()  # One detector at a time
+        self.camera_controls.detector_btn.setEnabled(not checked)
+        logging.info(f"[INFO] {'Starting' if checked else 'Stopping'} on-board pose...")
+        if sio.connected:
+            sio.emit("subscribe_topics", {"topics": self.telemetry_topics()})
+            sio.emit("onboard_pose", {"enabled": checked})
+
+    def toggle_session_recording(self, checked):
+        """Record video and telemetry on the Pi's disk (survives link drops); fetched when stopped"""
+        if sio.connected:
+            sio.emit("session_recording", {"enabled": checked})
+
+    def handle_session_recording_status(self, data):
+        logging.info(f"[SESSION] {data.get('message')}")
+        btn = self.camera_controls.record_session_btn
+        btn.blockSignals(True)
+        btn.setChecked(bool(data.get("recording")))
+        btn.blockSignals(False)
+        if data.get("status") == "success" and not data.get("recording") and data.get("session"):
+            self.fetch_session(data["session"])
+
+    def fetch_session(self, session, start=None, end=None, topics=None):
+        """Copy a recorded session (or a time range of it) from the Pi into client/recordings/<session>"""
+        if self.session_download and self.session_download.active:
+            logging.info(f"[SESSION] Already fetching {self.session_download.session}")
+            return
+        self.session_download = SessionRecorder(os.path.join(os.path.dirname(__file__), "recordings"))
+        sio.emit("fetch_session", {"session": session, "start": start, "end": end, "topics": topics})
+
+    def handle_session_page(self, data):
+        """Store one page and ask for the next; the local copy uses the Pi's segment format"""
+        recorder = self.session_download
+        if recorder is None:
+            return
+        if data.get("error"):
+            logging.error(f"[SESSION] Fetch of {data.get('session')} failed: {data['error']}")
+            if recorder.active:
+                recorder.stop()
+            return
+        if not recorder.active:
+            recorder.start(data["topics"], name=data["session"])
+        for t, topic, payload in decode_records(data["data"], data["topics"]):
+            recorder.record(topic, payload, timestamp=t)
+        if data.get("cursor") and sio.connected:
+            sio.emit("fetch_session", dict(data["request"], cursor=data["cursor"]))
+        elif not data.get("cursor"):
+            result = recorder.stop()
+            logging.info(f"[SESSION] Fetched {data['session']}: {result['message']}"
+                         f"{', ' + str(result['stats']['dropped']) + ' dropped' if result['stats']['dropped'] else ''}")
+
+    def handle_tag_pose(self, data):
+        """Pose computed on the Pi - same plots and labels as run_detector"""
+        if not self.onboard_pose_active:
+            return
+        received = time.time()
+        hops = dict(data.get("latency") or {})
+        if data.get("sent_time") and data.get("capture_time"):
+            # Pi and ground clocks must be synced (NTP) for these two
+            hops["downlink"] = (received - data["sent_time"]) * 1000.0
+            hops["capture_to_client"] = (received - data["capture_time"]) * 1000.0
+        self.poseLatencyUpdated.emit(hops)
+        if not data.get("detected"):
+            self.tag_detected_in_last_frame = False
+            self.graph_section.live_labels["SPIN MODE"].setText("—")
+            self.graph_section.live_labels["DISTANCE MEASURING MODE"].setText("—")
+            self.graph_section.live_labels["SCANNING MODE"].setText("—")
+            return
+        rvec = np.array(data["rvec"], dtype=np.float64).reshape(3, 1)
+        tvec = np.array(data["tvec"], dtype=np.float64).reshape(3, 1)
+        self.spin_plotter.update(rvec, tvec)
+        self.distance_plotter.update(rvec, tvec)
+        self.angular_plotter.update(rvec, tvec)
+        self.tag_detected_in_last_frame = True
+        self.latencyUpdated.emit(data.get("detect_ms", 0.0))
+        self.graph_section.live_labels["SPIN MODE"].setText(f"{self.spin_plotter.current_angle:.0f}°")
+        self.graph_section.live_labels["DISTANCE MEASURING MODE"].setText(f"{self.distance_plotter.current_distance:.3f}m")
+        self.graph_section.live_labels["SCANNING MODE"].setText(f"{self.angular_plotter.current_ang:.1f}°")
+
     def toggle_detector(self):
         """Toggle object detection on/off"""
         self.detector_active = not self.detector_active
@@ -2286,7 +2502,7 @@ class MainWindow(QWidget):
         """Download captured image from server"""
         try:
             filename = os.path.basename(server_path)
-            sio.emit("download_image", {"server_path": server_path, "filename": filename})
+            self.image_receiver.request(server_path, filename)
         except Exception as e:
             logging.info(f"[ERROR] Failed to request image download: {e}")
 
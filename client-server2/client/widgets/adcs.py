@@ -278,10 +278,26 @@ class ADCSSection(QGroupBox):
         layout.addWidget(self.min_pulse_input, 1, 3)
         
         # Row 2
+        layout.addWidget(QLabel("Ki:"), 2, 0)
+        self.ki_input = QLineEdit("0")  # 0 = PD only
+        layout.addWidget(self.ki_input, 2, 1)
+        layout.addWidget(QLabel("Rate (Hz):"), 2, 2)
+        self.control_rate_input = QLineEdit("100")
+        layout.addWidget(self.control_rate_input, 2, 3)
+        
         self.set_pd_btn = QPushButton("Set Gains")
         self.set_pd_btn.setStyleSheet(ADCS_BUTTON_STYLE)
         self.set_pd_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        layout.addWidget(self.set_pd_btn, 0, 4, 2, 1)
+        layout.addWidget(self.set_pd_btn, 0, 4, 3, 1)
+
+        # Row 3 - relay-test auto-tune for a target settling time
+        layout.addWidget(QLabel("Settle (s):"), 3, 0)
+        self.settling_time_input = QLineEdit("2")
+        layout.addWidget(self.settling_time_input, 3, 1)
+        self.autotune_btn = QPushButton("Auto Tune")
+        self.autotune_btn.setStyleSheet(ADCS_BUTTON_STYLE)
+        self.autotune_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        layout.addWidget(self.autotune_btn, 3, 2, 1, 3)
 
         group.setLayout(layout)
         return group
@@ -305,6 +321,7 @@ class ADCSSection(QGroupBox):
         self.run_controller_btn.clicked.connect(self._handle_run_controller_clicked)
         self.set_zero_btn.clicked.connect(self._handle_set_zero_clicked)
         self.set_pd_btn.clicked.connect(self._handle_set_pd_clicked)
+        self.autotune_btn.clicked.connect(self._handle_autotune_clicked)
         
         # Quick target buttons
         self.btn_minus_45.clicked.connect(lambda: self._handle_quick_target(-45))
@@ -410,11 +427,37 @@ class ADCSSection(QGroupBox):
                 "kp": float(self.kp_input.text()),
                 "kd": float(self.kd_input.text()),
                 "deadband": float(self.deadband_input.text()),
+                "ki": float(self.ki_input.text()),
+                "rate_hz": float(self.control_rate_input.text()),
             }
             self._handle_action_clicked("adcs", "set_pd_values", pd_values)
         except ValueError:
             logging.warning("Invalid PD values")
 
+    def _handle_autotune_clicked(self):
+        try:
+            settling_time = float(self.settling_time_input.text())
+        except ValueError:
+            logging.warning("Invalid settling time")
+            return
+        self.autotune_btn.setEnabled(False)
+        self.autotune_btn.setText("Tuning...")
+        self._handle_action_clicked("adcs", "autotune", {"settling_time": settling_time})
+
+    def show_autotune_result(self, ack):
+        """adcs_command_ack of an autotune: load the designed gains into the inputs"""
+        self.autotune_btn.setEnabled(True)
+        self.autotune_btn.setText("Auto Tune")
+        data = ack.get("data")
+        if ack.get("status") != "SUCCESS" or not data:
+            return
+        self.kp_input.setText(f"{data['kp']:.2f}")
+        self.kd_input.setText(f"{data['kd']:.2f}")
+        model = data['model']
+        self.autotune_btn.setToolTip(
+            f"gain {model['gain']:.3f} °/s² per %, damping {model['damping']:.3f} 1/s (r² {model['r2']:.2f})\n"
+            f"{ack.get('message', '')}")
+
     def _handle_set_target_zero(self):
         """Set target to zero immediately"""
         self.current_target_value = 0.0
@@ -30,6 +30,8 @@ class CameraControlsWidget(QGroupBox):
         
         # Detector Control Button
         self.detector_btn = QPushButton("Run Detector")
+        self.onboard_pose_btn = QPushButton("On-board Pose")  # Detect on the Pi, stream pose instead of video
+        self.record_session_btn = QPushButton("Record on Pi")  # Video + telemetry to the Pi's disk, fetched on stop
         
         # Manual Orientation Button
         self.orientation_btn = QPushButton("Show Crosshairs")
@@ -67,11 +69,13 @@ class CameraControlsWidget(QGroupBox):
         """
 
         # Apply the same style to all buttons
-        for btn in (self.toggle_btn, self.reconnect_btn, self.capture_btn, self.detector_btn, self.orientation_btn, self.get_batt_temp_btn):
+        for btn in (self.toggle_btn, self.reconnect_btn, self.capture_btn, self.detector_btn, self.onboard_pose_btn, self.record_session_btn, self.orientation_btn, self.get_batt_temp_btn):
             btn.setStyleSheet(self.BUTTON_STYLE)
             
         # Make the Start Detector button checkable and set it to stay pressed when toggled
         self.detector_btn.setCheckable(True)
+        self.onboard_pose_btn.setCheckable(True)
+        self.record_session_btn.setCheckable(True)
         self.toggle_btn.setCheckable(True)
         self.orientation_btn.setCheckable(True)
 
@@ -94,6 +98,10 @@ class CameraControlsWidget(QGroupBox):
                 self.capture_btn.clicked.connect(self.parent_window.capture_image)
             if hasattr(self.parent_window, 'toggle_detector'):
                 self.detector_btn.clicked.connect(self.parent_window.toggle_detector)
+            if hasattr(self.parent_window, 'toggle_onboard_pose'):
+                self.onboard_pose_btn.toggled.connect(self.parent_window.toggle_onboard_pose)
+            if hasattr(self.parent_window, 'toggle_session_recording'):
+                self.record_session_btn.toggled.connect(self.parent_window.toggle_session_recording)
             if hasattr(self.parent_window, 'toggle_orientation'):
                 self.orientation_btn.clicked.connect(self.parent_window.toggle_orientation)
             # Optionally connect Get Battery Temp button if handler exists
@@ -104,6 +112,8 @@ class CameraControlsWidget(QGroupBox):
         self.toggle_btn.setEnabled(False)
         self.capture_btn.setEnabled(False)  # Will be enabled when connected
         self.detector_btn.setEnabled(False)  # Will be enabled when connected
+        self.onboard_pose_btn.setEnabled(False)  # Will be enabled when connected
+        self.record_session_btn.setEnabled(False)  # Will be enabled when connected
         
         # Set crosshairs button to be checked by default
         self.orientation_btn.setChecked(False)
@@ -112,9 +122,11 @@ class CameraControlsWidget(QGroupBox):
         #self.layout.addWidget(self.run_camera_btn)
         #self.layout.addWidget(self.run_lidar_btn)
         self.layout.addWidget(self.detector_btn)
+        self.layout.addWidget(self.onboard_pose_btn)
         self.layout.addWidget(self.toggle_btn)
         self.layout.addWidget(self.reconnect_btn)
         self.layout.addWidget(self.capture_btn)
+        self.layout.addWidget(self.record_session_btn)
         self.layout.addWidget(self.get_batt_temp_btn)
         self.layout.addWidget(self.orientation_btn)
 
@@ -149,7 +161,7 @@ class CameraControlsWidget(QGroupBox):
         """Apply external style while preserving button styles"""
         # Store current button styles
         button_styles = {}
-        for btn_name in ['toggle_btn', 'reconnect_btn', 'capture_btn', 'detector_btn']:
+        for btn_name in ['toggle_btn', 'reconnect_btn', 'capture_btn', 'detector_btn', 'onboard_pose_btn', 'record_session_btn']:
             btn = getattr(self, btn_name)
             button_styles[btn_name] = btn.styleSheet()
         
@@ -116,6 +116,11 @@ class DetectorSettingsWidget(QGroupBox):
         self.display_fps_label = QLabel("Display FPS: --")
         layout.addWidget(self.display_fps_label)
 
+        # On-board pose: latency of each hop from exposure (ms)
+        self.pose_latency_label = QLabel("Pose Latency: --")
+        self.pose_latency_label.setWordWrap(True)
+        layout.addWidget(self.pose_latency_label)
+
         self.setLayout(layout)
         self._emit_settings()
 
@@ -135,6 +140,14 @@ class DetectorSettingsWidget(QGroupBox):
         """Update the latency display (in milliseconds)."""
         self.latency_label.setText(f"Latency: {ms:.1f} ms")
 
+    def set_pose_latency(self, hops: dict):
+        """Update the on-board pose latency breakdown (ms per hop)."""
+        self.pose_latency_label.setText(
+            f"Pose Latency: capture→detect {hops.get('capture_to_detect', 0):.0f} | "
+            f"detect {hops.get('detect', 0):.0f} | →ADCS {hops.get('to_adcs', 0):.1f} | "
+            f"downlink {hops.get('downlink', 0):.0f} | total {hops.get('capture_to_client', 0):.0f} ms"
+        )
+
     def set_display_fps(self, fps: float):
         """Update the display FPS."""
         self.display_fps_label.setText(f"Display FPS: {fps:.1f}")
@@ -29,8 +29,12 @@ from theme import (
 # LIDAR_Y_MAX = 2
 # X-axis fixed to 10 seconds range
 
+AVERAGE_WINDOW_S = 5.0       # Seconds of history behind the "5s Avg" label
+HISTORY_LIMIT = 5000         # Samples kept at most (5s at the sensor's 500Hz, plus margin)
+
 class LidarWidget(QWidget):
     lidar_metrics_received = pyqtSignal(dict)
+    lidar_batch_received = pyqtSignal(dict)
     back_button_clicked = pyqtSignal()
     lidar_start_requested = pyqtSignal()
     lidar_stop_requested = pyqtSignal()
@@ -42,7 +46,8 @@ class LidarWidget(QWidget):
         self.is_streaming = False
         self.data_mutex = QMutex()
 
-        self.live_distance_history = deque(maxlen=70) 
+        self.live_distance_history = deque(maxlen=HISTORY_LIMIT)  # Distances (m) over the last AVERAGE_WINDOW_S
+        self.live_distance_times = deque(maxlen=HISTORY_LIMIT)    # Matching wall-clock times
 
         # Recording attributes
         self.is_recording = False
@@ -55,6 +60,7 @@ class LidarWidget(QWidget):
         
         # Connect the signal to update method
         self.lidar_metrics_received.connect(self.update_metrics_slot)
+        self.lidar_batch_received.connect(self.update_batch_slot)
 
     # init_plot method is removed
 
@@ -243,7 +249,7 @@ class LidarWidget(QWidget):
         if live_distance is not None:
             self.live_distance_label.setText(f"{live_distance:.2f} m")
             with QMutexLocker(self.data_mutex):
-                self.live_distance_history.append(live_distance)
+                self._append_history(current_time, live_distance)
         else:
             self.live_distance_label.setText("N/A")
 
@@ -265,6 +271,36 @@ class LidarWidget(QWidget):
                 relative_timestamp = current_time - self.recording_start_time
                 self.recorded_data.append((relative_timestamp, live_distance))
 
+    def set_batch(self, samples: dict):
+        """Receive a batch {"t": [...], "distance_cm": [...]} (on-board monotonic seconds, filtered cm)"""
+        if samples and samples.get("t"):
+            self.lidar_batch_received.emit(samples)
+
+    def update_batch_slot(self, samples: dict):
+        """Every sample of a batch goes into the history (and the recording); labels show the latest.
+        Sample times are placed on the local clock by their offset from the batch's last sample."""
+        if not self.is_streaming:
+            return
+        current_time = time.time()
+        t, distances = samples["t"], samples["distance_cm"]
+        with QMutexLocker(self.data_mutex):
+            for ti, distance_cm in zip(t, distances):
+                wall_time = current_time - (t[-1] - ti)
+                self._append_history(wall_time, distance_cm / 100.0)
+                if self.is_recording:
+                    self.recorded_data.append((wall_time - self.recording_start_time, distance_cm / 100.0))
+            average = sum(self.live_distance_history) / len(self.live_distance_history)
+        self.live_distance_label.setText(f"{distances[-1] / 100.0:.2f} m")
+        self.average_distance_label.setText(f"{average:.2f} m")
+
+    def _append_history(self, timestamp, distance_m):
+        """Add one sample and drop those older than AVERAGE_WINDOW_S (call with data_mutex held)"""
+        self.live_distance_history.append(distance_m)
+        self.live_distance_times.append(timestamp)
+        while self.live_distance_times and self.live_distance_times[0] < timestamp - AVERAGE_WINDOW_S:
+            self.live_distance_times.popleft()
+            self.live_distance_history.popleft()
+
     # update_plot method is removed
 
     def start_recording(self):
@@ -324,6 +360,7 @@ class LidarWidget(QWidget):
     def clear_history(self):
         with QMutexLocker(self.data_mutex):
             self.live_distance_history.clear() # Clear the client-side history
+            self.live_distance_times.clear()
             if hasattr(self, 'recorded_data'): 
                  self.recorded_data = []
         self.live_distance_label.setText("-- m")
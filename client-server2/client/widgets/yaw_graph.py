@@ -1,7 +1,7 @@
 import pyqtgraph as pg
 from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QStackedWidget, QPushButton, QWidget, QFrame, QSizePolicy
 from PyQt6.QtCore import QTimer, Qt
-from collections import deque
+import numpy as np
 import time
 from theme import (
     PLOT_BACKGROUND, PLOT_LINE_PRIMARY, PLOT_LINE_SECONDARY,
@@ -9,10 +9,13 @@ from theme import (
 )
 
 class YawGraphWidget(QFrame):
-    def __init__(self, parent=None, window_seconds=10):
+    def __init__(self, parent=None, window_seconds=10, max_rate_hz=250):
         super().__init__(parent)
         self.window_seconds = window_seconds
-        self.data = deque()
+        # Ring buffer of (t, target, current) - sized for full-rate batched telemetry
+        self.capacity = int(window_seconds * max_rate_hz)
+        self.data = np.zeros((self.capacity, 3))
+        self.count = 0
         self.setMinimumSize(400, 160)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.setStyleSheet(f"background-color: {PLOT_BACKGROUND}; border: none;")
@@ -71,26 +74,38 @@ class YawGraphWidget(QFrame):
         self.stacked.setCurrentIndex(0)
 
     def reset_time(self):
-        self.t0 = time.time()
-        self.data.clear()
+        self.t0 = None
+        self.count = 0
 
     def push_data(self, target_yaw, current_yaw):
-        now = time.time()
+        """One sample stamped with the local receive time (legacy per-sample broadcast)"""
+        self.push_batch([time.time()], [target_yaw], [current_yaw])
+
+    def push_batch(self, times, target_yaws, current_yaws):
+        """A chunk of samples stamped with their own (server) times"""
+        times = np.asarray(times, dtype=np.float64)
+        if len(times) == 0:
+            return
         if self.t0 is None:
-            self.t0 = now
-        t_rel = now - self.t0
-        self.data.append((t_rel, float(target_yaw), float(current_yaw)))
-        cutoff = t_rel - self.window_seconds
-        while self.data and self.data[0][0] < cutoff:
-            self.data.popleft()
+            self.t0 = times[0]
+        rows = np.column_stack((times - self.t0, target_yaws, current_yaws))[-self.capacity:]
+        idx = np.arange(self.count, self.count + len(rows)) % self.capacity
+        self.data[idx] = rows
+        self.count += len(rows)
+
+    def _window(self):
+        """Samples in the visible window, oldest first"""
+        first = max(self.count - self.capacity, 0)
+        rows = self.data[np.arange(first, self.count) % self.capacity]
+        if len(rows):
+            rows = rows[rows[:, 0] >= rows[-1, 0] - self.window_seconds]
+        return rows
 
     def redraw(self):
-        if len(self.data) < 2:
+        rows = self._window()
+        if len(rows) < 2:
             self.target_curve.setData([], [])
             self.current_curve.setData([], [])
             return
-        times = [d[0] for d in self.data]
-        target_yaws = [d[1] for d in self.data]
-        current_yaws = [d[2] for d in self.data]
-        self.target_curve.setData(times, target_yaws)
-        self.current_curve.setData(times, current_yaws)
+        self.target_curve.setData(rows[:, 0], rows[:, 1])
+        self.current_curve.setData(rows[:, 0], rows[:, 2])
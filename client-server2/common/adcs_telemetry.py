@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+📦 ADCS TELEMETRY FRAMES - compact binary records for the adcs_broadcast event
+Replaces the dictionary of pre-formatted strings with raw numbers; values are
+formatted only where they are displayed.
+- Versioned message header + N fixed-size NumPy records (little-endian)
+- Every record carries a sequence number and the server time.monotonic() stamp
+- decode_frames() returns a structured array (whole batches decode in one call)
+- to_display_dict() rebuilds the legacy string dictionary at the display edge
+- TelemetryRing keeps every data-thread sample so the broadcaster can ship
+  them in chunks (one message per chunk instead of one per sample)
+
+Shared by server and client from common/; bump FRAME_VERSION when the
+record layout changes.
+"""
+import struct
+import threading
+
+import numpy as np
+
+FRAME_MAGIC = b"AT"
+FRAME_VERSION = 1
+FRAME_KIND_ADCS = 1
+HEADER = struct.Struct("<2sBBH")   # magic, version, kind, record count
+
+ADCS_RECORD_DTYPE = np.dtype([
+    ('seq', '<u4'),            # Data-thread sample counter
+    ('t', '<f8'),              # Server time.monotonic() of the sample
+    ('yaw', '<f4'),            # Control yaw (fused when the estimator is enabled)
+    ('roll', '<f4'),
+    ('pitch', '<f4'),
+    ('gyro_yaw', '<f4'),       # Raw gyro integral, not re-anchored by tag / sun fixes
+    ('rate_x', '<f4'),
+    ('rate_y', '<f4'),
+    ('rate_z', '<f4'),
+    ('temp', '<f4'),
+    ('lux1', '<f4'),
+    ('lux2', '<f4'),
+    ('lux3', '<f4'),
+    ('rpm', '<f4'),
+    ('target_yaw', '<f4'),
+    ('error', '<f4'),
+    ('motor_power', '<f4'),
+    ('yaw_bias', '<f4'),
+    ('yaw_std', '<f4'),
+    ('fifo_samples', '<u4'),
+    ('fifo_overflows', '<u4'),
+    ('fifo_batch', '<u2'),
+    ('status', 'u1'),
+    ('reference', 'u1'),
+    ('controller_enabled', 'u1'),
+    ('reserved', 'u1'),
+])
+
+STATUS_NAMES = ["Unknown", "Initializing", "Active", "Error", "MPU Error", "MPU Not Ready"]
+REFERENCE_NAMES = ["zero", "tag", "sun"]
+
+def _code(names, value):
+    try:
+        return names.index(value)
+    except ValueError:
+        return 0 if names is STATUS_NAMES else 255
+
+def _name(names, code):
+    return names[code] if code < len(names) else "Unknown"
+
+def _fill_row(row, record):
+    for field in ADCS_RECORD_DTYPE.names:
+        if field in ('status', 'reference', 'reserved'):
+            continue
+        if field in record:
+            row[field] = record[field]
+    row['status'] = _code(STATUS_NAMES, record.get('status', 'Unknown'))
+    row['reference'] = _code(REFERENCE_NAMES, record.get('reference', 'zero'))
+
+def encode_frames(records):
+    """Pack telemetry dicts (keys as in ADCS_RECORD_DTYPE, status/reference as names) into bytes"""
+    array = np.zeros(len(records), dtype=ADCS_RECORD_DTYPE)
+    for i, record in enumerate(records):
+        _fill_row(array[i], record)
+    return HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_KIND_ADCS, len(array)) + array.tobytes()
+
+def encode_array(array):
+    """Pack an existing ADCS_RECORD_DTYPE array (no per-field work)"""
+    return HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_KIND_ADCS, len(array)) + array.tobytes()
+
+def decode_frames(payload):
+    """Bytes -> structured array of ADCS records. Raises ValueError on a foreign or newer frame"""
+    payload = bytes(payload)
+    if len(payload) < HEADER.size:
+        raise ValueError("Telemetry frame too short")
+    magic, version, kind, count = HEADER.unpack_from(payload)
+    if magic != FRAME_MAGIC or kind != FRAME_KIND_ADCS:
+        raise ValueError("Not an ADCS telemetry frame")
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported telemetry frame version {version} (expected {FRAME_VERSION})")
+    expected = HEADER.size + count * ADCS_RECORD_DTYPE.itemsize
+    if len(payload) != expected:
+        raise ValueError(f"Telemetry frame length {len(payload)} != {expected}")
+    return np.frombuffer(payload, dtype=ADCS_RECORD_DTYPE, count=count, offset=HEADER.size)
+
+def to_display_dict(record):
+    """Legacy adcs_broadcast string dictionary from one decoded record (display edge only)"""
+    yaw, roll, pitch = float(record['yaw']), float(record['roll']), float(record['pitch'])
+    return {
+        'gyro': f"{yaw:.1f}°",
+        'orientation': f"Y:{yaw:.1f}° R:{roll:.1f}° P:{pitch:.1f}°",
+        'lux1': f"{record['lux1']:.1f}",
+        'lux2': f"{record['lux2']:.1f}",
+        'lux3': f"{record['lux3']:.1f}",
+        'rpm': f"{record['rpm']:.1f}",
+        'status': _name(STATUS_NAMES, int(record['status'])),
+        'gyro_rate_x': f"{record['rate_x']:.2f}",
+        'gyro_rate_y': f"{record['rate_y']:.2f}",
+        'gyro_rate_z': f"{record['rate_z']:.2f}",
+        'angle_x': f"{pitch:.1f}",
+        'angle_y': f"{roll:.1f}",
+        'angle_z': f"{yaw:.1f}",
+        'gyro_yaw': f"{record['gyro_yaw']:.1f}",
+        'temperature': f"{record['temp']:.1f}°C",
+        'fifo_samples': f"{int(record['fifo_samples'])}",
+        'fifo_batch': f"{int(record['fifo_batch'])}",
+        'fifo_overflows': f"{int(record['fifo_overflows'])}",
+        'yaw_bias': f"{record['yaw_bias']:.3f}",
+        'yaw_std': f"{record['yaw_std']:.2f}",
+        'yaw_reference': _name(REFERENCE_NAMES, int(record['reference'])),
+    }
+
+# ── SAMPLE RING ────────────────────────────────────────────────────────
+class TelemetryRing:
+    """Fixed-size ring of ADCS records, read back by sequence number.
+
+    The data thread append()s every sample; the broadcaster calls
+    since(last_seq) and ships whatever is new as one or more frames.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=ADCS_RECORD_DTYPE)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, record):
+        """Store one telemetry dict (same keys as encode_frames)"""
+        with self.lock:
+            _fill_row(self.records[self.count % self.capacity], record)
+            self.count += 1
+
+    @property
+    def last_seq(self):
+        with self.lock:
+            return int(self.records[(self.count - 1) % self.capacity]['seq']) if self.count else 0
+
+    def since(self, seq, limit=None):
+        """Copy of the records newer than `seq`, oldest first (at most `limit`, newest kept)"""
+        with self.lock:
+            first = max(self.count - self.capacity, 0)
+            idx = np.arange(first, self.count) % self.capacity
+            records = self.records[idx]
+        records = records[records['seq'] > seq]
+        if limit is not None and len(records) > limit:
+            records = records[-limit:]
+        return records.copy()
+
+def chunk_frames(records, chunk_size):
+    """Split a record array into encoded frames of at most chunk_size records"""
+    return [encode_array(records[i:i + chunk_size]) for i in range(0, len(records), max(1, chunk_size))]
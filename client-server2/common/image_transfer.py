@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+📦 IMAGE TRANSFER - chunked binary download of captured stills with resume
+Replaces the single base64 image_download message (whole file in memory, +33%)
+with raw binary chunks streamed from disk.
+- Server: ImageSender reads CHUNK_SIZE pieces from the file; at most
+  WINDOW_CHUNKS are unacknowledged at a time (flow control)
+- Client: ImageReceiver writes chunks to <name>.part and acknowledges each one;
+  a sidecar .part.json keeps the size/checksum so an interrupted download
+  resumes from the bytes already on disk (after a reconnect, or a new request)
+- SHA-256 of the whole file is sent up front and checked before the .part is renamed
+- Progress callbacks carry percent and transfer rate for the UI
+
+Events:  client -> server  download_image {server_path, filename, offset, sha256}
+                           image_chunk_ack {transfer_id, next_offset}
+         server -> client  image_transfer_start {transfer_id, filename, size, sha256, offset, chunk_size}
+                           image_chunk {transfer_id, offset, data}
+                           image_transfer_end {transfer_id, size}
+                           image_download {success: False, error}   (failures, as before)
+
+Shared by server and client from common/.
+"""
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+
+CHUNK_SIZE = 64 * 1024
+WINDOW_CHUNKS = 8                 # 512 KB in flight
+ACK_TIMEOUT_S = 10.0              # No acknowledgement for this long -> the client is gone
+
+def file_sha256(path, block_size=1024 * 1024):
+    """Checksum of a file read in blocks (never the whole file in memory)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# ── SERVER ─────────────────────────────────────────────────────────────
+class _Transfer:
+    def __init__(self, transfer_id, client, path, size, sha256, offset, emit):
+        self.id = transfer_id
+        self.client = client
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.offset = offset          # Where this session started
+        self.sent = offset
+        self.acked = offset
+        self.emit = emit
+        self.cancelled = False
+
+class ImageSender:
+    """Streams files to clients in acknowledged chunks.
+
+    emit(event, payload) is given per transfer (already bound to the client).
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, window=WINDOW_CHUNKS, ack_timeout=ACK_TIMEOUT_S):
+        self.chunk_size = chunk_size
+        self.window = window
+        self.ack_timeout = ack_timeout
+        self.transfers = {}
+        self.condition = threading.Condition()
+        self.ids = itertools.count(1)
+        self.checksums = {}           # (path, size, mtime) -> sha256
+
+        self.completed = 0
+        self.aborted = 0
+        self.bytes_sent = 0
+
+    def start(self, client, path, filename, emit, offset=0, sha256=None):
+        """Begin (or resume from `offset`) sending `path`; returns the transfer id"""
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime)
+        if key not in self.checksums:
+            self.checksums[key] = file_sha256(path)
+        checksum = self.checksums[key]
+        offset = int(offset or 0)
+        if sha256 != checksum or not 0 <= offset <= stat.st_size:
+            offset = 0                # Different file (or nothing to resume): from the start
+        transfer = _Transfer(f"{os.getpid()}-{next(self.ids)}", client, path, stat.st_size, checksum, offset, emit)
+        with self.condition:
+            for other in self.transfers.values():
+                if other.client == client and other.path == path:
+                    other.cancelled = True    # A re-request replaces the old session
+            self.transfers[transfer.id] = transfer
+            self.condition.notify_all()
+        emit("image_transfer_start", {
+            "transfer_id": transfer.id, "filename": filename, "size": transfer.size,
+            "sha256": checksum, "offset": offset, "chunk_size": self.chunk_size,
+        })
+        threading.Thread(target=self._run, args=(transfer,), daemon=True).start()
+        return transfer.id
+
+    def ack(self, transfer_id, next_offset):
+        with self.condition:
+            transfer = self.transfers.get(transfer_id)
+            if transfer and next_offset > transfer.acked:
+                transfer.acked = min(int(next_offset), transfer.sent)
+                self.condition.notify_all()
+
+    def cancel(self, client):
+        """Stop every transfer of a client (disconnect); the client resumes later"""
+        with self.condition:
+            for transfer in self.transfers.values():
+                if transfer.client == client:
+                    transfer.cancelled = True
+            self.condition.notify_all()
+
+    def _run(self, transfer):
+        window_bytes = self.window * self.chunk_size
+        try:
+            with open(transfer.path, "rb") as f:
+                f.seek(transfer.sent)
+                while True:
+                    with self.condition:
+                        deadline = time.monotonic() + self.ack_timeout
+                        while not transfer.cancelled and (
+                                transfer.sent - transfer.acked >= window_bytes
+                                or (transfer.sent >= transfer.size and transfer.acked < transfer.size)):
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                transfer.cancelled = True
+                                print(f"[WARN] Image transfer {transfer.id}: no acknowledgement for {self.ack_timeout:.1f}s")
+                                break
+                            progress = transfer.acked
+                            self.condition.wait(remaining)
+                            if transfer.acked != progress:
+                                deadline = time.monotonic() + self.ack_timeout
+                        if transfer.cancelled:
+                            self.aborted += 1
+                            return
+                        if transfer.acked >= transfer.size:
+                            break
+                        offset = transfer.sent
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        raise IOError(f"{transfer.path} shrank during the transfer")
+                    with self.condition:
+                        transfer.sent += len(data)
+                    transfer.emit("image_chunk", {"transfer_id": transfer.id, "offset": offset, "data": data})
+                    self.bytes_sent += len(data)
+            transfer.emit("image_transfer_end", {"transfer_id": transfer.id, "size": transfer.size})
+            self.completed += 1
+        except Exception as e:
+            self.aborted += 1
+            print(f"[ERROR] Image transfer {transfer.id}: {e}")
+            transfer.emit("image_download", {"success": False, "error": str(e)})
+        finally:
+            with self.condition:
+                self.transfers.pop(transfer.id, None)
+
+    def get_stats(self):
+        return {"active": len(self.transfers), "completed": self.completed,
+                "aborted": self.aborted, "bytes_sent": self.bytes_sent}
+
+# ── CLIENT ─────────────────────────────────────────────────────────────
+class _Download:
+    def __init__(self, server_path, filename, path):
+        self.server_path = server_path
+        self.filename = filename
+        self.path = path
+        self.part = path + ".part"
+        self.meta = path + ".part.json"
+        self.transfer_id = None
+        self.size = None
+        self.sha256 = None
+        self.received = 0
+        self.session_start = None
+        self.session_offset = 0
+        self.file = None
+
+class ImageReceiver:
+    """Writes incoming chunks to disk, acknowledges them and resumes interrupted downloads.
+
+    emit(event, payload) sends to the server. on_progress(info) gets
+    {filename, received, size, percent, rate_mbps, done, ok, error, path}.
+    """
+
+    def __init__(self, emit, directory, on_progress=None):
+        self.emit = emit
+        self.directory = directory
+        self.on_progress = on_progress
+        self.downloads = {}           # filename -> _Download
+        self.by_transfer = {}         # transfer_id -> _Download
+        self.lock = threading.Lock()
+
+    def request(self, server_path, filename):
+        """Ask for a file; picks up an earlier partial download of the same name"""
+        os.makedirs(self.directory, exist_ok=True)
+        download = _Download(server_path, filename, os.path.join(self.directory, filename))
+        offset, sha256 = 0, None
+        if os.path.exists(download.part) and os.path.exists(download.meta):
+            try:
+                with open(download.meta) as f:
+                    meta = json.load(f)
+                if meta.get("server_path") == server_path:
+                    offset, sha256 = os.path.getsize(download.part), meta.get("sha256")
+            except (OSError, ValueError):
+                pass
+        with self.lock:
+            self._close(self.downloads.get(filename))
+            self.downloads[filename] = download
+        self.emit("download_image", {"server_path": server_path, "filename": filename,
+                                     "offset": offset, "sha256": sha256})
+
+    def resume_pending(self):
+        """Re-request every unfinished download (call after reconnecting)"""
+        with self.lock:
+            pending = [(d.server_path, d.filename) for d in self.downloads.values()]
+        for server_path, filename in pending:
+            self.request(server_path, filename)
+
+    def on_start(self, msg):
+        with self.lock:
+            download = self.downloads.get(msg["filename"])
+            if download is None:
+                return
+            self._close(download)
+            download.transfer_id = msg["transfer_id"]
+            download.size = msg["size"]
+            download.sha256 = msg["sha256"]
+            download.received = download.session_offset = msg["offset"]
+            download.session_start = time.monotonic()
+            download.file = open(download.part, "r+b" if msg["offset"] and os.path.exists(download.part) else "wb")
+            download.file.truncate(msg["offset"])
+            download.file.seek(msg["offset"])
+            with open(download.meta, "w") as f:
+                json.dump({"server_path": download.server_path, "size": download.size, "sha256": download.sha256}, f)
+            self.by_transfer[download.transfer_id] = download
+        if msg["offset"]:
+            print(f"[INFO] Resuming {download.filename} at {msg['offset'] / 1024:.0f} KB")
+
+    def on_chunk(self, msg):
+        with self.lock:
+            download = self.by_transfer.get(msg["transfer_id"])
+            if download is None or download.file is None:
+                return
+            if msg["offset"] == download.received:
+                download.file.write(msg["data"])
+                download.received += len(msg["data"])
+            next_offset = download.received   # Duplicates / gaps re-acknowledge what we have
+        self.emit("image_chunk_ack", {"transfer_id": msg["transfer_id"], "next_offset": next_offset})
+        self._progress(download)
+
+    def on_end(self, msg):
+        with self.lock:
+            download = self.by_transfer.pop(msg["transfer_id"], None)
+            if download is None:
+                return
+            self._close(download)
+            self.downloads.pop(download.filename, None)
+        error = None
+        if download.received != download.size:
+            error = f"incomplete ({download.received} of {download.size} bytes)"
+        elif file_sha256(download.part) != download.sha256:
+            error = "checksum mismatch"
+        if error:
+            for path in (download.part, download.meta):
+                if os.path.exists(path):
+                    os.remove(path)
+        else:
+            os.replace(download.part, download.path)
+            os.remove(download.meta)
+        self._progress(download, done=True, error=error)
+
+    def _close(self, download):
+        if download is not None and download.file is not None:
+            download.file.close()
+            download.file = None
+
+    def _progress(self, download, done=False, error=None):
+        if not self.on_progress:
+            return
+        elapsed = time.monotonic() - download.session_start if download.session_start else 0.0
+        rate = (download.received - download.session_offset) / elapsed / 1e6 if elapsed > 0 else 0.0
+        self.on_progress({
+            "filename": download.filename, "received": download.received, "size": download.size,
+            "percent": 100.0 * download.received / download.size if download.size else 0.0,
+            "rate_mbps": rate, "done": done, "ok": done and error is None, "error": error,
+            "path": download.path,
+        })
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+🎞️ SESSION RECORDER - on-board recording of the camera stream and telemetry
+Appends JPEG frames (the bytes CameraStreamer already produced, never re-encoded)
+and telemetry records (ADCS binary frames, LiDAR / power dictionaries) to
+segment files with a time index, so nothing depends on the ground link.
+- Session directory: session.json manifest + NNNNNN.seg (records) + NNNNNN.idx (index)
+- Record = header (wall time, topic id, kind, length) + payload; the .idx holds
+  (time, offset, length, topic, kind) per record for O(log n) time lookup
+- Bounded write buffering: record() only appends to memory; a writer thread
+  flushes every FLUSH_INTERVAL_S or FLUSH_BYTES. Past MAX_PENDING_BYTES records
+  are dropped (counted), the publisher never blocks on the SD card
+- Segments rotate by size / duration; recording stops when free disk is low
+- SessionReader: any time range of any topics back out, paged for the link;
+  an index lost in a crash is rebuilt from the segment headers
+- Pages travel as concatenated records (encode_records / decode_records)
+
+Shared by server and client from common/.
+"""
+import json
+import os
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), "sessions")
+SEGMENT_BYTES = 64 * 1024 * 1024
+SEGMENT_SECONDS = 300
+FLUSH_INTERVAL_S = 0.5
+FLUSH_BYTES = 1024 * 1024
+MAX_PENDING_BYTES = 16 * 1024 * 1024   # ~10s of 1536x864 video
+MIN_FREE_BYTES = 200 * 1024 * 1024
+PAGE_BYTES = 256 * 1024                # Per fetch_session reply
+
+KIND_BYTES, KIND_JSON = 0, 1
+RECORD_HEADER = struct.Struct("<dBBI")          # time, topic id, kind, payload length
+INDEX_DTYPE = np.dtype([("t", "<f8"), ("offset", "<u4"), ("length", "<u4"), ("topic", "u1"), ("kind", "u1")])
+
+def _encode_payload(payload):
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return KIND_BYTES, bytes(payload)
+    return KIND_JSON, json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+def _decode_payload(kind, data):
+    return data if kind == KIND_BYTES else json.loads(data)
+
+def encode_records(records, topics):
+    """[(t, topic name, payload)] -> bytes (topics: list of names, position = id)"""
+    parts = []
+    for t, topic, payload in records:
+        kind, data = _encode_payload(payload)
+        parts.append(RECORD_HEADER.pack(t, topics.index(topic), kind, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+def decode_records(data, topics):
+    """Inverse of encode_records; yields (t, topic name, payload)"""
+    view = memoryview(data)
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(view):
+        t, topic, kind, length = RECORD_HEADER.unpack_from(view, offset)
+        offset += RECORD_HEADER.size
+        yield t, topics[topic], _decode_payload(kind, bytes(view[offset:offset + length]))
+        offset += length
+
+# ── WRITER ─────────────────────────────────────────────────────────────
+class SessionRecorder:
+    """Records topics into session directories under `directory`.
+
+    Usage:
+        recorder.start(["frame", "adcs", "lidar"])
+        recorder.record("frame", jpeg_bytes)           # any thread, never blocks on disk
+        recorder.stop()
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, segment_bytes=SEGMENT_BYTES,
+                 segment_seconds=SEGMENT_SECONDS, max_pending_bytes=MAX_PENDING_BYTES,
+                 min_free_bytes=MIN_FREE_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_pending_bytes = max_pending_bytes
+        self.min_free_bytes = min_free_bytes
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.active = False
+        self.thread = None
+        self._reset()
+
+    def _reset(self):
+        self.session = None
+        self.path = None
+        self.topics = []
+        self.topic_ids = {}
+        self.pending = []            # (t, topic id, kind, data)
+        self.pending_bytes = 0
+        self.last_t = 0.0
+        self.segments = []
+        self.segment = None          # Open segment entry of self.segments
+        self.seg_file = None
+        self.idx_file = None
+        self.records = 0
+        self.bytes_written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_time = 0.0
+        self.max_flush_ms = 0.0
+        self.stop_reason = None
+
+    def wants(self, topic):
+        """Cheap check before producing a payload only the recorder would need"""
+        return self.active and topic in self.topic_ids
+
+    def start(self, topics, name=None):
+        with self.lock:
+            if self.active:
+                return {"status": "error", "message": f"Already recording {self.session}"}
+            self._reset()
+            self.session = name or datetime.now().strftime("session_%Y%m%d_%H%M%S")
+            self.path = os.path.join(self.directory, self.session)
+            os.makedirs(self.path, exist_ok=True)
+            self.topics = list(topics)
+            self.topic_ids = {topic: i for i, topic in enumerate(self.topics)}
+            self.started = time.time()
+            self._write_manifest()
+            self.active = True
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+        return {"status": "success", "message": f"Recording {', '.join(self.topics)} to {self.path}",
+                "session": self.session}
+
+    def record(self, topic, payload, timestamp=None):
+        """Queue one record; returns False if not recording this topic or the buffer is full.
+
+        timestamp defaults to now (wall clock); pass one when copying recorded records.
+        """
+        if not self.active:
+            return False
+        topic_id = self.topic_ids.get(topic)
+        if topic_id is None:
+            return False
+        kind, data = _encode_payload(payload)
+        with self.lock:
+            if not self.active:
+                return False
+            if self.pending_bytes + len(data) > self.max_pending_bytes:
+                self.dropped += 1
+                return False
+            t = max(time.time() if timestamp is None else timestamp, self.last_t)  # Index stays sorted if the clock steps back
+            self.last_t = t
+            self.pending.append((t, topic_id, kind, data))
+            self.pending_bytes += len(data) + RECORD_HEADER.size
+            if self.pending_bytes >= FLUSH_BYTES:
+                self.wake.notify()
+        return True
+
+    def stop(self, reason="stopped"):
+        with self.lock:
+            if not self.active:
+                return {"status": "error", "message": "Not recording"}
+            self.active = False
+            self.stop_reason = reason
+            self.wake.notify()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        stats = self.get_stats()
+        return {"status": "success", "session": self.session, "stats": stats,
+                "message": f"Recorded {stats['records']} records ({stats['mb_written']} MB) to {self.path}"}
+
+    # ── DISK ───────────────────────────────────────────────────────────
+    def _writer_loop(self):
+        while True:
+            with self.lock:
+                if self.active and self.pending_bytes < FLUSH_BYTES:
+                    self.wake.wait(FLUSH_INTERVAL_S)
+                batch, self.pending, self.pending_bytes = self.pending, [], 0
+                active = self.active
+            try:
+                if batch:
+                    self._flush(batch)
+            except OSError as e:
+                print(f"[ERROR] Session recorder write failed: {e}")
+                with self.lock:
+                    self.active = False
+                    self.stop_reason = f"write error: {e}"
+                active = False
+            if active and shutil.disk_usage(self.path).free < self.min_free_bytes:
+                print("[WARN] Session recorder: disk nearly full, stopping")
+                with self.lock:
+                    self.active = False
+                    self.stop_reason = "disk full"
+                active = False
+            if not active:
+                with self.lock:
+                    batch, self.pending, self.pending_bytes = self.pending, [], 0
+                if batch:
+                    try:
+                        self._flush(batch)
+                    except OSError as e:
+                        print(f"[ERROR] Session recorder write failed: {e}")
+                self._close_segment()
+                self._write_manifest()
+                return
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        i = 0
+        while i < len(batch):
+            if self.segment is None or self._segment_full(batch[i][0]):
+                self._close_segment()
+                self._open_segment(batch[i][0])
+            # Everything that fits in this segment goes out in one write per file
+            parts = []
+            index = []
+            offset = self.segment["bytes"]
+            while i < len(batch):
+                t, topic_id, kind, data = batch[i]
+                if index and (offset + len(data) > self.segment_bytes or t - self.segment["start"] > self.segment_seconds):
+                    break
+                parts.append(RECORD_HEADER.pack(t, topic_id, kind, len(data)))
+                parts.append(data)
+                index.append((t, offset + RECORD_HEADER.size, len(data), topic_id, kind))
+                offset += RECORD_HEADER.size + len(data)
+                i += 1
+            data = b"".join(parts)
+            self.seg_file.write(data)
+            self.seg_file.flush()
+            self.idx_file.write(np.array(index, dtype=INDEX_DTYPE).tobytes())
+            self.idx_file.flush()
+            self.segment["bytes"] = offset
+            self.segment["records"] += len(index)
+            self.segment["end"] = index[-1][0]
+            self.records += len(index)
+            self.bytes_written += len(data)
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.flush_time += elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed * 1000.0)
+
+    def _segment_full(self, t):
+        return self.segment["bytes"] >= self.segment_bytes or t - self.segment["start"] > self.segment_seconds
+
+    def _open_segment(self, t):
+        name = f"{len(self.segments) + 1:06d}"
+        self.segment = {"name": name, "start": t, "end": t, "records": 0, "bytes": 0}
+        self.segments.append(self.segment)
+        self.seg_file = open(os.path.join(self.path, name + ".seg"), "wb")
+        self.idx_file = open(os.path.join(self.path, name + ".idx"), "wb")
+        self._write_manifest()
+
+    def _close_segment(self):
+        if self.seg_file:
+            for f in (self.seg_file, self.idx_file):
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+            self.seg_file = self.idx_file = None
+            self.segment = None
+            self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = {"session": self.session, "topics": self.topics, "started": self.started,
+                    "recording": self.active, "stop_reason": self.stop_reason, "segments": self.segments}
+        tmp = os.path.join(self.path, "session.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, "session.json"))
+
+    def get_stats(self):
+        return {
+            "session": self.session,
+            "recording": self.active,
+            "records": self.records,
+            "mb_written": round(self.bytes_written / (1024 * 1024), 2),
+            "segments": len(self.segments),
+            "dropped": self.dropped,
+            "pending_kb": round(self.pending_bytes / 1024, 1),
+            "mean_flush_ms": round(self.flush_time / self.flushes * 1000.0, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "stop_reason": self.stop_reason,
+        }
+
+# ── READER ─────────────────────────────────────────────────────────────
+def list_sessions(directory=DEFAULT_DIRECTORY):
+    """Manifests of the sessions under `directory`, oldest first"""
+    sessions = []
+    if not os.path.isdir(directory):
+        return sessions
+    for name in sorted(os.listdir(directory)):
+        try:
+            with open(os.path.join(directory, name, "session.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        segments = manifest.get("segments", [])
+        manifest["start"] = segments[0]["start"] if segments else None
+        manifest["end"] = segments[-1]["end"] if segments else None
+        manifest["records"] = sum(s["records"] for s in segments)
+        manifest["bytes"] = sum(s["bytes"] for s in segments)
+        sessions.append(manifest)
+    return sessions
+
+def _scan_segment(path, offset=0):
+    """Index entries from the record headers from `offset` on (stops at a torn record)"""
+    entries = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while offset + RECORD_HEADER.size <= size:
+            t, topic, kind, length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+            if offset + RECORD_HEADER.size + length > size:
+                break
+            entries.append((t, offset + RECORD_HEADER.size, length, topic, kind))
+            offset += RECORD_HEADER.size + length
+            f.seek(offset)
+    return np.array(entries, dtype=INDEX_DTYPE)
+
+class SessionReader:
+    """Random access to a recorded session by time."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "session.json")) as f:
+            self.manifest = json.load(f)
+        self.topics = self.manifest["topics"]
+        self.segments = []           # (name, index array)
+        for segment in self.manifest["segments"]:
+            self.segments.append((segment["name"], self._load_index(segment["name"])))
+        self.times = [index["t"] for _, index in self.segments]
+
+    def _load_index(self, name):
+        seg_path = os.path.join(self.path, name + ".seg")
+        idx_path = os.path.join(self.path, name + ".idx")
+        size = os.path.getsize(idx_path) if os.path.exists(idx_path) else 0
+        index = np.fromfile(idx_path, dtype=INDEX_DTYPE, count=size // INDEX_DTYPE.itemsize) if size else \
+            np.zeros(0, dtype=INDEX_DTYPE)
+        end = int(index["offset"][-1] + index["length"][-1]) if len(index) else 0
+        if os.path.exists(seg_path) and end < os.path.getsize(seg_path):
+            # Crash between the data and index writes: recover from the headers
+            index = np.concatenate([index, _scan_segment(seg_path, end)])
+        return index
+
+    @property
+    def start(self):
+        return next((float(t[0]) for t in self.times if len(t)), None)
+
+    @property
+    def end(self):
+        return next((float(t[-1]) for t in reversed(self.times) if len(t)), None)
+
+    def locate(self, timestamp):
+        """Cursor (segment, record) of the first record at or after `timestamp`"""
+        for s, times in enumerate(self.times):
+            if len(times) and times[-1] >= timestamp:
+                return s, int(np.searchsorted(times, timestamp, side="left"))
+        return len(self.segments), 0
+
+    def read(self, start=None, end=None, topics=None, cursor=None, max_bytes=None):
+        """Records with start <= t <= end, in time order.
+
+        Returns (records, next_cursor); next_cursor is None when the range is done.
+        Resume with cursor=next_cursor for the next page.
+        """
+        wanted = None if topics is None else {self.topics.index(t) for t in topics if t in self.topics}
+        seg, pos = cursor if cursor else self.locate(start if start is not None else float("-inf"))
+        end = float("inf") if end is None else end
+        records, total = [], 0
+        while seg < len(self.segments):
+            name, index = self.segments[seg]
+            stop = int(np.searchsorted(index["t"], end, side="right"))
+            if pos < stop:
+                entries = index[pos:stop]
+                if wanted is not None:
+                    keep = np.isin(entries["topic"], list(wanted))
+                else:
+                    keep = np.ones(len(entries), dtype=bool)
+                with open(os.path.join(self.path, name + ".seg"), "rb") as f:
+                    for k, entry in enumerate(entries):
+                        if max_bytes is not None and records and total >= max_bytes:
+                            return records, (seg, pos + k)
+                        if not keep[k]:
+                            continue
+                        f.seek(int(entry["offset"]))
+                        data = f.read(int(entry["length"]))
+                        records.append((float(entry["t"]), self.topics[entry["topic"]],
+                                        _decode_payload(int(entry["kind"]), data)))
+                        total += len(data)
+            if stop < len(index):
+                return records, None     # Past `end`
+            seg, pos = seg + 1, 0
+        return records, None
+
+    def read_page(self, start=None, end=None, topics=None, cursor=None, max_bytes=PAGE_BYTES):
+        """One page on the wire: {"data": encoded records, "cursor": next cursor or None}"""
+        records, cursor = self.read(start, end, topics, cursor, max_bytes)
+        return {"data": encode_records(records, self.topics), "topics": self.topics,
+                "records": len(records), "cursor": list(cursor) if cursor else None}
@@ -2,27 +2,57 @@
 """
 🛰️ UNIFIED ADCS CONTROLLER - Step 1: Sensor Reading & Basic Communication
 Combines MPU6050 (IMU) + VEML7700 (3x Lux) sensors with server communication interface
-- Real-time sensor data acquisition (20Hz)
+- Real-time sensor data acquisition (200Hz, shipped in batches at 20Hz)
+- Hardware-timed MPU6050 FIFO gyro sampling with batched integration
+- Round-robin lux acquisition on its own task (never blocks the gyro loop)
+- Shared I2C bus arbiter: gyro traffic is served ahead of lux / LiDAR / power telemetry
+- Fused yaw (gyro + AprilTag + lux peaks) Kalman estimate with gyro bias drives the PD controller
+- Timestamped gyro yaw history: delayed fixes are carried forward by the rotation since capture
+- Streaming lux peak detector with sub-sample sun bearing for the environmental modes
 - Thread-safe data sharing
 - Client command handling for calibration
-- Live data broadcasting at 20Hz
-- PWM PD Motor Control for Yaw Attitude Control
+- Live data broadcasting at 20Hz (numeric binary frames, see adcs_telemetry.py)
+- PWM PD Motor Control for Yaw Attitude Control (motor_driver.py: writes only on change)
+- Wheel RPM from the interrupt-driven tachometer (tachometer.py) in every telemetry sample
+- Control loop at 100Hz (configurable up to 500Hz): D term from the gyro, filtered setpoint,
+  optional I term with anti-windup; per-step compute time and loop jitter reported
+- Auto-tune command: relay test identifies the yaw plant, gains designed for a settling time
+  and checked against a predicted step response (pd_autotune.py)
 """
-from gevent import monkey
-monkey.patch_all()
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass  # Standard threads (see GEVENT COMPATIBILITY below) - e.g. under adcs_sim.py
 
 import time
-import board
-import busio
-import smbus2
 import threading
 import math
 from datetime import datetime
 import logging
 import csv
 import os
+import sys
 from collections import deque
 import datetime
+import numpy as np
+
+# Protocol modules shared with the client live in ../common
+COMMON_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+
+from mpu_fifo import MPU6050Fifo, integrate_gyro_batch
+from lux_acquisition import LuxRoundRobinReader
+from i2c_arbiter import get_shared_arbiter, PRIORITY_CONTROL, PRIORITY_TELEMETRY
+from yaw_estimator import YawKalmanFilter
+from yaw_history import YawHistory
+from lux_peak import LuxPeakDetector
+from adcs_telemetry import TelemetryRing
+from motor_driver import MotorDriver, GPIOBackend, GPIO_AVAILABLE
+from tachometer import Tachometer
+from pd_autotune import (RelayTest, fit_rate_model, design_gains, predict_step, step_metrics,
+                         DEFAULT_DAMPING_RATIO)
 
 # ── GEVENT COMPATIBILITY ───────────────────────────────────────────────
 # Handle gevent/threading compatibility for server environments
@@ -54,15 +84,13 @@ def create_thread(target, daemon=True):
         thread = threading.Thread(target=target, daemon=daemon)
         return thread
 
-# Try to import hardware libraries
-try:
-    import RPi.GPIO as GPIO
-    GPIO_AVAILABLE = True
-except ImportError:
+# Try to import hardware libraries (RPi.GPIO is probed by motor_driver)
+if not GPIO_AVAILABLE:
     print("Warning: RPi.GPIO not available - motor control disabled")
-    GPIO_AVAILABLE = False
 
 try:
+    import board
+    import busio
     from adafruit_veml7700 import VEML7700
     LUX_AVAILABLE = True
 except ImportError:
@@ -70,57 +98,67 @@ except ImportError:
     LUX_AVAILABLE = False
 
 # Constants
-LOG_FREQUENCY = 20  # Hz - Data acquisition frequency (balanced for control stability)
-DISPLAY_FREQUENCY = 20  # Hz - Server broadcast frequency (matches acquisition rate)
+LOG_FREQUENCY = 200  # Hz - Data acquisition frequency (every sample goes into the telemetry ring)
+DISPLAY_FREQUENCY = 20  # Hz - Server broadcast frequency (each broadcast ships the samples since the last)
+CONTROL_FREQUENCY = 100  # Hz - PD control loop (set_control_rate changes it at runtime)
+MAX_CONTROL_FREQUENCY = 500  # Hz - upper limit accepted by set_control_rate
+CONTROL_STATS_WINDOW = 1000  # Control steps kept for the compute-time / jitter statistics
+TEMPERATURE_FREQUENCY = 10  # Hz - MPU temperature changes slowly, no need to read it every sample
+TELEMETRY_RING_SIZE = 1024  # Samples kept for the batched broadcast (~5s at LOG_FREQUENCY)
 
 # LUX sensor constants
 MUX_ADDRESS = 0x70
 LUX_CHANNELS = [1, 2, 3]
+LUX_ACQUISITION_RATE = 30  # Hz - round-robin tick rate, one mux channel per tick (10Hz per sensor)
+LUX_PEAK_MIN_LUX = 50      # lux - peaks below this are ignored
+LUX_PEAK_PROMINENCE = 100  # lux - rise above the previous trough for a hump to count as a peak
+LUX_PEAK_HYSTERESIS = 20   # lux - drop below the maximum that confirms a peak
 
 # MPU6050 constants  
 MPU_ADDRESS = 0x68
+MPU_ACQUISITION_MODE = "fifo"  # "fifo" = hardware-timed FIFO batches, "poll" = one sample per cycle
+MPU_FIFO_SAMPLE_RATE = 500     # Hz - hardware gyro sample rate in FIFO mode
+
+# Fused yaw estimator
+YAW_ESTIMATOR_ENABLED = True   # Controller/telemetry yaw from the Kalman filter instead of raw gyro integration
+TAG_YAW_VARIANCE = 0.5 ** 2    # deg² - AprilTag relative angle
+LUX_YAW_VARIANCE = 5.0 ** 2    # deg² - lux peak (limited by sensor spacing and 10Hz per sensor)
 
 # ── PD CONTROLLER DEFAULT VALUES ───────────────────────────────────────────
 # These values can be easily changed here and will be used for initialization
 # The set_pd_values function can still change these during runtime
 DEFAULT_KP = 17           # Proportional gain
-DEFAULT_KD = 15           # Derivative gain  
+DEFAULT_KD = 15           # Derivative gain (on the measured gyro rate)
+DEFAULT_KI = 0.0          # Integral gain (0 = PD only)
 DEFAULT_MAX_POWER = 100     # Maximum PWM power (0-100%)
 DEFAULT_DEADBAND = 1      # Deadband in degrees (±1° no action zone)
-DEFAULT_INTEGRAL_LIMIT = 50.0  # Integral windup protection limit
+DEFAULT_INTEGRAL_LIMIT = 50.0  # % - largest motor power the integral term may contribute
+DEFAULT_SETPOINT_TAU = 0.05  # s - setpoint filter time constant (0 = steps); smooths targets updated slower than the loop
+ENV_SWEEP_LEAD = 20.0     # ° - environmental auto-zero target lead; sweep rate ≈ Kp * lead / Kd
 
-# ── GPIO PIN DEFINITIONS ───────────────────────────────────────────────
-# Motor control pins (PWM)
-IN1_PIN = 13    # Clockwise control
-IN2_PIN = 19    # Counterclockwise control  
-SLEEP_PIN = 26  # Motor driver enable
-PWM_FREQUENCY = 1000  # Hz (1kHz for smooth motor control)
+# ── AUTO-TUNE (relay test -> model -> gains, see pd_autotune.py) ───────
+AUTOTUNE_SETTLING_TIME = 2.0   # s - default target settling time for the designed gains
+AUTOTUNE_SAMPLE_RATE = 50      # Hz - relay test sampling and switching rate
+AUTOTUNE_VERIFY_STEP = 30.0    # ° - target step used to compare the measured and predicted response
+AUTOTUNE_MAX_EXCURSION = 45.0  # ° - relay test aborts if the yaw wanders this far from its start
 
-# Global PWM objects
-motor_cw_pwm = None
-motor_ccw_pwm = None
+# ── MOTOR DRIVER ───────────────────────────────────────────────────────
+# Pins and PWM frequency live in motor_driver.py
+MOTOR_DEADBAND = 0.0     # % - commands smaller than this are sent as 0 (0 = off)
+MOTOR_SLEW_RATE = None   # %/s - max change of motor power per second (None = unlimited)
+
+# Shared driver: PD loop, manual control and stop all go through it
+motor_driver = None
 
 # ── MOTOR CONTROL FUNCTIONS ────────────────────────────────────────────
-def setup_motor_control():
-    """Setup GPIO pins for PWM motor control"""
-    global motor_cw_pwm, motor_ccw_pwm
-    if not GPIO_AVAILABLE:
+def setup_motor_control(backend=None):
+    """Setup GPIO pins for PWM motor control (or drive `backend`, e.g. the simulated wheel)"""
+    global motor_driver
+    if backend is None and not GPIO_AVAILABLE:
         return False
     try:
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
-        GPIO.setup([IN1_PIN, IN2_PIN, SLEEP_PIN], GPIO.OUT, initial=GPIO.LOW)
-        
-        # Create PWM instances for each direction
-        motor_cw_pwm = GPIO.PWM(IN1_PIN, PWM_FREQUENCY)
-        motor_ccw_pwm = GPIO.PWM(IN2_PIN, PWM_FREQUENCY)
-        
-        # Start PWM with 0% duty cycle (motor off)
-        motor_cw_pwm.start(0)
-        motor_ccw_pwm.start(0)
-        
-        # Enable motor driver
-        GPIO.output(SLEEP_PIN, GPIO.HIGH)
+        motor_driver = MotorDriver(backend or GPIOBackend(), deadband=MOTOR_DEADBAND, slew_rate=MOTOR_SLEW_RATE,
+                                   clock=time.monotonic)
         print("✓ PWM Motor control GPIO initialized")
         return True
     except Exception as e:
@@ -129,31 +167,14 @@ def setup_motor_control():
 
 def set_motor_power(power):
     """
-    Set motor power using PWM
+    Set motor power using PWM (PWM is only written when the duty cycle changes)
     Args:
         power: -100 to 100 (negative = CCW, positive = CW, 0 = stop)
+    Returns the power applied after the driver's deadband / slew limit
     """
-    global motor_cw_pwm, motor_ccw_pwm
-    if not GPIO_AVAILABLE or not motor_cw_pwm or not motor_ccw_pwm:
-        return
-    
-    # Clamp power to valid range
-    power = max(-100, min(100, power))
-    
-    try:
-        if power > 0:  # Clockwise
-            motor_ccw_pwm.ChangeDutyCycle(0)
-            motor_cw_pwm.ChangeDutyCycle(abs(power))
-        elif power < 0:  # Counter-clockwise
-            motor_cw_pwm.ChangeDutyCycle(0)
-            motor_ccw_pwm.ChangeDutyCycle(abs(power))
-        else:  # Stop
-            motor_cw_pwm.ChangeDutyCycle(0)
-            motor_ccw_pwm.ChangeDutyCycle(0)
-        
-        time.sleep(0.001)  # Brief delay to avoid I2C interference
-    except Exception as e:
-        print(f"Error setting motor power: {e}")
+    if motor_driver is None:
+        return max(-100, min(100, power))
+    return motor_driver.set_power(power)
 
 def rotate_clockwise():
     """Rotate motor clockwise (full power) - for manual control"""
@@ -165,31 +186,40 @@ def rotate_counterclockwise():
 
 def stop_motor():
     """Stop motor (no power)"""
-    set_motor_power(0)
+    if motor_driver is not None:
+        motor_driver.stop()
+
+def get_motor_stats():
+    """Motor command / PWM write counters and write latency"""
+    return motor_driver.get_stats() if motor_driver is not None else None
 
 def cleanup_motor_control():
     """Cleanup GPIO pins and PWM"""
-    global motor_cw_pwm, motor_ccw_pwm
-    if GPIO_AVAILABLE:
+    global motor_driver
+    if motor_driver is not None:
         try:
-            if motor_cw_pwm:
-                motor_cw_pwm.stop()
-            if motor_ccw_pwm:
-                motor_ccw_pwm.stop()
-            GPIO.output(SLEEP_PIN, GPIO.LOW)  # Disable motor driver
-            GPIO.cleanup()
+            motor_driver.close()
         except:
             pass
+        motor_driver = None
 
 # --- Utility function removed - using full angle range to infinity ---
 
 class MPU6050Sensor:
     """Dedicated MPU6050 sensor class for ADCS"""
     
-    def __init__(self, bus_number=1, device_address=0x68):
-        self.bus = smbus2.SMBus(bus_number)
+    def __init__(self, bus_number=1, device_address=0x68, acquisition_mode=MPU_ACQUISITION_MODE,
+                 fifo_sample_rate=MPU_FIFO_SAMPLE_RATE, bus=None):
+        # Gyro traffic goes through the shared arbiter at control priority
+        self.bus = bus if bus is not None else get_shared_arbiter(bus_number).client(PRIORITY_CONTROL)
         self.device_address = device_address
         
+        # Acquisition mode - FIFO batches are integrated with the exact hardware period
+        self.acquisition_mode = acquisition_mode
+        self.fifo_sample_rate = fifo_sample_rate
+        self.fifo = None
+        self.last_gyro = [0.0, 0.0, 0.0]
+        
         # Calibration values - unified system
         self.gyro_x_cal = 0.0
         self.gyro_y_cal = 0.0
@@ -203,6 +233,13 @@ class MPU6050Sensor:
         self.angle_roll = 0.0
         self.angle_pitch = 0.0
         
+        # Fused yaw: gyro batches propagate it, tag / lux-peak fixes correct it
+        self.yaw_estimator = YawKalmanFilter()
+        
+        # Unwrapped gyro integral (never zeroed) and the samples of the last update, for the yaw history
+        self.gyro_yaw_total = 0.0
+        self.last_yaw_batch = None  # (monotonic times, gyro_yaw_total, yaw rates)
+        
         # Timing variables
         self.last_time = time.time()
         self.dt = 0.0
@@ -233,6 +270,31 @@ class MPU6050Sensor:
         except Exception as e:
             print(f"✗ MPU6050 initialization failed: {e}")
             self.sensor_ready = False
+            return
+        
+        if self.acquisition_mode == "fifo":
+            self.enable_fifo()
+    
+    def enable_fifo(self):
+        """Switch to FIFO acquisition - falls back to polling if the FIFO cannot be configured"""
+        try:
+            self.fifo = MPU6050Fifo(self.bus, self.device_address, sample_rate_hz=self.fifo_sample_rate)
+            self.fifo.configure()
+            self.last_time = time.time()
+            return True
+        except Exception as e:
+            print(f"✗ MPU6050 FIFO setup failed, using polled gyro: {e}")
+            self.fifo = None
+            return False
+    
+    def disable_fifo(self):
+        """Return to one polled gyro sample per update"""
+        if self.fifo is not None:
+            try:
+                self.fifo.disable()
+            except Exception as e:
+                print(f"✗ MPU6050 FIFO disable failed: {e}")
+            self.fifo = None
     
     def calibrate_gyro(self, samples=2000):
         """Calibrate gyroscope - keep sensor stationary during this process"""
@@ -259,6 +321,7 @@ class MPU6050Sensor:
         self.gyro_y_cal = gyro_sum[1] / samples  
         self.gyro_z_cal = gyro_sum[2] / samples
         self.calibration_type = "auto"  # Mark as auto-calibrated
+        self.yaw_estimator.reset_bias()
         
         print(f"✓ MPU6050 auto-calibration complete!")
         print(f"  Offsets - X: {self.gyro_x_cal:.3f}, Y: {self.gyro_y_cal:.3f}, Z: {self.gyro_z_cal:.3f}")
@@ -268,6 +331,7 @@ class MPU6050Sensor:
         """Set manual calibration for Z-axis gyro"""
         self.gyro_z_cal = gyro_z_offset
         self.calibration_type = "manual"  # Mark as manually calibrated
+        self.yaw_estimator.reset_bias()
         print(f"✓ MPU6050 manual calibration set!")
         print(f"  Z-axis offset: {self.gyro_z_cal:.3f}")
         print(f"  Calibration type: {self.calibration_type}")
@@ -325,17 +389,70 @@ class MPU6050Sensor:
         self.dt = current_time - self.last_time
         self.last_time = current_time
         
+        if self.fifo is not None:
+            try:
+                if self._update_angles_fifo():
+                    return
+            except Exception as e:
+                print(f"MPU6050 FIFO read error: {e}")
+        
         # Read gyroscope data (always uses current calibration)
         gyro = self.read_gyroscope()
+        self.last_gyro = gyro
         
         if gyro and self.dt > 0:
             # Integrate yaw angle (Z-axis gyro) - no wrapping, full range
             self.angle_yaw += gyro[2] * self.dt  # Primary control angle
+            now = time.monotonic()
+            self.yaw_estimator.predict_batch([gyro[2]], self.dt, now)
+            self.gyro_yaw_total += gyro[2] * self.dt
+            self.last_yaw_batch = ((now,), (self.gyro_yaw_total,), (gyro[2],))
 
             # Update other angles for completeness
             self.angle_roll += gyro[1] * self.dt
             self.angle_pitch += gyro[0] * self.dt
     
+    def _update_angles_fifo(self):
+        """Integrate every queued FIFO sample with the hardware sample period.
+        
+        Returns False when the batch was lost to an overflow so the caller falls
+        back to a polled sample over the wall-clock dt for this cycle.
+        """
+        rates = self.fifo.drain()
+        if self.fifo.overflow_in_last_drain:
+            print(f"⚠️ MPU6050 FIFO overflow ({self.fifo.overflow_count} total) - samples lost this cycle")
+            return False
+        if len(rates) == 0:
+            return True
+        
+        rates = rates - np.array([self.gyro_x_cal, self.gyro_y_cal, self.gyro_z_cal])
+        # Axis order matches the polled path: pitch from X, roll from Y, yaw from Z
+        angles = integrate_gyro_batch(rates, self.fifo.sample_period,
+                                      (self.angle_pitch, self.angle_roll, self.angle_yaw))[-1]
+        self.angle_pitch, self.angle_roll, self.angle_yaw = float(angles[0]), float(angles[1]), float(angles[2])
+        self.last_gyro = rates[-1].tolist()
+        self.dt = len(rates) * self.fifo.sample_period
+        self.yaw_estimator.predict_batch(rates[:, 2], self.fifo.sample_period, self.fifo.last_drain_time)
+        # Per-sample times from the hardware period, ending at the drain
+        times = self.fifo.last_drain_time - np.arange(len(rates) - 1, -1, -1) * self.fifo.sample_period
+        totals = self.gyro_yaw_total + np.cumsum(rates[:, 2]) * self.fifo.sample_period
+        self.gyro_yaw_total = float(totals[-1])
+        self.last_yaw_batch = (times, totals, rates[:, 2])
+        return True
+    
+    def get_gyro_rates(self):
+        """Latest calibrated gyro rates - from the last FIFO batch in FIFO mode"""
+        if self.fifo is not None:
+            return list(self.last_gyro)
+        return self.read_gyroscope()
+    
+    def get_fifo_stats(self):
+        """FIFO acquisition statistics (sample counts, overflows)"""
+        if self.fifo is None:
+            return {'enabled': False, 'sample_rate_hz': 0.0, 'samples_total': 0,
+                    'last_batch': 0, 'max_batch': 0, 'overflows': 0, 'bytes_read': 0}
+        return self.fifo.get_stats()
+    
     def get_yaw_angle(self):
         """Get current calibrated yaw angle for control"""
         self.update_angles()
@@ -346,14 +463,15 @@ class MPU6050Sensor:
         self.angle_yaw = 0.0
         self.angle_roll = 0.0
         self.angle_pitch = 0.0
+        self.yaw_estimator.reset(0.0)
         print(f"✓ Yaw position zeroed - current orientation set as zero reference (calibration: {self.calibration_type})")
     
     def attempt_reconnection(self):
         """Try to reconnect to the MPU6050 sensor"""
         try:
             print("🔄 Attempting MPU6050 reconnection...")
-            self.bus.close()
-            self.bus = smbus2.SMBus(1)
+            # The arbiter owns the bus file handle - only the device is re-initialised
+            self.fifo = None
             time.sleep(0.1)
             self.initialize_sensor()
             return self.sensor_ready
@@ -376,11 +494,18 @@ class LuxSensorManager:
         self.lux_sensors = {}
         self.sensors_ready = False
         
+        # Background round-robin acquisition
+        self.reader = None
+        self.reader_thread = None
+        self.publish_callback = None
+        
         if LUX_AVAILABLE:
             self.initialize_lux_sensors()
     
     def initialize_lux_sensors(self):
         """Initialize VEML7700 lux sensors"""
+        # The acquisition task must not switch the mux while sensors are being probed
+        self.stop_acquisition()
         try:
             self.lux_i2c = busio.I2C(board.SCL, board.SDA)
             self.lux_sensors = {}
@@ -406,20 +531,68 @@ class LuxSensorManager:
         except Exception as e:
             print(f"✗ Lux sensor initialization failed: {e}")
             self.sensors_ready = False
+        
+        # Resume (or start, if no sensor was ready before) the acquisition task
+        if self.publish_callback is not None:
+            self.start_acquisition(self.publish_callback)
     
-    def select_lux_channel(self, channel):
+    def select_lux_channel(self, channel, settle=True):
         """Select multiplexer channel for lux sensors"""
         if 0 <= channel <= 7 and self.lux_i2c:
             self.lux_i2c.writeto(MUX_ADDRESS, bytes([1 << channel]))
-            time.sleep(0.002)
+            if settle:
+                time.sleep(0.002)
+    
+    def _bus_guard(self):
+        """Hold the shared I2C bus across a mux select + lux read"""
+        return get_shared_arbiter().exclusive(PRIORITY_TELEMETRY)
+    
+    def start_acquisition(self, publish, rate_hz=LUX_ACQUISITION_RATE):
+        """Start the round-robin acquisition task.
+        
+        publish(channel, lux, timestamp) is called after every single-channel
+        read with a time.monotonic() timestamp.
+        """
+        self.publish_callback = publish
+        if not self.sensors_ready or self.reader is not None:
+            return False
+        
+        self.reader = LuxRoundRobinReader(
+            select_channel=lambda ch: self.select_lux_channel(ch, settle=False),
+            sensors=self.lux_sensors,
+            rate_hz=rate_hz,
+            publish=publish,
+            sensor_factory=lambda ch: VEML7700(self.lux_i2c),
+            guard=self._bus_guard,
+        )
+        self.reader_thread = create_thread(target=self.reader.run)
+        if hasattr(self.reader_thread, 'start'):  # threading.Thread
+            self.reader_thread.start()
+        print(f"✓ Lux acquisition running at {rate_hz}Hz ({rate_hz / len(LUX_CHANNELS):.0f}Hz per sensor)")
+        return True
+    
+    def stop_acquisition(self):
+        """Stop the acquisition task. Returns True if it was running"""
+        if self.reader is None:
+            return False
+        self.reader.stop()
+        if self.reader_thread is not None:
+            self.reader_thread.join(timeout=1.0)  # threading.Thread and gevent.Greenlet both support join
+        self.reader = None
+        self.reader_thread = None
+        return True
     
     def read_lux_sensors(self):
-        """Read all lux sensors"""
+        """Read all lux sensors - latest round-robin readings when acquisition is running"""
         lux_data = {ch: 0.0 for ch in LUX_CHANNELS}
         
         if not self.sensors_ready:
             return lux_data
         
+        if self.reader is not None:
+            lux_data.update({ch: lux for ch, (lux, _) in self.reader.latest.items()})
+            return lux_data
+        
         for ch in LUX_CHANNELS:
             try:
                 if ch in self.lux_sensors and self.lux_sensors[ch] is not None:
@@ -440,11 +613,48 @@ class LuxSensorManager:
         
         return lux_data
 
+class ControlLoopStats:
+    """Per-step compute time and start lateness (jitter) of the control loop, last `window` steps"""
+
+    def __init__(self, window=CONTROL_STATS_WINDOW):
+        self.starts = deque(maxlen=window)
+        self.compute = deque(maxlen=window)
+        self.lateness = deque(maxlen=window)
+        self.steps = 0
+        self.skipped = 0   # Control slots dropped because the loop fell a whole interval behind
+
+    def record(self, start, lateness, compute):
+        self.starts.append(start)
+        self.lateness.append(lateness)
+        self.compute.append(compute)
+        self.steps += 1
+
+    def get_stats(self):
+        starts, compute, lateness = list(self.starts), np.array(self.compute), np.array(self.lateness)
+        if len(starts) < 2:
+            return {'rate_hz': 0.0, 'steps': self.steps, 'skipped': self.skipped, 'compute_mean_us': 0.0,
+                    'compute_max_us': 0.0, 'jitter_mean_ms': 0.0, 'jitter_p99_ms': 0.0, 'jitter_max_ms': 0.0}
+        span = starts[-1] - starts[0]
+        return {
+            'rate_hz': round((len(starts) - 1) / span, 1) if span > 0 else 0.0,
+            'steps': self.steps,
+            'skipped': self.skipped,
+            'compute_mean_us': round(float(compute.mean()) * 1e6, 1),
+            'compute_max_us': round(float(compute.max()) * 1e6, 1),
+            'jitter_mean_ms': round(float(lateness.mean()) * 1e3, 3),
+            'jitter_p99_ms': round(float(np.percentile(lateness, 99)) * 1e3, 3),
+            'jitter_max_ms': round(float(lateness.max()) * 1e3, 3),
+        }
+
 class PDControllerPWM:
     """
-    PWM-based PD Controller for smooth motor control
+    PWM-based PD(+I) Controller for smooth motor control
+    - D term on the measured gyro rate only: a target step moves the P term, never the D term
+    - Filtered setpoint (setpoint_tau) spreads a target step out over the P term
+    - Optional I term with conditional integration (anti-windup) and an output limit
     """
-    def __init__(self, kp=DEFAULT_KP, kd=DEFAULT_KD, max_power=DEFAULT_MAX_POWER, deadband=DEFAULT_DEADBAND, integral_limit=DEFAULT_INTEGRAL_LIMIT):
+    def __init__(self, kp=DEFAULT_KP, kd=DEFAULT_KD, max_power=DEFAULT_MAX_POWER, deadband=DEFAULT_DEADBAND,
+                 integral_limit=DEFAULT_INTEGRAL_LIMIT, ki=DEFAULT_KI, setpoint_tau=DEFAULT_SETPOINT_TAU):
         """
         PWM PD Controller
         
@@ -453,16 +663,21 @@ class PDControllerPWM:
             kd: Derivative gain (default from DEFAULT_KD)
             max_power: Maximum PWM power 0-100% (default from DEFAULT_MAX_POWER)
             deadband: Angle deadband in degrees (default from DEFAULT_DEADBAND)
-            integral_limit: Maximum integral windup protection (default from DEFAULT_INTEGRAL_LIMIT)
+            integral_limit: Largest power (%) the integral term may contribute (default from DEFAULT_INTEGRAL_LIMIT)
+            ki: Integral gain, 0 disables the I term (default from DEFAULT_KI)
+            setpoint_tau: Setpoint filter time constant in seconds, 0 = off (default from DEFAULT_SETPOINT_TAU)
         """
         self.kp = kp
         self.kd = kd
+        self.ki = ki
         self.max_power = max_power
         self.deadband = deadband
         self.integral_limit = integral_limit
+        self.setpoint_tau = setpoint_tau
         
         # Control state
         self.target_yaw = 0.0
+        self.setpoint = None       # Filtered target (None until the first update after a start)
         self.previous_error = 0.0
         self.integral = 0.0
         self.last_time = time.time()
@@ -481,13 +696,14 @@ class PDControllerPWM:
         self.yaw_log_start_time = None
         
     def set_target(self, target_angle):
-        """Set target yaw angle in degrees - no wrapping, full range"""
+        """Set target yaw angle in degrees - no wrapping, full range (reached through the setpoint filter)"""
         self.target_yaw = target_angle  # Use full angle range
-        # Reset integral when target changes to prevent windup
         # print(f"Target yaw set to: {self.target_yaw:.1f}°")  # Commented out to reduce spam
     
     def start_controller(self):
         """Start the PD controller"""
+        self.setpoint = None  # Bumpless start from the current yaw
+        self.integral = 0.0
         self.controller_enabled = True
         # print("PWM PD Controller STARTED - Motor control active")  # Commented out to reduce spam
     
@@ -497,13 +713,23 @@ class PDControllerPWM:
         stop_motor()  # Immediately stop motor
         # print("PWM PD Controller STOPPED - Motor disabled")  # Commented out to reduce spam
     
+    def _filter_setpoint(self, current_yaw, dt):
+        """Move the setpoint towards target_yaw and return it"""
+        if self.setpoint is None:
+            self.setpoint = current_yaw if self.setpoint_tau > 0 else self.target_yaw
+        elif self.setpoint_tau > 0 and dt > 0:
+            self.setpoint += (self.target_yaw - self.setpoint) * (1.0 - math.exp(-dt / self.setpoint_tau))
+        else:
+            self.setpoint = self.target_yaw
+        return self.setpoint
+    
     def update(self, current_yaw, gyro_rate, dt):
         """
         Update PWM PD controller and return motor power
         
         Args:
             current_yaw: Current yaw angle in degrees
-            gyro_rate: Current yaw rate in °/s
+            gyro_rate: Current yaw rate in °/s (the D term uses it directly)
             dt: Time step in seconds
             
         Returns:
@@ -518,38 +744,35 @@ class PDControllerPWM:
         if not self.controller_enabled or self.input_mode:
             return 0, error, 0.0
         
-        # Apply deadband - no action if error is small
-        if abs(error) < self.deadband:
+        setpoint = self._filter_setpoint(current_yaw, dt)
+        control_error = setpoint - current_yaw
+        
+        # Apply deadband - no action if error is small (the integral is held)
+        if abs(error) < self.deadband and abs(control_error) < self.deadband:
             motor_power = 0
             pd_output = 0.0
         else:
-            # Calculate derivative
-            if dt > 0:
-                derivative = (error - self.previous_error) / dt
-            else:
-                derivative = 0.0
+            # Derivative on measurement: damps the body rate, blind to target changes
+            pd_output = self.kp * control_error - self.kd * gyro_rate
             
-            # PD control output
-            pd_output = self.kp * error + self.kd * derivative
+            if self.ki:
+                # Anti-windup: only integrate while the output is unsaturated or the error unwinds it
+                integral = self.integral + control_error * dt
+                integral_limit = self.integral_limit / self.ki
+                integral = max(-abs(integral_limit), min(abs(integral_limit), integral))
+                total = pd_output + self.ki * integral
+                if abs(total) <= self.max_power or (total > 0) != (control_error > 0):
+                    self.integral = integral
+                pd_output += self.ki * self.integral
             
-            # Convert to motor power (-100 to +100)
-            motor_power = pd_output
-            
-            # Limit motor power to maximum
-            motor_power = max(-self.max_power, min(self.max_power, motor_power))
-            
-            # Apply minimum power threshold (20% minimum when active)
-            if motor_power != 0:  # Only apply minimum when motor should be active
-                if motor_power > 0:
-                    motor_power = max(0, motor_power)  # Minimum 20% CW
-                else:
-                    motor_power = min(-0, motor_power)  # Minimum 20% CCW
+            # Limit motor power to maximum (-100 to +100)
+            motor_power = max(-self.max_power, min(self.max_power, pd_output))
         
-        # Apply motor power
+        # Apply motor power (reported as applied after the driver's deadband / slew limit)
         if self.controller_enabled:
-            set_motor_power(motor_power)
+            motor_power = set_motor_power(motor_power)
         
-        # Store previous error for next derivative calculation
+        # Kept for logging (the D term no longer differentiates the error)
         self.previous_error = error
         return motor_power, error, pd_output
 
@@ -559,18 +782,22 @@ class ADCSController:
     """
     
 
-    def __init__(self):
+    def __init__(self, mpu_bus=None, lux_manager=None, motor_backend=None, tachometer=None):
+        """Hardware defaults; adcs_sim.py passes a simulated bus, lux manager, motor backend and tachometer"""
+        self.hardware = {'mpu_bus': mpu_bus, 'lux_manager': lux_manager, 'motor_backend': motor_backend,
+                         'tachometer': tachometer}
         self._initialize()
 
     def _initialize(self):
         print("🛰️ Initializing UNIFIED ADCS Controller...")
 
         # Initialize sensor components
-        self.mpu_sensor = MPU6050Sensor()
-        self.lux_manager = LuxSensorManager()
+        self.mpu_sensor = MPU6050Sensor(bus=self.hardware['mpu_bus'])
+        self.lux_manager = self.hardware['lux_manager'] or LuxSensorManager()
 
         # Initialize motor control
-        self.motor_available = setup_motor_control()
+        self.motor_available = setup_motor_control(self.hardware['motor_backend'])
+        self.tachometer = self._setup_tachometer(self.hardware['tachometer'])
         self.manual_control_active = False
         self.status = "Initializing"
 
@@ -579,8 +806,12 @@ class ADCSController:
             kp=DEFAULT_KP,          # Proportional gain
             kd=DEFAULT_KD,          # Derivative gain
             max_power=DEFAULT_MAX_POWER,  # Maximum PWM power
-            deadband=DEFAULT_DEADBAND     # Deadband (±degrees)
+            deadband=DEFAULT_DEADBAND,    # Deadband (±degrees)
+            ki=DEFAULT_KI,                # Integral gain (0 = off)
+            setpoint_tau=DEFAULT_SETPOINT_TAU  # Setpoint filter
         )
+        self.control_interval = 1.0 / CONTROL_FREQUENCY
+        self.control_stats = ControlLoopStats()
 
         # Shared data and threading
         self.data_thread = None
@@ -595,15 +826,27 @@ class ADCSController:
             self.data_lock = threading.RLock()
 
         self.last_reading_time = time.time()
+        self.sample_seq = 0
+        self.telemetry_ring = TelemetryRing(TELEMETRY_RING_SIZE)
+        self.telemetry_callback = None
+        self.telemetry_every = 1
+        self.last_temperature = 0.0
+        self.last_temperature_time = 0.0
 
         # Current sensor data (shared between threads)
         self.current_data = {
             'mpu': {
                 'yaw': 0.0, 'roll': 0.0, 'pitch': 0.0, 'temp': 0.0,
                 'gyro_rate_x': 0.0, 'gyro_rate_y': 0.0, 'gyro_rate_z': 0.0,
-                'angle_x': 0.0, 'angle_y': 0.0, 'angle_z': 0.0
+                'angle_x': 0.0, 'angle_y': 0.0, 'angle_z': 0.0, 'gyro_yaw': 0.0
             },
             'lux': {ch: 0.0 for ch in LUX_CHANNELS},
+            'lux_time': {ch: None for ch in LUX_CHANNELS},  # time.monotonic() of each reading
+            'fifo': self.mpu_sensor.get_fifo_stats(),
+            'fused': self.mpu_sensor.yaw_estimator.get_state(),
+            'rpm': 0.0,         # Reaction wheel speed from the tachometer (unsigned)
+            'seq': 0,           # Data-thread sample counter
+            'timestamp': time.monotonic(),
             'status': 'Initializing',
             'controller': {
                 'enabled': False,
@@ -614,15 +857,30 @@ class ADCSController:
             }
         }
 
-        # Yaw history for timestamp matching
+        # Lux peaks - every reading goes through the detector, the env modes consume the peaks
+        self.lux_peak_detector = LuxPeakDetector(channels=LUX_CHANNELS, min_lux=LUX_PEAK_MIN_LUX,
+                                                 prominence=LUX_PEAK_PROMINENCE,
+                                                 hysteresis=LUX_PEAK_HYSTERESIS)
+        self.lux_peaks = deque(maxlen=32)
+
+        # Yaw history for timestamp matching: every gyro sample, so late fixes can be aligned
+        self.yaw_history = YawHistory()
 
         # Auto zero tag control with request-response system
         self.auto_zero_tag_enabled = False
+        self.last_tag_fix_age = None   # Seconds from frame capture to the last AprilTag fix (on-board poses)
         self.auto_zero_tag_target_set = False  # Track if we've already set target to 0
 
+        # Auto-tune: cleared by stop_autotune to abort a running test
+        self.autotune_active = False
+        self.last_autotune = None
+
         # Start high-speed data acquisition
         self.start_data_thread()
 
+        # Lux sensors run on their own task and publish into current_data
+        self.lux_manager.start_acquisition(self._publish_lux_reading)
+
         # Start control thread
         self.start_control_thread()
 
@@ -639,6 +897,20 @@ class ADCSController:
         self._initialize()
         print("✓ Reinitialization complete.")
     
+    def _setup_tachometer(self, tachometer=None):
+        """Start edge capture on the tacho pin (or `tachometer`, e.g. the simulated wheel); None without GPIO"""
+        if tachometer is None and not GPIO_AVAILABLE:
+            return None
+        try:
+            tachometer = tachometer or Tachometer()
+            if not tachometer.running:
+                tachometer.start()
+            print("✓ Tachometer edge capture started")
+            return tachometer
+        except Exception as e:
+            print(f"✗ Tachometer initialization failed: {e}")
+            return None
+
     def start_data_thread(self):
         """Start high-speed data acquisition thread"""
         self.stop_data_thread = False
@@ -661,14 +933,30 @@ class ADCSController:
                     try:
                         # Read all sensors
                         new_data = self.read_all_sensors()
+                        if self.tachometer is not None:
+                            new_data['rpm'] = self.tachometer.get_rpm()
                         
                         # Thread-safe update
                         with self.data_lock:
+                            self.sample_seq += 1
+                            new_data['seq'] = self.sample_seq
                             self.current_data.update(new_data)
                             self.last_reading_time = current_time
                             # Store yaw history for timestamp matching
+                            batch = self.mpu_sensor.last_yaw_batch
+                            if batch is not None:
+                                self.yaw_history.extend(*batch)
+                                self.mpu_sensor.last_yaw_batch = None
+                        self.telemetry_ring.append(self.get_adcs_telemetry())
+                        if self.telemetry_callback and self.sample_seq % self.telemetry_every == 0:
+                            try:
+                                self.telemetry_callback()
+                            except Exception as e:
+                                print(f"Telemetry callback error: {e}")
                         
                         next_read_time += interval
+                        if next_read_time < current_time - interval:
+                            next_read_time = current_time  # Fell behind - skip rather than burst
                         
                     except Exception as e:
                         print(f"Error in data thread: {e}")
@@ -685,6 +973,35 @@ class ADCSController:
                 print(f"Unexpected error in data thread: {e}")
                 time.sleep(0.01)  # Brief pause on unexpected errors
     
+    def _publish_lux_reading(self, channel, lux, timestamp):
+        """Lux acquisition callback - store one timestamped channel reading"""
+        with self.data_lock:
+            # Replace rather than mutate so snapshots from get_current_data() stay consistent
+            self.current_data['lux'] = {**self.current_data['lux'], channel: lux}
+            self.current_data['lux_time'] = {**self.current_data['lux_time'], channel: timestamp}
+            yaw = self.yaw_at(timestamp)
+            peak = self.lux_peak_detector.push(channel, lux, yaw, timestamp)
+            if peak:
+                self.lux_peaks.append(peak)
+    
+    def yaw_at(self, timestamp):
+        """Control yaw at a past monotonic time: current yaw minus the gyro rotation since then"""
+        if YAW_ESTIMATOR_ENABLED:
+            current = self.mpu_sensor.yaw_estimator.get_state()['yaw']
+        else:
+            current = self.mpu_sensor.angle_yaw
+        rotation = self.yaw_history.rotation_since(timestamp)
+        if rotation is None:
+            return self.mpu_sensor.yaw_estimator.yaw_at(timestamp)  # Before the history (startup)
+        return current - rotation
+
+    def _take_lux_peaks(self):
+        """Peaks confirmed since the last call (oldest first)"""
+        with self.data_lock:
+            peaks = list(self.lux_peaks)
+            self.lux_peaks.clear()
+        return peaks
+    
     def start_control_thread(self):
         """Start high-speed control thread"""
         self.stop_control_thread = False
@@ -692,48 +1009,59 @@ class ADCSController:
         if hasattr(self.control_thread, 'start'):  # threading.Thread
             self.control_thread.start()
         # For gevent, spawn already starts the greenlet
-        # print(f"🎮 Control thread started at 50Hz")  # Commented out to reduce spam
+        # print(f"🎮 Control thread started at {1.0 / self.control_interval:.0f}Hz")  # Commented out to reduce spam
 
     def _control_thread_worker(self):
-        """High-speed control worker thread"""
-        interval = 1.0 / 20  # 50Hz control loop
-        next_control_time = time.time()
-        last_time = time.time()
+        """Control worker: one PD update per control_interval, sleeping until the next slot"""
+        next_control_time = time.monotonic()
+        last_time = None
         
         while not self.stop_control_thread:
             try:
-                current_time = time.time()
-
-                if current_time >= next_control_time:
-                    try:
-                        # Get current sensor data
-                        with self.data_lock:
-                            current_yaw = self.current_data['mpu']['yaw']
-                            gyro_rate = self.current_data['mpu']['gyro_rate_z']
-
-                        # Calculate time step
-                        dt = current_time - last_time
-                        last_time = current_time
-
-                        # Update PWM PD controller
-                        motor_power, error, pd_output = self.pd_controller.update(current_yaw, gyro_rate, dt)
+                current_time = time.monotonic()
+                if current_time < next_control_time:
+                    time.sleep(next_control_time - current_time)
+                    continue
 
-                        # Update shared data
-                        with self.data_lock:
-                            self.current_data['controller'].update({
-                                'enabled': self.pd_controller.controller_enabled,
-                                'target_yaw': self.pd_controller.target_yaw,
-                                'error': error,
-                                'motor_power': motor_power,
-                                'pd_output': pd_output
-                            })
+                step_start = time.perf_counter()
+                try:
+                    # Get current sensor data
+                    with self.data_lock:
+                        current_yaw = self.current_data['mpu']['yaw']
+                        gyro_rate = self.current_data['mpu']['gyro_rate_z']
+                        sample_time = self.current_data['timestamp']
+
+                    # Carry the last sample forward to now - the loop may run faster than the data thread
+                    current_yaw += gyro_rate * min(max(0.0, current_time - sample_time), 1.0 / LOG_FREQUENCY)
+
+                    # Calculate time step
+                    dt = current_time - last_time if last_time is not None else self.control_interval
+                    last_time = current_time
+
+                    # Update PWM PD controller
+                    motor_power, error, pd_output = self.pd_controller.update(current_yaw, gyro_rate, dt)
+
+                    # Update shared data
+                    with self.data_lock:
+                        self.current_data['controller'].update({
+                            'enabled': self.pd_controller.controller_enabled,
+                            'target_yaw': self.pd_controller.target_yaw,
+                            'error': error,
+                            'motor_power': motor_power,
+                            'pd_output': pd_output
+                        })
 
-                        next_control_time += interval
+                except Exception as e:
+                    print(f"Error in control thread: {e}")
 
-                    except Exception as e:
-                        print(f"Error in control thread: {e}")
-
-                time.sleep(0.001)  # 1ms sleep
+                self.control_stats.record(current_time, current_time - next_control_time,
+                                          time.perf_counter() - step_start)
+                next_control_time += self.control_interval
+                if next_control_time <= current_time:
+                    # Fell a whole interval behind - skip the missed slots rather than burst
+                    missed = int((current_time - next_control_time) / self.control_interval) + 1
+                    self.control_stats.skipped += missed
+                    next_control_time += missed * self.control_interval
 
             except (KeyboardInterrupt, SystemExit):
                 # Handle graceful shutdown
@@ -743,15 +1071,39 @@ class ADCSController:
                 print(f"Unexpected error in control thread: {e}")
                 time.sleep(0.01)  # Brief pause on unexpected errors
     
+    def set_control_rate(self, rate_hz):
+        """Change the control loop rate (Hz) - takes effect from the next control slot"""
+        try:
+            rate = float(rate_hz)
+            if not 1.0 <= rate <= MAX_CONTROL_FREQUENCY:
+                return {"status": "error", "message": f"Control rate must be 1-{MAX_CONTROL_FREQUENCY}Hz"}
+            self.control_interval = 1.0 / rate
+            self.control_stats = ControlLoopStats()
+            return {"status": "success", "message": f"Control loop at {rate:.0f}Hz"}
+        except (TypeError, ValueError) as e:
+            return {"status": "error", "message": f"Set control rate error: {e}"}
+    
+    def get_control_stats(self):
+        """Control loop rate, per-step compute time and start jitter"""
+        stats = self.control_stats.get_stats()
+        stats['target_hz'] = round(1.0 / self.control_interval, 1)
+        return stats
+    
     def read_all_sensors(self):
-        """Read all sensors and return formatted data"""
+        """Read the MPU6050 and return formatted data.
+        
+        Lux readings are not touched here - they are published into
+        current_data by the lux acquisition task so this never waits on the mux.
+        """
         data = {
             'mpu': {
                 'yaw': 0.0, 'roll': 0.0, 'pitch': 0.0, 'temp': 0.0,
                 'gyro_rate_x': 0.0, 'gyro_rate_y': 0.0, 'gyro_rate_z': 0.0,
-                'angle_x': 0.0, 'angle_y': 0.0, 'angle_z': 0.0
+                'angle_x': 0.0, 'angle_y': 0.0, 'angle_z': 0.0, 'gyro_yaw': 0.0
             },
-            'lux': {ch: 0.0 for ch in LUX_CHANNELS},
+            'fifo': self.mpu_sensor.get_fifo_stats(),
+            'fused': self.mpu_sensor.yaw_estimator.get_state(),
+            'timestamp': time.monotonic(),
             'status': 'Active'
         }
         
@@ -759,8 +1111,11 @@ class ADCSController:
         if self.mpu_sensor.sensor_ready:
             try:
                 yaw_angle = self.mpu_sensor.get_yaw_angle()  # Get unified calibrated yaw
-                gyro = self.mpu_sensor.read_gyroscope()
-                temp = self.mpu_sensor.read_temperature()
+                gyro = self.mpu_sensor.get_gyro_rates()
+                if time.monotonic() - self.last_temperature_time >= 1.0 / TEMPERATURE_FREQUENCY:
+                    self.last_temperature = self.mpu_sensor.read_temperature()
+                    self.last_temperature_time = time.monotonic()
+                temp = self.last_temperature
                 
                 # Position angles (integrated from gyro) - no wrapping
                 data['mpu']['yaw'] = yaw_angle  # Primary control angle (unified calibrated)
@@ -777,7 +1132,16 @@ class ADCSController:
                 # All angle positions (degrees) - no wrapping
                 data['mpu']['angle_x'] = self.mpu_sensor.angle_pitch  # Pitch angle
                 data['mpu']['angle_y'] = self.mpu_sensor.angle_roll   # Roll angle
-                data['mpu']['angle_z'] = self.mpu_sensor.angle_yaw    # Yaw angle
+                data['mpu']['gyro_yaw'] = self.mpu_sensor.angle_yaw   # Raw gyro integral (never re-anchored)
+                data['fifo'] = self.mpu_sensor.get_fifo_stats()
+                
+                # Fused, bias-corrected yaw and yaw rate for the controller
+                fused = self.mpu_sensor.yaw_estimator.get_state()
+                data['fused'] = fused
+                if YAW_ESTIMATOR_ENABLED:
+                    data['mpu']['yaw'] = fused['yaw']
+                    data['mpu']['gyro_rate_z'] = fused['rate']
+                data['mpu']['angle_z'] = data['mpu']['yaw']  # Yaw angle - the one the controller uses
                 
             except Exception as e:
                 print(f"MPU read error: {e}")
@@ -785,14 +1149,6 @@ class ADCSController:
         else:
             data['status'] = 'MPU Not Ready'
         
-        # Read Lux sensors
-        if self.lux_manager.sensors_ready:
-            try:
-                lux_readings = self.lux_manager.read_lux_sensors()
-                data['lux'].update(lux_readings)
-            except Exception as e:
-                print(f"Lux read error: {e}")
-        
         return data
     
     def get_current_data(self):
@@ -803,6 +1159,7 @@ class ADCSController:
     def get_adcs_data_for_server(self):
         """Format data for server ADCS broadcast"""
         data, _ = self.get_current_data()
+        control = self.get_control_stats()
         yaw = data['mpu']['yaw']    # Use full range yaw
         roll = data['mpu']['roll']   # Use full range roll
         pitch = data['mpu']['pitch'] # Use full range pitch
@@ -814,7 +1171,7 @@ class ADCSController:
             'lux1': f"{data['lux'][1]:.1f}" if 1 in data['lux'] else "0.0",
             'lux2': f"{data['lux'][2]:.1f}" if 2 in data['lux'] else "0.0", 
             'lux3': f"{data['lux'][3]:.1f}" if 3 in data['lux'] else "0.0",
-            'rpm': "0.0",  # TODO: Add tachometer in next step
+            'rpm': f"{data['rpm']:.1f}",
             'status': data.get('status', 'Unknown'),
             
             # Complete gyro rates (deg/s) for all axes
@@ -825,11 +1182,67 @@ class ADCSController:
             # Complete angle positions (degrees) for all axes  
             'angle_x': f"{data['mpu']['angle_x']:.1f}",  # Pitch angle
             'angle_y': f"{data['mpu']['angle_y']:.1f}",  # Roll angle
-            'angle_z': f"{data['mpu']['angle_z']:.1f}",  # Yaw angle
+            'angle_z': f"{data['mpu']['angle_z']:.1f}",  # Yaw angle (control yaw)
+            'gyro_yaw': f"{data['mpu']['gyro_yaw']:.1f}",  # Raw gyro-integrated yaw
             
             # Temperature
             'temperature': f"{data['mpu']['temp']:.1f}°C",
-        
+            
+            # Gyro FIFO acquisition health
+            'fifo_samples': f"{data['fifo']['samples_total']}",
+            'fifo_batch': f"{data['fifo']['last_batch']}",
+            'fifo_overflows': f"{data['fifo']['overflows']}",
+            
+            # Fused yaw estimator
+            'yaw_bias': f"{data['fused']['bias']:.3f}",
+            'yaw_std': f"{data['fused']['yaw_std']:.2f}",
+            'yaw_reference': data['fused']['reference'],
+            
+            # Control loop timing
+            'control_rate': f"{control['rate_hz']:.0f}",
+            'control_compute_us': f"{control['compute_mean_us']:.0f}",
+            'control_jitter_ms': f"{control['jitter_p99_ms']:.2f}",
+        }
+    
+    def set_telemetry_callback(self, callback, every=1):
+        """Call callback() from the data thread after every `every` samples (None to remove)"""
+        self.telemetry_every = max(1, int(every))
+        self.telemetry_callback = callback
+    
+    def get_telemetry_since(self, seq, limit=None):
+        """Telemetry records newer than `seq` (structured array, oldest first)"""
+        return self.telemetry_ring.since(seq, limit)
+    
+    def get_adcs_telemetry(self):
+        """Numeric ADCS record for the binary adcs_broadcast frame (see adcs_telemetry.py)"""
+        data, _ = self.get_current_data()
+        mpu, fifo, fused, ctrl = data['mpu'], data['fifo'], data['fused'], data['controller']
+        return {
+            'seq': data['seq'],
+            't': data['timestamp'],
+            'yaw': mpu['yaw'],
+            'roll': mpu['roll'],
+            'pitch': mpu['pitch'],
+            'gyro_yaw': mpu['gyro_yaw'],
+            'rate_x': mpu['gyro_rate_x'],
+            'rate_y': mpu['gyro_rate_y'],
+            'rate_z': mpu['gyro_rate_z'],
+            'temp': mpu['temp'],
+            'lux1': data['lux'].get(1, 0.0),
+            'lux2': data['lux'].get(2, 0.0),
+            'lux3': data['lux'].get(3, 0.0),
+            'rpm': data['rpm'],
+            'target_yaw': ctrl['target_yaw'],
+            'error': ctrl['error'],
+            'motor_power': ctrl['motor_power'],
+            'yaw_bias': fused['bias'],
+            'yaw_std': fused['yaw_std'],
+            'fifo_samples': fifo['samples_total'],
+            'fifo_overflows': fifo['overflows'],
+            'fifo_batch': fifo['last_batch'],
+            'status': data.get('status', 'Unknown'),
+            'reference': fused['reference'],
+            'controller_enabled': 1 if ctrl['enabled'] else 0,
         }
     
     def handle_adcs_command(self, mode, command, value=None):
@@ -862,6 +1275,14 @@ class ADCSController:
                     return self.stop_auto_control()
                 elif command == "set_pd_values":
                     return self.set_controller_gains(value)
+                elif command == "set_control_rate":
+                    return self.set_control_rate(value)
+                elif command == "control_stats":
+                    stats = self.get_control_stats()
+                    return {"status": "success", "data": stats,
+                            "message": f"Control loop {stats['rate_hz']:.0f}/{stats['target_hz']:.0f}Hz, "
+                                       f"compute {stats['compute_mean_us']:.0f}us (max {stats['compute_max_us']:.0f}us), "
+                                       f"jitter p99 {stats['jitter_p99_ms']:.2f}ms, {stats['skipped']} skipped"}
                 # --- Handle new zero commands ---
                 elif command == "auto_zero_tag":
                     return self.start_auto_zero_tag()
@@ -875,6 +1296,12 @@ class ADCSController:
                     return {"status": "success", "message": "Stopped Environmental"}
                 elif command == "manual_cal":
                     return self.manual_calibration(value)
+                elif command == "set_lux_peak":
+                    return self.set_lux_peak_thresholds(value)
+                elif command == "autotune":
+                    return self.start_autotune(value)
+                elif command == "stop_autotune":
+                    return self.stop_autotune()
                 elif command == "raw":
                     return self.return_to_raw_mode()
             
@@ -918,6 +1345,8 @@ class ADCSController:
             
             if getattr(self, 'auto_zero_env_enabled', False):
                 self.stop_auto_zero_env()
+
+            self.autotune_active = False
             
             # Stop manual control
             with self.data_lock:
@@ -1096,7 +1525,7 @@ class ADCSController:
             return {"status": "error", "message": f"Auto control stop error: {e}"}
 
     def set_controller_gains(self, gains):
-        """Set PD controller gains"""
+        """Set PD controller gains: kp, kd, ki, deadband, max_power, integral_limit, setpoint_tau, rate_hz"""
         try:
             if isinstance(gains, dict):
                 if 'kp' in gains:
@@ -1107,6 +1536,17 @@ class ADCSController:
                     self.pd_controller.deadband = float(gains['deadband'])
                 if 'max_power' in gains:
                     self.pd_controller.max_power = float(gains['max_power'])
+                if 'ki' in gains:
+                    self.pd_controller.ki = float(gains['ki'])
+                    self.pd_controller.integral = 0.0
+                if 'integral_limit' in gains:
+                    self.pd_controller.integral_limit = float(gains['integral_limit'])
+                if 'setpoint_tau' in gains:
+                    self.pd_controller.setpoint_tau = max(0.0, float(gains['setpoint_tau']))
+                if 'rate_hz' in gains:
+                    result = self.set_control_rate(gains['rate_hz'])
+                    if result['status'] != "success":
+                        return result
                 
                 # print(f"PWM Controller gains updated: Kp={self.pd_controller.kp}, Kd={self.pd_controller.kd}, Max Power={self.pd_controller.max_power}%, Deadband={self.pd_controller.deadband}")  # Commented out to reduce spam
                 return {"status": "success", "message": "Controller gains updated"}
@@ -1115,6 +1555,155 @@ class ADCSController:
         except Exception as e:
             return {"status": "error", "message": f"Set gains error: {e}"}
 
+    def set_lux_peak_thresholds(self, thresholds):
+        """Set lux peak detector thresholds: {'min_lux', 'prominence', 'hysteresis'}"""
+        try:
+            if not isinstance(thresholds, dict):
+                return {"status": "error", "message": "Thresholds must be a dictionary"}
+            with self.data_lock:
+                self.lux_peak_detector.configure(min_lux=thresholds.get('min_lux'),
+                                                 prominence=thresholds.get('prominence'),
+                                                 hysteresis=thresholds.get('hysteresis'))
+            d = self.lux_peak_detector
+            return {"status": "success",
+                    "message": f"Lux peak thresholds: min {d.min_lux:.0f}, prominence {d.prominence:.0f}, hysteresis {d.hysteresis:.0f} lux"}
+        except Exception as e:
+            return {"status": "error", "message": f"Set lux peak thresholds error: {e}"}
+
+    def start_autotune(self, options=None):
+        """
+        Auto-tune the PD gains for a target settling time:
+        1. Relay test around the current yaw (±relay power), recording gyro rate and power.
+        2. Fit the rate model (gain, damping) and design Kp/Kd for the settling time.
+        3. Apply the gains and step the target by verify_step degrees, comparing the
+           measured response with the model's prediction.
+        The PD controller is left on, holding the step target.
+        options: settling_time, damping_ratio, relay_power, hysteresis, cycles, verify_step, apply
+        """
+        options = options if isinstance(options, dict) else {}
+        try:
+            settling_time = float(options.get('settling_time', AUTOTUNE_SETTLING_TIME))
+            damping_ratio = float(options.get('damping_ratio', DEFAULT_DAMPING_RATIO))
+            verify_step = float(options.get('verify_step', AUTOTUNE_VERIFY_STEP))
+            apply = bool(options.get('apply', True))
+            relay_kwargs = {key: float(options[key]) for key in ('hysteresis',) if key in options}
+            if 'relay_power' in options:
+                relay_kwargs['power'] = min(float(options['relay_power']), self.pd_controller.max_power)
+            if 'cycles' in options:
+                relay_kwargs['cycles'] = int(options['cycles'])
+            if settling_time <= 0:
+                return {"status": "error", "message": "Settling time must be positive"}
+        except (TypeError, ValueError) as e:
+            return {"status": "error", "message": f"Invalid auto-tune options: {e}"}
+
+        if not self.motor_available:
+            return {"status": "error", "message": "Motor control not available"}
+        if not self.mpu_sensor.sensor_ready:
+            return {"status": "error", "message": "MPU6050 sensor not ready"}
+        with self.data_lock:
+            if self.manual_control_active:
+                return {"status": "error", "message": "Cannot auto-tune - manual control is active. Stop manual control first."}
+        if self.autotune_active:
+            return {"status": "error", "message": "Auto-tune already running"}
+
+        self.autotune_active = True
+        interval = 1.0 / AUTOTUNE_SAMPLE_RATE
+        try:
+            # 1. Relay test - PD controller off, the relay drives the motor directly
+            self.pd_controller.stop_controller()
+            with self.data_lock:
+                start_yaw = self.current_data['mpu']['yaw']
+            relay = RelayTest(target=start_yaw, **relay_kwargs)
+            print(f"[AUTOTUNE] Relay test around {start_yaw:.1f}° at ±{relay.power:.0f}%...")
+            while not relay.done:
+                if not self.autotune_active:
+                    stop_motor()
+                    return {"status": "error", "message": "Auto-tune stopped"}
+                with self.data_lock:
+                    yaw = self.current_data['mpu']['yaw']
+                    rate = self.current_data['mpu']['gyro_rate_z']
+                    sample_time = self.current_data['timestamp']
+                if abs(yaw - start_yaw) > AUTOTUNE_MAX_EXCURSION:
+                    stop_motor()
+                    return {"status": "error",
+                            "message": f"Auto-tune aborted - yaw moved {yaw - start_yaw:+.0f}° from the start"}
+                set_motor_power(relay.step(sample_time, yaw, rate))
+                time.sleep(interval)
+            stop_motor()
+
+            # 2. Identify and design
+            model = fit_rate_model(*relay.samples())
+            amplitude, period = relay.oscillation()
+            gains = design_gains(model['gain'], model['damping'], settling_time, damping_ratio)
+            print(f"[AUTOTUNE] Model: gain {model['gain']:.3f} °/s² per %, damping {model['damping']:.3f} 1/s "
+                  f"(r² {model['r2']:.2f}) -> Kp {gains['kp']:.2f}, Kd {gains['kd']:.2f}")
+            data = {
+                'model': model,
+                'relay': {'power': relay.power, 'amplitude': amplitude, 'period': period,
+                          'duration': relay.t[-1] - relay.t[0] if relay.t else 0.0},
+                'kp': gains['kp'], 'kd': gains['kd'], 'wn': gains['wn'],
+                'damping_ratio': damping_ratio, 'settling_time_target': settling_time,
+                'applied': apply,
+            }
+            if not apply:
+                self.last_autotune = data
+                return {"status": "success", "data": data,
+                        "message": f"Identified model: suggested Kp {gains['kp']:.2f}, Kd {gains['kd']:.2f} (not applied)"}
+
+            # 3. Apply and verify with a step
+            self.pd_controller.kp = gains['kp']
+            self.pd_controller.kd = gains['kd']
+            duration = max(3.0 * settling_time, 5.0)
+            t_pred, yaw_pred = predict_step(model['gain'], model['damping'], gains['kp'], gains['kd'], verify_step,
+                                            dt=self.control_interval, duration=duration,
+                                            max_power=self.pd_controller.max_power,
+                                            deadband=self.pd_controller.deadband,
+                                            setpoint_tau=self.pd_controller.setpoint_tau,
+                                            ki=self.pd_controller.ki)
+            with self.data_lock:
+                base_yaw = self.current_data['mpu']['yaw']
+            self.pd_controller.set_target(base_yaw)
+            self.pd_controller.start_controller()
+            self.pd_controller.set_target(base_yaw + verify_step)
+            step_start = time.monotonic()
+            measured_t, measured_yaw = [], []
+            while time.monotonic() - step_start < duration:
+                if not self.autotune_active:
+                    return {"status": "error", "message": "Auto-tune stopped during the verification step"}
+                with self.data_lock:
+                    measured_t.append(self.current_data['timestamp'] - step_start)
+                    measured_yaw.append(self.current_data['mpu']['yaw'] - base_yaw)
+                time.sleep(interval)
+
+            predicted = step_metrics(t_pred, yaw_pred, verify_step)
+            measured = step_metrics(measured_t, measured_yaw, verify_step)
+            tracking = np.array(measured_yaw) - np.interp(measured_t, t_pred, yaw_pred)
+            data.update({'verify_step': verify_step, 'predicted': predicted, 'measured': measured,
+                         'prediction_rms_error': float(np.sqrt(np.mean(tracking ** 2)))})
+            self.last_autotune = data
+
+            def fmt(metrics):
+                settling = metrics['settling_time']
+                return (f"settles {'never' if settling is None else f'{settling:.2f}s'}, "
+                        f"overshoot {metrics['overshoot_pct']:.0f}%")
+            message = (f"Auto-tune: Kp {gains['kp']:.2f}, Kd {gains['kd']:.2f} applied. "
+                       f"{verify_step:.0f}° step predicted {fmt(predicted)}; measured {fmt(measured)}")
+            print(f"[AUTOTUNE] {message}")
+            return {"status": "success", "data": data, "message": message}
+        except Exception as e:
+            stop_motor()
+            return {"status": "error", "message": f"Auto-tune error: {e}"}
+        finally:
+            self.autotune_active = False
+
+    def stop_autotune(self):
+        """Abort a running auto-tune; the relay test stops the motor, the verification step stops the controller"""
+        was_active = self.autotune_active
+        self.autotune_active = False
+        self.pd_controller.stop_controller()
+        stop_motor()
+        return {"status": "success", "message": "Auto-tune stopped" if was_active else "Auto-tune not running"}
+
     def shutdown(self):
         """Shutdown the ADCS controller"""
         # print("\n🛰️ ADCS Controller shutdown...")  # Commented out to reduce spam
@@ -1131,6 +1720,7 @@ class ADCSController:
         # Stop threads
         self.stop_data_thread = True
         self.stop_control_thread = True
+        self.lux_manager.stop_acquisition()
         
         if self.data_thread:
             if hasattr(self.data_thread, 'join'):  # threading.Thread
@@ -1144,6 +1734,9 @@ class ADCSController:
             elif hasattr(self.control_thread, 'kill'):  # gevent.Greenlet
                 self.control_thread.kill()
         
+        if self.tachometer is not None:
+            self.tachometer.stop()
+
         # Cleanup motor control
         cleanup_motor_control()
         # print("✓ ADCS Controller shutdown complete")  # Commented out to reduce spam
@@ -1153,7 +1746,7 @@ class ADCSController:
         Environmental auto-zeroing routine:
         1. Zero yaw and start controller.
         2. Wait until stationary.
-        3. Set PD controller target to yaw+30° in a loop (fixed error), record lux peaks.
+        3. Set PD controller target to yaw + ENV_SWEEP_LEAD in a loop (fixed error), record lux peaks.
         4. After 2 full rotations, set target to 0° and leave PD controller on.
         5. Enter continuous mode: update sun reference to 0° on new peaks.
         """
@@ -1165,7 +1758,8 @@ class ADCSController:
         
         print("[AUTO ZERO ENV] Starting environmental auto-zeroing routine...")
         self.auto_zero_env_enabled = True
-        self.lux_peak_windows = {1: [], 2: [], 3: []}
+        self.lux_peak_detector.reset()
+        self._take_lux_peaks()  # Discard peaks from before this run
         self.lux_angles = {1: 0, 2: 90, 3: 180}
         self.lux_zero_offset = 0.0
         self.env_peak_log = []
@@ -1188,36 +1782,31 @@ class ADCSController:
             time.sleep(0.1)
         print("[AUTO ZERO ENV] Stationary achieved.")
 
-        # 3. Set PD controller target to yaw+30° in a loop, record peaks, detect 2 wraps
-        print("[AUTO ZERO ENV] Rotating with fixed error (target = yaw + 30°)...")
+        # 3. Set PD controller target ENV_SWEEP_LEAD ahead in a loop, record peaks, detect 2 wraps
+        print(f"[AUTO ZERO ENV] Rotating with fixed error (target = yaw + {ENV_SWEEP_LEAD:.0f}°)...")
         yaw_wraps = 0
-        last_yaw = None
+        start_yaw = None
         peak_log = []
 
         while yaw_wraps < 2:
             with self.data_lock:
                 yaw = self.current_data['mpu']['yaw']
-                lux = self.current_data['lux'].copy()
-            # Set PD target to always be 30° ahead of current yaw
-            self.pd_controller.set_target(yaw + 2)  # No wrapping needed
-
-            # Detect yaw wrap-around
-            if last_yaw is not None:
-                if (last_yaw < -150 and yaw > 150):
-                    yaw_wraps += 1
-                    print(f"[AUTO ZERO ENV] Yaw wrap detected: {yaw_wraps}")
-            last_yaw = yaw
-
-            # Peak detection for each channel
-            for ch in [1, 2, 3]:
-                win = self.lux_peak_windows[ch]
-                win.append(lux[ch])
-                if len(win) > 3:
-                    win.pop(0)
-                if len(win) == 3:
-                    if win[1] > win[0] and win[1] > win[2] and win[1] > 50:  # 50 lux threshold
-                        peak_log.append({'ch': ch, 'lux': win[1], 'yaw': yaw, 'time': time.time()})
-                        print(f"[AUTO ZERO ENV] Peak detected: Lux{ch} {win[1]:.1f} at yaw {yaw:.1f}")
+            # Set PD target to always be ENV_SWEEP_LEAD ahead of current yaw (the D term damps
+            # the rate itself, so the lead sets the sweep speed)
+            self.pd_controller.set_target(yaw + ENV_SWEEP_LEAD)  # No wrapping needed
+
+            # Count full turns - yaw is unwrapped, so it never jumps from -180 to +180
+            if start_yaw is None:
+                start_yaw = yaw
+            turns = int(abs(yaw - start_yaw) // 360)
+            if turns > yaw_wraps:
+                yaw_wraps = turns
+                print(f"[AUTO ZERO ENV] Full rotation detected: {yaw_wraps}")
+
+            # Peaks confirmed by the detector since the last pass
+            for peak in self._take_lux_peaks():
+                peak_log.append(peak)
+                print(f"[AUTO ZERO ENV] Peak detected: Lux{peak['ch']} {peak['lux']:.1f} at yaw {peak['yaw']:.1f}")
 
             time.sleep(0.02)
 
@@ -1240,24 +1829,20 @@ class ADCSController:
 
         def continuous_env_loop():
             while self.auto_zero_env_enabled:
-                with self.data_lock:
-                    yaw = self.current_data['mpu']['yaw']
-                    lux = self.current_data['lux'].copy()
-                for ch in [1, 2, 3]:
-                    win = self.lux_peak_windows[ch]
-                    win.append(lux[ch])
-                    if len(win) > 3:
-                        win.pop(0)
-                    if len(win) == 3:
-                        # Thresholds: lux > 50, angle change > 10°
-                        if win[1] > win[0] and win[1] > win[2] and win[1] > 50:
-                            last_peak = self.env_peak_log[-1] if self.env_peak_log else None
-                            if not last_peak or abs(yaw - last_peak['yaw']) > 10:  # No wrapping needed
-                                sensor_angle = self.lux_angles[ch]
-                                offset = yaw - sensor_angle  # Direct calculation
-                                self.lux_zero_offset = offset
-                                self.env_peak_log.append({'ch': ch, 'lux': win[1], 'yaw': yaw, 'offset': offset, 'time': time.time()})
-                                print(f"[AUTO ZERO ENV] [LIVE] Peak Lux{ch} {win[1]:.1f} at yaw {yaw:.1f}°, offset set to {offset:.1f}°")
+                for peak in self._take_lux_peaks():
+                    ch, yaw = peak['ch'], peak['yaw']
+                    # Angle change > 10° since the last accepted peak
+                    last_peak = self.env_peak_log[-1] if self.env_peak_log else None
+                    if not last_peak or abs(yaw - last_peak['yaw']) > 10:  # No wrapping needed
+                        sensor_angle = self.lux_angles[ch]
+                        offset = yaw - sensor_angle  # Direct calculation
+                        self.lux_zero_offset = offset
+                        if YAW_ESTIMATOR_ENABLED:
+                            # Sensor ch faces the sun at yaw -sensor_angle in the sun frame
+                            self.mpu_sensor.yaw_estimator.update(-sensor_angle, timestamp=peak['time'],
+                                                                 variance=LUX_YAW_VARIANCE, source="sun")
+                        self.env_peak_log.append({**peak, 'offset': offset})
+                        print(f"[AUTO ZERO ENV] [LIVE] Peak Lux{ch} {peak['lux']:.1f} at yaw {yaw:.1f}°, offset set to {offset:.1f}°")
                 time.sleep(0.05)
 
         env_thread = create_thread(target=continuous_env_loop)
@@ -1281,33 +1866,23 @@ class ADCSController:
         if not getattr(self, "auto_zero_env_enabled", False):
             return
 
-        # Get current lux and yaw data (thread-safe)
-        with self.data_lock:
-            lux_data = self.current_data['lux'].copy()
-            mpu_yaw = self.current_data['mpu']['yaw']
-
-        for ch in [1, 2, 3]:
-            win = self.lux_peak_windows[ch]
-            win.append(lux_data[ch])
-            if len(win) > 3:
-                win.pop(0)
-            if len(win) == 3:
-                if win[1] > win[0] and win[1] > win[2]:
-                    # Peak detected for this channel
-                    sensor_angle = self.lux_angles[ch]
-                    offset = self.wrap_angle(mpu_yaw - sensor_angle)
-                    self.lux_zero_offset = offset
-                    print(f"[AUTO ZERO ENV] Peak detected on Lux{ch} at yaw {mpu_yaw:.1f}°, sensor angle {sensor_angle}°, offset set to {offset:.1f}°")
-                    # Optionally, break after first peak detected
-                    break
+        for peak in self._take_lux_peaks():
+            ch = peak['ch']
+            sensor_angle = self.lux_angles[ch]
+            offset = (peak['yaw'] - sensor_angle + 180.0) % 360.0 - 180.0
+            self.lux_zero_offset = offset
+            print(f"[AUTO ZERO ENV] Peak detected on Lux{ch} at yaw {peak['yaw']:.1f}°, sensor angle {sensor_angle}°, offset set to {offset:.1f}°")
+            # Optionally, break after first peak detected
+            break
 
     def auto_zero_tag(self, data):
         """
-        Called when scanning_mode_data is received or when AprilTag command is triggered.
+        Called when scanning_mode_data is received, for each on-board tag pose, or when AprilTag command is triggered.
         - When a relative angle is received, set MPU yaw to -relative_angle, set PD target to 0.
+        - 'timestamp' (time.monotonic() of the frame capture, on-board poses only) places the fix
+          at the instant it was seen, so detection and transfer delay do not lag the yaw.
         - If tag is lost, do nothing (wait for next detection).
         """
-        # Data is expected to contain only 'relative_angle' (no timestamp).
         rel_angle = data.get("relative_angle")
         if rel_angle is None:
             # Only print once when AprilTag is lost to avoid spam
@@ -1319,13 +1894,35 @@ class ADCSController:
             self._apriltag_lost_printed = False
         try:
             desired_mpu_yaw = -float(rel_angle)
+            timestamp = data.get("timestamp")
+            age = time.monotonic() - timestamp if timestamp is not None else None
             with self.data_lock:
-                self.mpu_sensor.angle_yaw = desired_mpu_yaw
+                if YAW_ESTIMATOR_ENABLED:
+                    # Fused as a fix in the tag frame instead of overwriting the gyro yaw
+                    self.mpu_sensor.yaw_estimator.update(desired_mpu_yaw, timestamp=timestamp,
+                                                         variance=TAG_YAW_VARIANCE, source="tag")
+                    current_yaw = self.mpu_sensor.yaw_estimator.get_state()['yaw']
+                else:
+                    if timestamp is not None:
+                        # Add the rotation since the frame was captured
+                        rotation = self.yaw_history.rotation_since(timestamp)
+                        if rotation is not None:
+                            desired_mpu_yaw += rotation
+                    self.mpu_sensor.angle_yaw = desired_mpu_yaw
+                    current_yaw = self.mpu_sensor.angle_yaw
+                self.last_tag_fix_age = age
                 # Also update PD controller target to point to tag (not just zero)
                 self.pd_controller.set_target(0.0)
-                self.pd_controller.start_controller()
-                print(f"[AUTO ZERO] AprilTag: {rel_angle:.1f}° → MPU: {desired_mpu_yaw:.1f}° (PD target 0°)")
-                print(f"[AUTO ZERO] MPU yaw is now: {self.mpu_sensor.angle_yaw:.2f}")
+                if not self.pd_controller.controller_enabled:
+                    # Fixes arrive at camera rate: a restart would reset the setpoint filter and integral each time
+                    self.pd_controller.start_controller()
+            # On-board poses arrive at camera rate: print at most once a second
+            now = time.monotonic()
+            if data.get("source") != "onboard" or now - getattr(self, '_auto_zero_printed', 0.0) >= 1.0:
+                self._auto_zero_printed = now
+                age_info = f", fix age {age * 1000:.0f} ms" if age is not None else ""
+                print(f"[AUTO ZERO] AprilTag: {rel_angle:.1f}° → MPU: {desired_mpu_yaw:.1f}° (PD target 0°{age_info})")
+                print(f"[AUTO ZERO] MPU yaw is now: {current_yaw:.2f}")
         except Exception as e:
             print(f"[AUTO ZERO] Error: {e}")
 
@@ -1373,6 +1970,8 @@ class ADCSController:
             
             if getattr(self, 'auto_zero_env_enabled', False):
                 self.stop_auto_zero_env()
+
+            self.autotune_active = False
             
             # Stop manual control
             with self.data_lock:
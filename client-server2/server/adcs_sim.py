@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+🧪 ADCS SIMULATOR - the real ADCSController flying a simulated yaw plant, faster than real time
+ADCS_PD runs unmodified: its gyro, lux sensors and motor are replaced by models and its
+clock by a virtual one, so PD gains, control rates and the environmental auto-zero
+routine can be benchmarked on a PC.
+- YawPlant: rigid-body yaw + reaction wheel (DC motor torque / back-EMF, viscous friction,
+  optional disturbance torque)
+- Gyro: SimulatedMPU6050 FIFO fed with the true body rate plus bias and white noise
+- Lux: three SimulatedVEML7700 behind the mux, lit by a sun at a configurable bearing
+- Motor: MotorDriver writes into the plant instead of the GPIO pins
+- Tachometer: one edge per wheel revolution into the real Tachometer through FakeTachoGPIO
+- VirtualTime: time.time / monotonic / sleep for ADCS_PD and its helpers; every
+  controller thread runs in lockstep with the physics, never waiting in real time
+- LegacyPDController: the PD law before the gyro D term, for A/B runs against the current one
+- Step-response metrics: rise time, overshoot, settling time, steady-state error, effort
+- tune: ADCSController.start_autotune against the plant, identified vs true rate model
+
+The plant parameters below are estimates for the bench rig, not measurements - fit them
+to a recorded step response before trusting absolute numbers; comparisons between gains
+and control rates are what this is for.
+
+Usage: python adcs_sim.py [step|env|sweep|tune] [--kp 17 --kd 15 --rate 20 --target 90 --sun 40 --settle 2]
+"""
+import argparse
+import contextlib
+import heapq
+import io
+import math
+import random
+import threading
+import time as _time
+
+import numpy as np
+
+import ADCS_PD
+import mpu_fifo
+import yaw_estimator
+import yaw_history
+from lux_acquisition import LuxRoundRobinReader
+from motor_driver import CW, CCW
+from pd_autotune import step_metrics
+from tachometer import Tachometer, FakeTachoGPIO
+from sim_hardware import SimulatedSMBus, SimulatedMPU6050, SimulatedTCA9548A, SimulatedVEML7700
+from yaw_history import YawHistory
+
+# ── PLANT PARAMETERS (assumed) ─────────────────────────────────────────
+BODY_INERTIA = 0.005        # kg·m² - satellite body about yaw, wheel included
+WHEEL_INERTIA = 2.5e-5      # kg·m² - reaction wheel rotor
+STALL_TORQUE = 0.004        # N·m - motor torque at 100% duty, wheel at rest
+NO_LOAD_SPEED = 628.0       # rad/s - wheel speed where 100% duty gives no torque (~6000 rpm)
+WHEEL_FRICTION = 2e-7       # N·m·s/rad - wheel bearing viscous friction
+BODY_FRICTION = 1e-4        # N·m·s/rad - air bearing / tether drag on the body
+WHEEL_MOUNT = -1            # Wheel axis against gyro Z: positive power turns the body to positive yaw
+
+GYRO_BIAS = (0.0, 0.0, 0.3)  # °/s
+GYRO_NOISE = 0.05            # °/s white noise per sample
+SUN_LUX = 2000.0             # lux on a sensor facing the sun
+AMBIENT_LUX = 20.0           # lux from everywhere else
+
+SIM_STEP = 0.001             # s - physics step and the finest scheduling granularity
+STALL_TIMEOUT_S = 5.0        # Real seconds a controller thread may run without yielding
+SETTLE_BAND = 2.0            # ° - step response counts as settled inside target ± this
+
+class SimulationStall(RuntimeError):
+    """A controller thread did not get back to a sleep within STALL_TIMEOUT_S real seconds"""
+
+# ── VIRTUAL TIME ───────────────────────────────────────────────────────
+class _ManagedThread(threading.Thread):
+    """Controller thread whose sleeps are scheduled on the virtual clock"""
+
+    def __init__(self, clock, target, daemon=True):
+        super().__init__(target=target, daemon=daemon)
+        self.clock = clock
+
+    def start(self):
+        with self.clock.cond:
+            self.clock.running += 1
+        super().start()
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            with self.clock.cond:
+                self.clock.running -= 1
+                self.clock.cond.notify_all()
+
+class VirtualTime:
+    """Stand-in for the time module, shared by the simulation driver and the controller threads.
+
+    Threads made with thread() are managed: their sleep() parks them until the virtual
+    clock reaches the wake time. Any other caller of sleep() is the driver: it advances
+    the clock, running on_step(t0, t1) for the physics between wake-ups, and only moves
+    on once every managed thread is parked again. Time therefore never passes while a
+    controller thread is computing - as if the Pi were infinitely fast.
+    """
+
+    def __init__(self, step=SIM_STEP, on_step=None, epoch=1.7e9, stall_timeout=STALL_TIMEOUT_S):
+        self.step = step
+        self.on_step = on_step
+        self.epoch = epoch
+        self.stall_timeout = stall_timeout
+        self.now = 0.0
+        self.cond = threading.Condition()
+        self.sleepers = []       # heap of (wake time, seq, token)
+        self.seq = 0
+        self.running = 0         # Managed threads not parked in sleep()
+        self.released = False
+        self.steps = 0
+
+    def __getattr__(self, name):
+        return getattr(_time, name)  # strftime, localtime, ... from the real module
+
+    def time(self):
+        return self.epoch + self.now
+
+    def monotonic(self):
+        return self.now
+
+    # perf_counter comes from the real module: compute-time statistics measure this machine
+
+    def thread(self, target, daemon=True):
+        """create_thread() replacement - start() it like a threading.Thread"""
+        return _ManagedThread(self, target, daemon)
+
+    def sleep(self, seconds):
+        if isinstance(threading.current_thread(), _ManagedThread):
+            self._park(seconds)
+        else:
+            self.advance(seconds)
+
+    def _park(self, seconds):
+        with self.cond:
+            if self.released:
+                self.cond.wait(0.001)  # Torn down: return at once, just don't spin
+                return
+            token = [False]
+            heapq.heappush(self.sleepers, (self.now + max(0.0, seconds), self.seq, token))
+            self.seq += 1
+            self.running -= 1
+            self.cond.notify_all()
+            while not token[0] and not self.released:
+                self.cond.wait()
+
+    def _settle(self):
+        """Wait (in real time) until every managed thread is parked"""
+        while self.running > 0:
+            if not self.cond.wait(self.stall_timeout):
+                raise SimulationStall(f"{self.running} controller thread(s) still running after "
+                                      f"{self.stall_timeout:.0f}s at t={self.now:.3f}")
+
+    def advance(self, seconds):
+        """Driver: run the simulation for `seconds` of virtual time"""
+        end = self.now + max(0.0, seconds)
+        with self.cond:
+            while True:
+                self._settle()
+                woke = False
+                while self.sleepers and self.sleepers[0][0] <= self.now:
+                    heapq.heappop(self.sleepers)[2][0] = True
+                    self.running += 1
+                    woke = True
+                if woke:
+                    self.cond.notify_all()
+                    continue
+                if self.now >= end:
+                    return
+                t1 = min(end, self.now + self.step)
+                if self.sleepers:
+                    t1 = min(t1, self.sleepers[0][0])
+                if self.on_step is not None:
+                    self.on_step(self.now, t1)
+                self.now = t1
+                self.steps += 1
+
+    def release(self):
+        """Let every parked thread return so the controller can shut down"""
+        with self.cond:
+            self.released = True
+            for _, _, token in self.sleepers:
+                token[0] = True
+            self.sleepers = []
+            self.cond.notify_all()
+
+# ── YAW PLANT ──────────────────────────────────────────────────────────
+class YawPlant:
+    """Body yaw + reaction wheel, integrated with explicit Euler at the simulation step.
+
+    Motor torque on the wheel follows the DC motor line
+        tau = STALL_TORQUE * (duty - wheel_speed / NO_LOAD_SPEED)
+    while driven and is zero with both driver inputs low (coast). The body gets the
+    reaction (through WHEEL_MOUNT), minus its own drag, plus `disturbance` (N·m).
+    Yaw and rate are kept in degrees, as the gyro reports them.
+    """
+
+    def __init__(self, body_inertia=BODY_INERTIA, wheel_inertia=WHEEL_INERTIA, stall_torque=STALL_TORQUE,
+                 no_load_speed=NO_LOAD_SPEED, wheel_friction=WHEEL_FRICTION, body_friction=BODY_FRICTION,
+                 disturbance=0.0, yaw=0.0):
+        self.body_inertia = body_inertia
+        self.wheel_inertia = wheel_inertia
+        self.stall_torque = stall_torque
+        self.no_load_speed = no_load_speed
+        self.wheel_friction = wheel_friction
+        self.body_friction = body_friction
+        self.disturbance = disturbance
+        self.body_rate = 0.0                # rad/s
+        self.body_yaw = math.radians(yaw)   # rad, unwrapped
+        self.wheel_speed = 0.0              # rad/s relative to the body
+        self.duty = [0.0, 0.0]              # % on the CW / CCW driver inputs
+        self.history = YawHistory()
+
+    # Motor backend (MotorDriver calls these instead of the GPIO PWM)
+    def write(self, channel, duty):
+        self.duty[channel] = duty
+
+    def close(self):
+        self.duty = [0.0, 0.0]
+
+    @property
+    def power(self):
+        """Signed motor power -100..100 as the controller commanded it"""
+        return self.duty[CW] - self.duty[CCW]
+
+    @property
+    def yaw(self):
+        return math.degrees(self.body_yaw)
+
+    @property
+    def rate(self):
+        return math.degrees(self.body_rate)
+
+    @property
+    def wheel_rpm(self):
+        return self.wheel_speed * 60.0 / (2 * math.pi)
+
+    def rate_model(self):
+        """(gain °/s² per %, damping 1/s) of the driven plant, as pd_autotune fits it.
+
+        Starting from rest the wheel speed tracks body_rate * body/wheel inertia,
+        so back-EMF and wheel friction act as damping on the body rate.
+        """
+        gain = math.degrees(self.stall_torque / self.body_inertia) / 100.0
+        damping = ((self.stall_torque / self.no_load_speed + self.wheel_friction) / self.wheel_inertia
+                   + self.body_friction / self.body_inertia)
+        return gain, damping
+
+    def step(self, t0, t1):
+        dt = t1 - t0
+        duty = self.power / 100.0
+        torque = self.stall_torque * (duty - self.wheel_speed / self.no_load_speed) if duty else 0.0
+        wheel_torque = torque - self.wheel_friction * self.wheel_speed
+        body_torque = -WHEEL_MOUNT * wheel_torque - self.body_friction * self.body_rate + self.disturbance
+        self.wheel_speed += wheel_torque / self.wheel_inertia * dt
+        self.body_rate += body_torque / self.body_inertia * dt
+        self.body_yaw += self.body_rate * dt
+        self.history.append(t1, self.yaw, self.rate)
+
+    def rate_at(self, t):
+        rate = self.history.rate_at(t)
+        return self.rate if rate is None else rate
+
+    def yaw_at(self, t):
+        yaw = self.history.yaw_at(t)
+        return self.yaw if yaw is None else yaw
+
+# ── SIMULATED LUX MANAGER ──────────────────────────────────────────────
+class SimulatedLuxManager:
+    """LuxSensorManager stand-in: the same round-robin reader on simulated VEML7700s"""
+
+    def __init__(self, clock, mux, sensors):
+        self.clock = clock
+        self.mux = mux
+        self.lux_sensors = dict(sensors)
+        self.sensors_ready = True
+        self.reader = None
+        self.reader_thread = None
+        self.publish_callback = None
+
+    def select_lux_channel(self, channel, settle=False):
+        self.mux.writeto(ADCS_PD.MUX_ADDRESS, bytes([1 << channel]))
+
+    def initialize_lux_sensors(self):
+        self.stop_acquisition()
+        if self.publish_callback is not None:
+            self.start_acquisition(self.publish_callback)
+
+    def start_acquisition(self, publish, rate_hz=ADCS_PD.LUX_ACQUISITION_RATE):
+        self.publish_callback = publish
+        if self.reader is not None:
+            return False
+        self.reader = LuxRoundRobinReader(select_channel=self.select_lux_channel, sensors=self.lux_sensors,
+                                          rate_hz=rate_hz, publish=publish,
+                                          clock=self.clock.monotonic, sleep=self.clock.sleep)
+        self.reader_thread = self.clock.thread(self.reader.run)
+        self.reader_thread.start()
+        return True
+
+    def stop_acquisition(self):
+        if self.reader is None:
+            return False
+        self.reader.stop()  # The thread exits at its next wake-up
+        self.reader = None
+        self.reader_thread = None
+        return True
+
+    def read_lux_sensors(self):
+        if self.reader is None:
+            return {ch: 0.0 for ch in ADCS_PD.LUX_CHANNELS}
+        return {ch: lux for ch, (lux, _) in self.reader.latest.items()}
+
+# ── REFERENCE CONTROLLER ───────────────────────────────────────────────
+class LegacyPDController(ADCS_PD.PDControllerPWM):
+    """PD law before the gyro D term: numerically differentiated error, targets applied as steps"""
+
+    def update(self, current_yaw, gyro_rate, dt):
+        error = self.target_yaw - current_yaw
+        if not self.controller_enabled or self.input_mode:
+            return 0, error, 0.0
+        if abs(error) < self.deadband:
+            motor_power, pd_output = 0, 0.0
+        else:
+            derivative = (error - self.previous_error) / dt if dt > 0 else 0.0
+            pd_output = self.kp * error + self.kd * derivative
+            motor_power = max(-self.max_power, min(self.max_power, pd_output))
+        motor_power = ADCS_PD.set_motor_power(motor_power)
+        self.previous_error = error
+        return motor_power, error, pd_output
+
+# ── SIMULATION ─────────────────────────────────────────────────────────
+class AdcsSimulation:
+    """One ADCSController on a YawPlant. Use as a context manager:
+
+        with AdcsSimulation(kp=17, kd=15, control_hz=20) as sim:
+            sim.run(1.0)
+            sim.controller.zero_yaw_position(); ...; sim.run(10.0)
+            metrics = sim.step_response(90.0)
+
+    While inside the block, ADCS_PD, mpu_fifo, yaw_estimator and yaw_history see
+    VirtualTime as their `time` module. The log holds one row every log_interval
+    seconds: (t, true yaw, true rate, controller yaw, motor power, wheel rpm).
+    """
+
+    def __init__(self, kp=None, kd=None, control_hz=None, sun_bearing=0.0, plant=None, gains=None, law="current",
+                 gyro_bias=GYRO_BIAS, gyro_noise=GYRO_NOISE, seed=0, log_interval=0.005,
+                 calibrate=True, quiet=True):
+        self.gains = dict(gains or {})
+        self.gains.update({k: v for k, v in (('kp', kp), ('kd', kd)) if v is not None})
+        self.law = law
+        self.control_hz = control_hz
+        self.sun_bearing = sun_bearing
+        self.plant = plant or YawPlant()
+        self.calibrate = calibrate
+        self.quiet = quiet
+        self.log_interval = log_interval
+        self.log = []
+        self.peaks = []
+        self.output = io.StringIO()
+        self.clock = VirtualTime(on_step=self._on_step)
+        self._next_log = 0.0
+        self._patched = []
+        self._stdout = None
+        self.controller = None
+
+        self.bus = SimulatedSMBus()
+        self.mpu = self.bus.attach(ADCS_PD.MPU_ADDRESS, SimulatedMPU6050(
+            rate_fn=lambda t: (0.0, 0.0, self.plant.rate_at(t)), bias=gyro_bias, noise_std=gyro_noise,
+            clock=self.clock.monotonic, rng=random.Random(seed)))
+        self.mux = SimulatedTCA9548A(address=ADCS_PD.MUX_ADDRESS, clock=self.clock.monotonic)
+        self.sensor_angles = {1: 0, 2: 90, 3: 180}  # Same layout start_auto_zero_env assumes
+        self.lux_sensors = {ch: SimulatedVEML7700(self.mux, ch, self._lux_fn(ch)) for ch in ADCS_PD.LUX_CHANNELS}
+        self.tacho_gpio = FakeTachoGPIO()
+        self._wheel_turns = 0.0
+
+    def _lux_fn(self, channel):
+        angle = self.sensor_angles[channel]
+        def lux(t):
+            facing = math.radians(self.plant.yaw_at(t) + angle - self.sun_bearing)
+            return AMBIENT_LUX + SUN_LUX * max(0.0, math.cos(facing))
+        return lux
+
+    def _record_peaks(self, detector):
+        """Keep every confirmed lux peak with its bearing error against the truth"""
+        push = detector.push
+        def recording_push(channel, lux, yaw, timestamp):
+            peak = push(channel, lux, yaw, timestamp)
+            if peak:
+                # Sensor `channel` faces the sun when the sun-frame yaw is -angle
+                truth = self.plant.yaw_at(peak['time']) - self.sun_bearing + self.sensor_angles[channel]
+                self.peaks.append({**peak, 'bearing_error': wrap_180(truth)})
+            return peak
+        detector.push = recording_push
+
+    def _on_step(self, t0, t1):
+        self.plant.step(t0, t1)
+        self.tacho_gpio.now = t1
+        self._wheel_turns += abs(self.plant.wheel_speed) * (t1 - t0) / (2 * math.pi)
+        if self._wheel_turns >= 1.0:
+            self._wheel_turns -= 1.0
+            self.tacho_gpio.edge()
+        if t1 >= self._next_log and self.controller is not None:
+            self._next_log = t1 + self.log_interval
+            self.log.append((t1, self.plant.yaw, self.plant.rate, self.controller.current_data['mpu']['yaw'],
+                             self.plant.power, self.plant.wheel_rpm))
+
+    def _patch(self, obj, name, value):
+        self._patched.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def __enter__(self):
+        if self.quiet:
+            self._stdout = contextlib.redirect_stdout(self.output)
+            self._stdout.__enter__()
+        try:
+            for module in (ADCS_PD, mpu_fifo, yaw_estimator, yaw_history):
+                self._patch(module, 'time', self.clock)
+            self._patch(ADCS_PD, 'create_thread', self.clock.thread)
+            lux_manager = SimulatedLuxManager(self.clock, self.mux, self.lux_sensors)
+            tachometer = Tachometer(gpio=self.tacho_gpio, clock=self.tacho_gpio.clock)
+            self.controller = ADCS_PD.ADCSController(mpu_bus=self.bus, lux_manager=lux_manager,
+                                                     motor_backend=self.plant, tachometer=tachometer)
+            self._record_peaks(self.controller.lux_peak_detector)
+            if self.law == "legacy":
+                self.controller.pd_controller = LegacyPDController()
+            if self.control_hz is not None:
+                self.controller.set_control_rate(self.control_hz)
+            if self.gains:
+                self.controller.set_controller_gains(self.gains)
+            if self.calibrate:
+                self.controller.mpu_sensor.calibrate_gyro(samples=500)
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.clock.release()
+        try:
+            if self.controller is not None:
+                self.controller.auto_zero_env_enabled = False
+                self.controller.shutdown()
+        finally:
+            for obj, name, value in reversed(self._patched):
+                setattr(obj, name, value)
+            self._patched = []
+            if self._stdout is not None:
+                self._stdout.__exit__(None, None, None)
+                self._stdout = None
+        return False
+
+    @property
+    def now(self):
+        return self.clock.now
+
+    def run(self, seconds):
+        self.clock.advance(seconds)
+
+    def log_array(self, start=0.0):
+        rows = [row for row in self.log if row[0] >= start]
+        return np.array(rows).reshape(-1, 6)
+
+    def step_response(self, target, start, zero_yaw, band=SETTLE_BAND):
+        """Metrics of the true yaw (relative to zero_yaw) after a target change at `start`"""
+        log = self.log_array(start)
+        return step_response(log[:, 0] - start, log[:, 1] - zero_yaw, target, band,
+                             power=log[:, 4], wheel_rpm=log[:, 5], estimate=log[:, 3])
+
+# ── METRICS ────────────────────────────────────────────────────────────
+def step_response(t, yaw, target, band=SETTLE_BAND, power=None, wheel_rpm=None, estimate=None):
+    """Classic step metrics for a step from 0 to `target` degrees.
+
+    settling_time is when yaw last entered target ± band (None if it ends outside),
+    overshoot is in % of the step, steady_state_error the mean error over the last second.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(yaw, dtype=np.float64) * (1.0 if target >= 0 else -1.0)
+    metrics = step_metrics(t, yaw, target, band)
+    tail = t >= t[-1] - 1.0
+    metrics['steady_state_error'] = float((y[tail] - abs(target)).mean())
+    if power is not None:
+        metrics['effort'] = float(np.sum(np.abs(power[:-1]) * np.diff(t)) / 100.0)  # Full-power seconds
+    if wheel_rpm is not None:
+        metrics['peak_wheel_rpm'] = float(np.abs(wheel_rpm).max())
+    if estimate is not None:
+        metrics['estimate_error'] = float(estimate[-1] * (1.0 if target >= 0 else -1.0) - y[-1])
+    return metrics
+
+def wrap_180(angle):
+    return (angle + 180.0) % 360.0 - 180.0
+
+def _fmt(value, unit="", digits=2):
+    return "-" if value is None else f"{value:.{digits}f}{unit}"
+
+# ── SCENARIOS ──────────────────────────────────────────────────────────
+def run_step(kp=None, kd=None, control_hz=None, target=90.0, duration=10.0, **kwargs):
+    """Zero, start the PD controller, step the target; returns step metrics + timing"""
+    with AdcsSimulation(kp=kp, kd=kd, control_hz=control_hz, **kwargs) as sim:
+        controller = sim.controller
+        sim.run(0.5)
+        controller.zero_yaw_position()
+        zero_yaw = sim.plant.yaw
+        controller.start_auto_control("PD")
+        controller.set_target_yaw(target)
+        start = sim.now
+        real_start = _time.perf_counter()
+        sim.run(duration)
+        real = _time.perf_counter() - real_start
+        metrics = sim.step_response(target, start, zero_yaw)
+        control = controller.get_control_stats()
+        with controller.data_lock:
+            tacho_rpm = controller.current_data['rpm']
+        metrics.update({'tacho_error_rpm': tacho_rpm - abs(sim.plant.wheel_rpm),
+                        'law': sim.law, 'kp': controller.pd_controller.kp, 'kd': controller.pd_controller.kd,
+                        'control_hz': control['target_hz'], 'compute_us': control['compute_mean_us'],
+                        'speedup': duration / real, 'motor_writes': ADCS_PD.get_motor_stats()['writes']})
+    return metrics
+
+def run_env(sun_bearing=40.0, settle=10.0, timeout=120.0, **kwargs):
+    """start_auto_zero_env on a plant with the sun at `sun_bearing`.
+
+    Returns the routine's duration, the bearing error of the peaks found while it
+    rotated and after it returned (the continuous sun-reference mode), and the final
+    yaw error against the truth in the sun frame.
+    """
+    with AdcsSimulation(sun_bearing=sun_bearing, **kwargs) as sim:
+        controller = sim.controller
+        sim.run(0.5)
+        real_start = _time.perf_counter()
+        start = sim.now
+        # The routine sleeps in the calling thread - as the driver that advances the clock
+        sim.clock.on_step = _deadline(sim._on_step, start + timeout)
+        result = controller.start_auto_zero_env()
+        end = sim.now
+        sim.run(settle)
+        real = _time.perf_counter() - real_start
+        with controller.data_lock:
+            yaw = controller.current_data['mpu']['yaw']
+        truth = sim.plant.yaw - sun_bearing
+    sweep = [abs(p['bearing_error']) for p in sim.peaks if p['time'] <= end]
+    live = [abs(p['bearing_error']) for p in sim.peaks if p['time'] > end]
+    return {'result': result['status'], 'duration': end - start,
+            'sweep_peaks': len(sweep), 'sweep_max_error': max(sweep, default=None),
+            'live_peaks': len(live), 'live_max_error': max(live, default=None),
+            'yaw_error': wrap_180(yaw - truth), 'speedup': (sim.now - start) / real}
+
+def _deadline(on_step, deadline):
+    def step(t0, t1):
+        if t1 > deadline:
+            raise TimeoutError(f"simulation passed its {deadline:.0f}s deadline")
+        on_step(t0, t1)
+    return step
+
+def run_tune(settling_time=2.0, timeout=120.0, **kwargs):
+    """start_autotune on the plant: identified vs true rate model, predicted vs measured step"""
+    with AdcsSimulation(**kwargs) as sim:
+        sim.run(0.5)
+        start = sim.now
+        sim.clock.on_step = _deadline(sim._on_step, start + timeout)
+        result = sim.controller.start_autotune({'settling_time': settling_time})
+        true_gain, true_damping = sim.plant.rate_model()
+        duration = sim.now - start
+    return {'result': result['status'], 'message': result['message'], 'data': result.get('data'),
+            'true_gain': true_gain, 'true_damping': true_damping, 'duration': duration}
+
+def run_sweep(gains=((17, 15), (10, 10), (25, 15), (17, 5)), rates=(20, 50, 200), target=90.0, duration=10.0):
+    """Step responses: the legacy law at 20Hz as the baseline, then the current law over a few
+    gain pairs (at the default rate) and control rates (default gains)"""
+    results = [run_step(control_hz=20, target=target, duration=duration, law="legacy")]
+    results += [run_step(kp=kp, kd=kd, target=target, duration=duration) for kp, kd in gains]
+    results += [run_step(control_hz=hz, target=target, duration=duration) for hz in rates
+                if hz != ADCS_PD.CONTROL_FREQUENCY]
+    return results
+
+def print_step_table(results, target):
+    print(f"Step {target:+.0f}° (settled = within ±{SETTLE_BAND:.0f}°, true yaw)")
+    print(f"{'law':>7s} {'Kp':>5s} {'Kd':>5s} {'Hz':>4s} {'rise':>7s} {'overshoot':>10s} {'settling':>9s} "
+          f"{'ss err':>7s} {'est err':>8s} {'effort':>7s} {'wheel':>8s} {'writes':>7s} {'step':>7s} {'speed':>6s}")
+    for r in results:
+        print(f"{r['law']:>7s} {r['kp']:5.1f} {r['kd']:5.1f} {r['control_hz']:4.0f} {_fmt(r['rise_time'], 's'):>7s} "
+              f"{r['overshoot_pct']:9.1f}% {_fmt(r['settling_time'], 's'):>9s} {r['steady_state_error']:6.2f}° "
+              f"{r['estimate_error']:7.2f}° {r['effort']:6.2f}s {r['peak_wheel_rpm']:5.0f}rpm "
+              f"{r['motor_writes']:7d} {r['compute_us']:5.0f}us {r['speedup']:5.1f}x")
+
+def print_env(r, sun_bearing):
+    print(f"Environmental auto-zero, sun at {sun_bearing:.0f}°: {r['result']} after {r['duration']:.1f}s "
+          f"({r['speedup']:.1f}x real time)")
+    print(f"  sweep peaks: {r['sweep_peaks']}, max bearing error {_fmt(r['sweep_max_error'], '°', 1)}")
+    print(f"  live peaks:  {r['live_peaks']}, max bearing error {_fmt(r['live_max_error'], '°', 1)}")
+    print(f"  final sun-frame yaw error {r['yaw_error']:+.1f}°")
+
+def print_tune(r):
+    print(f"Auto-tune: {r['result']} after {r['duration']:.1f}s - {r['message']}")
+    if not r['data']:
+        return
+    d, model = r['data'], r['data']['model']
+    print(f"  gain    {model['gain']:.3f} °/s² per % (true {r['true_gain']:.3f})")
+    print(f"  damping {model['damping']:.3f} 1/s       (true {r['true_damping']:.3f}), fit r² {model['r2']:.2f}")
+    print(f"  relay   ±{d['relay']['power']:.0f}%: {_fmt(d['relay']['amplitude'], '°', 1)} p-p, "
+          f"period {_fmt(d['relay']['period'], 's')}")
+    if 'measured' in d:
+        for name in ('predicted', 'measured'):
+            m = d[name]
+            print(f"  {name:<9} {d['verify_step']:.0f}° step: rise {_fmt(m['rise_time'], 's')}, "
+                  f"settling {_fmt(m['settling_time'], 's')}, overshoot {m['overshoot_pct']:.1f}%")
+        print(f"  prediction rms error {d['prediction_rms_error']:.2f}°")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ADCSController against a simulated yaw plant")
+    parser.add_argument("scenario", nargs="?", default="step", choices=["step", "env", "sweep", "tune"])
+    parser.add_argument("--kp", type=float)
+    parser.add_argument("--kd", type=float)
+    parser.add_argument("--rate", type=float, help="Control loop rate (Hz)")
+    parser.add_argument("--target", type=float, default=90.0, help="Step target (°)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds simulated after the step")
+    parser.add_argument("--sun", type=float, default=40.0, help="Sun bearing for the env scenario (°)")
+    parser.add_argument("--settle", type=float, default=2.0, help="Target settling time for the tune scenario (s)")
+    args = parser.parse_args()
+
+    if args.scenario == "env":
+        print_env(run_env(sun_bearing=args.sun), args.sun)
+    elif args.scenario == "tune":
+        print_tune(run_tune(settling_time=args.settle))
+    elif args.scenario == "sweep":
+        print_step_table(run_sweep(target=args.target, duration=args.duration), args.target)
+    else:
+        result = run_step(kp=args.kp, kd=args.kd, control_hz=args.rate, target=args.target,
+                          duration=args.duration)
+        print_step_table([result], args.target)
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,29 @@
 
 from gevent import monkey; monkey.patch_all()
 import time
-import socketio
+from service_link import ServiceClient
 import cv2
 from picamera2 import Picamera2
 
+try:
+    from frame_ring import FrameRing, DEFAULT_NAME as FRAME_RING_NAME, RAW_NAME as RAW_RING_NAME
+    FRAME_RING_AVAILABLE = True
+except ImportError as e:
+    print(f"[WARN] Shared-memory frame ring not available: {e}")
+    FrameRing = None
+    FRAME_RING_AVAILABLE = False
+
+from still_capture import StillCapture, dual_stream_config, yuv420_to_bgr, STILL_RESOLUTION
+
 SERVER_URL = "http://localhost:5000"
-sio = socketio.Client()
+# Standalone camera.py: "shared_memory" hands JPEG frames to server2 through the frame ring,
+# "socketio" sends each one over the socket. In-process (started by server2) frames go direct.
+FRAME_TRANSPORT = "shared_memory"
+SHARE_RAW_FRAMES = False          # Also publish unencoded frames ("slowmo_raw") for on-board detection
+# "dual_stream": video from the lores stream, full-res stills from main without pausing the stream;
+# "single": video-only configuration, stills pause the stream (and are video resolution)
+CAMERA_STREAM_MODE = "dual_stream"
+sio = ServiceClient()  # In-process when imported by server2, Socket.IO client when standalone
 
 last_status = None
 last_fps_value = None
@@ -35,6 +52,55 @@ class CameraStreamer:
             "exposure_time": None,         # None means auto         # Enable AE by default
         }
         self.picam = Picamera2()
+        self.frame_ring = None
+        self.raw_ring = None
+        self.share_raw = SHARE_RAW_FRAMES  # Switched on by consumers such as tag_pose
+        self.stills = StillCapture()
+        self.dual_stream = False           # Current configuration has the lores/main pair
+
+    def capture_frame(self):
+        """Next frame and the wall-clock time of its mid-exposure (from the sensor timestamp)"""
+        request = self.picam.capture_request()
+        try:
+            metadata = request.get_metadata()
+            capture_time = self._capture_time(metadata)
+            if self.dual_stream:
+                frame = yuv420_to_bgr(request.make_array("lores"))
+                if self.stills.pending:  # Copy the full-res buffer; encoding happens on the still writer
+                    self.stills.serve(request.make_array("main"), capture_time)
+            else:
+                frame = request.make_array("main")
+        finally:
+            request.release()
+        return frame, capture_time
+
+    @staticmethod
+    def _capture_time(metadata):
+        sensor_ns = metadata.get("SensorTimestamp")  # Start of exposure, CLOCK_BOOTTIME
+        if sensor_ns is None:
+            return time.time()
+        sensor_ns += metadata.get("ExposureTime", 0) * 500  # µs -> ns, half the exposure
+        age = time.clock_gettime(time.CLOCK_BOOTTIME) - sensor_ns / 1e9
+        return time.time() - age
+
+    def publish_frame(self, jpeg, capture_time=None):
+        """Send one encoded frame to server2 by the cheapest path available"""
+        if not sio.in_process and FRAME_TRANSPORT == "shared_memory" and FRAME_RING_AVAILABLE:
+            if self.frame_ring is None:
+                self.frame_ring = FrameRing(FRAME_RING_NAME, create=True)
+            self.frame_ring.write(jpeg, capture_time)  # Straight from the encoder's buffer
+        else:
+            sio.emit("frame", jpeg.tobytes())
+
+    def publish_raw(self, frame, capture_time=None):
+        """Raw pixels for on-board consumers, written before JPEG encoding"""
+        if not self.share_raw or not FRAME_RING_AVAILABLE:
+            return
+        if self.raw_ring is None or frame.nbytes > self.raw_ring.slot_size:
+            if self.raw_ring is not None:  # Resolution went up: readers re-attach to the new ring
+                self.raw_ring.close()
+            self.raw_ring = FrameRing(RAW_RING_NAME, create=True, slots=3, slot_size=frame.nbytes)
+        self.raw_ring.write_array(frame, capture_time)  # Slot timestamp = capture time, not write time
 
     def connect_socket(self):
         try:
@@ -77,10 +143,14 @@ class CameraStreamer:
             # debug print
             print("[CONFIG] Applying controls:", controls)
 
-            stream_cfg = self.picam.create_preview_configuration(
-                main={"format": "XRGB8888", "size": res},
-                controls=controls
-            )
+            self.dual_stream = CAMERA_STREAM_MODE == "dual_stream"
+            if self.dual_stream:
+                stream_cfg = dual_stream_config(self.picam, res, controls)
+            else:
+                stream_cfg = self.picam.create_preview_configuration(
+                    main={"format": "XRGB8888", "size": res},
+                    controls=controls
+                )
             self.picam.configure(stream_cfg)
             self.picam.start()
         except Exception as e:
@@ -103,20 +173,20 @@ class CameraStreamer:
         while True:
             try:
                 if self.streaming:
-                    frame = self.picam.capture_array()
+                    frame, capture_time = self.capture_frame()
+                    self.publish_raw(frame, capture_time)
                     ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.config["jpeg_quality"]])
                     if not ok:
                         continue
 
-                    frame_bytes = buf.tobytes()
-                    sio.emit("frame", frame_bytes)
+                    self.publish_frame(buf, capture_time)
                     frame_count += 1
-                    bytes_sent += len(frame_bytes)
+                    bytes_sent += buf.nbytes
 
                     now = time.time()
                     if now - last_time >= 1.0:
                         fps = frame_count
-                        frame_size = len(frame_bytes) // 1024  # KB
+                        frame_size = buf.nbytes // 1024  # KB
                         upload_speed = (bytes_sent - last_bytes_sent) // 1024  # KB/s
 
                         # EMIT CAMERA INFO EVENT WITH STATUS
@@ -145,6 +215,17 @@ class CameraStreamer:
                 import os
                 home_dir = os.path.expanduser("~")  # This will be /home/slowmo
                 path = os.path.join(home_dir, "captures", f"image_{timestamp}.jpg")
+
+            if self.dual_stream and self.picam.started:
+                # Full-res main buffer of a live request: the stream keeps running
+                still = self.stills.request(path)
+                if not self.streaming:
+                    self.capture_frame()  # Nobody is pulling requests - take one here
+                result = self.stills.wait(still)
+                if result["success"]:
+                    print(f"[INFO] High-res image saved: {path} ({result['size_mb']} MB, "
+                          f"{result['latency_ms']['total']:.0f} ms to disk)")
+                return result
             
             # Ensure capture directory exists
             import os
@@ -157,7 +238,7 @@ class CameraStreamer:
             if not self.picam.started:
                 # Create still configuration for high quality capture
                 still_cfg = self.picam.create_still_configuration(
-                    main={"size": (4608, 2592)},  # Full resolution for Pi Camera V3
+                    main={"size": STILL_RESOLUTION},  # Full resolution for Pi Camera V3
                     controls={"FrameDurationLimits": (100000, 100000)}  # 10 FPS
                 )
                 self.picam.configure(still_cfg)
@@ -215,6 +296,7 @@ streamer = CameraStreamer()
 def connect():
     streamer.connected = True
     print("📡 Connected to server from camera.py")
+    sio.emit("subscribe_topics", {"topics": []})  # Publisher only - no telemetry broadcasts
     # Send camera info on connection
     sio.emit("camera_info", {
         "fps": 0,
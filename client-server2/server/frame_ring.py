@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+🎞️ SHARED-MEMORY FRAME RING - camera frames between processes without sockets
+A fixed set of frame slots in multiprocessing.shared_memory, written by the
+camera and read in place by server2 (or an on-board detector).
+- Header: write sequence counter and registered reader pids
+- Slot: sequence number, capture time, size, shape and kind (JPEG or raw pixels)
+- Seqlock per slot: the writer clears a slot's sequence before overwriting it,
+  so a reader can tell whether the bytes it looked at are still that frame
+- Notification: the writer rings each registered reader's datagram socket
+  (Linux abstract namespace); readers without one fall back to polling
+- Readers get a memoryview / NumPy view of the slot - no copy until they need one
+"""
+import os
+import socket
+import struct
+import time
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from multiprocessing import shared_memory
+
+DEFAULT_NAME = "slowmo_frames"
+RAW_NAME = "slowmo_raw"           # Unencoded camera frames for on-board consumers
+DEFAULT_SLOTS = 4
+DEFAULT_SLOT_SIZE = 1024 * 1024   # Enough for a 1536x864 JPEG at quality 95
+MAX_READERS = 8
+POLL_INTERVAL = 0.005             # Wait granularity when a reader has no doorbell
+
+KIND_JPEG = 1
+KIND_RAW = 2                      # uint8 pixels, height x width x channels
+
+MAGIC = b"FRNG"
+HEADER = struct.Struct(f"<4sHHIQ{MAX_READERS}i")   # magic, version, slots, slot_size, write_seq, reader pids
+HEADER_SIZE = 128
+SLOT_HEADER = struct.Struct("<QdIHHBB6x")           # seq, timestamp, length, width, height, channels, kind
+SLOT_HEADER_SIZE = SLOT_HEADER.size
+VERSION = 1
+_WRITE_SEQ_OFFSET = 12
+_READERS_OFFSET = 20
+
+_created = set()  # Segments this process (or its parent, after fork) created
+
+def _doorbell_address(name, pid):
+    return f"\0{name}.reader.{pid}"
+
+class Frame:
+    """A frame still sitting in its slot; data is a view, valid() says whether it was overwritten"""
+    __slots__ = ("ring", "seq", "timestamp", "kind", "width", "height", "channels", "data")
+
+    def __init__(self, ring, seq, timestamp, kind, width, height, channels, data):
+        self.ring = ring
+        self.seq = seq
+        self.timestamp = timestamp
+        self.kind = kind
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.data = data
+
+    def valid(self):
+        return self.ring.slot_seq(self.seq) == self.seq
+
+    def array(self):
+        """NumPy view of a raw frame (height, width, channels)"""
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(self.height, self.width, self.channels)
+
+    def tobytes(self):
+        """Copy out of the slot; None if the writer got there first"""
+        data = bytes(self.data)
+        return data if self.valid() else None
+
+    def release(self):
+        """Drop the view into shared memory (the ring cannot be closed while views exist)"""
+        self.data.release()
+
+class FrameRing:
+    """Single-writer, multi-reader frame ring in shared memory.
+
+    Writer:  ring = FrameRing(create=True); ring.write(jpeg_buffer)
+    Reader:  ring = FrameRing(); seq = ring.wait(last_seq); frame = ring.read(seq)
+    """
+
+    def __init__(self, name=DEFAULT_NAME, create=False, slots=DEFAULT_SLOTS, slot_size=DEFAULT_SLOT_SIZE):
+        self.name = name
+        self.owner = create
+        if create:
+            try:  # Left behind by a writer that crashed
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=HEADER_SIZE + slots * (SLOT_HEADER_SIZE + slot_size))
+            _created.add(name)
+            HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, slots, slot_size, 0, *([0] * MAX_READERS))
+            for i in range(slots):
+                SLOT_HEADER.pack_into(self.shm.buf, self._slot_offset(i, slots, slot_size), 0, 0.0, 0, 0, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if name not in _created:
+                _untrack(self.shm)  # The writer owns the segment; do not unlink it when this process exits
+            magic, version, slots, slot_size = HEADER.unpack_from(self.shm.buf, 0)[:4]
+            if magic != MAGIC or version != VERSION:
+                self.shm.close()
+                raise ValueError(f"{name} is not a version {VERSION} frame ring")
+        self.slots = slots
+        self.slot_size = slot_size
+        self.doorbell = None
+        self.reader_index = None
+        self.notify_errors = 0
+        self.writes = 0
+
+    @staticmethod
+    def _slot_offset(index, slots, slot_size):
+        return HEADER_SIZE + (index % slots) * (SLOT_HEADER_SIZE + slot_size)
+
+    # ── WRITER ─────────────────────────────────────────────────────────
+    @property
+    def write_seq(self):
+        return struct.unpack_from("<Q", self.shm.buf, _WRITE_SEQ_OFFSET)[0]
+
+    def write(self, data, timestamp=None, kind=KIND_JPEG, width=0, height=0, channels=0):
+        """Copy one frame into the next slot and wake the readers; returns its sequence number"""
+        view = memoryview(data).cast("B")
+        length = view.nbytes
+        if length > self.slot_size:
+            raise ValueError(f"Frame of {length} bytes does not fit a {self.slot_size}-byte slot")
+        seq = self.write_seq + 1
+        offset = self._slot_offset(seq, self.slots, self.slot_size)
+        buf = self.shm.buf
+        struct.pack_into("<Q", buf, offset, 0)  # Readers of the old frame in this slot now see it as gone
+        buf[offset + SLOT_HEADER_SIZE:offset + SLOT_HEADER_SIZE + length] = view
+        SLOT_HEADER.pack_into(buf, offset, seq, time.time() if timestamp is None else timestamp,
+                              length, width, height, channels, kind)
+        struct.pack_into("<Q", buf, _WRITE_SEQ_OFFSET, seq)
+        self.writes += 1
+        self._notify(seq)
+        return seq
+
+    def write_array(self, frame, timestamp=None):
+        """Raw pixels (height, width[, channels] uint8), e.g. before JPEG encoding"""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        return self.write(frame, timestamp, KIND_RAW, frame.shape[1], frame.shape[0], channels)
+
+    def _notify(self, seq):
+        pids = struct.unpack_from(f"<{MAX_READERS}i", self.shm.buf, _READERS_OFFSET)
+        if not any(pids):
+            return
+        if self.doorbell is None:
+            self.doorbell = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.doorbell.setblocking(False)
+        message = struct.pack("<Q", seq)
+        for index, pid in enumerate(pids):
+            if not pid:
+                continue
+            try:
+                self.doorbell.sendto(message, _doorbell_address(self.name, pid))
+            except BlockingIOError:
+                pass  # Reader is behind; it will read the latest sequence when it wakes
+            except (ConnectionRefusedError, FileNotFoundError):
+                struct.pack_into("<i", self.shm.buf, _READERS_OFFSET + 4 * index, 0)  # Reader has gone
+            except OSError:
+                self.notify_errors += 1
+
+    # ── READER ─────────────────────────────────────────────────────────
+    def register_reader(self):
+        """Claim a reader slot and a doorbell socket so wait() sleeps instead of polling"""
+        if self.doorbell is not None:
+            return True
+        pid = os.getpid()
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(_doorbell_address(self.name, pid))
+        except OSError:
+            return False  # No abstract namespace (not Linux) - wait() polls
+        pids = struct.unpack_from(f"<{MAX_READERS}i", self.shm.buf, _READERS_OFFSET)
+        for index, existing in enumerate(pids):
+            if not existing or existing == pid:
+                struct.pack_into("<i", self.shm.buf, _READERS_OFFSET + 4 * index, pid)
+                self.doorbell, self.reader_index = sock, index
+                return True
+        sock.close()
+        return False
+
+    def slot_seq(self, seq):
+        return struct.unpack_from("<Q", self.shm.buf, self._slot_offset(seq, self.slots, self.slot_size))[0]
+
+    def read(self, seq=None):
+        """The frame with this sequence number (default: latest) as a view, or None if overwritten"""
+        seq = self.write_seq if seq is None else seq
+        if seq <= 0:
+            return None
+        offset = self._slot_offset(seq, self.slots, self.slot_size)
+        slot_seq, timestamp, length, width, height, channels, kind = SLOT_HEADER.unpack_from(self.shm.buf, offset)
+        if slot_seq != seq:
+            return None
+        start = offset + SLOT_HEADER_SIZE
+        return Frame(self, seq, timestamp, kind, width, height, channels, self.shm.buf[start:start + length])
+
+    def wait(self, after_seq, timeout=None):
+        """Block until a frame newer than after_seq is written; returns the latest seq or None"""
+        seq = self.write_seq
+        if seq > after_seq:
+            return seq
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if self.doorbell is not None and self.reader_index is not None:
+                self.doorbell.settimeout(remaining)
+                try:
+                    self.doorbell.recv(8)
+                    self.doorbell.setblocking(False)
+                    while True:  # Drain rings for frames we are about to skip
+                        self.doorbell.recv(8)
+                except (BlockingIOError, socket.timeout):
+                    pass
+            else:
+                time.sleep(POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining))
+            seq = self.write_seq
+            if seq > after_seq:
+                return seq
+
+    # ── LIFETIME ───────────────────────────────────────────────────────
+    def close(self):
+        if self.reader_index is not None:
+            try:
+                struct.pack_into("<i", self.shm.buf, _READERS_OFFSET + 4 * self.reader_index, 0)
+            except (TypeError, ValueError):
+                pass
+            self.reader_index = None
+        if self.doorbell is not None:
+            self.doorbell.close()
+            self.doorbell = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            _created.discard(self.name)
+
+def _untrack(shm):
+    """Stop the resource tracker unlinking a segment this process only attached to (Python < 3.13)"""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+🚦 I2C BUS ARBITER - single owner of I2C bus 1 for ADCS, LiDAR and power
+The MPU6050, the lux mux, the LiDAR and the INA228 used to hit bus 1 from
+different threads with nothing coordinating them. The arbiter owns the bus and
+serves every transaction from one worker, highest priority first.
+- PRIORITY_CONTROL (MPU6050 / control loop) always goes ahead of PRIORITY_TELEMETRY
+- All queued transactions are served in one batch per wake-up; identical queued
+  reads are coalesced into a single bus transaction
+- submit_batch() runs several register operations back-to-back as one unit
+- exclusive() grants the whole bus to code that talks I2C through another
+  driver (busio: VEML7700 behind the mux, INA228)
+- Bus utilisation, queue latency and error counts via get_stats() / stats callback
+
+Clients get an smbus2.SMBus-compatible proxy from arbiter.client(priority), so
+existing register code works unchanged on the real bus or a SimulatedSMBus.
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+PRIORITY_CONTROL = 0
+PRIORITY_TELEMETRY = 1
+PRIORITY_NAMES = {PRIORITY_CONTROL: "control", PRIORITY_TELEMETRY: "telemetry"}
+
+TRANSACTION_TIMEOUT = 1.0   # Seconds a client waits for its transaction
+EXCLUSIVE_HOLD_LIMIT = 0.5  # Seconds an exclusive() holder may keep the bus
+
+READ_OPS = ("read_byte_data", "read_i2c_block_data")
+
+class _Transaction:
+    __slots__ = ("priority", "seq", "ops", "enqueued", "done", "result", "error",
+                 "exclusive", "released")
+
+    def __init__(self, priority, seq, ops, exclusive=False):
+        self.priority = priority
+        self.seq = seq
+        self.ops = ops            # [(method_name, args), ...]
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.exclusive = exclusive
+        self.released = threading.Event() if exclusive else None
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def read_key(self):
+        """Key for coalescing - only single plain reads are merged"""
+        if self.exclusive or len(self.ops) != 1 or self.ops[0][0] not in READ_OPS:
+            return None
+        return self.ops[0]
+
+    def addresses(self):
+        return {args[0] for _, args in self.ops}
+
+class I2CBusArbiter:
+    """Owns one bus and serialises all access to it through a priority queue."""
+
+    def __init__(self, bus, stats_interval=1.0, stats_callback=None):
+        self.bus = bus
+        self.stats_interval = stats_interval
+        self.stats_callback = stats_callback
+        self.running = False
+        self.worker = None
+
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        # Statistics
+        self._started = time.monotonic()
+        self._busy_time = 0.0
+        self._transactions = 0
+        self._bus_operations = 0
+        self._batches = 0
+        self._coalesced = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._latency = {p: {'count': 0, 'total': 0.0, 'max': 0.0} for p in PRIORITY_NAMES}
+        self._window = (time.monotonic(), 0.0)   # (window start, busy time at start)
+        self._last_stats = {}
+
+    # ── LIFECYCLE ──────────────────────────────────────────────────────
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self.worker:
+            self.worker.join(timeout=1.0)
+
+    def set_stats_callback(self, callback, interval=None):
+        """callback(stats_dict) is called from the worker every stats_interval seconds"""
+        self.stats_callback = callback
+        if interval:
+            self.stats_interval = interval
+
+    # ── CLIENT API ─────────────────────────────────────────────────────
+    def client(self, priority=PRIORITY_TELEMETRY):
+        """smbus2.SMBus-compatible proxy that routes through the arbiter"""
+        return ArbitratedBus(self, priority)
+
+    def submit(self, method, args, priority=PRIORITY_TELEMETRY):
+        """Run one bus operation and return its result (raises on bus error)"""
+        return self.submit_batch([(method, args)], priority)[0]
+
+    def submit_batch(self, ops, priority=PRIORITY_TELEMETRY):
+        """Run several bus operations back-to-back as one queued unit.
+
+        ops is a list of (method_name, args) tuples, e.g.
+        [("read_byte_data", (0x68, 0x3A)), ("read_i2c_block_data", (0x68, 0x72, 2))]
+        """
+        txn = self._enqueue(_Transaction(priority, next(self._seq), list(ops)))
+        if not txn.done.wait(TRANSACTION_TIMEOUT):
+            self._timeouts += 1
+            raise TimeoutError(f"I2C transaction timed out after {TRANSACTION_TIMEOUT}s")
+        if txn.error is not None:
+            raise txn.error
+        return txn.result
+
+    @contextmanager
+    def exclusive(self, priority=PRIORITY_TELEMETRY):
+        """Hold the whole bus for a compound operation done through another driver.
+
+        Yields the raw bus. Do not call arbiter clients inside the block - the
+        worker is parked until the block exits.
+        """
+        txn = self._enqueue(_Transaction(priority, next(self._seq), [], exclusive=True))
+        if not txn.done.wait(TRANSACTION_TIMEOUT):
+            txn.released.set()  # The worker will skip it when it gets there
+            self._timeouts += 1
+            raise TimeoutError(f"I2C exclusive grant timed out after {TRANSACTION_TIMEOUT}s")
+        try:
+            yield self.bus
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            txn.released.set()
+
+    def _enqueue(self, txn):
+        if not self.running:
+            self.start()
+        with self._cond:
+            heapq.heappush(self._queue, txn)
+            self._cond.notify()
+        return txn
+
+    # ── WORKER ─────────────────────────────────────────────────────────
+    def _worker_loop(self):
+        next_stats = time.monotonic() + self.stats_interval
+        while self.running:
+            with self._cond:
+                while self.running and not self._queue:
+                    timeout = next_stats - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                has_work = bool(self._queue)
+
+            if has_work:
+                self._run_batch()
+
+            if time.monotonic() >= next_stats:
+                next_stats = time.monotonic() + self.stats_interval
+                self._publish_stats()
+
+    def _run_batch(self):
+        """Serve everything that is queued, re-checking priorities after each unit"""
+        self._batches += 1
+        while True:
+            with self._cond:
+                if not self._queue:
+                    return
+                txn = heapq.heappop(self._queue)
+                followers = self._pop_coalescable(txn)
+            self._execute(txn, followers)
+
+    def _pop_coalescable(self, txn):
+        """Remove queued reads identical to txn that no queued write would change"""
+        key = txn.read_key()
+        if key is None:
+            return []
+        address = key[1][0]
+        writes_to_device = [t.seq for t in self._queue
+                            if t.read_key() is None and (t.exclusive or address in t.addresses())]
+        barrier = min(writes_to_device) if writes_to_device else None
+        followers = [t for t in self._queue
+                     if t.read_key() == key and (barrier is None or t.seq < barrier)]
+        if followers:
+            self._queue = [t for t in self._queue if t not in followers]
+            heapq.heapify(self._queue)
+            self._coalesced += len(followers)
+        return followers
+
+    def _execute(self, txn, followers):
+        start = time.monotonic()
+        for t in [txn] + followers:
+            self._record_latency(t, start)
+
+        if txn.exclusive:
+            if txn.released.is_set():  # Caller already gave up waiting
+                return
+            txn.done.set()
+            if not txn.released.wait(EXCLUSIVE_HOLD_LIMIT):
+                self._errors += 1
+                print(f"⚠️ I2C exclusive hold exceeded {EXCLUSIVE_HOLD_LIMIT}s - waiting for release")
+                txn.released.wait()
+            self._busy_time += time.monotonic() - start
+            self._transactions += 1
+            return
+
+        results = []
+        try:
+            for method, args in txn.ops:
+                results.append(getattr(self.bus, method)(*args))
+                self._bus_operations += 1
+            txn.result = results
+        except Exception as e:
+            self._errors += 1
+            txn.error = e
+        finally:
+            self._busy_time += time.monotonic() - start
+            self._transactions += 1 + len(followers)
+            for t in [txn] + followers:
+                t.result, t.error = txn.result, txn.error
+                t.done.set()
+
+    def _record_latency(self, txn, now):
+        latency = now - txn.enqueued
+        stats = self._latency.setdefault(txn.priority, {'count': 0, 'total': 0.0, 'max': 0.0})
+        stats['count'] += 1
+        stats['total'] += latency
+        stats['max'] = max(stats['max'], latency)
+
+    # ── STATISTICS ─────────────────────────────────────────────────────
+    def get_stats(self):
+        """Utilisation over the last stats window plus cumulative counters"""
+        now = time.monotonic()
+        window_start, busy_at_start = self._window
+        elapsed = now - window_start
+        utilisation = (self._busy_time - busy_at_start) / elapsed if elapsed > 0 else 0.0
+        latency = {}
+        for priority, stats in self._latency.items():
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            mean = stats['total'] / stats['count'] if stats['count'] else 0.0
+            latency[name] = {'count': stats['count'], 'mean_ms': mean * 1000.0, 'max_ms': stats['max'] * 1000.0}
+        return {
+            'utilisation': min(1.0, utilisation),
+            'queue_depth': len(self._queue),
+            'transactions': self._transactions,
+            'bus_operations': self._bus_operations,
+            'batches': self._batches,
+            'coalesced_reads': self._coalesced,
+            'errors': self._errors,
+            'timeouts': self._timeouts,
+            'latency': latency,
+            'uptime_s': now - self._started,
+        }
+
+    def _publish_stats(self):
+        self._last_stats = self.get_stats()
+        self._window = (time.monotonic(), self._busy_time)
+        if self.stats_callback:
+            try:
+                self.stats_callback(self._last_stats)
+            except Exception as e:
+                print(f"Error in I2C stats callback: {e}")
+
+class ArbitratedBus:
+    """smbus2.SMBus look-alike whose operations are queued on an I2CBusArbiter"""
+
+    def __init__(self, arbiter, priority=PRIORITY_TELEMETRY):
+        self.arbiter = arbiter
+        self.priority = priority
+
+    def read_byte_data(self, address, register):
+        return self.arbiter.submit("read_byte_data", (address, register), self.priority)
+
+    def write_byte_data(self, address, register, value):
+        return self.arbiter.submit("write_byte_data", (address, register, value), self.priority)
+
+    def read_i2c_block_data(self, address, register, length):
+        return self.arbiter.submit("read_i2c_block_data", (address, register, length), self.priority)
+
+    def write_i2c_block_data(self, address, register, data):
+        return self.arbiter.submit("write_i2c_block_data", (address, register, list(data)), self.priority)
+
+    def batch(self, ops):
+        """Queue several operations as one unit - see I2CBusArbiter.submit_batch"""
+        return self.arbiter.submit_batch(ops, self.priority)
+
+    def close(self):
+        pass  # The arbiter owns the bus
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+# ── SHARED INSTANCE ────────────────────────────────────────────────────
+_shared_arbiters = {}
+_shared_lock = threading.Lock()
+
+def get_shared_arbiter(bus_number=1):
+    """Process-wide arbiter for an I2C bus, opened on first use"""
+    with _shared_lock:
+        arbiter = _shared_arbiters.get(bus_number)
+        if arbiter is None:
+            from smbus2 import SMBus
+            arbiter = I2CBusArbiter(SMBus(bus_number))
+            arbiter.start()
+            _shared_arbiters[bus_number] = arbiter
+        return arbiter
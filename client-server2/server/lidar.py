@@ -1,10 +1,11 @@
 # lidar.py
 
-from smbus2 import SMBus
 import time
-import socketio
+from service_link import ServiceClient
 import threading
 from datetime import datetime
+from i2c_arbiter import get_shared_arbiter, PRIORITY_TELEMETRY
+from lidar_acquisition import LidarAcquisition, DISTANCE_BLOCK
 
 SERVER_URL = "http://localhost:5000"
 LIDAR_ADDR = 0x62
@@ -13,11 +14,12 @@ DISTANCE_HIGH = 0x0f
 DISTANCE_LOW = 0x10
 MEASURE = 0x04
 
-sio = socketio.Client()
+sio = ServiceClient()  # In-process when imported by server2, Socket.IO client when standalone
 
 @sio.event
 def connect():
     print("📡 LIDAR connected to server")
+    sio.emit("subscribe_topics", {"topics": []})  # Publisher only - no telemetry broadcasts
     if 'lidar_controller' in globals():
         lidar_controller.connected = True
         # Send status update immediately to show connected state in client
@@ -41,11 +43,11 @@ def on_lidar_update(_):
         print(f"[ERROR] lidar_update handler: {e}")
 
 def read_distance(bus):
+    """Single blocking reading (cm) - continuous collection uses LidarAcquisition"""
     try:
         bus.write_byte_data(LIDAR_ADDR, ACQ_COMMAND, MEASURE)
-        time.sleep(0.01)
-        high = bus.read_byte_data(LIDAR_ADDR, DISTANCE_HIGH)
-        low = bus.read_byte_data(LIDAR_ADDR, DISTANCE_LOW)
+        time.sleep(0.01)  # The arbiter serves other devices while the LiDAR measures
+        high, low = bus.read_i2c_block_data(LIDAR_ADDR, DISTANCE_BLOCK, 2)
         return (high << 8) + low
     except Exception as e:
         return None
@@ -58,6 +60,7 @@ class LidarController:
         self.start_time = None
         self.last_status_time = time.time()
         self.connected = False
+        self.acquisition = None
         
     def connect_to_server(self):
         """Connect to the SocketIO server"""
@@ -100,31 +103,28 @@ class LidarController:
         self._send_status_update()
         
     def _collection_loop(self):
-        """Main data collection loop"""
+        """Main data collection loop - samples at the sensor rate, emits one batch per BATCH_INTERVAL"""
         try:
-            with SMBus(1) as bus:
-                while self.is_collecting:
-                    # Read distance
-                    distance = read_distance(bus)
-                    if distance is not None:
-                        sio.emit("lidar_data", {"distance_cm": distance})
-                        self.data_count += 1
-                    
-                    # Send status update every second
-                    current_time = time.time()
-                    if current_time - self.last_status_time >= 1.0:
-                        self._send_status_update()
-                        self.last_status_time = current_time
-                    
-                    # Simple 20Hz frequency control
-                    time.sleep(0.05)  # 1/20 = 0.05 seconds
-
-                    
+            with get_shared_arbiter(1).client(PRIORITY_TELEMETRY) as bus:
+                self.acquisition = LidarAcquisition(bus, publish=self._emit_batch)
+                self.acquisition.run(lambda: self.is_collecting)
         except Exception as e:
             print(f"❌ LIDAR collection error: {e}")
             self.is_collecting = False
             self.connected = False  # Assume disconnection on error
             
+    def _emit_batch(self, batch):
+        """One lidar_data event per batch; distance_cm stays the latest value for older clients"""
+        sio.emit("lidar_data", {"distance_cm": batch["distance_cm"][-1], "timestamp": time.time(),
+                                "samples": {"t": batch["t"], "distance_cm": batch["distance_cm"]}})
+        self.data_count += len(batch["t"])
+
+        # Send status update every second
+        current_time = time.time()
+        if current_time - self.last_status_time >= 1.0:
+            self._send_status_update()
+            self.last_status_time = current_time
+
     def _send_status_update(self):
         """Send status update to server"""
         if not self.connected:
@@ -178,7 +178,7 @@ if __name__ == "__main__":
             print("🔄 Starting LIDAR data collection...")
             lidar_controller.start_collection()
             
-            print("📊 LIDAR is now collecting data at 20Hz")
+            print("📊 LIDAR is now collecting data (batches at 20Hz)")
             print("Press Ctrl+C to stop...")
             
             # Keep the program running
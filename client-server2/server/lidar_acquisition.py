@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+📏 LIDAR ACQUISITION - LIDAR-Lite v3 at the sensor's rate, filtered and shipped in batches
+Each sample is ONE bus batch: a 2-byte auto-increment block read of the previous
+acquisition's distance, immediately followed by the trigger for the next one, so the
+sensor measures while the loop sleeps instead of the loop sleeping while it measures.
+- Fixed sample rate up to the sensor's 500Hz; receiver bias correction every
+  BIAS_CORRECTION_EVERY acquisitions, the faster uncorrected mode in between
+- Samples carry the time.monotonic() of the trigger that started their acquisition
+- No-return readings (≤ 1 cm) are dropped; a sliding median removes spikes, and
+  samples far from it are counted as outliers
+- Batches of (t, distance) published every BATCH_INTERVAL through a callback
+- Works on an arbitrated bus (batch) or a plain smbus2.SMBus / SimulatedSMBus
+"""
+import statistics
+import time
+from collections import deque
+
+LIDAR_ADDR = 0x62
+ACQ_COMMAND = 0x00
+MEASURE_BIAS_CORRECTED = 0x04
+MEASURE_FAST = 0x03               # No receiver bias correction
+DISTANCE_BLOCK = 0x8F             # DISTANCE_HIGH (0x0f) with the auto-increment flag
+
+LIDAR_SAMPLE_RATE = 500           # Hz - LIDAR-Lite v3 maximum
+BIAS_CORRECTION_EVERY = 100       # Acquisitions between bias-corrected ones (Garmin's recommendation)
+BATCH_INTERVAL = 0.05             # s - publish a batch at 20Hz
+FILTER_WINDOW = 5                 # Samples in the sliding median (odd)
+OUTLIER_CM = 20                   # cm - samples further than this from the median count as outliers
+MIN_VALID_CM = 2                  # cm - the sensor reports 1 cm when nothing returns
+
+class LidarAcquisition:
+    """Triggers, reads and filters LIDAR-Lite samples; publishes batches.
+
+    Args:
+        bus: smbus2-compatible bus; its batch() is used when it has one
+        rate_hz: sample rate
+        publish: callable(batch) with batch = {"t": [...], "distance_cm": [...],
+            "raw_cm": [...]} (monotonic seconds, filtered and raw cm)
+        clock / sleep: injectable time sources for simulation
+    """
+
+    def __init__(self, bus, rate_hz=LIDAR_SAMPLE_RATE, publish=None, batch_interval=BATCH_INTERVAL,
+                 window=FILTER_WINDOW, outlier_cm=OUTLIER_CM, clock=time.monotonic, sleep=time.sleep):
+        self.bus = bus
+        self.rate_hz = rate_hz
+        self.publish = publish
+        self.batch_interval = batch_interval
+        self.outlier_cm = outlier_cm
+        self.clock = clock
+        self.sleep = sleep
+        self.window = deque(maxlen=window)
+        self.batch = {"t": [], "distance_cm": [], "raw_cm": []}
+        self._trigger_time = None       # Start of the acquisition in flight
+        self._acquisitions = 0
+        self._last_flush = None
+        self.samples = 0
+        self.invalid = 0
+        self.outliers = 0
+        self.errors = 0
+        self.batches = 0
+        self.latest = None              # (t, filtered cm)
+
+    def _transfer(self, ops):
+        if hasattr(self.bus, "batch"):
+            return self.bus.batch(ops)
+        return [getattr(self.bus, method)(*args) for method, args in ops]
+
+    def tick(self):
+        """Read the acquisition in flight and trigger the next. Returns (t, filtered, raw) or None"""
+        command = MEASURE_BIAS_CORRECTED if self._acquisitions % BIAS_CORRECTION_EVERY == 0 else MEASURE_FAST
+        trigger = ("write_byte_data", (LIDAR_ADDR, ACQ_COMMAND, command))
+        measured_at = self._trigger_time
+        try:
+            if measured_at is None:
+                self._transfer([trigger])
+                block = None
+            else:
+                block = self._transfer([("read_i2c_block_data", (LIDAR_ADDR, DISTANCE_BLOCK, 2)), trigger])[0]
+        except Exception:
+            self.errors += 1
+            self._trigger_time = None  # Start over with a fresh trigger
+            return None
+        self._trigger_time = self.clock()
+        self._acquisitions += 1
+        if self._last_flush is None:
+            self._last_flush = self._trigger_time
+
+        sample = None
+        if block is not None:
+            sample = self._filter(measured_at, (block[0] << 8) | block[1])
+        if self._trigger_time - self._last_flush >= self.batch_interval:
+            self.flush()
+        return sample
+
+    def _filter(self, t, raw):
+        if raw < MIN_VALID_CM:
+            self.invalid += 1
+            return None
+        self.window.append(raw)
+        filtered = statistics.median(self.window)
+        if abs(raw - filtered) > self.outlier_cm:
+            self.outliers += 1
+        self.samples += 1
+        self.latest = (t, filtered)
+        self.batch["t"].append(round(t, 4))
+        self.batch["distance_cm"].append(filtered)
+        self.batch["raw_cm"].append(raw)
+        return t, filtered, raw
+
+    def flush(self):
+        """Publish the samples collected since the last batch (nothing if there are none)"""
+        self._last_flush = self.clock()
+        if not self.batch["t"]:
+            return
+        batch, self.batch = self.batch, {"t": [], "distance_cm": [], "raw_cm": []}
+        self.batches += 1
+        if self.publish:
+            self.publish(batch)
+
+    def run(self, keep_running):
+        """Tick at rate_hz until keep_running() is False, sleeping to each slot"""
+        period = 1.0 / self.rate_hz
+        next_tick = self.clock()
+        while keep_running():
+            self.tick()
+            next_tick += period
+            now = self.clock()
+            if next_tick < now - period:
+                next_tick = now  # Fell behind (bus busy) - skip rather than burst
+            self.sleep(max(0.0, next_tick - now))
+        self.flush()
+
+    def get_stats(self):
+        return {
+            'samples': self.samples,
+            'invalid': self.invalid,
+            'outliers': self.outliers,
+            'errors': self.errors,
+            'batches': self.batches,
+        }
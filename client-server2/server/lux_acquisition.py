@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+☀️ ROUND-ROBIN LUX ACQUISITION - VEML7700 sensors behind the TCA9548A mux
+Runs as its own task at its own rate and reads ONE mux channel per tick, so the
+gyro/data thread never waits on mux switching or lux conversions.
+- Fixed tick rate, one channel per tick (3 channels at 30Hz -> 10Hz per sensor)
+- Timestamped readings (time.monotonic) published through a callback
+- Failed sensors are re-created once, then skipped until the next re-initialisation
+- Optional bus guard keeps the mux select + read atomic on a shared I2C bus
+"""
+import time
+from contextlib import nullcontext
+
+class LuxRoundRobinReader:
+    """Reads one lux channel per tick and publishes timestamped readings.
+
+    Args:
+        select_channel: callable(channel) that switches the mux
+        sensors: dict {channel: sensor-with-.lux or None}
+        rate_hz: tick rate (each channel is read at rate_hz / len(channels))
+        publish: callable(channel, lux, timestamp) invoked after every read
+        sensor_factory: optional callable(channel) used to re-create a failed sensor
+        guard: optional callable returning a context manager held around each
+            select + read (e.g. I2CBusArbiter.exclusive)
+        clock / sleep: injectable time sources for simulation
+    """
+
+    def __init__(self, select_channel, sensors, rate_hz=30.0, publish=None,
+                 sensor_factory=None, guard=None, clock=time.monotonic, sleep=time.sleep):
+        self.select_channel = select_channel
+        self.sensors = sensors
+        self.channels = sorted(sensors.keys())
+        self.rate_hz = rate_hz
+        self.publish = publish
+        self.sensor_factory = sensor_factory
+        self.guard = guard or nullcontext
+        self.clock = clock
+        self.sleep = sleep
+        self.running = False
+
+        self._index = 0
+        self.latest = {ch: (0.0, None) for ch in self.channels}  # ch -> (lux, timestamp)
+        self.read_count = {ch: 0 for ch in self.channels}
+        self.error_count = {ch: 0 for ch in self.channels}
+        self.max_tick_duration = 0.0
+
+    def _next_channel(self):
+        """Next channel with a live sensor, or None if every sensor has failed"""
+        for _ in range(len(self.channels)):
+            ch = self.channels[self._index]
+            self._index = (self._index + 1) % len(self.channels)
+            if self.sensors.get(ch) is not None:
+                return ch
+        return None
+
+    def tick(self):
+        """Read a single channel. Returns (channel, lux, timestamp) or None"""
+        ch = self._next_channel()
+        if ch is None:
+            return None
+
+        start = self.clock()
+        try:
+            with self.guard():
+                self.select_channel(ch)
+                lux = self.sensors[ch].lux
+        except Exception:
+            self.error_count[ch] += 1
+            lux = self._recover(ch)
+            if lux is None:
+                return None
+
+        timestamp = self.clock()
+        self.latest[ch] = (lux, timestamp)
+        self.read_count[ch] += 1
+        self.max_tick_duration = max(self.max_tick_duration, timestamp - start)
+        if self.publish:
+            self.publish(ch, lux, timestamp)
+        return ch, lux, timestamp
+
+    def _recover(self, ch):
+        """Re-create a failed sensor once; mark it dead if that fails too"""
+        if self.sensor_factory is None:
+            self.sensors[ch] = None
+            return None
+        try:
+            with self.guard():
+                self.select_channel(ch)
+                self.sensors[ch] = self.sensor_factory(ch)
+                return self.sensors[ch].lux
+        except Exception as e:
+            print(f"✗ Lux channel {ch} lost: {e}")
+            self.sensors[ch] = None
+            return None
+
+    def run(self):
+        """Tick at rate_hz until stop() is called"""
+        self.running = True
+        interval = 1.0 / self.rate_hz
+        next_tick = self.clock()
+        while self.running:
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error in lux acquisition: {e}")
+            next_tick += interval
+            delay = next_tick - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+            else:
+                next_tick = self.clock()  # Fell behind - don't try to catch up in a burst
+
+    def stop(self):
+        self.running = False
+
+    def get_stats(self):
+        return {
+            'rate_hz': self.rate_hz,
+            'reads': dict(self.read_count),
+            'errors': dict(self.error_count),
+            'max_tick_ms': self.max_tick_duration * 1000.0,
+        }
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+🔆 STREAMING LUX PEAK DETECTOR - sun bearing from the VEML7700 ring
+One reusable detector for the environmental auto-zero modes, fed with every
+timestamped lux reading and the yaw at that instant.
+- NumPy ring buffer of (time, yaw, lux) per channel
+- Hysteresis state machine: a peak is confirmed once lux has fallen `hysteresis`
+  below the maximum, and only if it rose `prominence` above the previous trough
+- Parabola fit around the maximum (in time) for a sub-sample peak instant;
+  the sun bearing is the yaw interpolated at that instant
+"""
+import numpy as np
+
+DEFAULT_CAPACITY = 64        # Samples kept per channel
+DEFAULT_MIN_LUX = 50.0       # Ignore peaks below this (matches the old threshold)
+DEFAULT_PROMINENCE = 100.0   # lux a peak must rise above the preceding trough
+DEFAULT_HYSTERESIS = 20.0    # lux drop below the maximum that confirms a peak
+DEFAULT_FIT_HALF_WIDTH = 4   # Samples either side of the maximum used by the fit
+
+class _ChannelRing:
+    """Fixed-size (time, yaw, lux) ring plus the peak state machine for one channel"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.t = np.zeros(capacity)
+        self.yaw = np.zeros(capacity)
+        self.lux = np.zeros(capacity)
+        self.count = 0
+        self.rising = True
+        self.max_lux = None
+        self.max_index = -1
+        self.trough = None
+
+    def append(self, timestamp, yaw, lux):
+        i = self.count % self.capacity
+        self.t[i], self.yaw[i], self.lux[i] = timestamp, yaw, lux
+        self.count += 1
+        return self.count - 1
+
+    def window(self, first, last):
+        """Samples with absolute indices first..last (clipped to what is still in the ring)"""
+        first = max(first, self.count - self.capacity, 0)
+        last = min(last, self.count - 1)
+        idx = np.arange(first, last + 1) % self.capacity
+        return self.t[idx], self.yaw[idx], self.lux[idx]
+
+class LuxPeakDetector:
+    """Streaming per-channel peak detector with sub-sample interpolation.
+
+    push() returns a peak dict {'ch', 'lux', 'yaw', 'time', 'prominence',
+    'sample_yaw'} when a peak is confirmed, otherwise None. 'yaw' is the
+    interpolated bearing, 'sample_yaw' the yaw of the brightest raw sample.
+    """
+
+    def __init__(self, channels=(1, 2, 3), capacity=DEFAULT_CAPACITY, min_lux=DEFAULT_MIN_LUX,
+                 prominence=DEFAULT_PROMINENCE, hysteresis=DEFAULT_HYSTERESIS,
+                 fit_half_width=DEFAULT_FIT_HALF_WIDTH):
+        self.channels = tuple(channels)
+        self.capacity = capacity
+        self.min_lux = min_lux
+        self.prominence = prominence
+        self.hysteresis = hysteresis
+        self.fit_half_width = fit_half_width
+        self.peak_count = {ch: 0 for ch in self.channels}
+        self.reset()
+
+    def reset(self):
+        """Forget all samples and peak state (e.g. after the yaw frame changed)"""
+        self.rings = {ch: _ChannelRing(self.capacity) for ch in self.channels}
+
+    def configure(self, min_lux=None, prominence=None, hysteresis=None):
+        if min_lux is not None:
+            self.min_lux = float(min_lux)
+        if prominence is not None:
+            self.prominence = float(prominence)
+        if hysteresis is not None:
+            self.hysteresis = float(hysteresis)
+
+    def push(self, channel, lux, yaw, timestamp):
+        """Add one reading; returns a peak dict when this reading confirms a peak"""
+        ring = self.rings.get(channel)
+        if ring is None or lux is None or yaw is None:
+            return None
+        index = ring.append(timestamp, yaw, lux)
+
+        if ring.max_lux is None:  # First sample
+            ring.max_lux, ring.max_index, ring.trough = lux, index, lux
+            return None
+
+        if not ring.rising:
+            ring.trough = min(ring.trough, lux)
+            if lux > ring.trough + self.hysteresis:
+                ring.rising = True
+                ring.max_lux, ring.max_index = lux, index
+            return None
+
+        if lux > ring.max_lux:
+            ring.max_lux, ring.max_index = lux, index
+            return None
+        if lux >= ring.max_lux - self.hysteresis:
+            return None
+
+        # Fell far enough below the maximum - the hump is over
+        ring.rising = False
+        prominence = ring.max_lux - ring.trough
+        peak = None
+        if prominence >= self.prominence and ring.max_lux >= self.min_lux \
+                and index - ring.max_index < ring.capacity:
+            peak = self._fit_peak(channel, ring, prominence)
+            self.peak_count[channel] += 1
+        ring.trough = lux
+        return peak
+
+    def _fit_peak(self, channel, ring, prominence):
+        """Parabola through the samples around the maximum -> peak instant, yaw and lux"""
+        t, yaw, lux = ring.window(ring.max_index - self.fit_half_width, ring.max_index + self.fit_half_width)
+        t_max, yaw_max = t[np.argmax(lux)], yaw[np.argmax(lux)]
+        peak_t, peak_lux = t_max, float(lux.max())
+        if len(t) >= 3:
+            a, b, c = np.polyfit(t - t_max, lux, 2)
+            if a < 0:
+                offset = -b / (2.0 * a)
+                if (t[0] - t_max) <= offset <= (t[-1] - t_max):
+                    peak_t = t_max + offset
+                    peak_lux = float(np.polyval((a, b, c), offset))
+        return {
+            'ch': channel,
+            'lux': peak_lux,
+            'yaw': float(np.interp(peak_t, t, yaw)),
+            'time': float(peak_t),
+            'prominence': float(prominence),
+            'sample_yaw': float(yaw_max),
+        }
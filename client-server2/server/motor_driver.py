@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+⚙️ MOTOR DRIVER - reaction wheel PWM output behind one command path
+Every power command (PD loop, manual control, stop) goes through MotorDriver,
+which shapes it and only touches the PWM hardware when a duty cycle changes.
+- Write-on-change: an unchanged command costs no ChangeDutyCycle call
+- Break-before-make on direction changes (the driving channel goes to 0 first)
+- Optional deadband (powers too small to turn the wheel become 0) and slew-rate limit
+- Command / write counters and write latency for the control-loop time budget
+- GPIO backend (RPi.GPIO software PWM on the driver inputs) and a fake backend
+  that records writes, for running the controller without hardware
+"""
+import threading
+import time
+
+try:
+    import RPi.GPIO as GPIO
+    GPIO_AVAILABLE = True
+except ImportError:
+    GPIO = None
+    GPIO_AVAILABLE = False
+
+IN1_PIN = 13                # Clockwise control
+IN2_PIN = 19                # Counterclockwise control
+SLEEP_PIN = 26              # Motor driver enable
+PWM_FREQUENCY = 1000        # Hz
+DUTY_RESOLUTION = 0.1       # % - commands are rounded to this before comparing
+
+CW, CCW = 0, 1              # Backend channels
+
+# ── BACKENDS ───────────────────────────────────────────────────────────
+class GPIOBackend:
+    """Two RPi.GPIO software PWM channels plus the driver's sleep pin"""
+
+    def __init__(self, cw_pin=IN1_PIN, ccw_pin=IN2_PIN, sleep_pin=SLEEP_PIN, frequency=PWM_FREQUENCY):
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+        GPIO.setup([cw_pin, ccw_pin, sleep_pin], GPIO.OUT, initial=GPIO.LOW)
+        self.sleep_pin = sleep_pin
+        self.pwm = [GPIO.PWM(cw_pin, frequency), GPIO.PWM(ccw_pin, frequency)]
+        for pwm in self.pwm:
+            pwm.start(0)
+        GPIO.output(sleep_pin, GPIO.HIGH)  # Enable motor driver
+
+    def write(self, channel, duty):
+        self.pwm[channel].ChangeDutyCycle(duty)
+
+    def close(self):
+        for pwm in self.pwm:
+            pwm.stop()
+        GPIO.output(self.sleep_pin, GPIO.LOW)  # Disable motor driver
+        GPIO.cleanup()
+
+class FakeGPIOBackend:
+    """Records duty-cycle writes instead of driving pins (tests, benches, no-hardware runs).
+
+    write_delay adds a busy wait per write to stand in for the real call's cost.
+    """
+
+    def __init__(self, write_delay=0.0):
+        self.write_delay = write_delay
+        self.duty = [0.0, 0.0]
+        self.writes = []            # (channel, duty)
+        self.closed = False
+
+    def write(self, channel, duty):
+        if self.write_delay:
+            end = time.perf_counter() + self.write_delay
+            while time.perf_counter() < end:
+                pass
+        self.duty[channel] = duty
+        self.writes.append((channel, duty))
+
+    def close(self):
+        self.duty = [0.0, 0.0]
+        self.closed = True
+
+# ── DRIVER ─────────────────────────────────────────────────────────────
+class MotorDriver:
+    """Signed power (-100..100, + = CW) to two PWM channels.
+
+    Args:
+        backend: object with write(channel, duty) and close()
+        deadband: |power| below this (%) is sent as 0
+        slew_rate: max power change in %/s (None = unlimited); stop() is never limited
+    """
+
+    def __init__(self, backend, deadband=0.0, slew_rate=None, clock=time.monotonic):
+        self.backend = backend
+        self.deadband = deadband
+        self.slew_rate = slew_rate
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.duty = [0.0, 0.0]      # Last duty written per channel
+        self.power = 0.0            # Last applied (shaped) power
+        self.last_command_time = None
+
+        self.commands = 0
+        self.writes = 0
+        self.write_time = 0.0       # Seconds spent in backend writes
+        self.last_write_us = 0.0
+        self.max_write_us = 0.0
+        self.errors = 0
+
+    def set_power(self, power):
+        """Apply a power command; returns the power actually applied after shaping"""
+        with self.lock:
+            self.commands += 1
+            now = self.clock()
+            power = max(-100.0, min(100.0, float(power)))
+            if abs(power) < self.deadband:
+                power = 0.0
+            if self.slew_rate and self.last_command_time is not None:
+                step = self.slew_rate * (now - self.last_command_time)
+                power = max(self.power - step, min(self.power + step, power))
+            self.last_command_time = now
+            self._apply(power)
+            return self.power
+
+    def stop(self):
+        """Motor off immediately (bypasses the slew limit)"""
+        with self.lock:
+            self.commands += 1
+            self.last_command_time = self.clock()
+            self._apply(0.0)
+
+    def _apply(self, power):
+        power = round(power / DUTY_RESOLUTION) * DUTY_RESOLUTION
+        target = [max(power, 0.0), max(-power, 0.0)]
+        # Channel being switched off first, so both are never driven together
+        for channel in sorted((CW, CCW), key=lambda c: target[c] > 0):
+            if target[channel] != self.duty[channel]:
+                self._write(channel, target[channel])
+        self.power = power
+
+    def _write(self, channel, duty):
+        start = time.perf_counter()
+        try:
+            self.backend.write(channel, duty)
+            self.duty[channel] = duty
+        except Exception as e:
+            self.errors += 1
+            print(f"Error setting motor power: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        self.writes += 1
+        self.write_time += elapsed
+        self.last_write_us = elapsed * 1e6
+        self.max_write_us = max(self.max_write_us, self.last_write_us)
+
+    def close(self):
+        with self.lock:
+            self._apply(0.0)
+            self.backend.close()
+
+    def get_stats(self):
+        return {
+            'power': self.power,
+            'commands': self.commands,
+            'writes': self.writes,
+            'skipped': self.commands - min(self.commands, self.writes),
+            'mean_write_us': round(self.write_time / self.writes * 1e6, 1) if self.writes else 0.0,
+            'last_write_us': round(self.last_write_us, 1),
+            'max_write_us': round(self.max_write_us, 1),
+            'errors': self.errors,
+        }
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+📥 MPU6050 FIFO ACQUISITION - hardware-timed gyro sampling with batched integration
+The MPU6050 samples the gyro at a fixed rate into its 1 KB FIFO; the data thread
+drains it in bulk and integrates every sample with the exact hardware period,
+so yaw accuracy no longer depends on Python loop timing.
+- FIFO configuration (sample rate divider, DLPF, gyro-only packets)
+- Bulk drain with 30-byte SMBus block reads, queued as one unit on the bus arbiter
+- Overflow detection (INT_STATUS) with automatic FIFO reset
+- Vectorised integration of a whole batch in one NumPy step
+"""
+import time
+import numpy as np
+
+# MPU6050 registers used by the FIFO path
+REG_SMPLRT_DIV = 0x19
+REG_CONFIG = 0x1A
+REG_FIFO_EN = 0x23
+REG_INT_ENABLE = 0x38
+REG_INT_STATUS = 0x3A
+REG_USER_CTRL = 0x6A
+REG_FIFO_COUNTH = 0x72
+REG_FIFO_R_W = 0x74
+
+FIFO_EN_GYRO_XYZ = 0x70       # XG_FIFO_EN | YG_FIFO_EN | ZG_FIFO_EN
+USER_CTRL_FIFO_EN = 0x40
+USER_CTRL_FIFO_RESET = 0x04
+INT_FIFO_OFLOW = 0x10
+
+FIFO_SIZE = 1024              # Bytes
+BYTES_PER_SAMPLE = 6          # Gyro X/Y/Z, 16-bit big-endian each
+BLOCK_READ_SIZE = 30          # Largest multiple of 6 within the 32-byte SMBus limit
+GYRO_LSB_PER_DPS = 131.0      # ±250°/s full scale
+DLPF_188HZ = 1                # DLPF on -> 1 kHz gyro output rate
+
+def integrate_gyro_batch(rates, dt, start_angles=(0.0, 0.0, 0.0)):
+    """Integrate an (N, 3) array of rates (°/s) sampled every dt seconds.
+
+    Returns the (N, 3) array of angles after each sample, so the caller gets
+    both the final angle and a per-sample trace from a single cumsum.
+    """
+    rates = np.asarray(rates, dtype=np.float64).reshape(-1, 3)
+    return np.asarray(start_angles, dtype=np.float64) + np.cumsum(rates, axis=0) * dt
+
+class MPU6050Fifo:
+    """Configures and drains the MPU6050 gyro FIFO over an smbus2-style bus."""
+
+    def __init__(self, bus, device_address=0x68, sample_rate_hz=500, dlpf_cfg=DLPF_188HZ):
+        self.bus = bus
+        self.device_address = device_address
+        self.dlpf_cfg = dlpf_cfg
+        gyro_output_rate = 8000.0 if dlpf_cfg in (0, 7) else 1000.0
+        self.sample_divider = max(0, min(255, int(round(gyro_output_rate / sample_rate_hz)) - 1))
+        self.sample_rate_hz = gyro_output_rate / (1 + self.sample_divider)
+        self.sample_period = 1.0 / self.sample_rate_hz
+        self.enabled = False
+
+        # Statistics
+        self.samples_total = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.overflow_count = 0
+        self.overflow_in_last_drain = False
+        self.bytes_read = 0
+        self.last_drain_time = None
+
+    def configure(self):
+        """Program sample rate, DLPF and gyro-only FIFO packets, then start the FIFO"""
+        write = self.bus.write_byte_data
+        write(self.device_address, REG_USER_CTRL, 0x00)                  # Stop FIFO while configuring
+        write(self.device_address, REG_CONFIG, self.dlpf_cfg)
+        write(self.device_address, REG_SMPLRT_DIV, self.sample_divider)
+        write(self.device_address, REG_FIFO_EN, FIFO_EN_GYRO_XYZ)
+        write(self.device_address, REG_INT_ENABLE, INT_FIFO_OFLOW)
+        self.reset()
+        self.enabled = True
+        print(f"✓ MPU6050 FIFO enabled at {self.sample_rate_hz:.1f}Hz (divider {self.sample_divider})")
+
+    def reset(self):
+        """Flush the FIFO and restart collection"""
+        self.bus.write_byte_data(self.device_address, REG_USER_CTRL, USER_CTRL_FIFO_RESET)
+        self.bus.write_byte_data(self.device_address, REG_USER_CTRL, USER_CTRL_FIFO_EN)
+        self.bus.read_byte_data(self.device_address, REG_INT_STATUS)    # Clear stale overflow flag
+        self.last_drain_time = time.monotonic()
+
+    def disable(self):
+        """Stop FIFO collection"""
+        try:
+            self.bus.write_byte_data(self.device_address, REG_USER_CTRL, 0x00)
+            self.bus.write_byte_data(self.device_address, REG_FIFO_EN, 0x00)
+        finally:
+            self.enabled = False
+
+    def _read_many(self, ops):
+        """Run register reads back-to-back - as one arbiter batch when the bus supports it"""
+        if hasattr(self.bus, "batch"):
+            return self.bus.batch(ops)
+        return [getattr(self.bus, method)(*args) for method, args in ops]
+
+    def fifo_count(self):
+        """Number of bytes currently waiting in the FIFO"""
+        high, low = self.bus.read_i2c_block_data(self.device_address, REG_FIFO_COUNTH, 2)
+        return (high << 8) | low
+
+    def drain(self):
+        """Read every complete sample from the FIFO.
+
+        Returns an (N, 3) float array of raw gyro rates in °/s (uncalibrated).
+        On overflow the FIFO is reset, the batch is discarded because packet
+        alignment can no longer be trusted, and overflow_in_last_drain is set.
+        """
+        self.overflow_in_last_drain = False
+        self.last_drain_time = time.monotonic()
+
+        status, (high, low) = self._read_many([
+            ("read_byte_data", (self.device_address, REG_INT_STATUS)),
+            ("read_i2c_block_data", (self.device_address, REG_FIFO_COUNTH, 2)),
+        ])
+        count = (high << 8) | low
+        if status & INT_FIFO_OFLOW or count >= FIFO_SIZE:
+            self.overflow_count += 1
+            self.overflow_in_last_drain = True
+            self.last_batch_size = 0
+            self.reset()
+            return np.empty((0, 3))
+
+        count -= count % BYTES_PER_SAMPLE
+        reads = [("read_i2c_block_data", (self.device_address, REG_FIFO_R_W, min(BLOCK_READ_SIZE, count - offset)))
+                 for offset in range(0, count, BLOCK_READ_SIZE)]
+        raw = bytearray()
+        for chunk in self._read_many(reads):
+            raw.extend(chunk)
+
+        self.bytes_read += len(raw)
+        rates = np.frombuffer(bytes(raw), dtype=">i2").reshape(-1, 3) / GYRO_LSB_PER_DPS
+        self.last_batch_size = len(rates)
+        self.max_batch_size = max(self.max_batch_size, self.last_batch_size)
+        self.samples_total += self.last_batch_size
+        return rates
+
+    def get_stats(self):
+        """Acquisition statistics for telemetry"""
+        return {
+            'enabled': self.enabled,
+            'sample_rate_hz': self.sample_rate_hz,
+            'samples_total': self.samples_total,
+            'last_batch': self.last_batch_size,
+            'max_batch': self.max_batch_size,
+            'overflows': self.overflow_count,
+            'bytes_read': self.bytes_read,
+        }
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+🎛️ PD AUTO-TUNE - identify the yaw plant with a relay test and design gains for a settling time
+A relay on the yaw error (±relay power around the starting yaw) makes the body oscillate a
+few degrees either side of where it was. A least-squares fit of the recorded gyro rate
+against the commanded power gives the first-order rate model
+    d(rate)/dt = gain * power - damping * rate        (°/s² per %, 1/s)
+gain is the motor torque over the body inertia, damping the back-EMF / friction term.
+- RelayTest: relay + recording, fed one sample per step by the routine that drives the motor
+- fit_rate_model(): least squares on the recorded samples, with fit quality
+- design_gains(): Kp / Kd placing the closed-loop poles for a 2% settling time
+- predict_step(): the controller law (setpoint filter, deadband, saturation) on the model
+- step_metrics(): rise / settling time and overshoot, shared with adcs_sim.py
+The routine itself is ADCSController.start_autotune (hardware, or adcs_sim.py's plant).
+"""
+import math
+
+import numpy as np
+
+RELAY_POWER = 40.0        # % - relay output
+RELAY_HYSTERESIS = 1.0    # ° - error band before the relay switches
+RELAY_CYCLES = 4          # Full oscillations recorded
+RELAY_MAX_DURATION = 30.0 # s - give up after this long
+DEFAULT_DAMPING_RATIO = 0.9
+SETTLE_BAND = 2.0         # ° - settled inside target ± this
+
+# ── RELAY TEST ─────────────────────────────────────────────────────────
+class RelayTest:
+    """Relay feedback on yaw around `target`; step() returns the power to apply next.
+
+    done is set after `cycles` full oscillations (or max_duration). The
+    oscillation amplitude and period are measured from the yaw extremes.
+    """
+
+    def __init__(self, target, power=RELAY_POWER, hysteresis=RELAY_HYSTERESIS, cycles=RELAY_CYCLES,
+                 max_duration=RELAY_MAX_DURATION):
+        self.target = target
+        self.power = abs(power)
+        self.hysteresis = hysteresis
+        self.cycles = cycles
+        self.max_duration = max_duration
+        self.output = self.power
+        self.switch_times = []
+        self.extremes = []
+        self.t, self.yaw, self.rate, self.u = [], [], [], []
+        self._extreme = None
+        self.done = False
+
+    def step(self, t, yaw, rate):
+        """Record (t, yaw, rate) with the power that was applied up to now; returns the next power"""
+        if self.t and t <= self.t[-1]:
+            return self.output  # Same sample as last time
+        self.t.append(t)
+        self.yaw.append(yaw)
+        self.rate.append(rate)
+        self.u.append(self.output)
+
+        error = self.target - yaw
+        self._extreme = yaw if self._extreme is None else (max(self._extreme, yaw) if self.output > 0
+                                                           else min(self._extreme, yaw))
+        if (self.output > 0 and error < -self.hysteresis) or (self.output < 0 and error > self.hysteresis):
+            self.output = -self.output
+            self.switch_times.append(t)
+            self.extremes.append(self._extreme)
+            self._extreme = yaw
+        if len(self.switch_times) >= 2 * self.cycles + 1 or t - self.t[0] >= self.max_duration:
+            self.done = True
+        return self.output
+
+    def samples(self):
+        return np.array(self.t), np.array(self.rate), np.array(self.u)
+
+    def oscillation(self):
+        """(peak-to-peak yaw amplitude °, period s) of the settled cycles, or (None, None)"""
+        if len(self.switch_times) < 3:
+            return None, None
+        period = 2.0 * float(np.mean(np.diff(self.switch_times[1:])))
+        swings = np.abs(np.diff(self.extremes[1:])) if len(self.extremes) > 2 else [0.0]
+        return float(np.mean(swings)), period
+
+# ── IDENTIFICATION ─────────────────────────────────────────────────────
+def fit_rate_model(t, rate, power):
+    """Least-squares fit of d(rate)/dt = gain * power - damping * rate.
+
+    Samples may be unevenly spaced: each interval uses the power in force
+    during it (zero-order hold) and the rate at its start. Returns a dict with
+    gain (°/s² per %), damping (1/s), time_constant (s), r2 and samples.
+    """
+    t, rate, power = (np.asarray(a, dtype=np.float64) for a in (t, rate, power))
+    if len(t) < 10:
+        raise ValueError(f"Not enough samples to fit ({len(t)})")
+    dt = np.diff(t)
+    accel = np.diff(rate) / dt
+    X = np.column_stack([power[1:], -rate[:-1]])  # power[k + 1] was applied over interval k
+    (gain, damping), *_ = np.linalg.lstsq(X, accel, rcond=None)
+    residual = accel - X @ np.array([gain, damping])
+    spread = float(np.sum((accel - accel.mean()) ** 2))
+    return {
+        'gain': float(gain),
+        'damping': float(damping),
+        'time_constant': float(1.0 / damping) if damping > 0 else float('inf'),
+        'r2': 1.0 - float(np.sum(residual ** 2)) / spread if spread > 0 else 0.0,
+        'samples': int(len(t)),
+    }
+
+# ── DESIGN ─────────────────────────────────────────────────────────────
+def design_gains(gain, damping, settling_time, damping_ratio=DEFAULT_DAMPING_RATIO):
+    """Kp (%/°) and Kd (%/(°/s)) for closed-loop poles with ζ = damping_ratio and
+    ωn = 4 / (ζ · settling_time), from yaw'' + (damping + gain·Kd) yaw' + gain·Kp yaw = gain·Kp target"""
+    if gain <= 0:
+        raise ValueError(f"Identified gain must be positive (got {gain:.4f}) - check the motor direction")
+    wn = 4.0 / (damping_ratio * settling_time)
+    kp = wn ** 2 / gain
+    kd = max(0.0, (2.0 * damping_ratio * wn - damping) / gain)
+    return {'kp': kp, 'kd': kd, 'wn': wn, 'damping_ratio': damping_ratio}
+
+def predict_step(gain, damping, kp, kd, step, dt=0.01, duration=10.0, max_power=100.0, deadband=0.0,
+                 setpoint_tau=0.0, ki=0.0):
+    """Yaw response of the model under PDControllerPWM's law to a `step` (°) from rest.
+
+    With zero power the motor driver coasts, so the model's damping only
+    applies while the wheel is driven. Returns (t, yaw) arrays.
+    """
+    n = int(round(duration / dt)) + 1
+    t = np.arange(n) * dt
+    yaw = np.zeros(n)
+    y, r, setpoint, integral = 0.0, 0.0, 0.0, 0.0
+    alpha = 1.0 - math.exp(-dt / setpoint_tau) if setpoint_tau > 0 else 1.0
+    for k in range(1, n):
+        setpoint += (step - setpoint) * alpha
+        control_error = setpoint - y
+        if abs(step - y) < deadband and abs(control_error) < deadband:
+            u = 0.0
+        else:
+            u = kp * control_error - kd * r
+            if ki:
+                integral += control_error * dt
+                u += ki * integral
+            u = max(-max_power, min(max_power, u))
+        r += (gain * u - (damping * r if u else 0.0)) * dt
+        y += r * dt
+        yaw[k] = y
+    return t, yaw
+
+def step_metrics(t, yaw, target, band=SETTLE_BAND):
+    """Rise time (10-90%), settling time (last entry into target ± band, None if it
+    ends outside), overshoot (% of the step) for a step from 0 to `target` degrees"""
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(yaw, dtype=np.float64) * (1.0 if target >= 0 else -1.0)
+    step = abs(target)
+    error = y - step
+    outside = np.nonzero(np.abs(error) > band)[0]
+    if len(outside) == 0:
+        settling = 0.0
+    elif outside[-1] == len(t) - 1:
+        settling = None
+    else:
+        settling = float(t[outside[-1] + 1])
+    t10 = np.nonzero(y >= 0.1 * step)[0]
+    t90 = np.nonzero(y >= 0.9 * step)[0]
+    return {
+        'rise_time': float(t[t90[0]] - t[t10[0]]) if len(t10) and len(t90) else None,
+        'settling_time': settling,
+        'overshoot_pct': max(0.0, float(error.max()) / step * 100.0) if step else 0.0,
+    }
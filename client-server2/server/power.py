@@ -18,14 +18,22 @@ except ImportError as e:
     board = None
     adafruit_ina228 = None
 
+from contextlib import nullcontext
+from i2c_arbiter import get_shared_arbiter, PRIORITY_TELEMETRY
+from power_sampling import INA228Sampler, POWER_SAMPLE_RATE, SHUNT_OHMS
+
+SAMPLER_RETRY_INTERVAL = 30.0  # s - property polling between attempts to restart burst sampling
+
 # Last edited 20250629T19:30
 
 class PowerMonitor:
     """Power monitoring system using INA228 sensor"""
     
-    def __init__(self, update_interval=2.0, mock_mode=False):
+    def __init__(self, update_interval=2.0, mock_mode=False, sample_rate=POWER_SAMPLE_RATE):
         print("[PowerMonitor.__init__] Initializing PowerMonitor")
         self.update_interval = update_interval
+        self.sample_rate = sample_rate  # INA228 burst readouts per second, summarized every update_interval
+        self.sampler = None
         # Never use mock mode - if hardware isn't available, show disconnected
         self.mock_mode = False
         self.hardware_available = board is not None and adafruit_ina228 is not None
@@ -38,7 +46,9 @@ class PowerMonitor:
         
         # CSV logging
         self.log_data = []
-        self.csv_headers = ['timestamp', 'current_ma', 'voltage_v', 'power_mw', 'energy_j', 'temperature_c', 'battery_percentage']
+        # energy_j is the INA228 accumulator on both paths; energy_j_integrated is the sampler's
+        # own integral since it started (empty when polling)
+        self.csv_headers = ['timestamp', 'current_ma', 'voltage_v', 'power_mw', 'energy_j', 'temperature_c', 'battery_percentage', 'current_max_ma', 'samples', 'energy_j_integrated']
         
         logging.info(f"PowerMonitor initialized (hardware_available: {self.hardware_available})")
         print(f"[PowerMonitor.__init__] hardware_available: {self.hardware_available}")
@@ -208,7 +218,10 @@ class PowerMonitor:
                 data.get('power_mw', 0),
                 data.get('energy_j', 0),
                 data.get('temperature_c', 0),
-                data.get('battery_percentage', 0)
+                data.get('battery_percentage', 0),
+                data.get('current_ma_max', data.get('current_ma', 0)),
+                data.get('samples', 1),
+                data.get('energy_j_integrated', '')
             ]
             self.log_data.append(row)
             
@@ -239,34 +252,83 @@ class PowerMonitor:
         except Exception as e:
             logging.error(f"Error saving CSV log: {e}")
 
+    def _bus_guard(self):
+        """Hold the shared I2C bus while the INA228 registers are read"""
+        if not self.sensor_connected:
+            return nullcontext()
+        try:
+            return get_shared_arbiter().exclusive(PRIORITY_TELEMETRY)
+        except Exception:
+            return nullcontext()  # No arbiter (e.g. smbus2 missing) - read unguarded
+
+    def summary_to_power_data(self, summary):
+        """Turn an INA228Sampler interval summary into the power_data dict the callback expects"""
+        power_data = {key: summary[key] for key in (
+            "current_ma", "current_ma_min", "current_ma_max", "voltage_v", "voltage_v_min", "voltage_v_max",
+            "power_mw", "power_mw_min", "power_mw_max", "energy_j_integrated", "charge_c", "temperature_c",
+            "samples")}
+        # INA228 accumulator, as on the polling path ("error" if it could not be read)
+        power_data["energy_j"] = summary["energy_j"] if summary["energy_j"] is not None else "error"
+        power_data["battery_percentage"] = self.get_battery_percentage(summary["voltage_v"], summary["current_ma"] / 1000)
+        power_data["status"] = self.determine_power_status(
+            summary["current_ma"], summary["voltage_v"], summary["power_mw"],
+            power_data["battery_percentage"], summary["temperature_c"]
+        )
+        return power_data
+
+    def publish_power_data(self, power_data):
+        """Store, log and forward one power update"""
+        if not power_data:
+            return
+        self.last_data = power_data
+
+        # Log to CSV
+        self.log_data_to_csv(power_data)
+
+        # Send update via callback
+        if self.callback:
+            try:
+                self.callback(power_data)
+            except Exception as e:
+                logging.error(f"Error in power data callback: {e}")
+
+        # Debug logging (reduced frequency)
+        if len(self.log_data) % 30 == 0 and isinstance(power_data.get('power_mw'), (int, float)):  # Log every 30 readings
+            logging.debug(f"Power: {power_data['power_mw']:.1f}mW, "
+                        f"Current: {power_data['current_ma']:.1f}mA, "
+                        f"Voltage: {power_data['voltage_v']:.2f}V, "
+                        f"Temp: {power_data['temperature_c']:.1f}°C")
+
+    def sampling_loop(self):
+        """Burst-read the INA228 at sample_rate through the arbiter; one update per update_interval"""
+        with get_shared_arbiter(1).client(PRIORITY_TELEMETRY) as bus:
+            self.sampler = INA228Sampler(bus, rate_hz=self.sample_rate, interval=self.update_interval,
+                                         publish=lambda summary: self.publish_power_data(self.summary_to_power_data(summary)),
+                                         shunt_ohms=SHUNT_OHMS).configure()
+            logging.info(f"INA228 sampling at {self.sample_rate}Hz, summarized every {self.update_interval}s")
+            self.sampler.run(lambda: self.running)
+
     def monitoring_loop(self):
         """Main monitoring loop running in separate thread"""
         logging.info("Power monitoring loop started")
 
+        sampler_retry_at = 0.0
         while self.running:
-            try:
-                # Get power data
-                power_data = self.get_power_values()
+            if self.sensor_connected and time.monotonic() >= sampler_retry_at:
+                try:
+                    self.sampling_loop()
+                    continue  # Returns only once monitoring is stopped
+                except Exception as e:
+                    # Includes a sensor that stops answering mid-run - poll (and report the errors) meanwhile
+                    logging.error(f"INA228 burst sampling failed, polling every {self.update_interval}s: {e}")
+                    sampler_retry_at = time.monotonic() + SAMPLER_RETRY_INTERVAL
 
-                if power_data:
-                    self.last_data = power_data
-
-                    # Log to CSV
-                    self.log_data_to_csv(power_data)
-
-                    # Send update via callback
-                    if self.callback:
-                        try:
-                            self.callback(power_data)
-                        except Exception as e:
-                            logging.error(f"Error in power data callback: {e}")
+            try:
+                # Get power data - one bus grant for the whole register set
+                with self._bus_guard():
+                    power_data = self.get_power_values()
 
-                    # Debug logging (reduced frequency)
-                    if len(self.log_data) % 30 == 0:  # Log every 30 readings
-                        logging.debug(f"Power: {power_data['power_mw']:.1f}mW, "
-                                    f"Current: {power_data['current_ma']:.1f}mA, "
-                                    f"Voltage: {power_data['voltage_v']:.2f}V, "
-                                    f"Temp: {power_data['temperature_c']:.1f}°C")
+                self.publish_power_data(power_data)
 
                 time.sleep(self.update_interval)
 
@@ -320,6 +382,7 @@ class PowerMonitor:
             "running": self.running,
             "sensor_connected": self.sensor_connected,
             "hardware_available": self.hardware_available,
+            "sampling": self.sampler.get_stats() if self.sampler else None,
             "last_update": datetime.now().isoformat() if self.last_data else None
         }
 
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+🔋 POWER SAMPLING - INA228 burst readout with on-board charge / energy integration
+The INA228 registers are read as ONE bus batch per sample (shunt voltage, bus
+voltage, die temperature back-to-back) at a fixed rate well above the broadcast
+rate, so motor current spikes show up in the per-interval max instead of being
+aliased away by a reading every 2 s.
+- Current from the shunt voltage and the shunt resistance (independent of SHUNT_CAL)
+- Charge (C) and energy (J) integrated with the trapezoidal rule on the
+  time.monotonic() of each sample (energy_j_integrated, from sampler start)
+- energy_j stays the INA228's own accumulator, read once per interval and scaled
+  by its SHUNT_CAL, so it means the same as on the property-poll path
+- Per broadcast interval: min / max / mean of current, voltage and power
+- MAX_CONSECUTIVE_ERRORS failed readouts in a row raise, so a sensor that stops
+  answering ends run() instead of leaving the summaries silently stale
+- Works on an arbitrated bus (batch) or a plain smbus2.SMBus / SimulatedSMBus
+"""
+import time
+
+INA228_ADDR = 0x40
+REG_CONFIG = 0x00
+REG_SHUNT_CAL = 0x02
+REG_VSHUNT = 0x04
+REG_VBUS = 0x05
+REG_DIETEMP = 0x06
+REG_ENERGY = 0x09
+REG_MANUFACTURER_ID = 0x3E
+MANUFACTURER_TI = 0x5449
+CONFIG_ADCRANGE = 0x10
+VSHUNT_LSB = (312.5e-9, 78.125e-9)   # V per LSB, ADCRANGE 0 (±163.84 mV) / 1 (±40.96 mV)
+VBUS_LSB = 195.3125e-6               # V per LSB
+DIETEMP_LSB = 7.8125e-3              # °C per LSB
+SHUNT_CAL_SCALE = 13107.2e6          # SHUNT_CAL = SHUNT_CAL_SCALE * CURRENT_LSB * R_shunt (x4 at ADCRANGE 1)
+ENERGY_SCALE = 16 * 3.2              # J per LSB = ENERGY_SCALE * CURRENT_LSB
+
+POWER_SAMPLE_RATE = 50     # Hz - burst readouts per second
+SHUNT_OHMS = 0.015         # Ω - Adafruit INA228 breakout shunt
+MAX_SAMPLE_GAP = 0.5       # s - longer gaps (bus errors) are not integrated across
+MAX_CONSECUTIVE_ERRORS = 25  # Failed readouts in a row (0.5 s at 50 Hz) before tick() raises
+
+def _signed(value, bits):
+    return value - (1 << bits) if value & (1 << (bits - 1)) else value
+
+class INA228Sampler:
+    """Burst-reads the INA228 at rate_hz and publishes one summary per interval.
+
+    Args:
+        bus: smbus2-compatible bus; its batch() is used when it has one
+        publish: callable(summary) - see summarize() for the fields
+        interval: seconds per summary (the broadcast interval)
+        clock / sleep: injectable time sources for simulation
+    """
+
+    def __init__(self, bus, rate_hz=POWER_SAMPLE_RATE, interval=2.0, publish=None, shunt_ohms=SHUNT_OHMS,
+                 address=INA228_ADDR, clock=time.monotonic, sleep=time.sleep):
+        self.bus = bus
+        self.rate_hz = rate_hz
+        self.interval = interval
+        self.publish = publish
+        self.shunt_ohms = shunt_ohms
+        self.address = address
+        self.clock = clock
+        self.sleep = sleep
+        self.vshunt_lsb = VSHUNT_LSB[0]
+        self.current_lsb = None      # From SHUNT_CAL; None = no hardware energy
+        self.charge_c = 0.0
+        self.energy_j = 0.0          # Software integral since the sampler started
+        self.hardware_energy_j = None
+        self.samples = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.latest = None           # (t, current_a, voltage_v, power_w, temperature_c)
+        self._reset_interval(None)
+
+    def _transfer(self, ops):
+        if hasattr(self.bus, "batch"):
+            return self.bus.batch(ops)
+        return [getattr(self.bus, method)(*args) for method, args in ops]
+
+    def configure(self):
+        """Check the part answers as an INA228; pick up its shunt ADC range and energy scale"""
+        manufacturer, config, shunt_cal = self._transfer([
+            ("read_i2c_block_data", (self.address, REG_MANUFACTURER_ID, 2)),
+            ("read_i2c_block_data", (self.address, REG_CONFIG, 2)),
+            ("read_i2c_block_data", (self.address, REG_SHUNT_CAL, 2)),
+        ])
+        if (manufacturer[0] << 8 | manufacturer[1]) != MANUFACTURER_TI:
+            raise OSError(f"No INA228 at 0x{self.address:02x} (manufacturer id {manufacturer})")
+        adcrange = (config[0] << 8 | config[1]) & CONFIG_ADCRANGE
+        self.vshunt_lsb = VSHUNT_LSB[1 if adcrange else 0]
+        shunt_cal = (shunt_cal[0] << 8 | shunt_cal[1]) & 0x7FFF
+        if shunt_cal:
+            self.current_lsb = shunt_cal / (SHUNT_CAL_SCALE * self.shunt_ohms * (4 if adcrange else 1))
+        self.read_energy()
+        return self
+
+    def read_energy(self):
+        """The INA228's energy accumulator in J (None without SHUNT_CAL or on a bus error)"""
+        if self.current_lsb is None:
+            return None
+        try:
+            raw = self._transfer([("read_i2c_block_data", (self.address, REG_ENERGY, 5))])[0]
+        except Exception:
+            self.errors += 1
+            return None
+        self.hardware_energy_j = int.from_bytes(bytes(raw), "big") * ENERGY_SCALE * self.current_lsb
+        return self.hardware_energy_j
+
+    def _reset_interval(self, start):
+        self._interval_start = start
+        self._stats = {name: [float("inf"), float("-inf"), 0.0] for name in ("current", "voltage", "power")}
+        self._count = 0
+
+    def tick(self):
+        """One burst readout. Returns (t, current_a, voltage_v, power_w, temperature_c) or None.
+
+        Raises OSError after MAX_CONSECUTIVE_ERRORS failed readouts in a row.
+        """
+        before = self.clock()
+        try:
+            vshunt, vbus, dietemp = self._transfer([
+                ("read_i2c_block_data", (self.address, REG_VSHUNT, 3)),
+                ("read_i2c_block_data", (self.address, REG_VBUS, 3)),
+                ("read_i2c_block_data", (self.address, REG_DIETEMP, 2)),
+            ])
+        except Exception as e:
+            self.errors += 1
+            self.consecutive_errors += 1
+            if self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                raise OSError(f"INA228 at 0x{self.address:02x} stopped answering "
+                              f"({self.consecutive_errors} failed readouts): {e}") from e
+            return None
+        self.consecutive_errors = 0
+        t = 0.5 * (before + self.clock())  # Middle of the burst
+        current = _signed((vshunt[0] << 16 | vshunt[1] << 8 | vshunt[2]) >> 4, 20) * self.vshunt_lsb / self.shunt_ohms
+        voltage = ((vbus[0] << 16 | vbus[1] << 8 | vbus[2]) >> 4) * VBUS_LSB
+        temperature = _signed(dietemp[0] << 8 | dietemp[1], 16) * DIETEMP_LSB
+        power = current * voltage
+
+        if self.latest is not None and 0.0 < t - self.latest[0] <= MAX_SAMPLE_GAP:
+            dt = t - self.latest[0]
+            self.charge_c += 0.5 * (self.latest[1] + current) * dt
+            self.energy_j += 0.5 * (self.latest[3] + power) * dt
+        self.latest = (t, current, voltage, power, temperature)
+        self.samples += 1
+
+        if self._interval_start is None:
+            self._interval_start = t
+        for name, value in (("current", current), ("voltage", voltage), ("power", power)):
+            stats = self._stats[name]
+            stats[0] = min(stats[0], value)
+            stats[1] = max(stats[1], value)
+            stats[2] += value
+        self._count += 1
+        if t - self._interval_start >= self.interval - 0.5 / self.rate_hz:  # Sample nearest the boundary
+            self.flush()
+        return self.latest
+
+    def summarize(self):
+        """Summary of the current interval (None before the first sample)"""
+        if not self._count:
+            return None
+        t, _, _, _, temperature = self.latest
+        summary = {'t': t, 'interval_s': t - self._interval_start, 'samples': self._count,
+                   'temperature_c': temperature, 'charge_c': self.charge_c,
+                   'energy_j': self.hardware_energy_j, 'energy_j_integrated': self.energy_j}
+        for name, key, scale in (("current", "current_ma", 1000.0), ("voltage", "voltage_v", 1.0),
+                                 ("power", "power_mw", 1000.0)):
+            low, high, total = self._stats[name]
+            summary[key] = total / self._count * scale
+            summary[key + "_min"] = low * scale
+            summary[key + "_max"] = high * scale
+        return summary
+
+    def flush(self):
+        """Publish the current interval's summary and start the next"""
+        self.read_energy()
+        summary = self.summarize()
+        self._reset_interval(self.latest[0] if self.latest else None)
+        if summary and self.publish:
+            self.publish(summary)
+        return summary
+
+    def run(self, keep_running):
+        """Sample at rate_hz until keep_running() is False, sleeping to each slot"""
+        period = 1.0 / self.rate_hz
+        next_tick = self.clock()
+        while keep_running():
+            self.tick()
+            next_tick += period
+            now = self.clock()
+            if next_tick < now - period:
+                next_tick = now  # Fell behind (bus busy) - skip rather than burst
+            self.sleep(max(0.0, next_tick - now))
+        self.flush()
+
+    def get_stats(self):
+        return {'samples': self.samples, 'errors': self.errors, 'charge_c': self.charge_c,
+                'energy_j': self.hardware_energy_j, 'energy_j_integrated': self.energy_j}
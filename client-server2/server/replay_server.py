@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+⏯️ REPLAY SERVER - recorded sessions served to client4 in place of the Pi
+Stands in for server2 on any Linux box so the ground-station pipeline
+(decode, detector, plots) can be measured without hardware.
+- Same Socket.IO events as server2: frame, adcs_broadcast, lidar_broadcast,
+  power_broadcast, through the same TelemetryHub (subscribe_topics, per-client rates)
+- Sources: session recordings (session_recorder format: frames, ADCS binary
+  frames, LiDAR, power) or the legacy client recordings - lidar_*.csv,
+  lux_log.csv (as ADCS lux) and captured_images (stills scaled to the stream
+  size and encoded once at load, cycled at --fps)
+- Speed: 1 = real time, N = N times faster, 0 = as fast as possible
+- Deterministic: the event sequence depends only on the source, never on the
+  speed or on timing jitter; lateness against the schedule is measured
+- Frames flow while a client has the camera started (start_camera / stop_camera), like the Pi
+
+Usage: python replay_server.py [--session DIR | --recordings DIR --images DIR]
+                               [--speed 1] [--loop] [--stream] [--port 5000]
+Point the client at it with SLOWMO_SERVER_URL=http://127.0.0.1:5000
+"""
+import argparse
+import glob
+import hashlib
+import heapq
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+COMMON_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)  # session_recorder is shared with the client
+
+from session_recorder import SessionReader
+
+CLIENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client")
+DEFAULT_RECORDINGS = os.path.join(CLIENT_DIR, "recordings")
+DEFAULT_IMAGES = os.path.join(CLIENT_DIR, "captured_images")
+FRAME_SIZE = (1536, 864)          # camera.py default stream resolution
+FRAME_QUALITY = 70
+LEGACY_FPS = 10.0
+STATS_INTERVAL_S = 5.0
+
+# ── SOURCES ────────────────────────────────────────────────────────────
+def session_events(path, start=None, end=None, topics=None):
+    """(t, topic, payload) from a recorded session, read page by page"""
+    reader = SessionReader(path)
+    cursor = None
+    while True:
+        records, cursor = reader.read(start, end, topics, cursor, max_bytes=4 * 1024 * 1024)
+        yield from records
+        if cursor is None:
+            return
+
+def _load_csv(path):
+    data = np.genfromtxt(path, delimiter=",", skip_header=1)
+    return data.reshape(-1, data.shape[-1]) if data.size else np.zeros((0, 2))
+
+def _legacy_lidar(recordings):
+    """lidar_*.csv (relative time, live distance in cm), played back to back"""
+    events, offset = [], 0.0
+    for path in sorted(glob.glob(os.path.join(recordings, "lidar_*.csv"))):
+        data = _load_csv(path)
+        for t, value in data[:, :2]:
+            events.append((offset + t, "lidar", {"distance_cm": float(value), "timestamp": offset + t}))
+        if len(data):
+            offset += data[-1, 0] + 1.0
+    return events
+
+def _legacy_lux(recordings):
+    """lux_log.csv as the legacy ADCS dictionary (lux channels only, attitude zero)"""
+    path = os.path.join(recordings, "lux_log.csv")
+    if not os.path.exists(path):
+        return []
+    data = np.genfromtxt(path, delimiter=",", skip_header=1, usecols=(0, 1, 2, 3))
+    data = data.reshape(-1, 4)
+    events = []
+    for t, l1, l2, l3 in data:
+        events.append((t - data[0, 0], "adcs", {
+            "gyro": "0.0°", "orientation": "Y:0.0° R:0.0° P:0.0°",
+            "lux1": f"{l1:.1f}", "lux2": f"{l2:.1f}", "lux3": f"{l3:.1f}",
+            "rpm": "0.0", "status": "Replay",
+            "gyro_rate_x": "0.00", "gyro_rate_y": "0.00", "gyro_rate_z": "0.00",
+            "angle_x": "0.0", "angle_y": "0.0", "angle_z": "0.0",
+            "temperature": "0.0°C",
+        }))
+    return events
+
+def _legacy_frames(images, duration, fps=LEGACY_FPS, frame_size=FRAME_SIZE, quality=FRAME_QUALITY):
+    """captured_images scaled to the stream size, encoded once, cycled over `duration`"""
+    import cv2
+    jpegs = []
+    for path in sorted(glob.glob(os.path.join(images, "*.jpg"))):
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        image = cv2.resize(image, frame_size, interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if ok:
+            jpegs.append(jpeg.tobytes())
+    if not jpegs:
+        return []
+    count = max(len(jpegs), int(duration * fps))
+    return [(i / fps, "frame", jpegs[i % len(jpegs)]) for i in range(count)]
+
+def legacy_events(recordings=DEFAULT_RECORDINGS, images=DEFAULT_IMAGES, fps=LEGACY_FPS):
+    """(t, topic, payload) built from the client's own recordings, all starting at t=0"""
+    telemetry = sorted(_legacy_lidar(recordings) + _legacy_lux(recordings), key=lambda e: e[0])
+    duration = telemetry[-1][0] if telemetry else 0.0
+    frames = _legacy_frames(images, duration, fps)
+    return list(heapq.merge(telemetry, frames, key=lambda e: e[0]))
+
+# ── REPLAYER ───────────────────────────────────────────────────────────
+class Replayer:
+    """Plays (t, topic, payload) events against a clock.
+
+    events: callable returning a fresh iterable of time-ordered events (one per pass)
+    speed: 1 = real time, N = N times faster, 0 = no waiting
+    """
+
+    def __init__(self, events, speed=1.0, loop=False, clock=time.monotonic, sleep=time.sleep):
+        self.events = events
+        self.speed = speed
+        self.loop = loop
+        self.clock = clock
+        self.sleep = sleep
+        self.paused = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.passes = 0
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.count = 0
+        self.bytes = 0
+        self.per_topic = {}
+        self.lateness = []           # Seconds behind schedule, per event
+        self.started = None
+        self.digest = hashlib.sha256()
+
+    def run(self, emit):
+        """Emit every event (blocking). emit(topic, payload); returns get_stats()"""
+        self._reset_stats()
+        self.started = self.clock()
+        offset = 0.0                 # Source time added per loop pass
+        t0 = None
+        anchor = None                # (wall, source time, speed) the schedule is measured from
+        while not self.stop_event.is_set():
+            last_t = None
+            for t, topic, payload in self.events():
+                if self.stop_event.is_set():
+                    break
+                t = t + offset
+                if t0 is None:
+                    t0 = t
+                if self.paused.is_set():
+                    while self.paused.is_set() and not self.stop_event.is_set():
+                        self.sleep(0.05)
+                    anchor = None
+                speed = self.speed
+                if speed:
+                    if anchor is None or anchor[2] != speed:
+                        anchor = (self.clock(), t, speed)   # Resume / speed change: schedule from here
+                    due = anchor[0] + (t - anchor[1]) / speed
+                    wait = due - self.clock()
+                    if wait > 0:
+                        self.sleep(wait)
+                    self.lateness.append(max(0.0, self.clock() - due))
+                emit(topic, payload)
+                self._count(t, topic, payload)
+                last_t = t
+            self.passes += 1
+            if not self.loop or last_t is None:
+                break
+            offset = last_t - t0 + 0.1   # Next pass continues the timeline
+        return self.get_stats()
+
+    def _count(self, t, topic, payload):
+        size = len(payload) if isinstance(payload, (bytes, bytearray)) else len(repr(payload))
+        self.count += 1
+        self.bytes += size
+        self.per_topic[topic] = self.per_topic.get(topic, 0) + 1
+        self.digest.update(f"{t:.6f}{topic}{size}".encode())
+
+    def start(self, emit):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, args=(emit,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def get_stats(self):
+        elapsed = self.clock() - self.started if self.started else 0.0
+        late = np.array(self.lateness) * 1000.0 if self.lateness else np.zeros(1)
+        return {
+            "events": self.count,
+            "per_topic": dict(self.per_topic),
+            "mb": round(self.bytes / 1e6, 2),
+            "elapsed_s": round(elapsed, 3),
+            "events_per_s": round(self.count / elapsed, 1) if elapsed > 0 else 0.0,
+            "late_mean_ms": round(float(late.mean()), 2),
+            "late_p99_ms": round(float(np.percentile(late, 99)), 2),
+            "late_max_ms": round(float(late.max()), 2),
+            "passes": self.passes,
+            "sequence": self.digest.hexdigest()[:16],   # Same source -> same value at any speed
+        }
+
+# ── SOCKET.IO SERVER ───────────────────────────────────────────────────
+def create_app(replayer, stream=False):
+    """Flask-SocketIO app speaking server2's telemetry protocol"""
+    from flask import Flask, request
+    from flask_socketio import SocketIO, emit, join_room, leave_room
+    from telemetry_hub import TelemetryHub
+
+    app = Flask(__name__)
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+    hub = TelemetryHub(
+        lambda event, payload, to: socketio.emit(event, payload, to=to),
+        join_room=lambda sid, room: join_room(room, sid=sid, namespace="/"),
+        leave_room=lambda sid, room: leave_room(room, sid=sid, namespace="/"),
+    )
+    hub.register_topic("adcs", stream=True)
+    hub.register_topic("power")
+    hub.register_topic("lidar", stream=True)
+    hub.register_topic("frame", event="frame", stream=True)
+    state = {"camera": stream, "clients": set()}
+
+    def publish(topic, payload):
+        if topic == "frame" and not state["camera"]:
+            return
+        if hub.has_subscribers(topic):
+            hub.publish(topic, payload)
+
+    @socketio.on("connect")
+    def on_connect():
+        state["clients"].add(request.sid)
+        hub.subscribe(request.sid)
+        print(f"[INFO] Client connected: {request.sid}")
+        if replayer.thread is None:
+            replayer.start(publish)
+            print(f"[INFO] Replay started at {'max' if not replayer.speed else str(replayer.speed) + 'x'} speed")
+
+    @socketio.on("disconnect")
+    def on_disconnect():
+        state["clients"].discard(request.sid)
+        hub.unsubscribe(request.sid)
+        print(f"[INFO] Client disconnected: {request.sid}")
+
+    @socketio.on("subscribe_topics")
+    def on_subscribe_topics(data):
+        topics = hub.subscribe(request.sid, (data or {}).get("topics"))
+        emit("subscribed_topics", {"topics": topics})
+
+    @socketio.on("start_camera")
+    def on_start_camera(data=None):
+        state["camera"] = True
+
+    @socketio.on("stop_camera")
+    def on_stop_camera(data=None):
+        state["camera"] = False
+
+    @socketio.on("replay_control")
+    def on_replay_control(data):
+        """{"speed": x, "paused": bool}"""
+        data = data or {}
+        if "speed" in data:
+            replayer.speed = float(data["speed"])
+        if "paused" in data:
+            (replayer.paused.set if data["paused"] else replayer.paused.clear)()
+        emit("replay_status", replayer.get_stats(), broadcast=True)
+
+    def report():
+        while True:
+            time.sleep(STATS_INTERVAL_S)
+            if replayer.started:
+                stats = replayer.get_stats()
+                print(f"[INFO] Replay: {stats['events']} events ({stats['events_per_s']}/s, {stats['mb']} MB), "
+                      f"late mean {stats['late_mean_ms']}ms p99 {stats['late_p99_ms']}ms")
+
+    hub.start()
+    threading.Thread(target=report, daemon=True).start()
+    return app, socketio
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--session", help="Recorded session directory (session_recorder format)")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS, help="Legacy client recordings directory")
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Stills cycled as the video stream (legacy)")
+    parser.add_argument("--fps", type=float, default=LEGACY_FPS, help="Frame rate for the legacy stills")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N times faster, 0 = max")
+    parser.add_argument("--loop", action="store_true", help="Start over at the end")
+    parser.add_argument("--stream", action="store_true", help="Send frames without waiting for start_camera")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.session:
+        events = lambda: session_events(args.session)
+        print(f"[INFO] Replaying session {args.session}")
+    else:
+        loaded = legacy_events(args.recordings, args.images, args.fps)
+        events = lambda: loaded
+        print(f"[INFO] Replaying {len(loaded)} events from {args.recordings} and {args.images}")
+    replayer = Replayer(events, speed=args.speed, loop=args.loop)
+    app, socketio = create_app(replayer, stream=args.stream)
+    print(f"🚀 Replay server at http://0.0.0.0:{args.port}")
+    socketio.run(app, host="0.0.0.0", port=args.port, allow_unsafe_werkzeug=True)
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,11 @@
 from gevent import monkey; monkey.patch_all()
 
 import time
-import socketio
+from service_link import ServiceClient
 import psutil
 
 SERVER_URL = "http://localhost:5000"
-sio = socketio.Client()
+sio = ServiceClient()  # In-process when imported by server2, Socket.IO client when standalone
 
 # Track uptime from when sensors start
 start_time = time.time()
@@ -15,6 +15,7 @@ start_time = time.time()
 @sio.event
 def connect():
     print("📡 Connected to server from sensors.py")
+    sio.emit("subscribe_topics", {"topics": []})  # Publisher only - no telemetry broadcasts
 
 @sio.event
 def disconnect():
@@ -2,7 +2,8 @@
 
 from gevent import monkey; monkey.patch_all()
 from flask import Flask, request
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
+import service_link
 import camera
 import sensors
 import lidar
@@ -10,7 +11,14 @@ import threading
 import logging
 import time
 import os
+import sys
 import base64
+from telemetry_hub import TelemetryHub
+
+# Protocol modules shared with the client (adcs_telemetry, image_transfer, session_recorder)
+COMMON_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
 
 # Import power monitoring
 try:
@@ -41,16 +49,126 @@ except ImportError as e:
 
 # Import ADCS controller
 try:
-    from ADCS_PD import ADCSController
+    from ADCS_PD import ADCSController, LOG_FREQUENCY as ADCS_SAMPLE_RATE
     ADCS_AVAILABLE = True
 except ImportError as e:
     logging.warning(f"ADCS controller not available: {e}")
     ADCSController = None
+    ADCS_SAMPLE_RATE = None
     ADCS_AVAILABLE = False
 
+# Import shared I2C bus arbiter (ADCS, LiDAR and power all go through it)
+try:
+    from i2c_arbiter import get_shared_arbiter
+    I2C_ARBITER_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"I2C bus arbiter not available: {e}")
+    get_shared_arbiter = None
+    I2C_ARBITER_AVAILABLE = False
+
+# Import binary ADCS telemetry frames (numeric records instead of formatted strings)
+try:
+    import adcs_telemetry
+    ADCS_TELEMETRY_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Binary ADCS telemetry not available: {e}")
+    adcs_telemetry = None
+    ADCS_TELEMETRY_AVAILABLE = False
+
+# Import the shared-memory frame ring (frames from a camera.py that is not running in-process)
+try:
+    from frame_ring import FrameRing, DEFAULT_NAME as FRAME_RING_NAME
+    FRAME_RING_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Shared-memory frame ring not available: {e}")
+    FrameRing = None
+    FRAME_RING_AVAILABLE = False
+
+# Import on-board AprilTag pose (detection on the Pi from the camera's raw frames)
+try:
+    from tag_pose import TagPoseService
+    TAG_POSE_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"On-board tag pose not available: {e}")
+    TagPoseService = None
+    TAG_POSE_AVAILABLE = False
+
+# Import chunked image transfer (download_image streams binary chunks with resume)
+try:
+    from image_transfer import ImageSender
+    IMAGE_TRANSFER_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Chunked image transfer not available: {e}")
+    ImageSender = None
+    IMAGE_TRANSFER_AVAILABLE = False
+
+# Import on-board session recorder (camera frames and telemetry to segment files)
+try:
+    from session_recorder import SessionRecorder, SessionReader, list_sessions
+    SESSION_RECORDER_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Session recorder not available: {e}")
+    SessionRecorder = SessionReader = list_sessions = None
+    SESSION_RECORDER_AVAILABLE = False
+
+# "binary" sends adcs_telemetry frames; "json" keeps the legacy string dictionary
+ADCS_TELEMETRY_FORMAT = "binary"
+ADCS_BROADCAST_HZ = 20          # Messages per second; each carries every sample since the last one
+ADCS_TELEMETRY_RATE_HZ = None   # Decimate the shipped samples to this rate (None = every data-thread sample)
+ADCS_TELEMETRY_CHUNK = 50       # Max samples per frame
+ADCS_TELEMETRY_BACKLOG = 200    # Max samples per broadcast (older ones are dropped after a stall)
+adcs_last_seq = 0
+
+# "in_process": camera.py / lidar.py / sensors.py call the handlers below directly;
+# "socketio": they connect back to this server over loopback like standalone clients
+SERVICE_LINK = "in_process"
+service_bus = service_link.bus
+if SERVICE_LINK == "in_process":
+    service_bus.enable()
+
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# ── TELEMETRY HUB ──────────────────────────────────────────────────────
+# Every live-data broadcast is published here; clients receive the topics they subscribed to
+def hub_emit(event, payload, to):
+    socketio.emit(event, payload, to=to)
+
+telemetry_hub = TelemetryHub(
+    hub_emit,
+    join_room=lambda sid, room: join_room(room, sid=sid, namespace="/"),
+    leave_room=lambda sid, room: leave_room(room, sid=sid, namespace="/"),
+)
+telemetry_hub.register_topic("adcs", stream=True)            # Every ADCS telemetry chunk
+telemetry_hub.register_topic("thermal", max_rate_hz=2.0)     # Re-derived whenever a temperature changes
+telemetry_hub.register_topic("power")
+telemetry_hub.register_topic("communication")
+telemetry_hub.register_topic("i2c_bus")
+telemetry_hub.register_topic("sensor")
+telemetry_hub.register_topic("lidar", stream=True)
+telemetry_hub.register_topic("tachometer", stream=True)
+telemetry_hub.register_topic("camera_payload")
+telemetry_hub.register_topic("lidar_payload")
+telemetry_hub.register_topic("frame", event="frame", stream=True)  # Camera stream relayed from camera.py
+telemetry_hub.register_topic("tag_pose", stream=True)                  # On-board AprilTag pose, every frame
+telemetry_hub.register_topic("tag_thumbnail", event="tag_thumbnail", stream=True)  # Small JPEG while pose replaces video
+
+image_sender = ImageSender() if IMAGE_TRANSFER_AVAILABLE else None
+
+# ── SESSION RECORDER ───────────────────────────────────────────────────
+SESSION_TOPICS = ["frame", "adcs", "lidar", "power"]   # Recorded by default
+session_recorder = SessionRecorder() if SESSION_RECORDER_AVAILABLE else None
+
+def record_session(topic, payload):
+    """Hand a payload to the on-board recorder (independent of who is subscribed)"""
+    if session_recorder and session_recorder.active:
+        session_recorder.record(topic, payload)
+
+def relay_to_services(event, data):
+    """Command for camera.py / lidar.py: in-process services directly, standalone ones over Socket.IO"""
+    emit(event, data, broadcast=True)
+    service_bus.dispatch(event, data)
+
 # Camera state is now managed entirely by camera.py via camera_info events
 # No need for server-side state tracking
 
@@ -92,13 +210,15 @@ def handle_scanning_mode_data(data):
 # ===================== CAMERA/LIVE STREAM/IMAGE SECTION =====================
 
 @socketio.on('frame')
+@service_bus.on('frame')
 def handle_frame(data):
     try:
-        # Check if we have connected clients before broadcasting
-        if len(connected_clients) == 0:
+        record_session("frame", data)  # The streamer's JPEG bytes as they are
+        # Only clients subscribed to "frame" receive it, each at the rate it asked for
+        if not telemetry_hub.has_subscribers("frame"):
             return
-            
-        emit('frame', data, broadcast=True)
+
+        telemetry_hub.publish("frame", data)
         # Note: Frame data no longer tracked for communication monitoring
         # as true channel throughput is now measured via dedicated tests
     except Exception as e:
@@ -109,11 +229,94 @@ def handle_frame(data):
         import traceback
         traceback.print_exc()
 
+# ===================== ON-BOARD APRILTAG POSE =====================
+
+def pose_to_adcs(pose):
+    """Feed on-board detections to AprilTag auto-zero without the ground round trip.
+
+    The fix carries the frame's capture time, so the yaw filter applies it where
+    the gyro history says the satellite was pointing at exposure, not on arrival.
+    """
+    if adcs_controller and getattr(adcs_controller, 'auto_zero_tag_enabled', False):
+        adcs_controller.auto_zero_tag({
+            "relative_angle": pose.get("relative_angle"),
+            "timestamp": pose.get("capture_monotonic"),
+            "source": "onboard",
+        })
+
+tag_pose_service = None
+if TAG_POSE_AVAILABLE:
+    tag_pose_service = TagPoseService(
+        lambda pose: telemetry_hub.publish("tag_pose", pose),
+        lambda jpeg: telemetry_hub.publish("tag_thumbnail", jpeg),
+    )
+    tag_pose_service.add_listener(pose_to_adcs)
+
+@socketio.on("onboard_pose")
+def handle_onboard_pose(data):
+    """{"enabled": bool, "tag_size": meters (optional)} - detect tags on the Pi and stream pose instead of video"""
+    try:
+        if not tag_pose_service:
+            emit("onboard_pose_status", {"status": "error", "message": "On-board pose not available"})
+            return
+        data = data or {}
+        if data.get("tag_size"):
+            tag_pose_service.set_tag_size(data["tag_size"])
+        if data.get("enabled"):
+            camera.streamer.share_raw = True
+            result = tag_pose_service.start()
+        else:
+            result = tag_pose_service.stop()
+            camera.streamer.share_raw = False
+        result["enabled"] = tag_pose_service.running
+        result["stats"] = tag_pose_service.get_stats()
+        emit("onboard_pose_status", result, broadcast=True)
+        print(f"[INFO] On-board pose: {result['message']}")
+    except Exception as e:
+        print(f"[ERROR] onboard_pose: {e}")
+        emit("onboard_pose_status", {"status": "error", "message": str(e)})
+
+def start_frame_ring_relay():
+    """Fan out the frames camera.py writes into the shared-memory ring when it is not in-process"""
+    def relay():
+        ring, last_seq, idle = None, 0, 0
+        while True:
+            if ring is None:
+                try:
+                    ring = FrameRing(FRAME_RING_NAME)
+                    ring.register_reader()
+                    last_seq, idle = ring.write_seq, 0
+                    print("[INFO] Attached to the camera frame ring")
+                except (FileNotFoundError, ValueError):
+                    time.sleep(2.0)
+                    continue
+            seq = ring.wait(last_seq, timeout=1.0)
+            if seq is None:
+                idle += 1
+                if idle >= 5:  # camera.py may have restarted with a new ring
+                    ring.close()
+                    ring = None
+                continue
+            last_seq, idle = seq, 0  # Behind? Skip to the newest frame
+            recording = session_recorder is not None and session_recorder.wants("frame")
+            if not telemetry_hub.has_subscribers("frame") and not recording:
+                continue
+            frame = ring.read(seq)
+            if frame is None:
+                continue
+            data = frame.tobytes()  # The only copy: Socket.IO needs bytes, every room shares this one
+            frame.release()
+            if data is not None:
+                record_session("frame", data)
+                telemetry_hub.publish("frame", data)
+
+    threading.Thread(target=relay, daemon=True).start()
+
 @socketio.on('start_camera')
 def handle_start_camera():
     try:
         # Simply relay the command to camera.py
-        emit('start_camera', {}, broadcast=True)
+        relay_to_services('start_camera', {})
         print("[INFO] Start camera command relayed to camera.py")
     except Exception as e:
         print(f"[ERROR] start_camera: {e}")
@@ -122,7 +325,7 @@ def handle_start_camera():
 def handle_stop_camera():
     try:
         # Simply relay the command to camera.py  
-        emit('stop_camera', {}, broadcast=True)
+        relay_to_services('stop_camera', {})
         print("[INFO] Stop camera command relayed to camera.py")
     except Exception as e:
         print(f"[ERROR] stop_camera: {e}")
@@ -130,13 +333,14 @@ def handle_stop_camera():
 @socketio.on('camera_config')
 def handle_camera_config(data):
     try:
-        emit('camera_config', data, broadcast=True)
+        relay_to_services('camera_config', data)
     except Exception as e:
         print(f"[ERROR] camera_config: {e}")
 
 
 # --- CAMERA-ONLY PAYLOAD BROADCAST ---
 @socketio.on("camera_info")
+@service_bus.on("camera_info")
 def on_camera_info(data):
     """Handle camera-only payload: status, fps, frame size"""
     try:
@@ -162,12 +366,13 @@ def on_camera_info(data):
             "frame_size": data.get("frame_size", 0),
             "status": camera_status_from_info  # Include the OK/Error status
         }
-        emit("camera_payload_broadcast", payload_data, broadcast=True)
+        telemetry_hub.publish("camera_payload", payload_data)
     except Exception as e:
         print("Camera info error:", e)
 
 # --- LIDAR-ONLY PAYLOAD BROADCAST ---
 @socketio.on("lidar_info")
+@service_bus.on("lidar_info")
 def on_lidar_info(data):
     """Handle lidar-only payload: status and frequency"""
     try:
@@ -188,7 +393,7 @@ def on_lidar_info(data):
             "collection_rate_hz": data.get("collection_rate_hz", 0),
             "status": lidar_status_from_info  # Include the OK/Error status
         }
-        emit("lidar_payload_broadcast", payload_data, broadcast=True)
+        telemetry_hub.publish("lidar_payload", payload_data)
     except Exception as e:
         print("Lidar info error:", e)
 
@@ -196,7 +401,7 @@ def on_lidar_info(data):
 def handle_set_camera_idle():
     try:
         # Simply relay the command to camera.py
-        emit('set_camera_idle', {}, broadcast=True)
+        relay_to_services('set_camera_idle', {})
         print("[INFO] Set camera idle command relayed to camera.py")
     except Exception as e:
         print(f"[ERROR] set_camera_idle: {e}")
@@ -213,7 +418,9 @@ def handle_capture_image(data):
         # Broadcast the result to all connected clients
         emit("image_captured", result, broadcast=True)
         if result["success"]:
-            print(f"[INFO] ✓ Image captured successfully: {result['path']} ({result['size_mb']} MB)")
+            latency = result.get("latency_ms")
+            latency_info = f", {latency['total']:.0f} ms capture-to-disk" if latency else ""
+            print(f"[INFO] ✓ Image captured successfully: {result['path']} ({result['size_mb']} MB{latency_info})")
         else:
             print(f"[ERROR] ❌ Image capture failed: {result['error']}")
     except Exception as e:
@@ -226,14 +433,29 @@ def handle_capture_image(data):
 
 @socketio.on('download_image')
 def handle_download_image(data):
-    """Send captured image to client for local storage"""
+    """Send captured image to client for local storage (chunked, resumable from data["offset"])"""
     try:
         import os
         import base64
         server_path = data.get("server_path")
         filename = data.get("filename")
         print(f"[INFO] Image download requested: {filename}")
-        if os.path.exists(server_path):
+        if not os.path.exists(server_path):
+            emit("image_download", {
+                "success": False,
+                "error": f"Image not found: {server_path}"
+            })
+            print(f"[ERROR] Image file not found: {server_path}")
+        elif image_sender:
+            sid = request.sid
+            image_sender.start(sid, server_path, filename,
+                               lambda event, payload: socketio.emit(event, payload, to=sid),
+                               offset=data.get("offset", 0), sha256=data.get("sha256"))
+            size = os.path.getsize(server_path)
+            offset = data.get("offset") or 0
+            resume_info = f" from {offset/1024:.1f} KB" if offset else ""
+            print(f"[INFO] 📤 Streaming image to client: {filename} ({size/1024:.1f} KB{resume_info})")
+        else:
             # Read the image file
             with open(server_path, 'rb') as f:
                 image_data = f.read()
@@ -247,12 +469,6 @@ def handle_download_image(data):
                 "size": len(image_data)
             })
             print(f"[INFO] 📤 Sent image to client: {filename} ({len(image_data)/1024:.1f} KB)")
-        else:
-            emit("image_download", {
-                "success": False,
-                "error": f"Image not found: {server_path}"
-            })
-            print(f"[ERROR] Image file not found: {server_path}")
     except Exception as e:
         print(f"[ERROR] download_image handler: {e}")
         emit("image_download", {
@@ -260,6 +476,68 @@ def handle_download_image(data):
             "error": str(e)
         })
 
+@socketio.on('image_chunk_ack')
+def handle_image_chunk_ack(data):
+    """Client has everything before next_offset; opens the send window"""
+    if image_sender:
+        image_sender.ack(data.get("transfer_id"), data.get("next_offset", 0))
+
+@socketio.on('image_transfer_done')
+def handle_image_transfer_done(data):
+    """Client verified (or rejected) the downloaded file"""
+    if data.get("success"):
+        print(f"[INFO] ✓ Client saved {data.get('filename')} ({data.get('rate_mbps', 0):.2f} MB/s)")
+    else:
+        print(f"[ERROR] Client rejected {data.get('filename')}: {data.get('error')}")
+
+
+@socketio.on('session_recording')
+def handle_session_recording(data):
+    """{"enabled": bool, "topics": [...] (optional)} - start/stop the on-board session recorder"""
+    try:
+        if not session_recorder:
+            emit("session_recording_status", {"status": "error", "message": "Session recorder not available"})
+            return
+        data = data or {}
+        if data.get("enabled"):
+            result = session_recorder.start(data.get("topics") or SESSION_TOPICS)
+        else:
+            result = session_recorder.stop()
+        result["recording"] = session_recorder.active
+        result["stats"] = session_recorder.get_stats()
+        emit("session_recording_status", result, broadcast=True)
+        print(f"[INFO] Session recorder: {result['message']}")
+    except Exception as e:
+        print(f"[ERROR] session_recording: {e}")
+        emit("session_recording_status", {"status": "error", "message": str(e)})
+
+@socketio.on('list_sessions')
+def handle_list_sessions(data=None):
+    try:
+        sessions = list_sessions(session_recorder.directory) if session_recorder else []
+        emit("session_list", {"sessions": sessions})
+    except Exception as e:
+        print(f"[ERROR] list_sessions: {e}")
+        emit("session_list", {"sessions": [], "error": str(e)})
+
+@socketio.on('fetch_session')
+def handle_fetch_session(data):
+    """One page of a recorded session: {session, start, end, topics, cursor} -> session_page.
+
+    The client asks for the next page with the returned cursor, so the link sets the pace.
+    """
+    import os
+    try:
+        name = os.path.basename(data.get("session", ""))
+        reader = SessionReader(os.path.join(session_recorder.directory, name))
+        cursor = data.get("cursor")
+        page = reader.read_page(data.get("start"), data.get("end"), data.get("topics"),
+                                tuple(cursor) if cursor else None)
+        page.update({"session": name, "request": data})
+        emit("session_page", page)
+    except Exception as e:
+        print(f"[ERROR] fetch_session: {e}")
+        emit("session_page", {"session": data.get("session"), "error": str(e), "cursor": None})
 
 # Removed all other payload update handlers. Only camera_info and lidar_info are used for payload updates.
 
@@ -269,9 +547,13 @@ def handle_download_image(data):
 
 def start_background_tasks():
     """Start background tasks with a delay to ensure server is ready"""
+    telemetry_hub.start()
+
     def delayed_start():
         time.sleep(2)  # Give the server time to start
         print("\n[INFO] Starting background tasks...")
+        if FRAME_RING_AVAILABLE and SERVICE_LINK != "in_process":
+            start_frame_ring_relay()
         threading.Thread(target=camera.start_stream, daemon=True).start()
         threading.Thread(target=sensors.start_sensors, daemon=True).start()
         threading.Thread(target=lidar.start_lidar, daemon=True).start()
@@ -288,9 +570,13 @@ def start_background_tasks():
             start_adcs_broadcast()
             logging.info("ADCS controller initialized and broadcasting started")
         
-        # Start thermal data broadcasting
+        # Publish I2C bus health once the bus users are running
+        if I2C_ARBITER_AVAILABLE:
+            start_i2c_stats_broadcast()
+        
+        # Thermal data is published whenever a temperature source updates; send the initial state
         if TEMPERATURE_AVAILABLE or ADCS_AVAILABLE:  # Start if we have any temperature source
-            start_thermal_broadcast()
+            thermal_data_broadcast()
             logging.info("Thermal data broadcasting started")
         
         # Do NOT start communication monitoring here; start on client connect
@@ -308,11 +594,12 @@ def handle_connect():
         
         print(f"[INFO] Client connected: {request.sid}")
         connected_clients.add(request.sid)
+        telemetry_hub.subscribe(request.sid)  # All topics until the client narrows it down
         print(f"[DEBUG] Total connected clients: {len(connected_clients)}")
         
         # Request current status from camera and lidar subsystems
-        emit('camera_update', {}, broadcast=True)
-        emit('lidar_update', {}, broadcast=True)
+        relay_to_services('camera_update', {})
+        relay_to_services('lidar_update', {})
         print("[INFO] Status update requests sent to camera and lidar subsystems")
         
         # Start communication monitoring if not already running
@@ -343,6 +630,9 @@ def handle_disconnect():
         
         print(f"[INFO] Client disconnected: {request.sid}")
         connected_clients.discard(request.sid)
+        telemetry_hub.unsubscribe(request.sid)
+        if image_sender:
+            image_sender.cancel(request.sid)  # The client resumes from its .part file on reconnect
         
         print(f"[DEBUG] Clients after removal: {len(connected_clients)}")
         print(f"[DEBUG] Remaining client SIDs: {list(connected_clients)}")
@@ -359,6 +649,22 @@ def handle_disconnect():
         import traceback
         traceback.print_exc()
 
+@socketio.on("subscribe_topics")
+def handle_subscribe_topics(data):
+    """Client picks the topics it displays and how fast it wants them.
+
+    {"topics": [...]} at each topic's own rate, {"topics": {"adcs": 5, ...}} with a
+    max rate in Hz per topic (null = topic rate), or {"topics": null} for everything.
+    Replies with the negotiated rates: {"topics": {name: Hz or null}}.
+    """
+    try:
+        topics = telemetry_hub.subscribe(request.sid, (data or {}).get("topics"))
+        emit("subscribed_topics", {"topics": topics})
+        summary = ', '.join(f"{name}@{rate}Hz" if rate else name for name, rate in topics.items())
+        print(f"[INFO] Client {request.sid} subscribed to: {summary or 'nothing'}")
+    except Exception as e:
+        print(f"[ERROR] subscribe_topics: {e}")
+
 @socketio.on("adcs_command")
 def handle_adcs_command(data):
     try:
@@ -390,6 +696,8 @@ def handle_adcs_command(data):
             "mode": mode,
             "command": command
         }
+        if "data" in result:
+            response_data["data"] = result["data"]  # e.g. autotune model / gains, control_stats
         
         print(f"[DEBUG] Sending ADCS response: {response_data}")
         emit("adcs_command_ack", response_data, broadcast=True)
@@ -410,6 +718,7 @@ def handle_adcs_command(data):
         emit("adcs_command_ack", error_response, broadcast=True)
 
 @socketio.on("sensor_data")
+@service_bus.on("sensor_data")
 def handle_sensor_data(data):
     global latest_pi_temp
     try:
@@ -437,7 +746,8 @@ def handle_sensor_data(data):
             "status": data.get("status")   # Smart system status
         }
         
-        emit("sensor_broadcast", enhanced_data, broadcast=True)
+        telemetry_hub.publish("sensor", enhanced_data)
+        thermal_data_broadcast()
         
         # Log sensor data periodically (every 60 seconds)
         if not hasattr(handle_sensor_data, 'last_log') or time.time() - handle_sensor_data.last_log > 60:
@@ -452,19 +762,21 @@ def handle_sensor_data(data):
     except Exception as e:
         print(f"[ERROR] sensor_data: {e}")
         # Send basic data on error to maintain connectivity
-        emit("sensor_broadcast", {
+        telemetry_hub.publish("sensor", {
             "temperature": data.get("temperature", 0),
             "cpu_percent": data.get("cpu_percent", 0),
             "memory_percent": None,
             "uptime": "Error",
             "status": "Unknown"
-        }, broadcast=True)
+        })
 
 @socketio.on("lidar_data")
+@service_bus.on("lidar_data")
 def handle_lidar_data(data):
     try:
         if "distance_cm" in data and data["distance_cm"] is not None:
-            emit("lidar_broadcast", data, broadcast=True)
+            record_session("lidar", data)
+            telemetry_hub.publish("lidar", data)
     except Exception as e:
         print(f"[ERROR] lidar_data: {e}")
 
@@ -472,7 +784,7 @@ def handle_lidar_data(data):
 @socketio.on("tachometer_data")
 def handle_tachometer_data(data):
     try:
-        emit("tachometer_broadcast", data, broadcast=True)
+        telemetry_hub.publish("tachometer", data)
     except Exception as e:
         print(f"[ERROR] tachometer_data: {e}")
 
@@ -501,9 +813,41 @@ def handle_stop_lidar():
 
 
 
+def i2c_stats_callback(stats):
+    """Broadcast bus arbiter statistics (called from the arbiter worker every second)"""
+    try:
+        latency = stats.get('latency', {})
+        control = latency.get('control', {})
+        telemetry = latency.get('telemetry', {})
+        telemetry_hub.publish("i2c_bus", {
+            "utilisation": f"{stats['utilisation'] * 100:.1f}",
+            "queue_depth": stats['queue_depth'],
+            "control_latency_ms": f"{control.get('mean_ms', 0.0):.2f}",
+            "control_latency_max_ms": f"{control.get('max_ms', 0.0):.2f}",
+            "telemetry_latency_ms": f"{telemetry.get('mean_ms', 0.0):.2f}",
+            "telemetry_latency_max_ms": f"{telemetry.get('max_ms', 0.0):.2f}",
+            "transactions": stats['transactions'],
+            "coalesced_reads": stats['coalesced_reads'],
+            "errors": stats['errors'],
+            "timeouts": stats['timeouts'],
+        })
+    except Exception as e:
+        print(f"[ERROR] I2C stats broadcast: {e}")
+
+def start_i2c_stats_broadcast():
+    """Attach the stats callback to the shared bus arbiter"""
+    try:
+        get_shared_arbiter(1).set_stats_callback(i2c_stats_callback, interval=1.0)
+        logging.info("I2C bus statistics broadcasting started")
+    except Exception as e:
+        logging.warning(f"I2C bus arbiter could not be started: {e}")
+
 def power_data_callback(power_data):
     try:
-        if power_data.get('status') in ['Disconnected', 'Error - Disconnected', 'Error']:
+        # Readings that failed arrive as "error" - publish that rather than nothing (a stale panel)
+        readable = all(isinstance(power_data.get(key), (int, float)) for key in
+                       ('current_ma', 'voltage_v', 'power_mw', 'energy_j', 'temperature_c', 'battery_percentage'))
+        if power_data.get('status') in ['Disconnected', 'Error - Disconnected', 'Error'] or not readable:
             formatted_data = {
                 "current": "0.000",
                 "voltage": "0.0", 
@@ -511,7 +855,8 @@ def power_data_callback(power_data):
                 "energy": "0.00",
                 "temperature": "0.0",
                 "battery_percentage": 0,
-                "status": "Disconnected"
+                "status": "Disconnected" if power_data.get('status') in ['Disconnected', 'Error - Disconnected']
+                          else "Sensor Error"
             }
         else:
             # Map power.py status to client-friendly status
@@ -540,8 +885,12 @@ def power_data_callback(power_data):
                 "battery_percentage": power_data['battery_percentage'],
                 "status": client_status
             }
+            if 'current_ma_max' in power_data:  # Burst-sampled: peaks within the interval
+                formatted_data["current_max"] = f"{power_data['current_ma_max'] / 1000:.3f}"
+                formatted_data["power_max"] = f"{power_data['power_mw_max'] / 1000:.2f}"
         # Print the full dictionary being sent
-        socketio.emit("power_broadcast", formatted_data)
+        record_session("power", formatted_data)
+        telemetry_hub.publish("power", formatted_data)
         import time
         if not hasattr(power_data_callback, 'last_log') or time.time() - power_data_callback.last_log > 10:
             if power_data.get('status') == 'Disconnected':
@@ -564,7 +913,7 @@ def communication_data_callback(comm_data):
             "status": comm_data.get('status', 'Disconnected')
         }
         
-        socketio.emit("communication_broadcast", formatted_data)
+        telemetry_hub.publish("communication", formatted_data)
         
         # Log communication status periodically (every 30 seconds)
         if not hasattr(communication_data_callback, 'last_log') or time.time() - communication_data_callback.last_log > 30:
@@ -573,7 +922,7 @@ def communication_data_callback(comm_data):
     except Exception as e:
         logging.error(f"Error in communication data callback: {e}")
         # Send error state to clients
-        socketio.emit("communication_broadcast", {
+        telemetry_hub.publish("communication", {
             "downlink_frequency": 0.0,
             "data_transmission_rate": 0.0,
             "server_signal_strength": 0,
@@ -592,17 +941,18 @@ def throughput_test_callback(event_type, data):
         logging.error(f"Error in throughput test callback: {e}")
 
 def adcs_data_broadcast():
-    """Broadcast ADCS data at 20Hz"""
+    """Publish ADCS data (called from the ADCS data thread ADCS_BROADCAST_HZ times a second)"""
     global latest_payload_temp
     
     if not adcs_controller:
         return
     
     try:
-        # Check if we have connected clients before broadcasting
-        if len(connected_clients) == 0:
+        if ADCS_TELEMETRY_FORMAT == "binary" and ADCS_TELEMETRY_AVAILABLE:
+            adcs_telemetry_batch_broadcast()
+            thermal_data_broadcast()
             return
-            
+
         adcs_data = adcs_controller.get_adcs_data_for_server()
         
         # Extract payload temperature from ADCS data
@@ -613,7 +963,10 @@ def adcs_data_broadcast():
         except:
             latest_payload_temp = None
         
-        socketio.emit("adcs_broadcast", adcs_data)
+        thermal_data_broadcast()
+        record_session("adcs", adcs_data)
+        if telemetry_hub.has_subscribers("adcs"):
+            telemetry_hub.publish("adcs", adcs_data)
         
         # Log ADCS data periodically (every 10 seconds)
         if not hasattr(adcs_data_broadcast, 'last_log') or time.time() - adcs_data_broadcast.last_log > 10:
@@ -633,8 +986,8 @@ def adcs_data_broadcast():
         
         # Send error state to clients
         try:
-            if len(connected_clients) > 0:
-                socketio.emit("adcs_broadcast", {
+            if telemetry_hub.has_subscribers("adcs"):
+                telemetry_hub.publish("adcs", {
                     "gyro": "0.0°",
                     "orientation": "Y:0.0° R:0.0° P:0.0°",
                     "gyro_rate_x": "0.00", "gyro_rate_y": "0.00", "gyro_rate_z": "0.00",
@@ -647,34 +1000,40 @@ def adcs_data_broadcast():
         except Exception as emit_error:
             print(f"[ERROR] Failed to emit error state: {emit_error}")
 
+def adcs_telemetry_batch_broadcast():
+    """Ship every new ADCS sample (or a decimated subset) as binary frames"""
+    global latest_payload_temp, adcs_last_seq
+
+    if adcs_controller.telemetry_ring.last_seq < adcs_last_seq:
+        adcs_last_seq = 0  # Controller was reinitialised, sequence restarted
+    records = adcs_controller.get_telemetry_since(adcs_last_seq, limit=ADCS_TELEMETRY_BACKLOG)
+    if len(records) == 0:
+        return
+    adcs_last_seq = int(records['seq'][-1])
+    latest_payload_temp = float(records['temp'][-1])
+    if session_recorder and session_recorder.wants("adcs"):
+        for frame in adcs_telemetry.chunk_frames(records, ADCS_TELEMETRY_CHUNK):
+            session_recorder.record("adcs", frame)  # Every sample, before any decimation
+    if not telemetry_hub.has_subscribers("adcs"):
+        return
+
+    if ADCS_TELEMETRY_RATE_HZ:
+        stride = max(1, round(ADCS_SAMPLE_RATE / ADCS_TELEMETRY_RATE_HZ))
+        records = records[records['seq'] % stride == 0]
+    for frame in adcs_telemetry.chunk_frames(records, ADCS_TELEMETRY_CHUNK):
+        telemetry_hub.publish("adcs", frame)
+
 def start_adcs_broadcast():
-    """Start ADCS data broadcasting at 20Hz"""
+    """Publish ADCS data from the ADCS data thread, ADCS_BROADCAST_HZ times a second"""
     if not adcs_controller:
         print("[DEBUG] ADCS controller not available, skipping broadcast setup")
         return
     
-    def adcs_broadcast_loop():
-        print("[DEBUG] ADCS broadcast loop started")
-        loop_count = 0
-        while True:
-            try:
-                adcs_data_broadcast()
-                loop_count += 1
-                
-                # Print debug info every 200 loops (10 seconds at 20Hz)
-                if loop_count % 200 == 0:
-                    print(f"[DEBUG] ADCS broadcast loop running, count: {loop_count}, clients: {len(connected_clients)}")
-                
-                time.sleep(0.05)  # 20Hz = 50ms interval
-            except Exception as e:
-                print(f"[ERROR] Error in ADCS broadcast loop: {e}")
-                import traceback
-                traceback.print_exc()
-                time.sleep(1)  # Wait 1 second on error before retrying
-    
-    threading.Thread(target=adcs_broadcast_loop, daemon=True).start()
-    print("[DEBUG] ADCS data broadcasting thread started at 20Hz")
-    logging.info("ADCS data broadcasting started at 20Hz")
+    # No polling loop: the data thread hands over each chunk as soon as it is complete
+    every = max(1, round(ADCS_SAMPLE_RATE / ADCS_BROADCAST_HZ))
+    adcs_controller.set_telemetry_callback(adcs_data_broadcast, every=every)
+    print(f"[DEBUG] ADCS data broadcasting every {every} samples ({ADCS_BROADCAST_HZ}Hz)")
+    logging.info(f"ADCS data broadcasting started at {ADCS_BROADCAST_HZ}Hz")
 
 # Global variables to store latest temperature data
 latest_battery_temp = None
@@ -723,7 +1082,7 @@ def determine_thermal_status(battery_temp, pi_temp, payload_temp):
         return "Nominal"
 
 def thermal_data_broadcast():
-    """Broadcast thermal data combining all temperature sources"""
+    """Publish thermal data combining all temperature sources (call whenever one of them changes)"""
     global latest_battery_temp, latest_pi_temp, latest_payload_temp
     
     try:
@@ -740,7 +1099,7 @@ def thermal_data_broadcast():
             "status": status
         }
         
-        socketio.emit("thermal_broadcast", thermal_data)
+        telemetry_hub.publish("thermal", thermal_data)
         
         # Log thermal data periodically (every 30 seconds)
         if not hasattr(thermal_data_broadcast, 'last_log') or time.time() - thermal_data_broadcast.last_log > 30:
@@ -751,27 +1110,13 @@ def thermal_data_broadcast():
     except Exception as e:
         logging.error(f"Error in thermal data broadcast: {e}")
         # Send error state to clients
-        socketio.emit("thermal_broadcast", {
+        telemetry_hub.publish("thermal", {
             "battery_temp": "Error",
             "pi_temp": "Error", 
             "payload_temp": "Error",
             "status": "Error"
         })
 
-def start_thermal_broadcast():
-    """Start thermal data broadcasting at 2Hz"""
-    def thermal_broadcast_loop():
-        while True:
-            try:
-                thermal_data_broadcast()
-                time.sleep(0.5)  # 2Hz = 500ms interval
-            except Exception as e:
-                logging.error(f"Error in thermal broadcast loop: {e}")
-                time.sleep(1)  # Wait 1 second on error before retrying
-    
-    threading.Thread(target=thermal_broadcast_loop, daemon=True).start()
-    logging.info("Thermal data broadcasting started at 2Hz")
-
 @socketio.on('latency_response')
 def handle_latency_response(data):
     """Handle latency measurement response from client"""
@@ -815,6 +1160,7 @@ def handle_get_battery_temp():
         sensor = W1ThermSensor(sensor_id=BATTERY_SENSOR_ID)
         temp_c = sensor.get_temperature()
         latest_battery_temp = temp_c  # update global for next broadcast
+        thermal_data_broadcast()
         emit("battery_temp_response", {
             "success": True,
             "battery_temp": round(temp_c, 1)
@@ -840,7 +1186,7 @@ def handle_power_data(data):
 def handle_request_camera_update():
     """Manual request for camera status update"""
     try:
-        emit('camera_update', {}, broadcast=True)
+        relay_to_services('camera_update', {})
         print("[INFO] Camera status update requested manually")
     except Exception as e:
         print(f"[ERROR] request_camera_update: {e}")
@@ -849,7 +1195,7 @@ def handle_request_camera_update():
 def handle_request_lidar_update():
     """Manual request for lidar status update"""
     try:
-        emit('lidar_update', {}, broadcast=True)
+        relay_to_services('lidar_update', {})
         print("[INFO] Lidar status update requested manually")
     except Exception as e:
         print(f"[ERROR] request_lidar_update: {e}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+🔌 SERVICE LINK - in-process path between the Pi sensor services and server2
+camera.py, lidar.py and sensors.py were written as Socket.IO clients of the
+server on the same Pi. When server2 imports them they now hand their data
+straight to its handlers instead of going out and back over loopback TCP.
+- ServiceClient: the part of socketio.Client the services use (on, event, emit,
+  connect, disconnect). In-process once server2 has enabled the bus, a real
+  Socket.IO client otherwise (standalone mode is unchanged)
+- ServiceBus: events from services call the server handlers directly on the
+  service's thread (no JSON, no copies); server commands call the services' handlers
+"""
+import threading
+
+try:
+    import socketio
+    SOCKETIO_AVAILABLE = True
+except ImportError:
+    socketio = None
+    SOCKETIO_AVAILABLE = False
+
+class ServiceBus:
+    """Server side of the in-process link"""
+
+    def __init__(self):
+        self.enabled = False
+        self.server_handlers = {}  # event from a service -> server handler
+        self.clients = []          # In-process ServiceClients
+        self.lock = threading.Lock()
+        self.delivered = 0
+        self.unhandled = 0
+
+    def enable(self):
+        """Services connecting after this call stay in-process"""
+        self.enabled = True
+
+    def on(self, event):
+        """Register a server handler for an event the services emit (stacks with @socketio.on)"""
+        def decorator(handler):
+            self.server_handlers[event] = handler
+            return handler
+        return decorator
+
+    def attach(self, client):
+        with self.lock:
+            if client not in self.clients:
+                self.clients.append(client)
+
+    def detach(self, client):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def publish(self, event, data=None):
+        """Service -> server: run the server handler now, on the caller's thread"""
+        handler = self.server_handlers.get(event)
+        if handler is None:
+            self.unhandled += 1  # e.g. subscribe_topics - meaningless without a socket
+            return
+        self.delivered += 1
+        try:
+            handler(data)
+        except Exception as e:
+            print(f"[ERROR] Service event {event}: {e}")
+
+    def dispatch(self, event, data=None, wait=False):
+        """Server -> services: deliver a command to every in-process service that handles it.
+
+        Runs on its own thread like a Socket.IO client callback, so a slow
+        handler (camera reconfigure) does not hold up the server handler.
+        """
+        with self.lock:
+            clients = [c for c in self.clients if event in c.handlers]
+        for client in clients:
+            if wait:
+                client._deliver(event, data)
+            else:
+                threading.Thread(target=client._deliver, args=(event, data), daemon=True).start()
+
+bus = ServiceBus()
+
+class ServiceClient:
+    """Drop-in for the socketio.Client the services create at import time"""
+
+    def __init__(self, service_bus=None):
+        self.bus = service_bus or bus
+        self.handlers = {}
+        self.sio = None        # Real Socket.IO client in standalone mode
+        self.in_process = False
+        self._connected = False
+
+    # ── HANDLER REGISTRATION ───────────────────────────────────────────
+    def on(self, event, handler=None):
+        def decorator(fn):
+            self.handlers[event] = fn
+            if self.sio is not None:
+                self.sio.on(event, fn)
+            return fn
+        return decorator(handler) if handler else decorator
+
+    def event(self, handler):
+        return self.on(handler.__name__)(handler)
+
+    # ── CONNECTION ─────────────────────────────────────────────────────
+    @property
+    def connected(self):
+        return self.sio.connected if self.sio is not None else self._connected
+
+    def connect(self, url, **kwargs):
+        if self.bus.enabled:
+            self.in_process = True
+            self._connected = True
+            self.bus.attach(self)
+            self._deliver("connect")
+            return
+        if not SOCKETIO_AVAILABLE:
+            raise ConnectionError("python-socketio is not installed and the in-process bus is not enabled")
+        if self.sio is None:
+            self.sio = socketio.Client()
+            for event, fn in self.handlers.items():
+                self.sio.on(event, fn)
+        self.sio.connect(url, **kwargs)
+
+    def disconnect(self):
+        if self.in_process:
+            self.bus.detach(self)
+            self._connected = False
+            self._deliver("disconnect")
+        elif self.sio is not None:
+            self.sio.disconnect()
+
+    # ── EVENTS ─────────────────────────────────────────────────────────
+    def emit(self, event, data=None):
+        if self.in_process:
+            self.bus.publish(event, data)
+        elif self.sio is not None:
+            self.sio.emit(event, data)
+        else:
+            raise ConnectionError("Service is not connected")
+
+    def _deliver(self, event, data=None):
+        handler = self.handlers.get(event)
+        if handler is None:
+            return
+        try:
+            handler() if event in ("connect", "disconnect") else handler(data)
+        except Exception as e:
+            print(f"[ERROR] Service handler {event}: {e}")
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+🧪 SIMULATED HARDWARE - register-level stand-ins for the Pi peripherals
+Lets the ADCS / payload code run on a PC without the real sensors attached.
+- SimulatedSMBus: smbus2.SMBus-compatible bus that routes to device models
+- SimulatedMPU6050: MPU6050 register model with a FIFO filled at the configured rate
+- SimulatedTCA9548A / SimulatedVEML7700: lux sensors behind the I2C multiplexer
+- SimulatedLidarLite: LIDAR-Lite v3 register model measuring a synthetic distance signal
+- SimulatedINA228: INA228 power monitor register model driven by current / voltage profiles
+- SimulatedRegisterDevice: plain register file for any other I2C peripheral
+
+Every model takes a `clock` callable (default time.monotonic) so it can be
+driven by a simulated clock and run faster than real time.
+"""
+import math
+import random
+import time
+from collections import deque
+
+# ── SIMULATED I2C BUS ──────────────────────────────────────────────────
+class SimulatedSMBus:
+    """Drop-in replacement for smbus2.SMBus that talks to device models.
+
+    Devices are attached by address and must implement read_register(reg),
+    write_register(reg, value) and may implement read_block(reg, length).
+    `byte_time` > 0 makes every transaction take real time (address + register
+    + data bytes), which is what the bus arbiter needs to see contention.
+    """
+
+    def __init__(self, bus_number=1, byte_time=0.0):
+        self.bus_number = bus_number
+        self.byte_time = byte_time
+        self.devices = {}
+        self.transactions = 0
+
+    def _occupy(self, data_bytes):
+        if self.byte_time:
+            time.sleep((2 + data_bytes) * self.byte_time)
+
+    def attach(self, address, device):
+        self.devices[address] = device
+        return device
+
+    def _device(self, address):
+        device = self.devices.get(address)
+        if device is None:
+            raise OSError(121, f"Remote I/O error (no device at 0x{address:02x})")
+        return device
+
+    def read_byte_data(self, address, register):
+        self.transactions += 1
+        self._occupy(1)
+        return self._device(address).read_register(register) & 0xFF
+
+    def write_byte_data(self, address, register, value):
+        self.transactions += 1
+        self._occupy(1)
+        self._device(address).write_register(register, value & 0xFF)
+
+    def read_i2c_block_data(self, address, register, length):
+        self.transactions += 1
+        self._occupy(length)
+        device = self._device(address)
+        if hasattr(device, "read_block"):
+            return list(device.read_block(register, length))
+        return [device.read_register(register + i) & 0xFF for i in range(length)]
+
+    def write_i2c_block_data(self, address, register, data):
+        self.transactions += 1
+        self._occupy(len(data))
+        device = self._device(address)
+        for i, value in enumerate(data):
+            device.write_register(register + i, value & 0xFF)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class SimulatedRegisterDevice:
+    """Generic I2C peripheral: a register file that reads back what was written"""
+
+    def __init__(self, registers=None):
+        self.registers = dict(registers or {})
+
+    def read_register(self, register):
+        return self.registers.get(register, 0)
+
+    def write_register(self, register, value):
+        self.registers[register] = value
+
+# ── MPU6050 REGISTER MODEL ─────────────────────────────────────────────
+MPU_REG_SMPLRT_DIV = 0x19
+MPU_REG_CONFIG = 0x1A
+MPU_REG_GYRO_CONFIG = 0x1B
+MPU_REG_FIFO_EN = 0x23
+MPU_REG_INT_ENABLE = 0x38
+MPU_REG_INT_STATUS = 0x3A
+MPU_REG_TEMP_OUT_H = 0x41
+MPU_REG_GYRO_XOUT_H = 0x43
+MPU_REG_USER_CTRL = 0x6A
+MPU_REG_PWR_MGMT_1 = 0x6B
+MPU_REG_FIFO_COUNTH = 0x72
+MPU_REG_FIFO_COUNTL = 0x73
+MPU_REG_FIFO_R_W = 0x74
+
+MPU_FIFO_SIZE = 1024
+MPU_GYRO_LSB_PER_DPS = 131.0  # ±250°/s full scale
+
+def _to_int16_bytes(value):
+    raw = int(round(value))
+    raw = max(-32768, min(32767, raw))
+    raw &= 0xFFFF
+    return [(raw >> 8) & 0xFF, raw & 0xFF]
+
+class SimulatedMPU6050:
+    """MPU6050 register model driven by a true angular-rate profile.
+
+    `rate_fn(t)` returns the true (x, y, z) angular rate in °/s at time t.
+    `bias` is added to every gyro sample and `noise_std` adds white noise.
+    The FIFO is filled lazily whenever the bus touches the device, one gyro
+    sample per hardware sample period, exactly like the real part.
+    """
+
+    def __init__(self, rate_fn=None, bias=(0.0, 0.0, 0.0), noise_std=0.0,
+                 temperature_c=25.0, clock=time.monotonic, rng=None):
+        self.rate_fn = rate_fn or (lambda t: (0.0, 0.0, 0.0))
+        self.bias = bias
+        self.noise_std = noise_std
+        self.temperature_c = temperature_c
+        self.clock = clock
+        self.rng = rng
+        self.registers = {MPU_REG_PWR_MGMT_1: 0x40}  # Sleep bit set at power-up
+        self.fifo = deque()
+        self.overflowed = False
+        self.samples_generated = 0
+        self._last_sample_time = self.clock()
+
+    # Hardware timing ----------------------------------------------------
+    def gyro_output_rate(self):
+        dlpf_cfg = self.registers.get(MPU_REG_CONFIG, 0) & 0x07
+        return 8000.0 if dlpf_cfg in (0, 7) else 1000.0
+
+    def sample_period(self):
+        divider = self.registers.get(MPU_REG_SMPLRT_DIV, 0)
+        return (1 + divider) / self.gyro_output_rate()
+
+    def _gyro_sample(self, t):
+        rates = self.rate_fn(t)
+        sample = []
+        for axis in range(3):
+            value = rates[axis] + self.bias[axis]
+            if self.noise_std and self.rng is not None:
+                value += self.rng.gauss(0.0, self.noise_std)
+            elif self.noise_std:
+                import random
+                value += random.gauss(0.0, self.noise_std)
+            sample.append(value)
+        return sample
+
+    def _advance(self):
+        """Generate every sample that the hardware would have produced by now."""
+        now = self.clock()
+        period = self.sample_period()
+        if self.registers.get(MPU_REG_PWR_MGMT_1, 0) & 0x40:
+            self._last_sample_time = now
+            return
+        fifo_running = (self.registers.get(MPU_REG_USER_CTRL, 0) & 0x40) and \
+                       (self.registers.get(MPU_REG_FIFO_EN, 0) & 0x70)
+        while self._last_sample_time + period <= now:
+            self._last_sample_time += period
+            self.samples_generated += 1
+            if not fifo_running:
+                continue
+            sample = self._gyro_sample(self._last_sample_time)
+            packet = []
+            for value in sample:
+                packet.extend(_to_int16_bytes(value * MPU_GYRO_LSB_PER_DPS))
+            for byte in packet:
+                if len(self.fifo) >= MPU_FIFO_SIZE:
+                    self.fifo.popleft()  # Oldest data is lost on overflow
+                    self.overflowed = True
+                self.fifo.append(byte)
+
+    # Register interface -------------------------------------------------
+    def write_register(self, register, value):
+        self._advance()
+        if register == MPU_REG_USER_CTRL and value & 0x04:
+            self.fifo.clear()  # FIFO_RESET self-clears
+            value &= ~0x04
+        if register == MPU_REG_PWR_MGMT_1 and value & 0x80:
+            self.registers = {MPU_REG_PWR_MGMT_1: 0x40}
+            self.fifo.clear()
+            return
+        self.registers[register] = value
+
+    def read_register(self, register):
+        self._advance()
+        if register == MPU_REG_INT_STATUS:
+            status = 0x10 if self.overflowed else 0x00
+            self.overflowed = False  # Cleared on read
+            return status | 0x01
+        if register in (MPU_REG_FIFO_COUNTH, MPU_REG_FIFO_COUNTL):
+            count = len(self.fifo)
+            return (count >> 8) & 0xFF if register == MPU_REG_FIFO_COUNTH else count & 0xFF
+        if register == MPU_REG_FIFO_R_W:
+            return self.fifo.popleft() if self.fifo else 0
+        if MPU_REG_GYRO_XOUT_H <= register < MPU_REG_GYRO_XOUT_H + 6:
+            sample = self._gyro_sample(self.clock())
+            offset = register - MPU_REG_GYRO_XOUT_H
+            raw = _to_int16_bytes(sample[offset // 2] * MPU_GYRO_LSB_PER_DPS)
+            return raw[offset % 2]
+        if register in (MPU_REG_TEMP_OUT_H, MPU_REG_TEMP_OUT_H + 1):
+            raw = _to_int16_bytes((self.temperature_c - 36.53) * 340.0)
+            return raw[register - MPU_REG_TEMP_OUT_H]
+        return self.registers.get(register, 0)
+
+    def read_block(self, register, length):
+        if register == MPU_REG_FIFO_R_W:
+            self._advance()
+            return [self.fifo.popleft() if self.fifo else 0 for _ in range(length)]
+        return [self.read_register(register + i) for i in range(length)]
+
+# ── TCA9548A MUX + VEML7700 LUX SENSORS ────────────────────────────────
+class SimulatedTCA9548A:
+    """busio.I2C-style object exposing writeto() for mux channel selection"""
+
+    def __init__(self, address=0x70, clock=time.monotonic):
+        self.address = address
+        self.clock = clock
+        self.control = 0x00
+        self.select_count = 0
+
+    def writeto(self, address, buffer, **kwargs):
+        if address != self.address:
+            raise OSError(121, f"Remote I/O error (no device at 0x{address:02x})")
+        self.control = buffer[0] & 0xFF
+        self.select_count += 1
+
+    def selected_channels(self):
+        return [ch for ch in range(8) if self.control & (1 << ch)]
+
+class SimulatedVEML7700:
+    """VEML7700 on one mux channel - reading .lux fails unless its channel is selected.
+
+    `lux_fn(t)` gives the illuminance at time t (on the mux clock); set
+    `fail = True` to make the sensor stop responding.
+    """
+
+    def __init__(self, mux, channel, lux_fn=None):
+        self.mux = mux
+        self.channel = channel
+        self.lux_fn = lux_fn or (lambda t: 0.0)
+        self.fail = False
+        self.read_count = 0
+
+    @property
+    def lux(self):
+        if self.fail or self.mux.selected_channels() != [self.channel]:
+            raise OSError(121, f"Remote I/O error (VEML7700 on channel {self.channel} not selected)")
+        self.read_count += 1
+        return self.lux_fn(self.mux.clock())
+
+# ── LIDAR-LITE V3 REGISTER MODEL ───────────────────────────────────────
+LIDAR_REG_ACQ_COMMAND = 0x00
+LIDAR_REG_STATUS = 0x01
+LIDAR_REG_DISTANCE_HIGH = 0x0F
+LIDAR_REG_DISTANCE_LOW = 0x10
+LIDAR_AUTO_INCREMENT = 0x80       # Register address flag for multi-byte reads
+
+class SimulatedLidarLite:
+    """LIDAR-Lite v3 measuring `distance_fn(t)` (cm) when an acquisition is triggered.
+
+    Writing 0x03 / 0x04 to ACQ_COMMAND latches a measurement (plus Gaussian
+    noise) into the distance registers. With probability `outlier_rate` the
+    reading is a spurious return anywhere in range, with `dropout_rate` it is
+    the sensor's no-return value of 1 cm. Both byte reads and the
+    auto-increment block read (0x8f) are served.
+    """
+
+    def __init__(self, distance_fn=None, noise_std=0.0, outlier_rate=0.0, dropout_rate=0.0,
+                 clock=time.monotonic, rng=None):
+        self.distance_fn = distance_fn or (lambda t: 100.0)
+        self.noise_std = noise_std
+        self.outlier_rate = outlier_rate
+        self.dropout_rate = dropout_rate
+        self.clock = clock
+        self.rng = rng or random.Random(0)
+        self.registers = {LIDAR_REG_DISTANCE_HIGH: 0, LIDAR_REG_DISTANCE_LOW: 1}
+        self.acquisitions = 0
+        self.bias_corrections = 0
+
+    def _measure(self):
+        t = self.clock()
+        roll = self.rng.random()
+        if roll < self.dropout_rate:
+            distance = 1
+        elif roll < self.dropout_rate + self.outlier_rate:
+            distance = self.rng.randint(5, 4000)
+        else:
+            distance = self.distance_fn(t) + self.rng.gauss(0.0, self.noise_std)
+        raw = max(0, min(0xFFFF, int(round(distance))))
+        self.registers[LIDAR_REG_DISTANCE_HIGH] = raw >> 8
+        self.registers[LIDAR_REG_DISTANCE_LOW] = raw & 0xFF
+
+    def write_register(self, register, value):
+        if register == LIDAR_REG_ACQ_COMMAND and value in (0x03, 0x04):
+            self.acquisitions += 1
+            self.bias_corrections += value == 0x04
+            self._measure()
+        else:
+            self.registers[register] = value
+
+    def read_register(self, register):
+        return self.registers.get(register & ~LIDAR_AUTO_INCREMENT, 0)
+
+    def read_block(self, register, length):
+        start = register & ~LIDAR_AUTO_INCREMENT
+        return [self.registers.get(start + i, 0) for i in range(length)]
+
+# ── INA228 REGISTER MODEL ──────────────────────────────────────────────
+INA228_REG_CONFIG = 0x00
+INA228_REG_SHUNT_CAL = 0x02
+INA228_REG_VSHUNT = 0x04
+INA228_REG_VBUS = 0x05
+INA228_REG_DIETEMP = 0x06
+INA228_REG_ENERGY = 0x09
+INA228_REG_MANUFACTURER_ID = 0x3E
+INA228_REG_DEVICE_ID = 0x3F
+INA228_CONFIG_ADCRANGE = 0x10
+INA228_VSHUNT_LSB = (312.5e-9, 78.125e-9)   # V per LSB for ADCRANGE 0 / 1
+INA228_VBUS_LSB = 195.3125e-6               # V per LSB
+INA228_DIETEMP_LSB = 7.8125e-3              # °C per LSB
+INA228_CONVERSION_TIME = 1e-3               # s - energy accumulator update period in the model
+
+class SimulatedINA228:
+    """INA228 measuring `current_fn(t)` (A) through `shunt_ohms` and `voltage_fn(t)` (V).
+
+    Each read returns the value at the time of the read, big-endian, with the
+    20-bit VSHUNT / VBUS results left-aligned in 24 bits as on the real part.
+    ENERGY accumulates V * I every INA228_CONVERSION_TIME in the units set by
+    SHUNT_CAL (default: 10 A full scale). Only the registers a sampler needs are
+    modelled; the rest read as written.
+    """
+
+    def __init__(self, current_fn=None, voltage_fn=None, shunt_ohms=0.015, temperature_c=30.0,
+                 clock=time.monotonic):
+        self.current_fn = current_fn or (lambda t: 0.5)
+        self.voltage_fn = voltage_fn or (lambda t: 7.4)
+        self.shunt_ohms = shunt_ohms
+        self.temperature_c = temperature_c
+        self.clock = clock
+        shunt_cal = int(round(13107.2e6 * (10.0 / 2 ** 19) * shunt_ohms))
+        self.registers = {INA228_REG_CONFIG: 0x0000, INA228_REG_SHUNT_CAL: shunt_cal,
+                          INA228_REG_MANUFACTURER_ID: 0x5449, INA228_REG_DEVICE_ID: 0x2281}
+        self.energy_j = 0.0
+        self._energy_time = None
+        self.reads = 0
+
+    def _accumulate(self, t):
+        """Energy up to t, one conversion at a time (as the hardware does)"""
+        if self._energy_time is None:
+            self._energy_time = t
+        while self._energy_time + INA228_CONVERSION_TIME <= t:
+            self._energy_time += INA228_CONVERSION_TIME
+            self.energy_j += (self.current_fn(self._energy_time) * self.voltage_fn(self._energy_time)
+                              * INA228_CONVERSION_TIME)
+
+    def _value(self, register):
+        """(raw value, byte length) of a register now"""
+        t = self.clock()
+        self._accumulate(t)
+        if register == INA228_REG_VSHUNT:
+            lsb = INA228_VSHUNT_LSB[1 if self.registers[INA228_REG_CONFIG] & INA228_CONFIG_ADCRANGE else 0]
+            raw = int(round(self.current_fn(t) * self.shunt_ohms / lsb))
+            return (max(-(1 << 19), min((1 << 19) - 1, raw)) & 0xFFFFF) << 4, 3
+        if register == INA228_REG_VBUS:
+            return max(0, min((1 << 20) - 1, int(round(self.voltage_fn(t) / INA228_VBUS_LSB)))) << 4, 3
+        if register == INA228_REG_DIETEMP:
+            return int(round(self.temperature_c / INA228_DIETEMP_LSB)) & 0xFFFF, 2
+        if register == INA228_REG_ENERGY:
+            scale = 4 if self.registers[INA228_REG_CONFIG] & INA228_CONFIG_ADCRANGE else 1
+            current_lsb = self.registers[INA228_REG_SHUNT_CAL] / (13107.2e6 * self.shunt_ohms * scale)
+            return min((1 << 40) - 1, int(self.energy_j / (16 * 3.2 * current_lsb))), 5
+        return self.registers.get(register, 0), 2
+
+    def read_block(self, register, length):
+        self.reads += 1
+        value, size = self._value(register)
+        data = value.to_bytes(size, "big")
+        return list(data[:length]) + [0] * max(0, length - size)
+
+    def read_register(self, register):
+        return self.read_block(register, 1)[0]
+
+    def write_register(self, register, value):
+        self.registers[register] = value
+
+# ── SIMULATED CLOCK ────────────────────────────────────────────────────
+class SimClock:
+    """Manually advanced clock for faster-than-real-time simulation."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+        return self.now
+
+def sine_rate_profile(amplitude_dps=30.0, period_s=4.0):
+    """Yaw-only sinusoidal rate profile for exercising the gyro path."""
+    def rate_fn(t):
+        return (0.0, 0.0, amplitude_dps * math.sin(2 * math.pi * t / period_s))
+    return rate_fn
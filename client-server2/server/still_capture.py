@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+📸 STILL CAPTURE - full-resolution stills while the live stream keeps running
+Picamera2 runs one dual-stream configuration: the small "lores" stream feeds the
+video, the full-resolution "main" stream is only copied out when a still is wanted.
+- No stop / reconfigure / settle sleep: a still is the main buffer of the next
+  video request, so the stream does not miss a frame
+- Both streams are YUV420 (lores requires it; full-res main buffers stay 18 MB
+  instead of 47 MB for XRGB8888)
+- Colour conversion, JPEG encoding and the disk write run on a background writer thread
+- Capture-to-disk latency reported per still (wait for frame, encode, write)
+- FakePicamera2 stands in for the camera in the tests
+"""
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    cv2 = None
+    CV2_AVAILABLE = False
+
+STILL_RESOLUTION = (4608, 2592)   # Pi Camera V3 full resolution
+STILL_JPEG_QUALITY = 95
+STILL_BUFFER_COUNT = 3            # Full-res buffers held by the ISP in dual-stream mode
+STILL_TIMEOUT_S = 10.0
+
+def dual_stream_config(picam, video_size, controls, still_size=STILL_RESOLUTION):
+    """Video configuration with lores = live stream and main = stills"""
+    return picam.create_video_configuration(
+        main={"format": "YUV420", "size": tuple(still_size)},
+        lores={"format": "YUV420", "size": tuple(video_size)},
+        buffer_count=STILL_BUFFER_COUNT,
+        controls=controls,
+    )
+
+def yuv420_to_bgr(array):
+    """Picamera2 YUV420 (I420, shape (h*3/2, w)) to BGR"""
+    return cv2.cvtColor(array, cv2.COLOR_YUV2BGR_I420)
+
+class StillRequest:
+    """One pending still; done is set once it is on disk (or failed)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.requested = time.perf_counter()
+        self.grabbed = None
+        self.capture_time = None
+        self.done = threading.Event()
+        self.result = None
+
+class StillCapture:
+    """Queue of still requests served from the live request stream.
+
+    Usage (camera thread):
+        if stills.pending:                               # cheap check per frame
+            stills.serve(request.make_array("main"), capture_time)
+    Usage (caller):
+        result = stills.capture(path)                    # blocks until saved
+    """
+
+    def __init__(self, quality=STILL_JPEG_QUALITY):
+        self.quality = quality
+        self.pending = []
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer.start()
+
+        self.captured = 0
+        self.failed = 0
+        self.last_latency = None
+
+    def request(self, path):
+        still = StillRequest(path)
+        with self.lock:
+            self.pending.append(still)
+        return still
+
+    def serve(self, main_array, capture_time=None):
+        """Hand the current main frame to every waiting request (the array must be a copy)"""
+        with self.lock:
+            waiting, self.pending = self.pending, []
+        now = time.perf_counter()
+        for still in waiting:
+            still.grabbed = now
+            still.capture_time = capture_time
+            self.jobs.put((still, main_array))
+
+    def wait(self, still, timeout=STILL_TIMEOUT_S):
+        if not still.done.wait(timeout):
+            with self.lock:
+                if still in self.pending:
+                    self.pending.remove(still)
+            self.failed += 1
+            return {"success": False, "error": f"No frame for the still within {timeout:.0f}s"}
+        return still.result
+
+    def _writer_loop(self):
+        while True:
+            still, array = self.jobs.get()
+            try:
+                still.result = self._write(still, array)
+                self.captured += 1
+                self.last_latency = still.result.get("latency_ms")
+            except Exception as e:
+                self.failed += 1
+                still.result = {"success": False, "error": str(e)}
+            finally:
+                still.done.set()
+
+    def _write(self, still, array):
+        start = time.perf_counter()
+        image = yuv420_to_bgr(array) if array.ndim == 2 else array
+        if image.ndim == 3 and image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        ok, jpeg = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+        encoded = time.perf_counter()
+        if not ok:
+            return {"success": False, "error": "Failed to encode image"}
+        os.makedirs(os.path.dirname(still.path) or ".", exist_ok=True)
+        with open(still.path, "wb") as f:
+            f.write(jpeg.tobytes())
+        written = time.perf_counter()
+        latency = {
+            "wait_frame": round((still.grabbed - still.requested) * 1000.0, 1),
+            "encode": round((encoded - start) * 1000.0, 1),
+            "write": round((written - encoded) * 1000.0, 1),
+            "total": round((written - still.requested) * 1000.0, 1),
+        }
+        return {
+            "success": True, "path": still.path,
+            "size_mb": round(len(jpeg) / (1024 * 1024), 2),
+            "resolution": [image.shape[1], image.shape[0]],
+            "latency_ms": latency,
+        }
+
+    def capture(self, path, timeout=STILL_TIMEOUT_S):
+        return self.wait(self.request(path), timeout)
+
+    def get_stats(self):
+        return {"captured": self.captured, "failed": self.failed, "pending": len(self.pending),
+                "last_latency_ms": self.last_latency}
+
+# ── FAKE CAMERA ────────────────────────────────────────────────────────
+class _FakeRequest:
+    def __init__(self, camera, frame_index):
+        self.camera = camera
+        self.frame_index = frame_index
+
+    def make_array(self, name):
+        stream = self.camera.config[name]
+        w, h = stream["size"]
+        array = np.empty((h * 3 // 2, w), dtype=np.uint8)
+        array[:h] = (self.frame_index * 7) % 256  # Y plane tracks the frame
+        array[h:] = 128
+        return array
+
+    def get_metadata(self):
+        return {"SensorTimestamp": int(self.camera.frame_times[-1] * 1e9), "ExposureTime": 10000}
+
+    def release(self):
+        pass
+
+class FakePicamera2:
+    """Just enough of Picamera2 for the still path: YUV420 frames at a fixed rate"""
+
+    def __init__(self, fps=10.0):
+        self.period = 1.0 / fps
+        self.config = None
+        self.started = False
+        self.frame_index = 0
+        self.next_frame = time.monotonic()
+        self.frame_times = []
+
+    def create_video_configuration(self, main, lores=None, buffer_count=None, controls=None):
+        config = {"main": dict(main)}
+        if lores:
+            config["lores"] = dict(lores)
+        return config
+
+    def configure(self, config):
+        self.config = config
+
+    def start(self):
+        self.started = True
+        self.next_frame = time.monotonic()
+
+    def stop(self):
+        self.started = False
+
+    def capture_request(self):
+        delay = self.next_frame - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame = max(self.next_frame + self.period, time.monotonic())
+        self.frame_index += 1
+        self.frame_times.append(time.monotonic())
+        return _FakeRequest(self, self.frame_index)
@@ -1,65 +1,179 @@
-import RPi.GPIO as GPIO
+#!/usr/bin/env python3
+"""
+⏱️ TACHOMETER - reaction wheel speed from timestamped tacho edges
+The tacho line raises an edge interrupt (RPi.GPIO event detect) instead of being
+polled, so no pulse is missed however fast the wheel turns.
+- Edge callback only appends a monotonic timestamp to a ring buffer (lock-free:
+  deque appends are atomic, and the callback runs on RPi.GPIO's own thread)
+- RPM = median of the last few edge periods: one late or glitched edge does not move it
+- Edges closer together than MAX_RPM allows are glitches: dropped and counted
+- A wheel that slows down is bounded by the time since the last edge; no edge for
+  STALE_TIMEOUT reads as 0 rpm
+- FakeTachoGPIO injects pulse trains at known rates for benches and the tests
+
+Usage: python tachometer.py                # live RPM on TACHO_PIN (Ctrl-C to exit)
+"""
+import random
 import time
+from collections import deque
+
+try:
+    import RPi.GPIO as GPIO
+    GPIO_AVAILABLE = True
+except ImportError:
+    GPIO = None
+    GPIO_AVAILABLE = False
+
+TACHO_PIN = 16           # BCM pin of the tacho line
+PULSES_PER_REV = 1       # Tacho edges per wheel revolution
+RING_SIZE = 64           # Edge timestamps kept
+MEDIAN_WINDOW = 8        # Periods in the sliding median
+MAX_RPM = 20000          # Faster than this is a glitch, not the wheel
+STALE_TIMEOUT = 1.0      # s - no edge for this long reads as stopped
+REPORT_DELTA = 1.0       # rpm - run_tachometer reports changes bigger than this
+
+# ── TACHOMETER ─────────────────────────────────────────────────────────
+class Tachometer:
+    """Wheel speed from rising-edge timestamps on `pin`.
+
+    `gpio` is the RPi.GPIO module (default) or a stand-in with the same
+    setmode / setup / add_event_detect / remove_event_detect calls; `clock`
+    stamps the edges and must be the clock get_rpm() is compared against.
+    """
+
+    def __init__(self, pin=TACHO_PIN, pulses_per_rev=PULSES_PER_REV, window=MEDIAN_WINDOW, gpio=None,
+                 clock=time.monotonic, max_rpm=MAX_RPM, stale_timeout=STALE_TIMEOUT):
+        self.pin = pin
+        self.pulses_per_rev = pulses_per_rev
+        self.window = window
+        self.gpio = gpio or GPIO
+        self.clock = clock
+        self.min_period = 60.0 / (max_rpm * pulses_per_rev)
+        self.stale_timeout = stale_timeout
+        self.edges = deque(maxlen=RING_SIZE)
+        self.pulses = 0
+        self.glitches = 0
+        self.running = False
 
-TACHO_PIN = 16  # Changed to GPIO 16 as requested
+    def start(self):
+        if self.gpio is None:
+            raise RuntimeError("RPi.GPIO not available")
+        self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setup(self.pin, self.gpio.IN, pull_up_down=self.gpio.PUD_DOWN)
+        self.gpio.add_event_detect(self.pin, self.gpio.RISING, callback=self._on_edge)
+        self.running = True
+        return self
 
-def run_tachometer(report_func):
-    """Continuously sample TACHO_PIN and call report_func(rpm)."""
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setup(TACHO_PIN, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+    def stop(self):
+        if self.running:
+            self.gpio.remove_event_detect(self.pin)
+            self.running = False
 
-    prev_ref         = False
-    initial_time     = None
-    last_pulse_time  = None
-    rpm              = 0.0
+    def _on_edge(self, channel=None):
+        """GPIO callback - timestamp only, the RPM is worked out by the reader"""
+        now = self.clock()
+        if self.edges and now - self.edges[-1] < self.min_period:
+            self.glitches += 1
+            return
+        self.edges.append(now)
+        self.pulses += 1
 
-    print(f"[DEBUG] Initial GPIO {TACHO_PIN} level: {GPIO.input(TACHO_PIN)}")
+    def get_rpm(self, now=None):
+        """Median-period RPM, capped by the time since the last edge (0 when stale)"""
+        edges = list(self.edges)  # Atomic copy - the callback may append meanwhile
+        if len(edges) < 2:
+            return 0.0
+        now = self.clock() if now is None else now
+        since_last = now - edges[-1]
+        if since_last > self.stale_timeout:
+            return 0.0
+        periods = sorted(b - a for a, b in zip(edges[-self.window - 1:-1], edges[-self.window:]))
+        mid = len(periods) // 2
+        period = periods[mid] if len(periods) % 2 else 0.5 * (periods[mid - 1] + periods[mid])
+        period = max(period, since_last)  # Wheel slowing down: the next edge is already late
+        return 60.0 / (period * self.pulses_per_rev)
 
+    def get_stats(self):
+        edges = list(self.edges)
+        return {
+            'rpm': self.get_rpm(),
+            'pulses': self.pulses,
+            'glitches': self.glitches,
+            'last_edge_age': self.clock() - edges[-1] if edges else None,
+        }
+
+def run_tachometer(report_func, interval=0.1, pin=TACHO_PIN):
+    """Call report_func(rpm) whenever the RPM changes by more than REPORT_DELTA (Ctrl-C to stop)"""
+    tacho = Tachometer(pin=pin).start()
+    reported = None
     try:
         while True:
-            level = GPIO.input(TACHO_PIN)
-            if level == GPIO.HIGH and not prev_ref:
-                print(f"[DEBUG] Rising edge detected on GPIO {TACHO_PIN}")
-                now = time.perf_counter()
-                last_pulse_time = now
-                if initial_time is None:
-                    initial_time = now
-                else:
-                    period = now - initial_time
-                    rpm    = 60.0 / period if period > 0 else 0.0
-                    initial_time = now
-                prev_ref = True
-            elif level == GPIO.LOW and prev_ref:
-                print(f"[DEBUG] Falling edge detected on GPIO {TACHO_PIN}")
-                prev_ref = False
-
-            # if we haven’t seen a pulse in ≥1 s, force rpm=0
-            if last_pulse_time and (time.perf_counter() - last_pulse_time) > 1.0:
-                rpm = 0.0
-
-            report_func(rpm)
-            time.sleep(0.1)
-
+            rpm = tacho.get_rpm()
+            if reported is None or abs(rpm - reported) > REPORT_DELTA or (rpm == 0.0 and reported != 0.0):
+                report_func(rpm)
+                reported = rpm
+            time.sleep(interval)
     except KeyboardInterrupt:
         pass
-
     finally:
+        tacho.stop()
         GPIO.cleanup()
 
+# ── FAKE GPIO ──────────────────────────────────────────────────────────
+class FakeTachoGPIO:
+    """RPi.GPIO stand-in with its own clock; pulse_train() fires the edge callbacks.
+
+    Pass it as Tachometer(gpio=fake, clock=fake.clock).
+    """
+    BCM, IN, PUD_DOWN, RISING = "BCM", "IN", "PUD_DOWN", "RISING"
+
+    def __init__(self, seed=0):
+        self.now = 0.0
+        self.callbacks = {}
+        self.rng = random.Random(seed)
+
+    def clock(self):
+        return self.now
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None):
+        pass
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        self.callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def pulse_train(self, rpm, duration, pin=TACHO_PIN, pulses_per_rev=PULSES_PER_REV, jitter=0.0,
+                    glitch_rate=0.0):
+        """Edges for `duration` s at `rpm`: each edge late by up to jitter * period, and
+        a spurious extra edge shortly after a real one with probability glitch_rate"""
+        period = 60.0 / (rpm * pulses_per_rev)
+        end = self.now + duration
+        ideal = self.now + period
+        while ideal <= end:
+            self.now = ideal + self.rng.uniform(0.0, jitter * period)
+            self.edge(pin)
+            if self.rng.random() < glitch_rate:
+                self.now += 20e-6
+                self.edge(pin)
+            ideal += period
+        self.now = end
+
+    def edge(self, pin=TACHO_PIN):
+        """One rising edge on `pin` at the current time"""
+        callback = self.callbacks.get(pin)
+        if callback:
+            callback(pin)
 
 # ── MANUAL TEST REPL ─────────────────────────────────────────
 if __name__ == "__main__":
     print(f"Tachometer test: reading RPM on GPIO {TACHO_PIN} (Ctrl-C to exit)")
-    print("Connect your tachometer data line to GPIO 0")
-    print("Raw signal and RPM will be displayed...")
-    try:
-        def display_rpm(rpm):
-            # Show both raw signal level and calculated RPM
-            level = GPIO.input(TACHO_PIN)
-            print(f"GPIO {TACHO_PIN} Level: {level} | RPM: {rpm:.1f}")
-        
-        run_tachometer(display_rpm)
-    except KeyboardInterrupt:
-        print("\nExiting tachometer test.")
-    finally:
-        GPIO.cleanup()
\ No newline at end of file
+    run_tachometer(lambda rpm: print(f"RPM: {rpm:.1f}"))
+    print("\nExiting tachometer test.")
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+🏷️ ON-BOARD APRILTAG POSE - pose telemetry from the Pi instead of video
+Runs the ground client's AprilTag pipeline (client/payload/detector4.py) on the
+raw camera frames, so the link carries a pose of a few dozen bytes per frame
+instead of every JPEG.
+- Raw frames come from the camera's shared-memory ring ("slowmo_raw"), read in place
+- Same detector settings and tag size as detector4; calibration chosen by the
+  frame resolution (client/calibrations/calibration_<W>x<H>.npz, or the nearest
+  one with the same aspect ratio, scaled)
+- Pose from the tag corners with solvePnP (IPPE_SQUARE) on the distorted image,
+  instead of undistorting every full frame first
+- One pose payload per frame; a small JPEG thumbnail every few seconds
+- Listeners (ADCS auto-zero) get every pose on the Pi, without a network round trip,
+  before it is published
+- Each pose carries the frame's capture time (wall clock and monotonic, for the
+  delayed-fix yaw filter) and the latency of every hop from exposure to ADCS
+"""
+import glob
+import math
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    cv2 = None
+    CV2_AVAILABLE = False
+
+try:
+    import pyapriltags
+    APRILTAGS_AVAILABLE = True
+except ImportError:
+    pyapriltags = None
+    APRILTAGS_AVAILABLE = False
+
+from frame_ring import FrameRing, RAW_NAME as RAW_RING_NAME
+
+CALIBRATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client", "calibrations")
+DETECTOR_CONFIG = {                # Same as client/payload/detector4.py
+    'families': 'tag25h9',
+    'nthreads': 4,
+    'quad_decimate': 0.5,
+    'quad_sigma': 0,
+    'refine_edges': 4,
+    'decode_sharpening': 0.25,
+}
+DEFAULT_TAG_SIZE = 0.055           # meters
+THUMBNAIL_INTERVAL_S = 2.0
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_QUALITY = 60
+RING_IDLE_REATTACH_S = 5.0         # No frames for this long -> the camera may have made a new ring
+
+# ── CALIBRATION ────────────────────────────────────────────────────────
+_calibration_cache = {}
+
+def load_calibration(width, height, directory=CALIBRATION_DIR):
+    """(mtx, dist, source) for a frame size, or None if nothing fits"""
+    key = (width, height, directory)
+    if key in _calibration_cache:
+        return _calibration_cache[key]
+    result = None
+    exact = os.path.join(directory, f"calibration_{width}x{height}.npz")
+    if os.path.exists(exact):
+        data = np.load(exact)
+        result = (data['mtx'].astype(np.float64), data['dist'].astype(np.float64), os.path.basename(exact))
+    else:
+        # Same sensor mode at another resolution: scale the nearest calibration with the same aspect
+        best = None
+        for path in glob.glob(os.path.join(directory, "calibration_*x*.npz")):
+            match = re.search(r"calibration_(\d+)x(\d+)\.npz$", path)
+            if not match:
+                continue
+            w, h = int(match.group(1)), int(match.group(2))
+            if abs(w / h - width / height) > 0.01:
+                continue
+            if best is None or abs(w - width) < abs(best[0] - width):
+                best = (w, h, path)
+        if best:
+            w, h, path = best
+            data = np.load(path)
+            mtx = data['mtx'].astype(np.float64).copy()
+            mtx[0, :] *= width / w   # fx, skew, cx
+            mtx[1, :] *= height / h  # fy, cy
+            result = (mtx, data['dist'].astype(np.float64), f"{os.path.basename(path)} scaled")
+    _calibration_cache[key] = result
+    return result
+
+# ── POSE ───────────────────────────────────────────────────────────────
+def tag_object_points(tag_size):
+    """Tag corners in the tag frame, in the order pyapriltags returns them"""
+    h = tag_size / 2.0
+    return np.array([[-h, h, 0.0], [h, h, 0.0], [h, -h, 0.0], [-h, -h, 0.0]], dtype=np.float64)
+
+def pose_from_corners(corners, mtx, dist, tag_size):
+    """(rvec, tvec) of a tag from its 4 image corners, or None"""
+    ok, rvec, tvec = cv2.solvePnP(tag_object_points(tag_size), np.asarray(corners, dtype=np.float64),
+                                  mtx, dist, flags=cv2.SOLVEPNP_IPPE_SQUARE)
+    return (rvec, tvec) if ok else None
+
+def relative_angle(tvec):
+    """Bearing of the tag from the optical axis (°), as the client's RelativeAnglePlotter computes it"""
+    return math.degrees(math.atan2(float(tvec[0]), float(tvec[2])))
+
+def to_gray(frame):
+    if frame.ndim == 2:
+        return frame
+    if frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)  # Picamera2 XRGB8888
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+class TagPoseEstimator:
+    """pyapriltags detection + corner PnP for one frame"""
+
+    def __init__(self, tag_size=DEFAULT_TAG_SIZE, config=None):
+        self.config = dict(DETECTOR_CONFIG, **(config or {}))
+        self.detector = pyapriltags.Detector(**self.config)
+        self.tag_size = tag_size
+
+    def estimate(self, gray, mtx, dist):
+        """Best tag in the frame: dict with tag_id, rvec, tvec, relative_angle, distance, margin, corners"""
+        tags = self.detector.detect(gray)
+        best = None
+        for tag in tags:
+            if best is None or tag.decision_margin > best.decision_margin:
+                best = tag
+        if best is None:
+            return None
+        pose = pose_from_corners(best.corners, mtx, dist, self.tag_size)
+        if pose is None:
+            return None
+        rvec, tvec = pose
+        return {
+            'tag_id': int(best.tag_id),
+            'rvec': rvec.ravel(),
+            'tvec': tvec.ravel(),
+            'relative_angle': relative_angle(tvec.ravel()),
+            'distance': float(np.linalg.norm(tvec)),
+            'margin': float(best.decision_margin),
+            'corners': best.corners,
+        }
+
+# ── SERVICE ────────────────────────────────────────────────────────────
+class TagPoseService:
+    """Detection thread fed by the raw frame ring.
+
+    Args:
+        publish_pose: publish_pose(payload) - one dict per processed frame
+        publish_thumbnail: publish_thumbnail(jpeg_bytes) - every THUMBNAIL_INTERVAL_S
+    """
+
+    def __init__(self, publish_pose, publish_thumbnail=None, ring_name=RAW_RING_NAME,
+                 tag_size=DEFAULT_TAG_SIZE, calibration_dir=CALIBRATION_DIR):
+        self.publish_pose = publish_pose
+        self.publish_thumbnail = publish_thumbnail
+        self.ring_name = ring_name
+        self.tag_size = tag_size
+        self.calibration_dir = calibration_dir
+        self.listeners = []
+        self.running = False
+        self.thread = None
+        self.estimator = None
+        self.last_thumbnail = 0.0
+
+        self.frames = 0
+        self.detections = 0
+        self.skipped = 0
+        self.detect_ms = 0.0
+        self.latency_ms = {}               # Smoothed per-hop latency
+        self.calibration_source = None
+        self.status = "Stopped"
+
+    def add_listener(self, callback):
+        """callback(pose_payload) on the detection thread for every processed frame"""
+        self.listeners.append(callback)
+
+    def set_tag_size(self, tag_size):
+        self.tag_size = float(tag_size)
+        if self.estimator:
+            self.estimator.tag_size = self.tag_size
+
+    def start(self):
+        if self.running:
+            return {"status": "success", "message": "On-board pose already running"}
+        if not (CV2_AVAILABLE and APRILTAGS_AVAILABLE):
+            return {"status": "error", "message": "OpenCV and pyapriltags are required for on-board pose"}
+        self.estimator = TagPoseEstimator(self.tag_size)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return {"status": "success", "message": "On-board pose started"}
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2.0)
+        self.status = "Stopped"
+        return {"status": "success", "message": "On-board pose stopped"}
+
+    def get_stats(self):
+        return {
+            'status': self.status, 'frames': self.frames, 'detections': self.detections,
+            'skipped': self.skipped, 'detect_ms': round(self.detect_ms, 1),
+            'latency_ms': {hop: round(ms, 1) for hop, ms in self.latency_ms.items()},
+            'calibration': self.calibration_source, 'tag_size': self.tag_size,
+        }
+
+    def _run(self):
+        ring, last_seq, idle_since = None, 0, time.monotonic()
+        while self.running:
+            if ring is None:
+                try:
+                    ring = FrameRing(self.ring_name)
+                    ring.register_reader()
+                    last_seq, idle_since = ring.write_seq, time.monotonic()
+                    self.status = "Waiting for frames"
+                except (FileNotFoundError, ValueError):
+                    self.status = "Waiting for camera"
+                    time.sleep(0.5)
+                    continue
+            seq = ring.wait(last_seq, timeout=0.5)
+            if seq is None:
+                if time.monotonic() - idle_since > RING_IDLE_REATTACH_S:
+                    ring.close()
+                    ring = None
+                continue
+            self.skipped += max(0, seq - last_seq - 1)  # Detection slower than the camera: newest frame wins
+            last_seq, idle_since = seq, time.monotonic()
+            frame = ring.read(seq)
+            if frame is None:
+                continue
+            try:
+                self._process(frame)
+            except Exception as e:
+                print(f"[ERROR] On-board pose: {e}")
+            finally:
+                frame.release()
+        if ring is not None:
+            ring.close()
+
+    def _process(self, frame):
+        pixels = frame.array()
+        height, width = pixels.shape[:2]
+        calibration = load_calibration(width, height, self.calibration_dir)
+        if calibration is None:
+            self.status = f"No calibration for {width}x{height}"
+            del pixels
+            return
+        mtx, dist, self.calibration_source = calibration
+        received = time.time()
+        start = time.perf_counter()
+        gray = to_gray(pixels)  # New array - the slot can be overwritten from here on
+        thumbnail_source = pixels if self._thumbnail_due() else None
+        if thumbnail_source is not None:
+            thumbnail_source = cv2.resize(thumbnail_source, (THUMBNAIL_WIDTH, int(height * THUMBNAIL_WIDTH / width)),
+                                          interpolation=cv2.INTER_AREA)
+        del pixels
+        result = self.estimator.estimate(gray, mtx, dist)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.detect_ms = elapsed_ms if self.frames == 0 else 0.9 * self.detect_ms + 0.1 * elapsed_ms
+        self.frames += 1
+        self.status = "Running"
+
+        payload = {
+            'seq': frame.seq, 'resolution': [width, height], 'detected': result is not None,
+            'capture_time': frame.timestamp,  # Wall clock, mid-exposure
+            'capture_monotonic': frame.timestamp - (time.time() - time.monotonic()),  # Yaw filter time base
+            'detect_ms': round(elapsed_ms, 1),
+            'tag_id': None, 'relative_angle': None, 'distance': None, 'rvec': None, 'tvec': None, 'margin': None,
+        }
+        if result is not None:
+            self.detections += 1
+            payload.update({
+                'tag_id': result['tag_id'],
+                'relative_angle': round(result['relative_angle'], 3),
+                'distance': round(result['distance'], 4),
+                'rvec': [round(float(v), 5) for v in result['rvec']],
+                'tvec': [round(float(v), 5) for v in result['tvec']],
+                'margin': round(result['margin'], 1),
+            })
+        # Listeners (ADCS) first: the telemetry publish must not delay the control path
+        detected = time.time()
+        for listener in self.listeners:
+            try:
+                listener(payload)
+            except Exception as e:
+                print(f"[ERROR] Pose listener: {e}")
+        applied = time.time()
+        payload['latency'] = {  # ms per hop on the Pi
+            'capture_to_detect': round((received - frame.timestamp) * 1000.0, 1),
+            'detect': payload['detect_ms'],
+            'to_adcs': round((applied - detected) * 1000.0, 2),
+            'capture_to_adcs': round((applied - frame.timestamp) * 1000.0, 1),
+        }
+        self._track_latency(payload['latency'])
+        payload['sent_time'] = time.time()  # Client adds the downlink hop (needs synced clocks)
+        self.publish_pose(payload)
+
+        if thumbnail_source is not None and frame.valid():
+            self._send_thumbnail(thumbnail_source, result, width)
+
+    def _track_latency(self, hops):
+        for hop, ms in hops.items():
+            previous = self.latency_ms.get(hop)
+            self.latency_ms[hop] = ms if previous is None else 0.9 * previous + 0.1 * ms
+
+    def _thumbnail_due(self):
+        return self.publish_thumbnail is not None and time.monotonic() - self.last_thumbnail >= THUMBNAIL_INTERVAL_S
+
+    def _send_thumbnail(self, image, result, full_width):
+        self.last_thumbnail = time.monotonic()
+        if image.ndim == 3 and image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        if result is not None:
+            scale = THUMBNAIL_WIDTH / full_width
+            corners = (np.asarray(result['corners']) * scale).astype(np.int32)
+            cv2.polylines(image, [corners], True, (0, 255, 0), 2)
+        ok, jpeg = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), THUMBNAIL_QUALITY])
+        if ok:
+            self.publish_thumbnail(jpeg.tobytes())
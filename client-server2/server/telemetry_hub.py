@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+📡 TELEMETRY HUB - one publish/subscribe dispatcher for every server broadcast
+Subsystems publish onto named topics; a single dispatcher thread decides what
+actually goes out to the clients.
+- Topic registration: Socket.IO event name, max rate, state vs stream topics
+- State topics keep only the latest value (rate limited) and are not re-sent
+  when unchanged; new subscribers get the last value straight away
+- Stream topics (ADCS frames, LiDAR samples, camera frames) deliver every payload in order
+- Event-driven: a publish inside the rate limit is emitted on the publisher's
+  thread; the dispatcher only wakes to flush values a rate limit held back
+- Clients subscribe to the topics they display; each topic is a Socket.IO room
+- Per-client rates: a client may ask for a topic slower than its topic rate.
+  It leaves the room and is sent the latest payload at its own rate (streams
+  are decimated for that client only)
+"""
+import threading
+import time
+from collections import deque
+
+STREAM_QUEUE_LIMIT = 256     # Pending stream payloads kept per topic while the dispatcher catches up
+ROOM_PREFIX = "topic:"
+
+def topic_room(name):
+    return ROOM_PREFIX + name
+
+class _ClientRate:
+    """Throttle state for one client on one topic (latest payload wins)"""
+    __slots__ = ("min_interval", "last_emit", "pending", "has_pending", "emitted", "skipped")
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.last_emit = 0.0
+        self.pending = None
+        self.has_pending = False
+        self.emitted = 0
+        self.skipped = 0
+
+    def due_at(self):
+        return self.last_emit + self.min_interval
+
+class Topic:
+    """One broadcast channel"""
+
+    def __init__(self, name, event, max_rate_hz=None, stream=False, coalesce=True):
+        self.name = name
+        self.event = event
+        self.room = topic_room(name)
+        self.max_rate_hz = max_rate_hz
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz else 0.0
+        self.stream = stream
+        self.coalesce = coalesce and not stream
+        self.subscribers = set()
+        self.throttled = {}  # sid -> _ClientRate, for subscribers slower than the topic (not in the room)
+
+        self.pending = deque(maxlen=STREAM_QUEUE_LIMIT) if stream else None
+        self.has_pending = False
+        self.last_payload = None
+        self.last_emit = 0.0
+
+        self.published = 0
+        self.emitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def due_at(self):
+        return self.last_emit + self.min_interval
+
+    def client_interval(self, max_rate_hz):
+        """Interval a client asking for max_rate_hz gets (0 / None = topic rate)"""
+        if not max_rate_hz or max_rate_hz <= 0:
+            return self.min_interval
+        return max(self.min_interval, 1.0 / max_rate_hz)
+
+    def room_has_members(self):
+        return len(self.subscribers) > len(self.throttled)
+
+class TelemetryHub:
+    """Publish/subscribe dispatcher in front of socketio.emit.
+
+    Args:
+        emit: emit(event, payload, to) - sends to a room or a single client sid
+        join_room / leave_room: join_room(sid, room) - Socket.IO room membership
+    """
+
+    def __init__(self, emit, join_room=None, leave_room=None):
+        self.emit = emit
+        self.join_room = join_room
+        self.leave_room = leave_room
+        self.topics = {}
+        self.clients = {}  # sid -> None (all topics) or {topic name: requested max rate}
+        self.condition = threading.Condition()
+        self.running = False
+        self.dirty = False  # Published since the dispatcher last collected
+        self.thread = None
+        self.emit_errors = 0
+
+    # ── REGISTRATION ───────────────────────────────────────────────────
+    def register_topic(self, name, event=None, max_rate_hz=None, stream=False, coalesce=True):
+        """Register a topic (event defaults to '<name>_broadcast')"""
+        with self.condition:
+            topic = Topic(name, event or f"{name}_broadcast", max_rate_hz, stream, coalesce)
+            self.topics[name] = topic
+            for sid, names in self.clients.items():
+                if names is None:  # Subscribed to everything
+                    self._join(sid, topic, topic.min_interval)
+            return topic
+
+    # ── SUBSCRIPTIONS ──────────────────────────────────────────────────
+    def subscribe(self, sid, topics=None):
+        """Set a client's topics and rates.
+
+        topics: None = all topics at their own rate (including topics registered
+        later), a list of names, or {name: max_rate_hz} where None/0 means the
+        topic rate. Unknown names are ignored.
+
+        Returns {name: effective max rate in Hz, or None for unlimited} - the
+        negotiated rates the client will actually receive.
+        """
+        with self.condition:
+            if topics is None:
+                requested = {name: None for name in self.topics}
+            elif isinstance(topics, dict):
+                requested = {name: rate for name, rate in topics.items() if name in self.topics}
+            else:
+                requested = {name: None for name in topics if name in self.topics}
+
+            current = self._client_topics(sid)
+            for name in current - set(requested):
+                self._leave(sid, self.topics[name])
+            joined = []
+            for name, rate in requested.items():
+                topic = self.topics[name]
+                interval = topic.client_interval(rate)
+                if name in current:
+                    self._set_interval(sid, topic, interval)
+                else:
+                    self._join(sid, topic, interval)
+                    joined.append(topic)
+            self.clients[sid] = None if topics is None else requested
+            negotiated = {name: self._client_rate(sid, self.topics[name]) for name in sorted(requested)}
+            snapshot = [(t.event, t.last_payload) for t in joined if not t.stream and t.last_payload is not None]
+            for topic in joined:
+                if sid in topic.throttled and topic.last_payload is not None and not topic.stream:
+                    topic.throttled[sid].last_emit = time.monotonic()  # The snapshot counts as its first emit
+            self.condition.notify()
+        for event, payload in snapshot:  # Latest state so the client does not wait for the next change
+            self._emit(event, payload, sid)
+        return negotiated
+
+    def unsubscribe(self, sid):
+        """Forget a client (disconnect)"""
+        with self.condition:
+            for name in self._client_topics(sid):
+                self.topics[name].subscribers.discard(sid)
+                self.topics[name].throttled.pop(sid, None)
+            self.clients.pop(sid, None)
+
+    def _client_topics(self, sid):
+        return {name for name, topic in self.topics.items() if sid in topic.subscribers}
+
+    def _client_rate(self, sid, topic):
+        interval = topic.throttled[sid].min_interval if sid in topic.throttled else topic.min_interval
+        return round(1.0 / interval, 3) if interval else None
+
+    def _join(self, sid, topic, interval):
+        topic.subscribers.add(sid)
+        if interval > topic.min_interval:
+            topic.throttled[sid] = _ClientRate(interval)  # Served directly, at its own rate
+        elif self.join_room:
+            self.join_room(sid, topic.room)
+
+    def _leave(self, sid, topic):
+        topic.subscribers.discard(sid)
+        if topic.throttled.pop(sid, None) is None and self.leave_room:
+            self.leave_room(sid, topic.room)
+
+    def _set_interval(self, sid, topic, interval):
+        """Move an existing subscriber between the room and a per-client throttle"""
+        throttle = topic.throttled.get(sid)
+        if interval > topic.min_interval:
+            if throttle is None:
+                if self.leave_room:
+                    self.leave_room(sid, topic.room)
+                topic.throttled[sid] = _ClientRate(interval)
+            else:
+                throttle.min_interval = interval
+        elif throttle is not None:
+            del topic.throttled[sid]
+            if self.join_room:
+                self.join_room(sid, topic.room)
+
+    def has_subscribers(self, *names):
+        return any(self.topics[name].subscribers for name in names if name in self.topics)
+
+    # ── PUBLISHING ─────────────────────────────────────────────────────
+    def publish(self, name, payload):
+        """Send a payload now if the topic's rate allows, otherwise leave it to the dispatcher"""
+        with self.condition:
+            topic = self.topics[name]
+            topic.published += 1
+            if topic.stream and not topic.subscribers:
+                return
+            now = time.monotonic()
+            if not topic.has_pending and now >= topic.due_at():
+                outgoing = self._take(topic, [payload], now)  # Emitted on the publisher's thread
+            else:
+                if topic.stream:
+                    if len(topic.pending) == topic.pending.maxlen:
+                        topic.dropped += 1
+                    topic.pending.append(payload)
+                else:
+                    if topic.has_pending:
+                        topic.coalesced += 1  # Superseded before it was sent
+                    topic.pending = payload
+                topic.has_pending = True
+                self.dirty = True
+                self.condition.notify()
+                return
+        for event, payload, room in outgoing:
+            self._emit(event, payload, room)
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                name: {
+                    'subscribers': len(t.subscribers), 'throttled': len(t.throttled),
+                    'published': t.published, 'emitted': t.emitted,
+                    'coalesced': t.coalesced, 'dropped': t.dropped,
+                }
+                for name, t in self.topics.items()
+            }
+
+    # ── DISPATCHER ─────────────────────────────────────────────────────
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                now = time.monotonic()
+                outgoing, wake_at = self._collect(now)
+                self.dirty = False
+            for event, payload, room in outgoing:
+                self._emit(event, payload, room)
+
+            with self.condition:
+                # Sleep until something is held back by a rate limit, or until that limit expires
+                if self.running and not self.dirty:
+                    timeout = None if wake_at is None else wake_at - time.monotonic()
+                    if timeout is None or timeout > 0:
+                        self.condition.wait(timeout)
+
+    def _collect(self, now):
+        """Payloads ready to emit, and the next time something becomes due"""
+        outgoing = []
+        wake_at = None
+        for topic in self.topics.values():
+            if topic.has_pending:
+                if now < topic.due_at():
+                    wake_at = topic.due_at() if wake_at is None else min(wake_at, topic.due_at())
+                else:
+                    topic.has_pending = False
+                    if topic.stream:
+                        payloads = list(topic.pending)
+                        topic.pending.clear()
+                    else:
+                        payloads = [topic.pending]
+                        topic.pending = None
+                    outgoing.extend(self._take(topic, payloads, now))
+            for sid, throttle in topic.throttled.items():
+                if not throttle.has_pending:
+                    continue
+                if now < throttle.due_at():
+                    wake_at = throttle.due_at() if wake_at is None else min(wake_at, throttle.due_at())
+                    continue
+                outgoing.append(self._take_client(topic, sid, throttle, now))
+        return outgoing, wake_at
+
+    def _take(self, topic, payloads, now):
+        """Apply coalescing and subscriber checks; returns (event, payload, room or sid) to emit"""
+        if not topic.stream:
+            if topic.coalesce and payloads[0] == topic.last_payload:
+                topic.coalesced += 1
+                return []
+            topic.last_payload = payloads[0]
+        if not topic.subscribers:
+            return []
+        topic.last_emit = now
+        outgoing = []
+        if topic.room_has_members():
+            topic.emitted += len(payloads)
+            outgoing = [(topic.event, payload, topic.room) for payload in payloads]
+        for sid, throttle in topic.throttled.items():
+            if throttle.has_pending:
+                throttle.skipped += 1
+            throttle.pending = payloads[-1]  # Only the latest matters at the client's rate
+            throttle.skipped += len(payloads) - 1
+            throttle.has_pending = True
+            if now >= throttle.due_at():
+                outgoing.append(self._take_client(topic, sid, throttle, now))
+            else:
+                self.dirty = True
+                self.condition.notify()
+        return outgoing
+
+    def _take_client(self, topic, sid, throttle, now):
+        payload = throttle.pending
+        throttle.pending = None
+        throttle.has_pending = False
+        throttle.last_emit = now
+        throttle.emitted += 1
+        return (topic.event, payload, sid)
+
+    def _emit(self, event, payload, to):
+        try:
+            self.emit(event, payload, to)
+        except Exception as e:
+            self.emit_errors += 1
+            print(f"[ERROR] Telemetry emit {event}: {e}")
@@ -0,0 +1,102 @@
+"""ADCS telemetry benchmark: legacy JSON strings vs binary frames vs batched 200Hz chunks
+Usage (from client-server2/server): python tests/bench_adcs_telemetry.py
+"""
+import json
+import time
+
+import numpy as np
+
+import conftest  # noqa: F401  (server/ and common/ on sys.path)
+from adcs_telemetry import TelemetryRing, encode_frames, decode_frames, chunk_frames, to_display_dict
+from test_adcs_telemetry import sample_record
+
+def legacy_dict(r):
+    """The string dictionary get_adcs_data_for_server sent before binary frames"""
+    return {
+        'gyro': f"{r['yaw']:.1f}°", 'orientation': f"Y:{r['yaw']:.1f}° R:{r['roll']:.1f}° P:{r['pitch']:.1f}°",
+        'lux1': f"{r['lux1']:.1f}", 'lux2': f"{r['lux2']:.1f}", 'lux3': f"{r['lux3']:.1f}",
+        'rpm': "0.0", 'status': r['status'],
+        'gyro_rate_x': f"{r['rate_x']:.2f}", 'gyro_rate_y': f"{r['rate_y']:.2f}", 'gyro_rate_z': f"{r['rate_z']:.2f}",
+        'angle_x': f"{r['pitch']:.1f}", 'angle_y': f"{r['roll']:.1f}", 'angle_z': f"{r['yaw']:.1f}",
+        'gyro_yaw': f"{r['gyro_yaw']:.1f}",
+        'temperature': f"{r['temp']:.1f}°C",
+        'fifo_samples': f"{r['fifo_samples']}", 'fifo_batch': f"{r['fifo_batch']}",
+        'fifo_overflows': f"{r['fifo_overflows']}",
+        'yaw_bias': f"{r['yaw_bias']:.3f}", 'yaw_std': f"{r['yaw_std']:.2f}", 'yaw_reference': r['reference'],
+    }
+
+def benchmark(frames=20000, rate_hz=20.0):
+    """Bytes/s and CPU/frame for the legacy JSON-string payload vs the binary frame"""
+    records = [sample_record(i) for i in range(frames)]
+    client_fields = ('rate_x', 'rate_y', 'rate_z', 'pitch', 'roll', 'yaw', 'lux1', 'lux2', 'lux3', 'temp')
+    legacy_fields = ('gyro_rate_x', 'gyro_rate_y', 'gyro_rate_z', 'angle_x', 'angle_y', 'angle_z',
+                     'lux1', 'lux2', 'lux3')
+
+    # Legacy: server formats strings (and server2 parses the temperature back out),
+    # Socket.IO JSON-encodes; the client decodes and parses the floats back
+    start = time.perf_counter()
+    legacy_payloads = []
+    for r in records:
+        d = legacy_dict(r)
+        float(d['temperature'].replace('°C', ''))
+        legacy_payloads.append("42" + json.dumps(["adcs_broadcast", d]))
+    legacy_encode = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for p in legacy_payloads:
+        d = json.loads(p[2:])[1]
+        values = [float(d[k]) for k in legacy_fields] + [float(d['temperature'].replace('°C', ''))]
+    legacy_decode = (time.perf_counter() - start) / frames
+    legacy_bytes = sum(len(p.encode()) for p in legacy_payloads) / frames
+
+    # Binary: one record; Socket.IO sends a placeholder text packet plus one binary attachment
+    placeholder = '451-' + json.dumps(["adcs_broadcast", {"_placeholder": True, "num": 0}])
+    start = time.perf_counter()
+    binary_payloads = [encode_frames([r]) for r in records]
+    binary_encode = (time.perf_counter() - start) / frames
+    start = time.perf_counter()
+    for p in binary_payloads:
+        rec = decode_frames(p)[0]
+        values = [float(rec[k]) for k in client_fields]
+    binary_decode = (time.perf_counter() - start) / frames
+    binary_bytes = len(binary_payloads[0]) + len(placeholder)
+
+    print(f"ADCS telemetry at {rate_hz:.0f}Hz ({frames} frames)")
+    print(f"  {'':8s} {'bytes/frame':>12s} {'bytes/s':>9s} {'server µs':>10s} {'client µs':>10s}")
+    print(f"  {'json':8s} {legacy_bytes:12.0f} {legacy_bytes * rate_hz:9.0f} "
+          f"{legacy_encode * 1e6:10.1f} {legacy_decode * 1e6:10.1f}")
+    print(f"  {'binary':8s} {binary_bytes:12.0f} {binary_bytes * rate_hz:9.0f} "
+          f"{binary_encode * 1e6:10.1f} {binary_decode * 1e6:10.1f}")
+    print(f"  (binary = {len(binary_payloads[0])}-byte frame + {len(placeholder)}-byte Socket.IO placeholder packet)")
+
+    # Batched: 200Hz samples through the ring, shipped 20 times a second
+    fast_hz, chunk = 200.0, 10
+    ring = TelemetryRing(capacity=256)
+    start = time.perf_counter()
+    sent, last_seq, frames_sent = 0, 0, []
+    for i, r in enumerate(records[1:4001]):  # Data-thread seq starts at 1
+        ring.append(r)
+        if (i + 1) % chunk == 0:
+            new = ring.since(last_seq)
+            last_seq = int(new['seq'][-1])
+            frames_sent.extend(chunk_frames(new, chunk))
+    batch_cpu = (time.perf_counter() - start) / 4000
+    received = np.concatenate([decode_frames(f) for f in frames_sent])
+    assert np.array_equal(received['seq'], np.arange(1, len(received) + 1))  # Every sample, in order
+    batch_bytes = (sum(len(f) for f in frames_sent) + len(frames_sent) * len(placeholder)) / len(received)
+    print(f"  {'batched':8s} {batch_bytes:12.0f} {batch_bytes * fast_hz:9.0f} {batch_cpu * 1e6:10.1f} "
+          f"{'':>10s}  ({fast_hz:.0f}Hz, {chunk} samples/message)")
+    print(f"  per-sample json at {fast_hz:.0f}Hz would be {legacy_bytes * fast_hz:.0f} B/s "
+          f"and {fast_hz:.0f} messages/s (batched: {fast_hz / chunk:.0f})")
+
+    # The display edge must still produce the legacy strings
+    sample = records[7]
+    rebuilt = to_display_dict(decode_frames(encode_frames([sample]))[0])
+    legacy = legacy_dict(sample)
+    mismatched = [k for k in legacy if k != 'rpm' and rebuilt[k] != legacy[k]]
+    assert not mismatched, mismatched
+    print("✓ Binary frames reproduce the legacy display strings")
+    return legacy_bytes, binary_bytes
+
+if __name__ == "__main__":
+    benchmark()
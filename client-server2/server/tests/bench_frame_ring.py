@@ -0,0 +1,144 @@
+"""Frame transport benchmark: fake camera process -> this process, loopback socket vs the shared-memory ring
+Usage (from client-server2/server): python tests/bench_frame_ring.py
+"""
+import json
+import multiprocessing
+import os
+import socket
+import struct
+import time
+
+import numpy as np
+
+import conftest  # noqa: F401  (server/ and common/ on sys.path)
+from frame_ring import FrameRing
+
+def fake_jpeg(i, size=24000):
+    return bytes([i % 251]) * size  # ~640x480 JPEG at quality 70
+
+def paced(count, rate_hz, ready):
+    """Yield count times at rate_hz, like a camera delivering frames"""
+    ready.wait()
+    next_at = time.monotonic()
+    for i in range(count):
+        next_at += 1.0 / rate_hz
+        yield i
+        delay = next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def ring_producer(name, count, rate_hz, size, raw_shape, ready):
+    ring = FrameRing(name)
+    frame = np.full(raw_shape, 7, dtype=np.uint8) if raw_shape else fake_jpeg(0, size)
+    for _ in paced(count, rate_hz, ready):
+        if raw_shape:
+            ring.write_array(frame)
+        else:
+            ring.write(frame)
+    ring.close()
+
+def socket_producer(port, count, rate_hz, size, ready):
+    sock = socket.create_connection(("127.0.0.1", port))
+    frame = fake_jpeg(0, size)
+    for _ in paced(count, rate_hz, ready):
+        # What camera.py sends today: a Socket.IO binary event (JSON header + attachment) over loopback
+        header = json.dumps(["frame", {"_placeholder": True, "num": 0}, time.time()]).encode()
+        sock.sendall(struct.pack("<II", len(header), len(frame)) + header + frame)
+    sock.close()
+
+def recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        r = sock.recv_into(view[got:])
+        if not r:
+            return None
+        got += r
+    return buf
+
+def bench_socket(count, rate_hz, size):
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    ready = multiprocessing.Event()
+    proc = multiprocessing.Process(target=socket_producer,
+                                   args=(listener.getsockname()[1], count, rate_hz, size, ready))
+    proc.start()
+    conn, _ = listener.accept()
+    cpu0, t0 = time.process_time(), time.monotonic()
+    ready.set()
+    received, latencies = 0, []
+    while True:
+        head = recv_exact(conn, 8)
+        if head is None:
+            break
+        hlen, flen = struct.unpack("<II", head)
+        header = json.loads(bytes(recv_exact(conn, hlen)))
+        data = bytes(recv_exact(conn, flen))  # python-socketio hands the handler a bytes object
+        latencies.append(time.time() - header[2])
+        received += 1
+    wall, cpu = time.monotonic() - t0, time.process_time() - cpu0
+    proc.join()
+    conn.close()
+    listener.close()
+    return received, wall, cpu, latencies
+
+def bench_ring(count, rate_hz, size, raw_shape=None):
+    name = f"slowmo_bench_{os.getpid()}"
+    slot = int(np.prod(raw_shape)) if raw_shape else size
+    ring = FrameRing(name, create=True, slot_size=slot)
+    ring.register_reader()
+    ready = multiprocessing.Event()
+    proc = multiprocessing.Process(target=ring_producer, args=(name, count, rate_hz, size, raw_shape, ready))
+    proc.start()
+    cpu0, t0 = time.process_time(), time.monotonic()
+    ready.set()
+    received, last, latencies = 0, 0, []
+    while last < count:
+        seq = ring.wait(last, timeout=2.0)
+        if seq is None:
+            break
+        frame = ring.read(seq)
+        if frame is not None:
+            if raw_shape:
+                pixels = frame.array()       # Detector path: zero-copy view of the pixels
+                ok = frame.valid() and pixels[0, 0, 0] == 7
+                del pixels
+            else:
+                ok = frame.tobytes() is not None  # server2 path: the one copy Socket.IO needs
+            latencies.append(time.time() - frame.timestamp)
+            received += ok
+            frame.release()
+        last = seq
+    wall, cpu = time.monotonic() - t0, time.process_time() - cpu0
+    proc.join()
+    ring.close()
+    return received, wall, cpu, latencies
+
+def benchmark(count=1000):
+    """Fake camera process -> this process: loopback Socket.IO-style packets vs the ring"""
+    print(f"Frame transport benchmark ({count} frames per case from a producer process)")
+    print(f"  {'path':36s} {'frames/s':>9s} {'reader cpu %':>13s} {'ms/frame':>9s} {'p50':>8s} {'p99':>8s}")
+    results = {}
+    cases = (
+        ("loopback socket, 24kB JPEG @100fps", lambda: bench_socket(count, 100.0, 24000)),
+        ("shared ring, 24kB JPEG @100fps", lambda: bench_ring(count, 100.0, 24000)),
+        ("loopback socket, 24kB JPEG unpaced", lambda: bench_socket(count * 10, 1e9, 24000)),
+        ("shared ring, 24kB JPEG unpaced", lambda: bench_ring(count * 10, 1e9, 24000)),
+        ("shared ring, raw 1536x864x3 @30fps", lambda: bench_ring(count // 5, 30.0, 0, (864, 1536, 3))),
+    )
+    for label, run in cases:
+        received, wall, cpu, latencies = run()
+        latencies.sort()
+        pick = lambda q: 1000.0 * latencies[int(q * (len(latencies) - 1))] if latencies else float("nan")
+        r = results[label] = {
+            'frames_per_s': received / wall, 'cpu_pct': 100.0 * cpu / wall,
+            'cpu_ms_per_frame': 1000.0 * cpu / max(received, 1), 'p50_ms': pick(0.5), 'p99_ms': pick(0.99),
+        }
+        print(f"  {label:36s} {r['frames_per_s']:9.0f} {r['cpu_pct']:13.1f} {r['cpu_ms_per_frame']:9.3f} "
+              f"{r['p50_ms']:6.3f}ms {r['p99_ms']:6.3f}ms")
+    return results
+
+if __name__ == "__main__":
+    benchmark()
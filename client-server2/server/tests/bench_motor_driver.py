@@ -0,0 +1,47 @@
+"""Motor driver benchmark: the old set_motor_power against MotorDriver over a minute of PD commands
+Usage (from client-server2/server): python tests/bench_motor_driver.py
+"""
+import time
+
+import conftest  # noqa: F401  (server/ and common/ on sys.path)
+from motor_driver import MotorDriver, FakeGPIOBackend, CW, CCW
+
+def legacy_set_motor_power(backend, power):
+    """The old ADCS_PD.set_motor_power: two writes and a 1ms sleep on every call"""
+    power = max(-100, min(100, power))
+    if power > 0:
+        backend.write(CCW, 0)
+        backend.write(CW, abs(power))
+    elif power < 0:
+        backend.write(CW, 0)
+        backend.write(CCW, abs(power))
+    else:
+        backend.write(CW, 0)
+        backend.write(CCW, 0)
+    time.sleep(0.001)  # "Brief delay to avoid I2C interference"
+
+def benchmark():
+    """Legacy set_motor_power vs MotorDriver over a minute of PD commands"""
+    # 60s of the 20Hz PD loop while holding a target: mostly repeated or near-identical commands.
+    # The fake busy-waits an assumed 100µs per ChangeDutyCycle; measure on the Pi with get_stats().
+    write_cost = 100e-6
+    commands = [0.0] * 600 + [35.0] * 300 + [12.04, 12.02] * 150 + [0.0] * 300
+    legacy, driver = FakeGPIOBackend(write_cost), FakeGPIOBackend(write_cost)
+    start = time.perf_counter()
+    for power in commands:
+        legacy_set_motor_power(legacy, power)
+    legacy_s = time.perf_counter() - start
+    motor = MotorDriver(driver)
+    start = time.perf_counter()
+    for power in commands:
+        motor.set_power(power)
+    driver_s = time.perf_counter() - start
+    print(f"{len(commands)} commands: legacy {len(legacy.writes)} writes, {legacy_s * 1000:.0f}ms "
+          f"({legacy_s / len(commands) * 1e6:.0f}µs/command)")
+    print(f"{len(commands)} commands: driver {len(driver.writes)} writes, {driver_s * 1000:.0f}ms "
+          f"({driver_s / len(commands) * 1e6:.0f}µs/command)")
+    print(f"Driver stats: {motor.get_stats()}")
+    assert len(driver.writes) < len(legacy.writes) / 50
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,205 @@
+"""Service link benchmark: sensor read -> client latency and CPU, loopback Socket.IO model vs in-process bus
+Usage (from client-server2/server): python tests/bench_service_link.py [--duration 10] [--live URL [--pid SERVER_PID]]
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+
+import conftest  # noqa: F401  (server/ and common/ on sys.path)
+from service_link import ServiceBus, ServiceClient
+from telemetry_hub import TelemetryHub
+
+def encode(event, data):
+    """Socket.IO-style packet: JSON event, binary payloads as a placeholder plus attachment"""
+    if isinstance(data, (bytes, bytearray)):
+        header = json.dumps([event, {"_placeholder": True, "num": 0}]).encode()
+        return len(header).to_bytes(4, "little") + header + bytes(data)
+    header = json.dumps([event, data]).encode()
+    return len(header).to_bytes(4, "little") + header
+
+def decode(packet):
+    size = int.from_bytes(packet[:4], "little")
+    event, data = json.loads(packet[4:4 + size])
+    if isinstance(data, dict) and data.get("_placeholder"):
+        data = bytes(packet[4 + size:])
+    return event, data
+
+class Stream:
+    """Length-prefixed packets over a socket, decoded on a reader thread"""
+
+    def __init__(self, sock, on_packet):
+        self.sock = sock
+        self.on_packet = on_packet
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def send(self, packet):
+        with self.lock:
+            self.sock.sendall(len(packet).to_bytes(4, "little") + packet)
+
+    def _recv_exact(self, n):
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                return None
+            buf += chunk
+        return buf
+
+    def _read(self):
+        while True:
+            try:
+                head = self._recv_exact(4)
+                packet = head and self._recv_exact(int.from_bytes(head, "little"))
+            except OSError:
+                return
+            if not packet:
+                return
+            self.on_packet(packet)
+
+def fake_frame(read_time):
+    return int(read_time * 1e6).to_bytes(8, "little") + bytes(24000)  # Fake ~24kB JPEG, read time in front
+
+def run_path(duration, in_process):
+    """Services -> server handlers -> telemetry hub -> one GUI client, with sensor-read timestamps"""
+    latencies = {"lidar_broadcast": [], "frame": []}
+
+    def on_client_packet(packet):  # GUI side
+        now = time.time()
+        event, data = decode(packet)
+        if event == "frame":
+            latencies[event].append(now - int.from_bytes(data[:8], "little") / 1e6)
+        elif event in latencies:
+            latencies[event].append(now - data["timestamp"])
+
+    server_end, client_end = socket.socketpair()
+    gui = Stream(client_end, on_client_packet)
+    to_gui = Stream(server_end, lambda packet: None)
+    hub = TelemetryHub(lambda event, payload, to: to_gui.send(encode(event, payload)))
+    hub.register_topic("lidar", stream=True)
+    hub.register_topic("sensor")
+    hub.register_topic("frame", event="frame", stream=True)
+    hub.subscribe("gui")
+    hub.start()
+
+    service_bus = ServiceBus()
+    service_bus.on("lidar_data")(lambda data: hub.publish("lidar", data))
+    service_bus.on("sensor_data")(lambda data: hub.publish("sensor", data))
+    service_bus.on("frame")(lambda data: hub.publish("frame", data))
+    links = []
+    if in_process:
+        service_bus.enable()
+        client = ServiceClient(service_bus)
+        client.connect("in-process")
+        emit = client.emit
+    else:
+        # The old path: encode, loopback TCP, decode on the server, then the same handler
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        tx = socket.create_connection(listener.getsockname())
+        rx, _ = listener.accept()
+        listener.close()
+        server_rx = Stream(rx, lambda packet: service_bus.publish(*decode(packet)))
+        service_tx = Stream(tx, lambda packet: None)
+        links = [tx, rx]
+        emit = lambda event, data: service_tx.send(encode(event, data))
+
+    stop = threading.Event()
+
+    def producer(rate_hz, make):
+        def run():
+            while not stop.is_set():
+                event, data = make()
+                emit(event, data)
+                time.sleep(1.0 / rate_hz)
+        return threading.Thread(target=run, daemon=True)
+
+    threads = [
+        producer(20.0, lambda: ("lidar_data", {"distance_cm": 120, "timestamp": time.time()})),
+        producer(10.0, lambda: ("frame", fake_frame(time.time()))),
+        producer(0.5, lambda: ("sensor_data", {"temperature": 48.3, "cpu_percent": 21.0, "timestamp": time.time()})),
+    ]
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    for thread in threads:
+        thread.join(timeout=2.0)
+    time.sleep(0.2)
+    hub.stop()
+    for sock in [server_end, client_end] + links:
+        sock.close()
+
+    def summary(values):
+        values = sorted(values)
+        if not values:
+            return {'n': 0, 'mean_ms': float("nan"), 'p99_ms': float("nan")}
+        return {'n': len(values), 'mean_ms': 1000.0 * sum(values) / len(values),
+                'p99_ms': 1000.0 * values[min(len(values) - 1, int(0.99 * len(values)))]}
+    return {'cpu_pct': 100.0 * cpu / wall, 'lidar': summary(latencies["lidar_broadcast"]),
+            'frame': summary(latencies["frame"])}
+
+def benchmark(duration=10.0):
+    """Loopback Socket.IO model vs in-process bus: same producers, handlers and hub"""
+    print(f"Service link benchmark ({duration:.0f}s each; LiDAR 20Hz, 24kB frames 10fps, sensors 0.5Hz)")
+    print(f"  {'path':12s} {'cpu %':>6s} {'lidar mean':>11s} {'lidar p99':>10s} {'frame mean':>11s} {'frame p99':>10s}")
+    results = {}
+    for name, in_process in (("loopback", False), ("in-process", True)):
+        r = run_path(duration, in_process)
+        results[name] = r
+        print(f"  {name:12s} {r['cpu_pct']:6.2f} {r['lidar']['mean_ms']:9.3f}ms {r['lidar']['p99_ms']:8.3f}ms "
+              f"{r['frame']['mean_ms']:9.3f}ms {r['frame']['p99_ms']:8.3f}ms")
+    assert results["in-process"]['lidar']['n'] > 0 and results["in-process"]['frame']['n'] > 0
+    return results
+
+def live(url, duration, pid=None):
+    """On the Pi: LiDAR read -> GUI receive latency through the running server, plus server CPU"""
+    try:
+        import socketio
+    except ImportError:
+        raise SystemExit("python-socketio is required for --live")
+    sio = socketio.Client()
+    latencies = []
+
+    @sio.on("lidar_broadcast")
+    def on_lidar(data):
+        if isinstance(data, dict) and "timestamp" in data:
+            latencies.append(time.time() - data["timestamp"])
+
+    process = None
+    if pid:
+        import psutil
+        process = psutil.Process(pid)
+        process.cpu_percent(None)
+    sio.connect(url)
+    sio.emit("subscribe_topics", {"topics": ["lidar"]})
+    sio.emit("start_lidar")
+    time.sleep(duration)
+    cpu = process.cpu_percent(None) if process else None
+    sio.disconnect()
+    latencies.sort()
+    if not latencies:
+        print("No timestamped LiDAR samples received")
+        return None
+    mean_ms = 1000.0 * sum(latencies) / len(latencies)
+    p99_ms = 1000.0 * latencies[int(0.99 * (len(latencies) - 1))]
+    print(f"LiDAR read -> client: {len(latencies)} samples, mean {mean_ms:.2f}ms, p99 {p99_ms:.2f}ms"
+          + (f", server CPU {cpu:.1f}%" if cpu is not None else ""))
+    return {'mean_ms': mean_ms, 'p99_ms': p99_ms, 'cpu_pct': cpu}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process service link benchmark")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--live", metavar="URL", help="Measure against a running server2 instead")
+    parser.add_argument("--pid", type=int, help="server2 process id for the CPU reading (--live)")
+    args = parser.parse_args()
+    if args.live:
+        live(args.live, args.duration, args.pid)
+    else:
+        benchmark(args.duration)
@@ -0,0 +1,289 @@
+"""Telemetry hub benchmarks: old per-subsystem broadcast loops vs the hub, and a multi-client load test
+Usage (from client-server2/server): python tests/bench_telemetry_hub.py [--load-test]
+"""
+import json
+import select
+import socket
+import sys
+import threading
+import time
+
+import conftest  # noqa: F401  (server/ and common/ on sys.path)
+from telemetry_hub import TelemetryHub, ROOM_PREFIX
+
+class CountingEmitter:
+    """Stands in for socketio.emit: encodes the packet once, writes it to each client's socket"""
+
+    def __init__(self, clients):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.bytes = 0
+        self.client_bytes = [0] * clients
+        self.client_events = [{} for _ in range(clients)]
+        self.pairs = [socket.socketpair() for _ in range(clients)]
+        self.running = True
+        self.reader = threading.Thread(target=self._drain, daemon=True)
+        self.reader.start()
+
+    def _drain(self):
+        while self.running:
+            readable, _, _ = select.select([b for _, b in self.pairs], [], [], 0.2) if self.pairs else ([], [], [])
+            if not self.pairs:
+                time.sleep(0.2)
+            for sock in readable:
+                sock.recv(65536)
+
+    def close(self):
+        self.running = False
+        self.reader.join(timeout=1.0)
+        for a, b in self.pairs:
+            a.close()
+            b.close()
+
+    def __call__(self, event, payload, to=None):
+        if isinstance(payload, (bytes, bytearray)):
+            packet = json.dumps([event, {"_placeholder": True, "num": 0}]).encode() + bytes(payload)
+        else:
+            packet = json.dumps([event, payload]).encode()
+        sids = range(len(self.pairs)) if to is None else ([to] if isinstance(to, int) else to)  # None = broadcast
+        with self.lock:
+            for sid in sids:
+                self.pairs[sid][0].sendall(packet)
+                self.client_bytes[sid] += len(packet)
+                events = self.client_events[sid]
+                events[event] = events.get(event, 0) + 1
+            self.count += 1
+            self.bytes += len(packet) * len(sids)
+
+def producers(handle, stop):
+    """Traffic arriving at server2 from the other processes / monitors (same before and after)"""
+    def loop(rate_hz, fn):
+        def run():
+            i = 0
+            while not stop.is_set():
+                fn(i)
+                i += 1
+                time.sleep(1.0 / rate_hz)
+        return threading.Thread(target=run, daemon=True)
+
+    return [
+        loop(0.5, lambda i: handle('sensor', {"temperature": 48.3, "cpu_percent": 21.0 + i % 3,
+                                              "memory_percent": 40.2, "uptime": f"{i * 2}s", "status": "Nominal"})),
+        loop(20.0, lambda i: handle('lidar', {"distance_cm": 120.0 + (i % 7)})),
+        loop(1.0, lambda i: handle('camera_payload', {"camera_status": "Streaming", "fps": 15, "status": "OK"})),
+        loop(1.0, lambda i: handle('lidar_payload', {"lidar_status": "Active", "collection_rate_hz": 20,
+                                                     "status": "OK"})),
+        loop(0.5, lambda i: handle('power', {"current": "0.412", "voltage": "7.9", "power": "3.25",
+                                             "energy": f"{i * 0.01:.2f}", "battery_percentage": 81,
+                                             "status": "Nominal"})),
+        loop(0.5, lambda i: handle('communication', {"downlink_frequency": 2.4, "latency": 12.0 + i % 2,
+                                                     "status": "Connected"})),
+        loop(1.0, lambda i: handle('i2c_bus', {"utilisation": "31.0", "queue_depth": 0, "errors": 0})),
+    ]
+
+def adcs_frame(i):
+    return bytes(100 * 10)  # One 10-sample frame
+
+def adcs_data_thread(stop, every_tenth):
+    """The 200Hz ADCS data thread (runs in both setups); every_tenth() is called per 10 samples"""
+    def run():
+        seq = 0
+        while not stop.is_set():
+            seq += 1
+            if seq % 10 == 0 and every_tenth:
+                every_tenth(seq)
+            time.sleep(0.005)
+    return threading.Thread(target=run, daemon=True)
+
+def thermal():
+    return {"battery_temp": "24.1", "pi_temp": "48.3", "payload_temp": "31.2", "status": "Nominal"}
+
+def run_old(duration, clients, topics=None):
+    """server2 before the hub: one sleep loop per periodic broadcast, relays emit inline"""
+    emitter = CountingEmitter(clients)
+    stop = threading.Event()
+    connected = set(range(clients))
+
+    def handle(name, payload):
+        emitter(f"{name}_broadcast", payload)
+
+    def adcs_loop():
+        i = 0
+        while not stop.is_set():
+            if len(connected) > 0:
+                emitter("adcs_broadcast", adcs_frame(i))
+            i += 1
+            time.sleep(0.05)
+
+    def thermal_loop():
+        while not stop.is_set():
+            emitter("thermal_broadcast", thermal())
+            time.sleep(0.5)
+
+    threads = producers(handle, stop) + [adcs_data_thread(stop, None),
+        threading.Thread(target=adcs_loop, daemon=True), threading.Thread(target=thermal_loop, daemon=True)]
+    return measure(threads, stop, duration, emitter)
+
+def run_hub(duration, clients, topics=None):
+    """Same traffic through the hub; `topics` = what clients after the first subscribe to"""
+    emitter = CountingEmitter(clients)
+    stop = threading.Event()
+
+    def emit(event, payload, to):
+        if isinstance(to, str):  # Room -> its members
+            topic = hub.topics[to[len(ROOM_PREFIX):]]
+            to = sorted(topic.subscribers - set(topic.throttled))
+        emitter(event, payload, to)
+
+    hub = TelemetryHub(emit)
+    for name, rate in (('sensor', None), ('camera_payload', None), ('lidar_payload', None), ('power', None),
+                       ('communication', None), ('i2c_bus', None), ('thermal', 2.0)):
+        hub.register_topic(name, max_rate_hz=rate)
+    hub.register_topic('lidar', stream=True)
+    hub.register_topic('adcs', event='adcs_broadcast', stream=True)
+    for sid in range(clients):
+        hub.subscribe(sid, None if sid == 0 else topics)
+
+    def handle(name, payload):
+        hub.publish(name, payload)
+        if name == 'sensor':  # Pi temperature changed -> thermal summary (event-driven, not polled)
+            hub.publish('thermal', thermal())
+
+    def adcs_chunk(seq):  # Data thread hands each full chunk to the hub
+        if hub.has_subscribers('adcs'):
+            hub.publish('adcs', adcs_frame(seq))
+
+    hub.start()
+    result = measure(producers(handle, stop) + [adcs_data_thread(stop, adcs_chunk)], stop, duration, emitter)
+    hub.stop()
+    return result
+
+def measure(threads, stop, duration, emitter):
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    count, size = emitter.count, emitter.bytes
+    for thread in threads:
+        thread.join(timeout=3.0)
+    emitter.close()
+    return {'cpu_pct': 100.0 * cpu / wall, 'emits_per_s': count / wall, 'bytes_per_s': size / wall}
+
+def benchmark(duration=10.0):
+    """Process CPU and emits/s for the old per-subsystem loops vs the hub"""
+    print(f"Broadcast benchmark ({duration:.0f}s each)")
+    print(f"  {'':32s} {'cpu %':>7s} {'emits/s':>8s} {'bytes/s':>9s}")
+    results = {}
+    scenarios = (("1 client", 1, None), ("3 clients", 3, None),
+                 ("GUI + 3 helper procs", 4, []), ("no clients", 0, None))
+    for label, clients, topics in scenarios:
+        for name, run in (("old loops", run_old), ("hub", run_hub)):
+            r = run(duration, clients, topics)
+            results[(name, label)] = r
+            print(f"  {name + ', ' + label:32s} {r['cpu_pct']:7.2f} {r['emits_per_s']:8.1f} {r['bytes_per_s']:9.0f}")
+    assert results[("hub", "1 client")]['emits_per_s'] < results[("old loops", "1 client")]['emits_per_s']
+    assert results[("hub", "no clients")]['emits_per_s'] == 0
+    return results
+
+LOAD_CLIENTS = (
+    # (label, subscription before per-client topics, subscription after)
+    ("GUI (client4)", None, None),
+    ("calibration", None, {"frame": 10}),
+    ("second GUI, slow link", None, {"adcs": 5, "thermal": None, "power": None, "sensor": None, "frame": 5}),
+    ("camera.py", [], []),
+    ("lidar.py", [], []),
+    ("sensors.py", [], []),
+)
+
+def jpeg(i):
+    return bytes(24000 + (i % 5) * 500)  # ~640x480 JPEG at quality 70
+
+def run_load(duration, per_client):
+    """Hub traffic plus a 20fps camera relay; per_client=False is server2 before per-client topics"""
+    clients = len(LOAD_CLIENTS)
+    emitter = CountingEmitter(clients)
+    stop = threading.Event()
+
+    def emit(event, payload, to):
+        if isinstance(to, str):
+            topic = hub.topics[to[len(ROOM_PREFIX):]]
+            to = sorted(topic.subscribers - set(topic.throttled))
+        emitter(event, payload, to)
+
+    hub = TelemetryHub(emit)
+    for name, rate in (('sensor', None), ('camera_payload', None), ('lidar_payload', None), ('power', None),
+                       ('communication', None), ('i2c_bus', None), ('thermal', 2.0)):
+        hub.register_topic(name, max_rate_hz=rate)
+    hub.register_topic('lidar', stream=True)
+    hub.register_topic('adcs', event='adcs_broadcast', stream=True)
+    if per_client:
+        hub.register_topic('frame', event='frame', stream=True)
+    for sid, (_, before, after) in enumerate(LOAD_CLIENTS):
+        hub.subscribe(sid, after if per_client else before)
+
+    def handle(name, payload):
+        hub.publish(name, payload)
+        if name == 'sensor':
+            hub.publish('thermal', thermal())
+
+    def adcs_chunk(seq):
+        if hub.has_subscribers('adcs'):
+            hub.publish('adcs', adcs_frame(seq))
+
+    def camera():
+        i = 0
+        while not stop.is_set():
+            if per_client:
+                hub.publish('frame', jpeg(i))
+            else:
+                emitter('frame', jpeg(i))  # emit('frame', data, broadcast=True) - sender included
+            i += 1
+            time.sleep(0.05)
+
+    hub.start()
+    threads = producers(handle, stop) + [adcs_data_thread(stop, adcs_chunk),
+                                          threading.Thread(target=camera, daemon=True)]
+    wall0 = time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    wall = time.monotonic() - wall0
+    with emitter.lock:
+        client_bytes = list(emitter.client_bytes)
+        client_events = [dict(events) for events in emitter.client_events]
+    for thread in threads:
+        thread.join(timeout=3.0)
+    hub.stop()
+    emitter.close()
+    return [{'bytes_per_s': b / wall, 'events_per_s': {e: n / wall for e, n in events.items()}}
+            for b, events in zip(client_bytes, client_events)]
+
+def load_test(duration=10.0):
+    """Bytes delivered to each client with everything broadcast vs per-client topics and rates"""
+    before = run_load(duration, per_client=False)
+    after = run_load(duration, per_client=True)
+    print(f"Multi-client load test ({duration:.0f}s each, camera 20fps, ADCS 200Hz)")
+    print(f"  {'client':24s} {'before B/s':>11s} {'after B/s':>10s}  after: frames/s  adcs/s")
+    for (label, _, _), old, new in zip(LOAD_CLIENTS, before, after):
+        events = new['events_per_s']
+        print(f"  {label:24s} {old['bytes_per_s']:11.0f} {new['bytes_per_s']:10.0f}  "
+              f"{events.get('frame', 0.0):14.1f} {events.get('adcs_broadcast', 0.0):7.1f}")
+    total_before = sum(r['bytes_per_s'] for r in before)
+    total_after = sum(r['bytes_per_s'] for r in after)
+    print(f"  {'total':24s} {total_before:11.0f} {total_after:10.0f}")
+
+    gui, calibration, slow = after[0]['events_per_s'], after[1]['events_per_s'], after[2]['events_per_s']
+    assert set(calibration) == {'frame'} and calibration['frame'] <= 10.5
+    assert slow['adcs_broadcast'] <= 5.5 and slow['frame'] <= 5.5
+    assert gui['frame'] > 15.0 and gui['adcs_broadcast'] > 15.0
+    assert all(r['bytes_per_s'] == 0 for r in after[3:])
+    return before, after
+
+if __name__ == "__main__":
+    if "--load-test" in sys.argv:
+        load_test()
+    else:
+        benchmark()
@@ -0,0 +1,26 @@
+"""Yaw history benchmark: lookup cost against the history length
+Usage (from client-server2/server): python tests/bench_yaw_history.py
+"""
+import time
+
+import numpy as np
+
+import conftest  # noqa: F401  (server/ and common/ on sys.path)
+from yaw_history import YawHistory
+
+def benchmark():
+    """Lookup cost stays logarithmic in the history length"""
+    rng = np.random.default_rng(3)
+    for capacity in (256, 4096, 65536):
+        h = YawHistory(capacity)
+        t = np.arange(capacity) * 0.002
+        h.extend(t, t * 10.0, np.full(capacity, 10.0))
+        queries = rng.uniform(t[0], t[-1], 2000)
+        start = time.perf_counter()
+        for q in queries:
+            h.yaw_at(q)
+        per_lookup = (time.perf_counter() - start) / len(queries) * 1e6
+        print(f"capacity {capacity:6d}: {per_lookup:.1f}µs per lookup")
+
+if __name__ == "__main__":
+    benchmark()
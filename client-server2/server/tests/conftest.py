@@ -0,0 +1,13 @@
+"""
+🧪 Server test suite - runs on a PC against the simulated hardware in sim_hardware.py
+Usage (from client-server2/server): python -m pytest tests
+The bench_*.py scripts here are run directly and import this module for the same sys.path.
+"""
+import os
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON_DIR = os.path.normpath(os.path.join(SERVER_DIR, "..", "common"))
+for path in (SERVER_DIR, COMMON_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
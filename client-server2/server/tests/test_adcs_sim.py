@@ -0,0 +1,75 @@
+"""ADCS simulator: the real ADCSController against the simulated yaw plant, faster than real time"""
+import pytest
+
+import ADCS_PD
+from adcs_sim import AdcsSimulation, VirtualTime, run_sweep, run_env, run_tune, SETTLE_BAND
+
+def test_virtual_time_runs_threads_in_lockstep():
+    clock = VirtualTime()
+    woke = []
+
+    def worker():
+        for _ in range(3):
+            clock.sleep(0.25)
+            woke.append(clock.monotonic())
+
+    thread = clock.thread(worker)
+    thread.start()
+    clock.sleep(1.0)
+    thread.join(1.0)
+    assert woke == [0.25, 0.5, 0.75]
+    assert clock.now == 1.0
+
+def test_default_gains_settle_a_90_degree_step():
+    legacy, default = run_sweep(gains=((17, 15), (17, 5)), rates=(20, 200))[:2]
+    assert default['settling_time'] is not None and default['settling_time'] < 10.0
+    assert abs(default['steady_state_error']) < SETTLE_BAND
+    assert default['settling_time'] <= legacy['settling_time']
+    assert default['speedup'] > 1.0
+
+def test_env_routine_finds_the_sun():
+    env = run_env(sun_bearing=40.0)
+    assert env['result'] == "success"
+    assert env['sweep_peaks'] >= 6  # 2 turns x 3 sensors
+    assert env['sweep_max_error'] < 2.0
+
+def test_tachometer_follows_the_wheel():
+    with AdcsSimulation() as sim:  # Spin the wheel up, then coast
+        ADCS_PD.set_motor_power(60)
+        sim.run(1.5)
+        ADCS_PD.stop_motor()
+        sim.run(1.0)
+        with sim.controller.data_lock:
+            tacho_rpm = sim.controller.current_data['rpm']
+        wheel_rpm = abs(sim.plant.wheel_rpm)
+    assert tacho_rpm == pytest.approx(wheel_rpm, rel=0.05)
+
+def test_autotune_identifies_the_plant():
+    tune = run_tune(settling_time=2.0)
+    assert tune['result'] == "success"
+    model, measured = tune['data']['model'], tune['data']['measured']
+    assert model['gain'] == pytest.approx(tune['true_gain'], rel=0.15)
+    assert model['damping'] == pytest.approx(tune['true_damping'], abs=0.1)
+    assert measured['settling_time'] is not None and measured['settling_time'] < 3.0
+
+def _track_tag(repeat_fixes, tag_bearing=5.0, duration=3.0, camera_hz=30.0):
+    """AprilTag mode on a tag at `tag_bearing`: one fix, or a fix every camera frame"""
+    with AdcsSimulation(gains={'ki': 2.0}) as sim:
+        controller = sim.controller
+        sim.run(0.5)
+        controller.start_auto_zero_tag()
+        start = sim.now
+        for frame in range(int(duration * camera_hz)):
+            if frame == 0 or repeat_fixes:
+                controller.auto_zero_tag({"relative_angle": tag_bearing - sim.plant.yaw})
+            sim.run(1.0 / camera_hz)
+        return sim.log_array(start)[:, 4], sim.plant.yaw, controller.pd_controller.integral
+
+def test_repeated_tag_fixes_do_not_restart_the_loop():
+    single_power, single_yaw, single_integral = _track_tag(repeat_fixes=False)
+    power, yaw, integral = _track_tag(repeat_fixes=True)
+    steps = min(len(single_power), len(power))
+    assert abs(single_integral) > 0.01
+    assert integral == pytest.approx(single_integral, rel=0.1)
+    assert abs(power[:steps] - single_power[:steps]).mean() < 1.0  # % power
+    assert yaw == pytest.approx(single_yaw, abs=0.5)
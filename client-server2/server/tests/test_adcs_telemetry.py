@@ -0,0 +1,66 @@
+"""ADCS telemetry frames: round trip, header checks, ring chunking and the display strings"""
+import struct
+
+import numpy as np
+import pytest
+
+from adcs_telemetry import (TelemetryRing, encode_frames, decode_frames, chunk_frames, to_display_dict,
+                            HEADER, FRAME_MAGIC, FRAME_VERSION, FRAME_KIND_ADCS)
+
+def sample_record(seq):
+    return {
+        'seq': seq, 't': 1234.5 + seq * 0.05, 'yaw': 12.34, 'roll': -0.5, 'pitch': 1.25,
+        'gyro_yaw': 12.9, 'rate_x': 0.12, 'rate_y': -0.03, 'rate_z': 4.56, 'temp': 31.2,
+        'lux1': 452.7, 'lux2': 1789.1, 'lux3': 444.6, 'rpm': 0.0, 'target_yaw': 15.0,
+        'error': 2.66, 'motor_power': 35.0, 'yaw_bias': 0.012, 'yaw_std': 0.31,
+        'fifo_samples': 500 * seq, 'fifo_overflows': 0, 'fifo_batch': 25,
+        'status': 'Active', 'reference': 'tag', 'controller_enabled': 1,
+    }
+
+def test_round_trip():
+    records = [sample_record(i) for i in range(1, 4)]
+    decoded = decode_frames(encode_frames(records))
+    assert list(decoded['seq']) == [1, 2, 3]
+    assert decoded['t'][2] == records[2]['t']
+    assert decoded['yaw'][0] == pytest.approx(12.34, abs=1e-5)
+    assert decoded['gyro_yaw'][0] == pytest.approx(12.9, abs=1e-5)
+
+def test_display_dict_rebuilds_the_legacy_strings():
+    display = to_display_dict(decode_frames(encode_frames([sample_record(7)]))[0])
+    assert display['orientation'] == "Y:12.3° R:-0.5° P:1.2°"
+    assert display['angle_z'] == "12.3" and display['gyro_yaw'] == "12.9"
+    assert display['gyro_rate_z'] == "4.56" and display['temperature'] == "31.2°C"
+    assert display['fifo_samples'] == "3500" and display['yaw_bias'] == "0.012"
+    assert display['status'] == "Active" and display['yaw_reference'] == "tag"
+
+@pytest.mark.parametrize("header", [
+    HEADER.pack(b"XX", FRAME_VERSION, FRAME_KIND_ADCS, 0),        # Foreign frame
+    HEADER.pack(FRAME_MAGIC, FRAME_VERSION + 1, FRAME_KIND_ADCS, 0),  # Newer layout
+    HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_KIND_ADCS, 1),  # Record missing
+    b"AT",                                                        # Truncated header
+])
+def test_bad_frames_rejected(header):
+    with pytest.raises(ValueError):
+        decode_frames(header)
+
+def test_ring_ships_every_sample_in_chunks():
+    # 200Hz samples through the ring, shipped every 10 samples
+    ring = TelemetryRing(capacity=256)
+    frames, last_seq = [], 0
+    for seq in range(1, 401):  # Data-thread seq starts at 1
+        ring.append(sample_record(seq))
+        if seq % 10 == 0:
+            new = ring.since(last_seq)
+            last_seq = int(new['seq'][-1])
+            frames.extend(chunk_frames(new, 4))
+    assert all(struct.unpack_from("<H", f, 4)[0] <= 4 for f in frames)
+    received = np.concatenate([decode_frames(f) for f in frames])
+    assert np.array_equal(received['seq'], np.arange(1, 401))
+    assert ring.last_seq == 400
+
+def test_ring_keeps_the_newest_when_overrun():
+    ring = TelemetryRing(capacity=8)
+    for seq in range(1, 21):
+        ring.append(sample_record(seq))
+    assert list(ring.since(0)['seq']) == list(range(13, 21))
+    assert list(ring.since(0, limit=3)['seq']) == [18, 19, 20]
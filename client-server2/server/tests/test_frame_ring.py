@@ -0,0 +1,51 @@
+"""Shared-memory frame ring: round trip, overwrite detection, raw frames and doorbell wake-up"""
+import os
+
+import numpy as np
+import pytest
+
+from frame_ring import FrameRing, KIND_JPEG, KIND_RAW
+
+@pytest.fixture
+def ring():
+    name = f"slowmo_test_{os.getpid()}"
+    writer = FrameRing(name, create=True, slots=3, slot_size=4096)
+    reader = FrameRing(name)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+def test_round_trip_and_doorbell(ring):
+    writer, reader = ring
+    assert reader.register_reader()
+    assert reader.read() is None
+    assert reader.wait(0, timeout=0.05) is None
+    seq = writer.write(b"jpeg-1", timestamp=12.5)
+    assert reader.wait(0, timeout=1.0) == seq == 1
+    frame = reader.read(seq)
+    assert bytes(frame.data) == b"jpeg-1" and frame.timestamp == 12.5 and frame.kind == KIND_JPEG
+    frame.release()
+
+def test_overwritten_slot_is_detected(ring):
+    writer, reader = ring
+    frame = reader.read(writer.write(b"jpeg-1"))
+    for i in range(3):                      # Wrap the 3 slots: frame 1 is overwritten by frame 4
+        writer.write(f"jpeg-{i + 2}".encode())
+    assert not frame.valid()
+    assert reader.read(1) is None and frame.tobytes() is None
+    latest = reader.read()
+    assert bytes(latest.data) == b"jpeg-4"
+    for view in (frame, latest):
+        view.release()
+
+def test_raw_frame(ring):
+    writer, reader = ring
+    pixels = np.arange(24 * 32 * 3, dtype=np.uint8).reshape(24, 32, 3)
+    raw = reader.read(writer.write_array(pixels))
+    assert raw.kind == KIND_RAW and np.array_equal(raw.array(), pixels)
+    raw.release()
+
+def test_oversized_frame_rejected(ring):
+    writer, _ = ring
+    with pytest.raises(ValueError):
+        writer.write(bytes(5000))
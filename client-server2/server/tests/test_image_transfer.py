@@ -0,0 +1,103 @@
+"""Image transfer: loopback download of a still over a 4 MB/s link, complete and resumed after a cut"""
+import os
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from image_transfer import ImageSender, ImageReceiver, file_sha256
+
+class Link:
+    """In-process link with latency and a bandwidth limit; can be cut"""
+
+    def __init__(self, latency=0.01, bandwidth=4e6):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.handlers = {}
+        self.connected = True
+        self.busy_until = 0.0
+        self.lock = threading.Lock()
+        self.bytes = 0
+
+    def send(self, event, payload):
+        if not self.connected:
+            return
+        size = len(payload.get("data", b"")) + 64 if isinstance(payload, dict) else len(payload)
+        with self.lock:
+            self.bytes += size
+            now = time.monotonic()
+            self.busy_until = max(self.busy_until, now) + size / self.bandwidth
+            deliver_at = self.busy_until + self.latency
+        threading.Timer(max(0.0, deliver_at - now), self._deliver, (event, payload)).start()
+
+    def _deliver(self, event, payload):
+        if self.connected and event in self.handlers:
+            self.handlers[event](payload)
+
+def connect(sender, dest_dir, progress, errors):
+    up, down = Link(), Link()
+    receiver = ImageReceiver(up.send, dest_dir, progress)
+    down.handlers = {"image_transfer_start": receiver.on_start, "image_chunk": receiver.on_chunk,
+                     "image_transfer_end": receiver.on_end, "image_download": errors.append}
+    up.handlers = {
+        "download_image": lambda msg: sender.start("client", msg["server_path"], msg["filename"],
+                                                   down.send, msg["offset"], msg["sha256"]),
+        "image_chunk_ack": lambda msg: sender.ack(msg["transfer_id"], msg["next_offset"]),
+    }
+    return receiver, up, down
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "image_test.jpg")
+    with open(path, "wb") as f:
+        f.write(os.urandom(5 * 1024 * 1024 + 12345))    # ~ a 4608x2592 still at quality 95
+    return path
+
+def test_full_transfer_streams_from_disk(source, tmp_path):
+    dest_dir = str(tmp_path / "captured_images")
+    finished, results, errors = threading.Event(), [], []
+
+    def progress(info):
+        if info["done"]:
+            results.append(info)
+            finished.set()
+
+    receiver, _, _ = connect(ImageSender(ack_timeout=2.0), dest_dir, progress, errors)
+    tracemalloc.start()
+    receiver.request(source, "image_test.jpg")
+    assert finished.wait(10.0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert results[0]["ok"] and not errors
+    assert file_sha256(os.path.join(dest_dir, "image_test.jpg")) == file_sha256(source)
+    assert peak < os.path.getsize(source) / 2   # Never the whole file in memory
+
+def test_resume_after_link_cut(source, tmp_path):
+    dest_dir = str(tmp_path / "captured_images")
+    sender = ImageSender(ack_timeout=2.0)
+    finished, cut, results, errors = threading.Event(), threading.Event(), [], []
+
+    def progress_cut(info):
+        if info["percent"] >= 40.0:
+            cut.set()
+
+    def progress(info):
+        if info["done"]:
+            results.append(info)
+            finished.set()
+
+    receiver, up, down = connect(sender, dest_dir, progress_cut, errors)
+    receiver.request(source, "image_test.jpg")
+    assert cut.wait(10.0)
+    up.connected = down.connected = False
+    sender.cancel("client")   # As server2 does on disconnect
+    part_size = os.path.getsize(os.path.join(dest_dir, "image_test.jpg.part"))
+
+    receiver, up, down = connect(sender, dest_dir, progress, errors)
+    receiver.request(source, "image_test.jpg")
+    assert finished.wait(10.0)
+    assert results[0]["ok"]
+    assert file_sha256(os.path.join(dest_dir, "image_test.jpg")) == file_sha256(source)
+    assert not os.path.exists(os.path.join(dest_dir, "image_test.jpg.part"))
+    assert down.bytes < os.path.getsize(source) - part_size + 1024 * 1024  # Only the missing part is resent
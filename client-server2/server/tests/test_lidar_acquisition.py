@@ -0,0 +1,44 @@
+"""LiDAR acquisition: a synthetic distance signal through the simulated LIDAR-Lite on a simulated clock"""
+import math
+import random
+
+import pytest
+
+from lidar_acquisition import LidarAcquisition, LIDAR_ADDR, LIDAR_SAMPLE_RATE, FILTER_WINDOW
+from sim_hardware import SimClock, SimulatedSMBus, SimulatedLidarLite
+
+def truth(t):
+    return 150.0 + 50.0 * math.sin(2 * math.pi * t / 2.0) if t < 2.0 else 300.0
+
+@pytest.fixture
+def run():
+    clock = SimClock()
+    bus = SimulatedSMBus()
+    bus.attach(LIDAR_ADDR, SimulatedLidarLite(truth, noise_std=1.0, outlier_rate=0.02, dropout_rate=0.01,
+                                              clock=clock, rng=random.Random(3)))
+    batches = []
+    acquisition = LidarAcquisition(bus, publish=batches.append, clock=clock, sleep=clock.advance)
+    acquisition.run(lambda: clock() < 2.2)
+    t = [x for b in batches for x in b["t"]]
+    filtered = [x for b in batches for x in b["distance_cm"]]
+    raw = [x for b in batches for x in b["raw_cm"]]
+    return acquisition, batches, t, filtered, raw
+
+def test_sample_rate_and_batching(run):
+    acquisition, batches, t, _, _ = run
+    stats = acquisition.get_stats()
+    assert abs(stats['samples'] + stats['invalid'] - LIDAR_SAMPLE_RATE * 2.2) <= 2
+    assert len(batches) in (43, 44, 45)
+    assert all(b - a == pytest.approx(1.0 / LIDAR_SAMPLE_RATE, abs=1e-6) for a, b in zip(t, t[1:]) if b - a < 0.003)
+
+def test_filter_rejects_outliers(run):
+    _, _, t, filtered, raw = run
+    sine = [(ti, f, r) for ti, f, r in zip(t, filtered, raw) if ti < 2.0]
+    assert max(abs(r - truth(ti)) for ti, _, r in sine) > 100
+    assert max(abs(f - truth(ti)) for ti, f, _ in sine) < 6
+
+def test_step_passes_the_median_within_half_a_window(run):
+    _, _, t, filtered, _ = run
+    after = [ti for ti, f in zip(t, filtered) if ti >= 2.0 and abs(f - 300) < 5]
+    assert after
+    assert after[0] - 2.0 <= (FILTER_WINDOW // 2 + 1) / LIDAR_SAMPLE_RATE + 1e-9
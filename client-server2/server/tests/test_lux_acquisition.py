@@ -0,0 +1,38 @@
+"""Round-robin VEML7700 reads behind a simulated TCA9548A mux"""
+import pytest
+
+from lux_acquisition import LuxRoundRobinReader
+from sim_hardware import SimClock, SimulatedTCA9548A, SimulatedVEML7700
+
+@pytest.fixture
+def rig():
+    clock = SimClock()
+    mux = SimulatedTCA9548A(clock=clock)
+    sensors = {ch: SimulatedVEML7700(mux, ch, lux_fn=lambda t, ch=ch: 100.0 * ch + t) for ch in (1, 2, 3)}
+    published = []
+    reader = LuxRoundRobinReader(
+        select_channel=lambda ch: mux.writeto(0x70, bytes([1 << ch])),
+        sensors=sensors, rate_hz=30.0,
+        publish=lambda ch, lux, ts: published.append((ch, lux, ts)),
+        clock=clock,
+    )
+    return clock, sensors, reader, published
+
+def test_channels_read_in_turn_from_the_selected_sensor(rig):
+    clock, _, reader, published = rig
+    for _ in range(30):
+        reader.tick()
+        clock.advance(1.0 / 30.0)
+
+    assert [ch for ch, _, _ in published][:6] == [1, 2, 3, 1, 2, 3]
+    for ch, lux, ts in published:
+        assert lux == pytest.approx(100.0 * ch + ts, abs=1e-9)
+    assert reader.read_count == {1: 10, 2: 10, 3: 10}
+
+def test_failed_sensor_is_skipped_without_stalling_the_others(rig):
+    _, sensors, reader, published = rig
+    sensors[2].fail = True
+    for _ in range(6):
+        reader.tick()
+    assert published and all(ch != 2 for ch, _, _ in published)
+    assert reader.sensors[2] is None
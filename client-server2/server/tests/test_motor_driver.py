@@ -0,0 +1,44 @@
+"""Motor driver: write-on-change, direction order, deadband and slew limit against the fake backend"""
+import pytest
+
+from motor_driver import MotorDriver, FakeGPIOBackend, CW, CCW
+
+def test_writes_only_on_change_and_breaks_before_make():
+    fake = FakeGPIOBackend()
+    motor = MotorDriver(fake)
+    motor.set_power(40)
+    assert fake.writes == [(CW, 40.0)]
+    motor.set_power(40)
+    motor.set_power(40.01)                              # Below the duty resolution
+    assert len(fake.writes) == 1
+    motor.set_power(-25)
+    assert fake.writes[1:] == [(CW, 0.0), (CCW, 25.0)]  # Off before on
+    motor.stop()
+    assert fake.duty == [0.0, 0.0]
+    assert motor.get_stats()['writes'] == 4
+
+def test_deadband():
+    motor = MotorDriver(FakeGPIOBackend(), deadband=8.0)
+    assert motor.set_power(5) == 0.0
+    assert motor.set_power(-9) == -9.0
+
+def test_slew_limit_but_not_on_stop():
+    clock = [0.0]
+    motor = MotorDriver(FakeGPIOBackend(), slew_rate=200.0, clock=lambda: clock[0])
+    motor.set_power(0)
+    clock[0] = 0.05
+    assert motor.set_power(100) == pytest.approx(10.0)  # 200%/s for 50ms
+    clock[0] = 0.10
+    assert motor.set_power(100) == pytest.approx(20.0)
+    motor.stop()
+    assert motor.power == 0.0
+
+def test_holding_a_target_skips_almost_every_write():
+    # A minute of the 20Hz PD loop; the old set_motor_power wrote both channels on every command
+    commands = [0.0] * 600 + [35.0] * 300 + [12.04, 12.02] * 150 + [0.0] * 300
+    fake = FakeGPIOBackend()
+    motor = MotorDriver(fake)
+    for power in commands:
+        motor.set_power(power)
+    assert len(fake.writes) < 2 * len(commands) / 50
+    assert motor.get_stats()['skipped'] == len(commands) - len(fake.writes)
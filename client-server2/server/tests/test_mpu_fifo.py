@@ -0,0 +1,48 @@
+"""MPU6050 FIFO drain and batched integration against a simulated MPU6050"""
+import math
+
+import numpy as np
+import pytest
+
+from mpu_fifo import MPU6050Fifo, integrate_gyro_batch
+from sim_hardware import SimulatedSMBus, SimulatedMPU6050, SimClock
+
+AMPLITUDE, PERIOD = 90.0, 2.0
+
+def true_yaw(t):
+    return AMPLITUDE * PERIOD / (2 * math.pi) * (1 - math.cos(2 * math.pi * t / PERIOD))
+
+@pytest.fixture
+def rig():
+    clock = SimClock()
+    bus = SimulatedSMBus()
+    rate_fn = lambda t: (0.0, 0.0, AMPLITUDE * math.sin(2 * math.pi * t / PERIOD))
+    mpu = bus.attach(0x68, SimulatedMPU6050(rate_fn=rate_fn, clock=clock))
+    bus.write_byte_data(0x68, 0x6B, 0)  # Wake up
+    fifo = MPU6050Fifo(bus, sample_rate_hz=500)
+    fifo.configure()
+    return clock, mpu, fifo
+
+def test_jittery_drain_integrates_to_true_yaw(rig):
+    clock, mpu, fifo = rig
+    start_time = clock()
+    angles = np.zeros(3)
+    jitter = [0.041, 0.063, 0.049, 0.057, 0.038, 0.052]  # 20Hz data thread with loop jitter
+    for i in range(200):
+        clock.advance(jitter[i % len(jitter)])
+        rates = fifo.drain()
+        if len(rates):
+            angles = integrate_gyro_batch(rates, fifo.sample_period, angles)[-1]
+
+    elapsed = mpu._last_sample_time - start_time
+    assert fifo.overflow_count == 0
+    assert fifo.samples_total / elapsed == pytest.approx(500, rel=0.01)
+    assert angles[2] == pytest.approx(true_yaw(elapsed), abs=0.5)
+
+def test_stall_longer_than_fifo_reports_overflow(rig):
+    clock, _, fifo = rig
+    clock.advance(0.05)
+    fifo.drain()
+    clock.advance(0.5)
+    fifo.drain()
+    assert fifo.overflow_in_last_drain and fifo.overflow_count == 1
@@ -0,0 +1,39 @@
+"""PD auto-tune: the relay test recovers a linear model and the designed gains meet the settling time"""
+import numpy as np
+import pytest
+
+from pd_autotune import RelayTest, fit_rate_model, design_gains, predict_step, step_metrics
+
+TRUE_GAIN, TRUE_DAMPING = 0.46, 0.28
+
+@pytest.fixture(scope="module")
+def model():
+    rng = np.random.default_rng(0)
+    dt = 0.02
+    relay = RelayTest(target=0.0)
+    yaw, rate, t = 0.0, 0.0, 0.0
+    u = relay.step(t, yaw, rate)
+    while not relay.done:
+        for _ in range(20):  # 1ms plant steps between 20ms samples
+            rate += (TRUE_GAIN * u - TRUE_DAMPING * rate) * 0.001
+            yaw += rate * 0.001
+        t += dt
+        u = relay.step(t, yaw, rate + rng.normal(0.0, 0.05))
+    amplitude, period = relay.oscillation()
+    assert amplitude > 0 and period > 0
+    return fit_rate_model(*relay.samples())
+
+def test_relay_fit_recovers_the_model(model):
+    assert model['gain'] == pytest.approx(TRUE_GAIN, rel=0.05)
+    assert model['damping'] == pytest.approx(TRUE_DAMPING, abs=0.05)
+
+@pytest.mark.parametrize("settling_time", [1.5, 3.0])
+def test_designed_gains_meet_settling_time(model, settling_time):
+    gains = design_gains(model['gain'], model['damping'], settling_time)
+    t, y = predict_step(TRUE_GAIN, TRUE_DAMPING, gains['kp'], gains['kd'], step=5.0)
+    metrics = step_metrics(t, y, 5.0, band=0.1)
+    assert metrics['settling_time'] == pytest.approx(settling_time, rel=0.25)
+
+def test_design_rejects_reversed_motor():
+    with pytest.raises(ValueError):
+        design_gains(-0.4, 0.3, 2.0)
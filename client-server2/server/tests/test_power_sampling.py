@@ -0,0 +1,47 @@
+"""INA228 sampler: motor current pulses on the simulated INA228, integration and sensor loss"""
+import pytest
+
+from power_sampling import (INA228Sampler, INA228_ADDR, POWER_SAMPLE_RATE, ENERGY_SCALE,
+                            MAX_CONSECUTIVE_ERRORS)
+from sim_hardware import SimClock, SimulatedSMBus, SimulatedINA228
+
+def current(t):
+    """0.4 A base load + 1.5 A for 30 ms every 0.7 s (motor direction changes)"""
+    return 0.4 + (1.5 if (t % 0.7) < 0.03 else 0.0)
+
+@pytest.fixture
+def rig():
+    clock = SimClock()
+    bus = SimulatedSMBus()
+    ina = bus.attach(INA228_ADDR, SimulatedINA228(current_fn=current, voltage_fn=lambda t: 7.4 - 0.1 * t / 10.0,
+                                                  clock=clock))
+    summaries = []
+    sampler = INA228Sampler(bus, rate_hz=POWER_SAMPLE_RATE, interval=2.0, publish=summaries.append,
+                            clock=clock, sleep=clock.advance).configure()
+    sampler.run(lambda: clock() < 10.0 + 1e-9)
+    return clock, bus, ina, sampler, summaries
+
+def test_summaries_catch_motor_pulses(rig):
+    _, _, _, _, summaries = rig
+    assert len(summaries) == 5
+    assert all(s['samples'] in (100, 101) for s in summaries)
+    assert all(s['current_ma_max'] > 1800 for s in summaries)
+    assert all(s['current_ma_min'] == pytest.approx(400, abs=1) for s in summaries)
+
+def test_charge_and_energy(rig):
+    _, _, ina, sampler, _ = rig
+    span = sampler.latest[0]
+    steps = 100000
+    exact = sum(current((k + 0.5) * span / steps) for k in range(steps)) * span / steps
+    assert sampler.charge_c == pytest.approx(exact, rel=0.05)
+    assert sampler.energy_j == pytest.approx(sampler.charge_c * 7.35, rel=0.01)
+    # The hardware accumulator, to one LSB
+    assert sampler.hardware_energy_j == pytest.approx(ina.energy_j, abs=ENERGY_SCALE * sampler.current_lsb)
+
+def test_run_raises_when_the_sensor_stops_answering(rig):
+    clock, bus, _, sampler, _ = rig
+    del bus.devices[INA228_ADDR]
+    failed_at = clock()
+    with pytest.raises(OSError):
+        sampler.run(lambda: clock() < failed_at + 5.0)
+    assert sampler.consecutive_errors == MAX_CONSECUTIVE_ERRORS
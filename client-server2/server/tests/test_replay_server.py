@@ -0,0 +1,62 @@
+"""Replay server: a synthetic session at 1x / 4x / max speed, looping, and the legacy client recordings"""
+import os
+import threading
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from replay_server import Replayer, session_events, legacy_events, DEFAULT_RECORDINGS, FRAME_QUALITY
+from session_recorder import SessionRecorder, list_sessions
+
+RECORDED_SPAN_S = 2.95
+
+@pytest.fixture(scope="module")
+def session(tmp_path_factory):
+    """Synthetic session: 10fps frames, 20Hz ADCS chunks, 10Hz LiDAR, 1Hz power (recorded timestamps)"""
+    directory = str(tmp_path_factory.mktemp("sessions"))
+    rng = np.random.default_rng(11)
+    frame = cv2.GaussianBlur(rng.integers(0, 255, (864, 1536, 3), dtype=np.uint8), (31, 31), 0)
+    jpeg = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), FRAME_QUALITY])[1].tobytes()
+    recorder = SessionRecorder(directory)
+    recorder.start(["frame", "adcs", "lidar", "power"], name="synthetic")
+    t0 = 1_750_000_000.0
+    for i in range(60):
+        t = t0 + i * 0.05 + rng.uniform(0, 0.004)
+        recorder.record("adcs", rng.bytes(2400), timestamp=t)
+        if i % 2 == 0:
+            recorder.record("frame", jpeg, timestamp=t + 0.001)
+            recorder.record("lidar", {"distance_cm": float(rng.uniform(20, 200))}, timestamp=t + 0.002)
+        if i % 20 == 0:
+            recorder.record("power", {"voltage": "7.4", "current": "0.512"}, timestamp=t + 0.003)
+    recorder.stop()
+    assert list_sessions(directory)[0]["session"] == "synthetic"
+    return os.path.join(directory, "synthetic")
+
+def replay(path, speed):
+    return Replayer(lambda: session_events(path), speed=speed).run(lambda topic, payload: None)
+
+def test_speed_scales_the_schedule(session):
+    real_time = replay(session, 1.0)
+    assert real_time["elapsed_s"] == pytest.approx(RECORDED_SPAN_S, abs=0.2)
+    assert real_time["late_p99_ms"] < 20
+    assert replay(session, 4.0)["elapsed_s"] == pytest.approx(RECORDED_SPAN_S / 4, abs=0.1)
+
+def test_same_sequence_at_every_speed(session):
+    # Same events in the same order, whatever the speed or timing jitter
+    sequences = {replay(session, speed)['sequence'] for speed in (1.0, 4.0, 0.0, 0.0)}
+    assert len(sequences) == 1
+
+def test_loop_until_stopped(session):
+    looped = Replayer(lambda: session_events(session, topics=["lidar"]), speed=0.0, loop=True)
+    timer = threading.Timer(0.2, looped.stop_event.set)
+    timer.start()
+    assert looped.run(lambda topic, payload: None)["passes"] > 1
+
+@pytest.mark.skipif(not os.path.isdir(DEFAULT_RECORDINGS), reason="client/recordings not present")
+def test_legacy_recordings():
+    events = legacy_events()
+    assert all(a[0] <= b[0] for a, b in zip(events, events[1:]))
+    stats = Replayer(lambda: events, speed=0.0).run(lambda topic, payload: None)
+    assert stats["events"] == len(events)
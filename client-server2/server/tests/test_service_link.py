@@ -0,0 +1,43 @@
+"""Service link: events reach the server handlers in-process, commands reach the service"""
+import pytest
+
+from service_link import ServiceBus, ServiceClient
+
+@pytest.fixture
+def link():
+    service_bus = ServiceBus()
+    received, commands, connected = [], [], []
+    service_bus.on("lidar_data")(received.append)
+    client = ServiceClient(service_bus)
+    client.on("start_camera")(commands.append)
+
+    @client.event
+    def connect():
+        connected.append(True)
+
+    assert not client.connected
+    service_bus.enable()
+    client.connect("http://localhost:5000")
+    return service_bus, client, received, commands, connected
+
+def test_connects_in_process(link):
+    _, client, _, _, connected = link
+    assert client.in_process and client.connected
+    assert connected == [True]
+
+def test_events_reach_server_handlers_without_copies(link):
+    service_bus, client, received, _, _ = link
+    payload = {"distance_cm": 120}
+    client.emit("lidar_data", payload)
+    client.emit("subscribe_topics", {"topics": []})  # No server handler in-process
+    assert received == [payload] and received[0] is payload  # Same object - no serialisation
+    assert service_bus.unhandled == 1
+
+def test_commands_reach_the_service_until_disconnect(link):
+    service_bus, client, _, commands, _ = link
+    service_bus.dispatch("start_camera", {}, wait=True)
+    service_bus.dispatch("camera_config", {"fps": 15}, wait=True)  # Not handled by this service
+    assert commands == [{}]
+    client.disconnect()
+    service_bus.dispatch("start_camera", {}, wait=True)
+    assert commands == [{}] and not client.connected
@@ -0,0 +1,56 @@
+"""Still capture: stills from the fake dual-stream camera must not interrupt the video"""
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from still_capture import StillCapture, FakePicamera2, dual_stream_config, yuv420_to_bgr, STILL_RESOLUTION
+
+FPS = 10.0
+
+def stream(camera, stills, stop, video_times):
+    """Camera-thread loop as camera.py runs it in dual-stream mode"""
+    while not stop.is_set():
+        request = camera.capture_request()
+        try:
+            frame = yuv420_to_bgr(request.make_array("lores"))
+            if stills.pending:
+                stills.serve(request.make_array("main"), time.time())
+        finally:
+            request.release()
+        cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
+        video_times.append(time.monotonic())
+
+def test_stills_do_not_interrupt_the_stream(tmp_path):
+    camera = FakePicamera2(fps=FPS)
+    camera.configure(dual_stream_config(camera, (1536, 864), {}))
+    camera.start()
+    stills = StillCapture()
+    stop, video_times = threading.Event(), []
+    thread = threading.Thread(target=stream, args=(camera, stills, stop, video_times), daemon=True)
+    thread.start()
+    time.sleep(0.5)
+    results = []
+    for i in range(3):
+        results.append(stills.capture(str(tmp_path / f"still_{i}.jpg")))
+        time.sleep(0.3)
+    stop.set()
+    thread.join()
+
+    for result in results:
+        assert result["success"], result
+        assert result["resolution"] == list(STILL_RESOLUTION)
+        assert os.path.getsize(result["path"]) > 0
+        assert set(result["latency_ms"]) == {"wait_frame", "encode", "write", "total"}
+    assert np.diff(video_times).max() < 2.0 / FPS  # No frame missed while the stills were encoded
+    assert stills.get_stats()["captured"] == 3
+
+def test_wait_times_out_without_frames():
+    stills = StillCapture()
+    result = stills.wait(stills.request("never.jpg"), timeout=0.05)
+    assert not result["success"]
+    assert stills.get_stats() == {"captured": 0, "failed": 1, "pending": 0, "last_latency_ms": None}
@@ -0,0 +1,30 @@
+"""Tachometer: known pulse rates from the fake GPIO read back; jitter, glitches, slow-down and stop"""
+import pytest
+
+from tachometer import Tachometer, FakeTachoGPIO, STALE_TIMEOUT
+
+@pytest.mark.parametrize("rpm", [60, 600, 3000, 12000])
+def test_pulse_rate_reads_back(rpm):
+    gpio = FakeTachoGPIO()
+    tacho = Tachometer(gpio=gpio, clock=gpio.clock).start()
+    gpio.pulse_train(rpm, duration=max(1.0, 20 * 60.0 / rpm))
+    assert tacho.get_rpm(now=tacho.edges[-1]) == pytest.approx(rpm, rel=1e-6)
+
+def test_jitter_and_glitch_edges():
+    gpio = FakeTachoGPIO(seed=1)
+    tacho = Tachometer(gpio=gpio, clock=gpio.clock).start()
+    gpio.pulse_train(3000, duration=1.0, jitter=0.1, glitch_rate=0.2)
+    assert tacho.get_rpm(now=tacho.edges[-1]) == pytest.approx(3000, rel=0.05)
+    assert tacho.glitches > 0
+
+def test_slow_down_then_stale():
+    # Half a second without edges after 600 rpm: bounded by the gap, then stale
+    gpio = FakeTachoGPIO()
+    tacho = Tachometer(gpio=gpio, clock=gpio.clock).start()
+    gpio.pulse_train(600, duration=1.0)
+    gpio.advance(0.5)
+    assert tacho.get_rpm() <= 60.0 / 0.5 + 1e-9
+    gpio.advance(STALE_TIMEOUT)
+    assert tacho.get_rpm() == 0.0
+    tacho.stop()
+    assert not gpio.callbacks
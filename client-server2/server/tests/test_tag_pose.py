@@ -0,0 +1,40 @@
+"""On-board tag pose: a recorded 768x432 frame with tag 0 against detector4's undistort + pyapriltags pose"""
+import os
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pyapriltags = pytest.importorskip("pyapriltags")
+
+from tag_pose import (TagPoseEstimator, load_calibration, relative_angle, to_gray, DETECTOR_CONFIG,
+                      DEFAULT_TAG_SIZE)
+
+IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "client", "captured_images",
+                     "image_20250608_111843.jpg")
+
+@pytest.mark.skipif(not os.path.exists(IMAGE), reason="client/captured_images sample not present")
+def test_pose_matches_detector4():
+    image = cv2.imread(IMAGE)
+    height, width = image.shape[:2]
+    mtx, dist, source = load_calibration(width, height)
+    assert source == "calibration_768x432.npz"
+
+    # Reference: what the ground client computes (client/payload/detector4.py)
+    undistorted = cv2.undistort(image, mtx, dist)
+    tags = pyapriltags.Detector(**DETECTOR_CONFIG).detect(
+        cv2.cvtColor(undistorted, cv2.COLOR_BGR2GRAY), estimate_tag_pose=True,
+        camera_params=(mtx[0, 0], mtx[1, 1], mtx[0, 2], mtx[1, 2]), tag_size=DEFAULT_TAG_SIZE)
+    reference_t = tags[0].pose_t.ravel()
+
+    # On-board: 4-channel frame straight from the ring, no full-frame undistort
+    result = TagPoseEstimator().estimate(to_gray(cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)), mtx, dist)
+    assert result['tag_id'] == tags[0].tag_id
+    assert result['relative_angle'] == pytest.approx(relative_angle(reference_t), abs=0.5)
+    assert result['distance'] == pytest.approx(float(np.linalg.norm(reference_t)), rel=0.01)
+
+def test_calibration_scaled_from_same_aspect_ratio():
+    # 1280x720 has no file of its own
+    scaled = load_calibration(1280, 720)
+    assert scaled is not None
+    assert scaled[2].endswith("scaled")
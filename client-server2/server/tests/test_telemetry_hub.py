@@ -0,0 +1,65 @@
+"""Telemetry hub: rate limit, coalescing, streams, subscriptions, per-client rates and snapshots"""
+import time
+
+import pytest
+
+from telemetry_hub import TelemetryHub, topic_room
+
+@pytest.fixture
+def sent():
+    return []
+
+@pytest.fixture
+def hub(sent):
+    hub = TelemetryHub(lambda event, payload, to: sent.append((event, payload, to)))
+    hub.register_topic('thermal', max_rate_hz=2.0)
+    hub.register_topic('adcs', event='adcs_broadcast', stream=True)
+    hub.start()
+    yield hub
+    hub.stop()
+
+def test_unchanged_coalesced_and_stream_sent_in_full(hub, sent):
+    hub.subscribe('a')
+    for i in range(10):
+        hub.publish('thermal', {"pi_temp": "48.3"})  # Unchanged -> one emit
+        hub.publish('adcs', i)                       # Stream -> every payload
+        time.sleep(0.02)
+    time.sleep(0.6)
+    assert len([s for s in sent if s[0] == 'thermal_broadcast']) == 1
+    assert [s[1] for s in sent if s[0] == 'adcs_broadcast'] == list(range(10))
+    assert all(s[2] == topic_room(s[0].replace('_broadcast', '')) for s in sent)
+
+def test_rate_limit_sends_the_latest_at_window_end(hub, sent):
+    hub.subscribe('a')
+    hub.publish('thermal', {"pi_temp": "49.0"})    # Sent straight away
+    hub.publish('thermal', {"pi_temp": "49.2"})    # Within the 2Hz window: superseded...
+    hub.publish('thermal', {"pi_temp": "49.5"})    # ...by the latest, sent when the window ends
+    time.sleep(0.6)
+    assert [s[1]["pi_temp"] for s in sent if s[0] == 'thermal_broadcast'] == ["49.0", "49.5"]
+
+    sent.clear()
+    assert hub.subscribe('b', ['thermal']) == {'thermal': 2.0}
+    assert sent == [('thermal_broadcast', {"pi_temp": "49.5"}, 'b')]  # Snapshot to the new client only
+
+def test_per_client_rate(hub, sent):
+    # 'c' takes ADCS at 10Hz, 'a' keeps every payload through the room
+    hub.subscribe('a')
+    assert hub.subscribe('c', {'adcs': 10, 'nonexistent': 1}) == {'adcs': 10.0}
+    for i in range(20):
+        hub.publish('adcs', i)
+        time.sleep(0.02)
+    time.sleep(0.15)
+    room = [s[1] for s in sent if s[2] == topic_room('adcs')]
+    direct = [s[1] for s in sent if s[2] == 'c']
+    assert room == list(range(20))
+    assert 3 <= len(direct) <= 6 and direct == sorted(direct) and direct[-1] == 19
+    assert hub.get_stats()['adcs']['throttled'] == 1
+    assert hub.subscribe('c', {'adcs': None}) == {'adcs': None}  # Back to full rate -> into the room
+    assert not hub.topics['adcs'].throttled
+
+def test_nothing_sent_without_subscribers(hub, sent):
+    hub.subscribe('a')
+    hub.unsubscribe('a')
+    hub.publish('adcs', 99)
+    time.sleep(0.1)
+    assert ('adcs_broadcast', 99, topic_room('adcs')) not in sent
@@ -0,0 +1,58 @@
+"""Fused yaw Kalman filter: biased, noisy gyro with late tag fixes"""
+import math
+
+import numpy as np
+import pytest
+
+from yaw_estimator import YawKalmanFilter, wrap_angle
+
+RATE_HZ, BIAS, LATENCY = 500.0, 0.8, 0.15
+
+@pytest.fixture(scope="module")
+def run():
+    rng = np.random.default_rng(1)
+    dt = 1.0 / RATE_HZ
+    t = np.arange(1, int(30 * RATE_HZ) + 1) * dt
+    true_rate = 20.0 * np.sin(2 * np.pi * t / 6.0)
+    true_yaw = np.cumsum(true_rate) * dt
+    gyro = true_rate + BIAS + rng.normal(0.0, 0.05, len(t))
+
+    kf = YawKalmanFilter()
+    pending = []  # (arrival_time, measured_time, value)
+    batch = int(RATE_HZ / 20)
+    errors = []
+    for start in range(0, len(t), batch):
+        stop = start + batch
+        kf.predict_batch(gyro[start:stop], dt, t[stop - 1])
+        now = t[stop - 1]
+        if start % int(RATE_HZ / 5) == 0:  # 5Hz tag fixes measured now, delivered LATENCY later
+            pending.append((now + LATENCY, now, true_yaw[stop - 1] + rng.normal(0.0, 0.5)))
+        while pending and pending[0][0] <= now:
+            _, measured, value = pending.pop(0)
+            kf.update(value, measured, variance=0.25, source="zero")
+        if now > 10.0:
+            errors.append(kf.get_state()['yaw'] - true_yaw[stop - 1])
+    return kf, t, true_yaw, errors
+
+def test_late_fixes_remove_drift_and_learn_bias(run):
+    kf, _, _, errors = run
+    assert math.sqrt(np.mean(np.square(errors))) < 0.5
+    assert kf.get_state()['bias'] == pytest.approx(BIAS, abs=0.1)
+
+def test_outlier_gated_and_stale_fix_dropped(run):
+    kf, t, true_yaw, _ = run
+    assert kf.update(true_yaw[-1] + 90.0, t[-1], variance=0.25, source="zero") is False
+    assert kf.update(0.0, t[0], variance=0.25, source="zero") is False
+    state = kf.get_state()
+    assert state['rejected'] >= 1 and state['stale'] >= 1
+
+def test_new_reference_frame_reanchors():
+    kf = YawKalmanFilter()
+    kf.predict_batch(np.full(50, 10.0), 0.002, 1.0)
+    assert kf.update(170.0, 1.0, variance=0.25, source="tag") is True
+    state = kf.get_state()
+    assert state['yaw'] == pytest.approx(170.0) and state['reference'] == "tag"
+
+def test_wrap_angle():
+    assert wrap_angle(190.0) == pytest.approx(-170.0)
+    assert wrap_angle(-180.0) == pytest.approx(-180.0)
@@ -0,0 +1,65 @@
+"""Yaw history: ring / lookup edge cases and delayed fixes carried forward on synthetic rotations"""
+import math
+
+import numpy as np
+import pytest
+
+from yaw_history import YawHistory, MAX_EXTRAPOLATION_S
+
+def replay(rate_hz, batch, delay, history, rng):
+    """Synthetic slew + oscillation; 10Hz fixes measured at capture, delivered `delay` later.
+
+    Returns (naive RMS error, aligned RMS error) - naive applies the fix as if it
+    were measured on arrival, aligned adds the rotation since capture from the history.
+    """
+    dt = 1.0 / rate_hz
+    t = 1000.0 + np.arange(1, int(20 * rate_hz) + 1) * dt
+    true_rate = 15.0 + 40.0 * np.sin(2 * np.pi * (t - t[0]) / 4.0)  # Spin-up + slew, up to 55°/s
+    true_yaw = np.cumsum(true_rate) * dt
+    gyro = true_rate + rng.normal(0.0, 0.05, len(t))
+    gyro_yaw = np.cumsum(gyro) * dt + 123.0   # Arbitrary offset: only differences are used
+
+    naive, aligned = [], []
+    pending = []  # (arrival, capture_time, true yaw at capture)
+    next_fix = t[0] + 1.0
+    for start in range(0, len(t), batch):
+        stop = min(start + batch, len(t))
+        history.extend(t[start:stop], gyro_yaw[start:stop], gyro[start:stop])
+        now = t[stop - 1]
+        while next_fix <= now:
+            pending.append((next_fix + delay, next_fix, float(np.interp(next_fix, t, true_yaw))))
+            next_fix += 0.1
+        while pending and pending[0][0] <= now:
+            _, capture, measured = pending.pop(0)
+            truth_now = true_yaw[stop - 1]
+            naive.append(measured - truth_now)
+            aligned.append(measured + history.rotation_since(capture, now) - truth_now)
+    return math.sqrt(np.mean(np.square(naive))), math.sqrt(np.mean(np.square(aligned)))
+
+def test_interpolation_and_extrapolation():
+    h = YawHistory(capacity=8)
+    assert h.yaw_at(1.0) is None
+    h.extend([1.0, 2.0, 3.0], [0.0, 10.0, 30.0], [10.0, 10.0, 20.0])
+    assert h.yaw_at(1.5) == pytest.approx(5.0)
+    assert h.yaw_at(2.5) == pytest.approx(20.0)
+    assert h.rate_at(2.5) == 20.0
+    assert h.yaw_at(3.25) == pytest.approx(35.0)                  # Extrapolated with the last rate
+    assert h.yaw_at(10.0) == pytest.approx(30.0 + 20.0 * MAX_EXTRAPOLATION_S)
+    assert h.yaw_at(0.5) is None                                  # Older than the history
+
+def test_out_of_order_and_wraparound():
+    h = YawHistory(capacity=8)
+    h.extend([1.0, 2.0, 3.0], [0.0, 10.0, 30.0], [10.0, 10.0, 20.0])
+    h.append(2.5, 99.0, 0.0)
+    assert h.dropped == 1 and len(h) == 3
+    h.extend(np.arange(4.0, 14.0), np.arange(4.0, 14.0) * 10.0, np.full(10, 10.0))
+    assert len(h) == 8 and h.span() == (6.0, 13.0)
+    assert h.yaw_at(12.5) == pytest.approx(125.0)
+    assert h.rotation_between(6.0, 13.0) == 70.0
+
+@pytest.mark.parametrize("rate_hz, batch", [(500.0, 25), (200.0, 1)])  # FIFO drained at 20Hz / polled
+@pytest.mark.parametrize("delay", [0.05, 0.15, 0.3, 0.6])
+def test_delayed_fixes_aligned(rate_hz, batch, delay):
+    naive, aligned = replay(rate_hz, batch, delay, YawHistory(), np.random.default_rng(3))
+    assert aligned < 0.1
+    assert aligned < naive / 20
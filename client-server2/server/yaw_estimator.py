@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+🧭 FUSED YAW ESTIMATOR - gyro + AprilTag + lux-peak Kalman filter
+Two-state Kalman filter (yaw, gyro bias) that integrates gyro batches at the
+full FIFO rate and corrects with absolute yaw fixes that arrive late.
+- Gyro batches propagate the state in closed form (one step per batch, not per sample)
+- Tag / lux-peak fixes carry the time they were measured; the filter rewinds to
+  that instant in its gyro history, applies the fix and re-propagates to now
+- Bias-corrected yaw rate for the D term of the controller
+- Each reference frame (zeroed, AprilTag, sun) is tracked separately: the first
+  fix from a new frame re-anchors yaw instead of fighting the old one
+- Innovation gate rejects outliers (wrong tag, reflections); a run of rejected
+  fixes re-anchors instead (the tag was moved)
+"""
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_Q_ANGLE = 0.01       # deg²/s - gyro angle random walk
+DEFAULT_Q_BIAS = 1e-4        # deg²/s³ - bias random walk
+DEFAULT_BIAS_STD = 1.0       # deg/s - initial bias uncertainty
+DEFAULT_GATE_SIGMA = 6.0     # Reject fixes further than this many sigma from the prediction
+DEFAULT_HISTORY_S = 3.0      # Oldest fix that can still be applied
+REANCHOR_AFTER = 5           # Consecutive gated fixes before the frame is assumed to have moved
+
+def wrap_angle(angle):
+    """Wrap to [-180, 180)"""
+    return (angle + 180.0) % 360.0 - 180.0
+
+class _GyroRecord:
+    """One gyro batch in the history, with the filter state at its start"""
+    __slots__ = ("t_start", "dt", "rates", "x0", "P0")
+
+    def __init__(self, t_start, dt, rates, x0, P0):
+        self.t_start = t_start
+        self.dt = dt
+        self.rates = rates
+        self.x0 = x0
+        self.P0 = P0
+
+    @property
+    def t_end(self):
+        return self.t_start + len(self.rates) * self.dt
+
+class YawKalmanFilter:
+    """Yaw / gyro-bias Kalman filter with delayed (out-of-sequence) measurements.
+
+    Usage:
+        kf.predict_batch(rates_z, dt, timestamp)      # every gyro batch
+        kf.update(z, timestamp, variance, source)     # whenever a fix arrives
+        kf.get_state()                                # yaw, rate, bias, ...
+    Timestamps are time.monotonic() seconds; `timestamp` for a batch is the
+    time of its last sample.
+    """
+
+    def __init__(self, q_angle=DEFAULT_Q_ANGLE, q_bias=DEFAULT_Q_BIAS, bias_std=DEFAULT_BIAS_STD,
+                 gate_sigma=DEFAULT_GATE_SIGMA, history_s=DEFAULT_HISTORY_S):
+        self.q_angle = q_angle
+        self.q_bias = q_bias
+        self.bias_std = bias_std
+        self.gate_sigma = gate_sigma
+        self.history_s = history_s
+        self.lock = threading.RLock()
+
+        self.history = deque()
+        self.update_count = 0
+        self.rejected_count = 0
+        self.stale_count = 0
+        self.consecutive_rejects = 0
+        self.last_innovation = 0.0
+        self.reset(0.0)
+
+    # ── STATE ──────────────────────────────────────────────────────────
+    def reset(self, yaw=0.0, reference="zero", keep_bias=True):
+        """Set yaw (certain) in a new reference frame; history is discarded"""
+        with self.lock:
+            bias = self.x[1] if keep_bias and hasattr(self, "x") else 0.0
+            bias_var = self.P[1, 1] if keep_bias and hasattr(self, "P") else self.bias_std ** 2
+            self.x = np.array([float(yaw), bias])
+            self.P = np.array([[0.0, 0.0], [0.0, bias_var]])
+            self.reference = reference
+            self.rate = 0.0
+            self.last_time = None
+            self.history.clear()
+
+    def reset_bias(self):
+        """Forget the learned bias - the gyro calibration offsets changed underneath it"""
+        with self.lock:
+            self.x[1] = 0.0
+            self.P[0, 1] = self.P[1, 0] = 0.0
+            self.P[1, 1] = self.bias_std ** 2
+            self.history.clear()  # Stored states assume the old bias
+
+    def get_state(self):
+        with self.lock:
+            return {
+                'yaw': float(self.x[0]),
+                'rate': float(self.rate),
+                'bias': float(self.x[1]),
+                'yaw_std': math.sqrt(max(self.P[0, 0], 0.0)),
+                'bias_std': math.sqrt(max(self.P[1, 1], 0.0)),
+                'reference': self.reference,
+                'updates': self.update_count,
+                'rejected': self.rejected_count,
+                'stale': self.stale_count,
+                'innovation': self.last_innovation,
+            }
+
+    def yaw_at(self, timestamp):
+        """Yaw at a past instant from the gyro history (extrapolated past the last sample)"""
+        with self.lock:
+            for record in reversed(self.history):
+                if record.t_start <= timestamp < record.t_end:
+                    k = int((timestamp - record.t_start) / record.dt)
+                    x, _ = self._propagate(record.x0, record.P0, record.rates[:k], record.dt)
+                    return float(x[0])
+            if self.last_time is None or timestamp >= self.last_time or not self.history:
+                last_time = self.last_time if self.last_time is not None else timestamp
+                return float(self.x[0] + self.rate * (timestamp - last_time))
+            return None  # Older than the history
+
+    # ── PROPAGATION ────────────────────────────────────────────────────
+    def _propagate(self, x, P, rates, dt):
+        """Closed-form propagation over len(rates) samples of constant dt"""
+        n = len(rates)
+        if n == 0:
+            return x, P
+        T = n * dt
+        x = np.array([x[0] + float(np.sum(rates)) * dt - x[1] * T, x[1]])
+        F = np.array([[1.0, -T], [0.0, 1.0]])
+        # Sum over k of F^k Q F^kT with Q = diag(q_angle, q_bias) * dt
+        s1 = n * (n - 1) / 2.0
+        s2 = (n - 1) * n * (2 * n - 1) / 6.0
+        Q = np.array([
+            [self.q_angle * T + self.q_bias * dt ** 3 * s2, -self.q_bias * dt ** 2 * s1],
+            [-self.q_bias * dt ** 2 * s1, self.q_bias * T],
+        ])
+        return x, F @ P @ F.T + Q
+
+    def predict_batch(self, rates, dt, timestamp=None):
+        """Propagate with a batch of calibrated Z rates (°/s) sampled every dt"""
+        rates = np.asarray(rates, dtype=np.float64).ravel()
+        if len(rates) == 0 or dt <= 0:
+            return
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self.lock:
+            t_start = timestamp - len(rates) * dt
+            self.history.append(_GyroRecord(t_start, dt, rates, self.x.copy(), self.P.copy()))
+            self.x, self.P = self._propagate(self.x, self.P, rates, dt)
+            self.rate = float(np.mean(rates)) - self.x[1]
+            self.last_time = timestamp
+            while self.history and self.history[0].t_end < timestamp - self.history_s:
+                self.history.popleft()
+
+    # ── MEASUREMENTS ───────────────────────────────────────────────────
+    def update(self, yaw_measurement, timestamp=None, variance=1.0, source="tag"):
+        """Apply an absolute yaw fix measured at `timestamp`.
+
+        Returns True if the fix was used. A fix from a different reference
+        frame than the current one re-anchors yaw at that instant.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self.lock:
+            index = self._split_history(timestamp)
+            if index is None:
+                self.stale_count += 1
+                return False
+
+            if index < len(self.history):
+                x, P = self.history[index].x0.copy(), self.history[index].P0.copy()
+            else:
+                x, P = self.x.copy(), self.P.copy()
+
+            innovation = wrap_angle(yaw_measurement - x[0])
+            S = P[0, 0] + variance
+            gated = bool(self.gate_sigma) and abs(innovation) > self.gate_sigma * math.sqrt(S)
+            if gated and source == self.reference:
+                self.rejected_count += 1
+                self.consecutive_rejects += 1
+                if self.consecutive_rejects < REANCHOR_AFTER:
+                    return False
+            self.consecutive_rejects = 0
+
+            if source != self.reference or gated:
+                x[0] = float(yaw_measurement)
+                P = np.array([[variance, 0.0], [0.0, P[1, 1]]])
+                self.reference = source
+                self.last_innovation = 0.0
+            else:
+                K = P[:, 0] / S
+                x = x + K * innovation
+                P = P - np.outer(K, P[0, :])
+                self.last_innovation = innovation
+
+            self.update_count += 1
+            self._repropagate(index, x, P)
+            return True
+
+    def _split_history(self, timestamp):
+        """Index of the first record starting at `timestamp`, splitting a batch if needed.
+
+        Returns len(history) for fixes newer than the last gyro sample and None
+        for fixes older than the history.
+        """
+        if not self.history or timestamp >= self.history[-1].t_end:
+            return len(self.history)
+        if timestamp < self.history[0].t_start:
+            return None
+        for i, record in enumerate(self.history):
+            if timestamp < record.t_end:
+                k = int((timestamp - record.t_start) / record.dt)
+                if k <= 0:
+                    return i
+                # Split the batch so the fix lands between two samples
+                x_mid, P_mid = self._propagate(record.x0, record.P0, record.rates[:k], record.dt)
+                tail = _GyroRecord(record.t_start + k * record.dt, record.dt, record.rates[k:], x_mid, P_mid)
+                record.rates = record.rates[:k]
+                self.history.insert(i + 1, tail)
+                return i + 1
+        return len(self.history)
+
+    def _repropagate(self, index, x, P):
+        """Replay the gyro history from `index` with the corrected state"""
+        for record in list(self.history)[index:]:
+            record.x0, record.P0 = x.copy(), P.copy()
+            x, P = self._propagate(x, P, record.rates, record.dt)
+        self.x, self.P = x, P
+        if self.history:
+            self.rate = float(np.mean(self.history[-1].rates)) - self.x[1]
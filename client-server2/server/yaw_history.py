@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+🕰️ YAW HISTORY - timestamped gyro yaw ring for delayed-measurement alignment
+Fixed-size, array-backed history of the gyro-integrated yaw and yaw rate,
+indexed by time.monotonic(), so a fix measured in the past (AprilTag frame,
+lux peak) can be carried forward to now with the rotation since its capture.
+- Preallocated NumPy arrays, no per-sample allocation; a whole FIFO batch is one write
+- O(log n) lookup by binary search on the ring, linear interpolation between samples
+  (exact for the rectangle-rule integration the gyro paths use)
+- Stores the unwrapped gyro integral, never re-zeroed: differences are what matter,
+  so a yaw reset or a tag overwrite does not break older entries
+"""
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_CAPACITY = 4096         # ~8s at the 500Hz FIFO rate
+MAX_EXTRAPOLATION_S = 0.5       # Past the newest sample, extrapolate with its rate at most this far
+
+class YawHistory:
+    """Ring of (timestamp, yaw, rate) samples with time lookup.
+
+    Usage:
+        history.extend(timestamps, yaws, rates)   # every gyro batch (or append per sample)
+        history.yaw_at(t)                          # interpolated yaw at a past instant
+        history.rotation_since(t)                  # yaw change from t to now
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = int(capacity)
+        self.t = np.zeros(self.capacity)
+        self.yaw = np.zeros(self.capacity)
+        self.rate = np.zeros(self.capacity)
+        self.start = 0               # Physical index of the oldest sample
+        self.count = 0
+        self.dropped = 0             # Out-of-order samples ignored
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        with self.lock:
+            self.start = 0
+            self.count = 0
+
+    # ── WRITE ──────────────────────────────────────────────────────────
+    def append(self, timestamp, yaw, rate):
+        self.extend((timestamp,), (yaw,), (rate,))
+
+    def extend(self, timestamps, yaws, rates):
+        """Add samples in time order; anything not newer than the last sample is dropped"""
+        timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+        yaws = np.asarray(yaws, dtype=np.float64).ravel()
+        rates = np.asarray(rates, dtype=np.float64).ravel()
+        with self.lock:
+            if self.count:
+                newer = timestamps > self.t[(self.start + self.count - 1) % self.capacity]
+                if not newer.all():
+                    self.dropped += int(len(newer) - newer.sum())
+                    timestamps, yaws, rates = timestamps[newer], yaws[newer], rates[newer]
+            n = len(timestamps)
+            if n == 0:
+                return
+            if n > self.capacity:
+                timestamps, yaws, rates = timestamps[-self.capacity:], yaws[-self.capacity:], rates[-self.capacity:]
+                n = self.capacity
+            index = (self.start + self.count + np.arange(n)) % self.capacity
+            self.t[index] = timestamps
+            self.yaw[index] = yaws
+            self.rate[index] = rates
+            overflow = max(0, self.count + n - self.capacity)
+            self.start = (self.start + overflow) % self.capacity
+            self.count = min(self.capacity, self.count + n)
+
+    # ── LOOKUP ─────────────────────────────────────────────────────────
+    def _at(self, i):
+        """Physical index of the i-th oldest sample"""
+        return (self.start + i) % self.capacity
+
+    def _search(self, timestamp):
+        """Number of samples at or before `timestamp` (bisect_right over the ring)"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.t[self._at(mid)] <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _yaw_rate_at(self, timestamp):
+        if self.count == 0:
+            return None
+        k = self._search(timestamp)
+        if k == 0:
+            return None  # Older than the history
+        i0 = self._at(k - 1)
+        if k == self.count:
+            age = timestamp - self.t[i0]
+            if age > MAX_EXTRAPOLATION_S:
+                age = MAX_EXTRAPOLATION_S
+            return float(self.yaw[i0] + self.rate[i0] * age), float(self.rate[i0])
+        i1 = self._at(k)
+        span = self.t[i1] - self.t[i0]
+        f = (timestamp - self.t[i0]) / span
+        # The integration holds the next sample's rate over the interval
+        return float(self.yaw[i0] + f * (self.yaw[i1] - self.yaw[i0])), float(self.rate[i1])
+
+    def yaw_at(self, timestamp):
+        """Gyro yaw (unwrapped integral) at a monotonic timestamp, or None if older than the history"""
+        with self.lock:
+            result = self._yaw_rate_at(timestamp)
+        return None if result is None else result[0]
+
+    def rate_at(self, timestamp):
+        """Yaw rate (°/s) in effect at a monotonic timestamp, or None"""
+        with self.lock:
+            result = self._yaw_rate_at(timestamp)
+        return None if result is None else result[1]
+
+    def rotation_between(self, t0, t1):
+        """Yaw change from t0 to t1 (°), or None if t0 is older than the history"""
+        with self.lock:
+            a = self._yaw_rate_at(t0)
+            b = self._yaw_rate_at(t1)
+        if a is None or b is None:
+            return None
+        return b[0] - a[0]
+
+    def rotation_since(self, timestamp, now=None):
+        """Yaw change from `timestamp` to now - add it to a fix measured at `timestamp`"""
+        return self.rotation_between(timestamp, time.monotonic() if now is None else now)
+
+    def span(self):
+        """(oldest, newest) timestamps held, or None when empty"""
+        with self.lock:
+            if self.count == 0:
+                return None
+            return float(self.t[self._at(0)]), float(self.t[self._at(self.count - 1)])
+
+    def get_stats(self):
+        span = self.span()
+        return {
+            'samples': self.count,
+            'capacity': self.capacity,
+            'span_s': round(span[1] - span[0], 3) if span else 0.0,
+            'dropped': self.dropped,
+        }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+🔁 YAW ESTIMATOR REPLAY - offline check of the fused estimator on recorded runs
+Replays client recordings through YawKalmanFilter and compares it with the old
+behaviour (raw gyro integration, overwritten whenever a fix arrives).
+- angle_*.csv: AprilTag relative angle -> truth, plus 5Hz tag fixes delivered late
+- lux_log.csv: lux peaks -> yaw fixes in the sun frame (truth rebuilt from the peaks)
+The gyro was not recorded, so it is synthesised from the truth at the FIFO rate
+with a constant bias and white noise.
+
+Usage: python yaw_replay.py [--recordings DIR] [--latency 0.15] [--bias 0.8]
+"""
+import argparse
+import glob
+import math
+import os
+
+import numpy as np
+
+from lux_peak import LuxPeakDetector
+from yaw_estimator import YawKalmanFilter
+
+GYRO_RATE_HZ = 500.0
+DRAIN_RATE_HZ = 20.0
+TAG_RATE_HZ = 5.0               # Client scanning-mode timer (200ms)
+TAG_VARIANCE = 0.5 ** 2
+LUX_VARIANCE = 5.0 ** 2
+LUX_ANGLES = {1: 0, 2: 90, 3: 180}
+
+DEFAULT_RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client", "recordings")
+
+# ── LOADERS ────────────────────────────────────────────────────────────
+def load_angle_recording(path):
+    """(t, value) arrays from a timestamp,value graph recording"""
+    data = np.genfromtxt(path, delimiter=",", skip_header=1)
+    return data[:, 0] - data[0, 0], data[:, 1]
+
+def load_lux_log(path):
+    """(t, lux[N, 3]) from lux_log.csv"""
+    data = np.genfromtxt(path, delimiter=",", skip_header=1, usecols=(0, 1, 2, 3))
+    return data[:, 0] - data[0, 0], data[:, 1:4]
+
+def detect_lux_peaks(t, lux):
+    """Peaks from the same streaming detector the environmental mode uses: [(time, channel)]"""
+    detector = LuxPeakDetector(channels=tuple(LUX_ANGLES))
+    peaks = []
+    for i in range(len(t)):
+        for c, ch in enumerate(LUX_ANGLES):
+            peak = detector.push(ch, lux[i, c], 0.0, t[i])
+            if peak:
+                peaks.append((peak['time'], ch))
+    return sorted(peaks)
+
+def lux_peak_truth(peaks):
+    """Rebuild a yaw trace from the peak sequence (channel ch peaks at yaw -angle[ch]).
+
+    Consecutive peaks are unwrapped along the shortest turn, so the result is
+    only as good as the peak sequence itself - enough to exercise the filter.
+    """
+    times, yaws = [], []
+    for time_s, ch in peaks:
+        target = -LUX_ANGLES[ch]
+        if yaws:
+            target = yaws[-1] + ((target - yaws[-1] + 180.0) % 360.0 - 180.0)
+            if time_s - times[-1] < 1e-6:
+                continue
+        times.append(time_s)
+        yaws.append(target)
+    return np.array(times), np.array(yaws)
+
+# ── SIMULATION ─────────────────────────────────────────────────────────
+def synthesize_gyro(t_truth, yaw_truth, bias, noise_std, rng):
+    """Gyro samples at GYRO_RATE_HZ whose integral follows the truth trace"""
+    dt = 1.0 / GYRO_RATE_HZ
+    t = np.arange(t_truth[0] + dt, t_truth[-1], dt)
+    yaw = np.interp(np.concatenate(([t_truth[0]], t)), t_truth, yaw_truth)
+    rates = np.diff(yaw) / dt
+    return t, rates + bias + rng.normal(0.0, noise_std, len(rates)), np.interp(t, t_truth, yaw_truth)
+
+def run_replay(gyro_t, gyro_rates, truth, fixes, latency, variance, source):
+    """Feed gyro batches and late fixes; returns error traces for fused and old behaviour.
+
+    fixes: [(measured_time, yaw)] - delivered `latency` seconds after measured_time.
+    """
+    dt = 1.0 / GYRO_RATE_HZ
+    batch = int(GYRO_RATE_HZ / DRAIN_RATE_HZ)
+    kf = YawKalmanFilter()
+    kf.reset(truth[0], reference=source)
+    overwrite_yaw = truth[0]
+    pending = sorted((measured + latency, measured, value) for measured, value in fixes)
+
+    fused_err, old_err, old_steps, fused_steps = [], [], [], []
+    last_fused, last_old = truth[0], overwrite_yaw
+    for start in range(0, len(gyro_t), batch):
+        stop = min(start + batch, len(gyro_t))
+        now = gyro_t[stop - 1]
+        kf.predict_batch(gyro_rates[start:stop], dt, now)
+        overwrite_yaw += gyro_rates[start:stop].sum() * dt
+        while pending and pending[0][0] <= now:
+            _, measured, value = pending.pop(0)
+            kf.update(value, measured, variance=variance, source=source)
+            overwrite_yaw = value  # Old behaviour: snap to the fix on arrival
+        fused = kf.get_state()['yaw']
+        fused_err.append(fused - truth[stop - 1])
+        old_err.append(overwrite_yaw - truth[stop - 1])
+        fused_steps.append(abs(fused - last_fused))
+        old_steps.append(abs(overwrite_yaw - last_old))
+        last_fused, last_old = fused, overwrite_yaw
+
+    rms = lambda e: math.sqrt(float(np.mean(np.square(e)))) if len(e) else float("nan")
+    return {
+        'fused_rms': rms(fused_err), 'old_rms': rms(old_err),
+        'fused_max_step': max(fused_steps), 'old_max_step': max(old_steps),
+        'bias': kf.get_state()['bias'], 'updates': kf.update_count, 'rejected': kf.rejected_count,
+    }
+
+def replay_angle_recording(path, latency, bias, noise_std, rng):
+    t, value = load_angle_recording(path)
+    truth = -value  # auto_zero_tag: yaw = -relative_angle
+    gyro_t, rates, truth_at_gyro = synthesize_gyro(t, truth, bias, noise_std, rng)
+    fix_times = np.arange(t[0], t[-1], 1.0 / TAG_RATE_HZ)
+    fixes = [(ft, float(np.interp(ft, t, truth)) + rng.normal(0.0, math.sqrt(TAG_VARIANCE))) for ft in fix_times]
+    return run_replay(gyro_t, rates, truth_at_gyro, fixes, latency, TAG_VARIANCE, "tag")
+
+def replay_lux_log(path, latency, bias, noise_std, rng):
+    t, lux = load_lux_log(path)
+    peaks = detect_lux_peaks(t, lux)
+    peak_t, peak_yaw = lux_peak_truth(peaks)
+    gyro_t, rates, truth_at_gyro = synthesize_gyro(peak_t, peak_yaw, bias, noise_std, rng)
+    fixes = [(pt, float(py)) for pt, py in zip(peak_t, peak_yaw)]
+    return run_replay(gyro_t, rates, truth_at_gyro, fixes, latency, LUX_VARIANCE, "sun")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recordings through the fused yaw estimator")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS)
+    parser.add_argument("--latency", type=float, default=0.15, help="Fix delivery latency (s)")
+    parser.add_argument("--bias", type=float, default=0.8, help="Synthetic gyro bias (°/s)")
+    parser.add_argument("--noise", type=float, default=0.05, help="Synthetic gyro noise (°/s)")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    runs = [(os.path.basename(p), replay_angle_recording, p)
+            for p in sorted(glob.glob(os.path.join(args.recordings, "angle_*.csv")))]
+    lux_path = os.path.join(args.recordings, "lux_log.csv")
+    if os.path.exists(lux_path):
+        runs.append(("lux_log.csv", replay_lux_log, lux_path))
+
+    print(f"{'recording':32s} {'fused rms':>10s} {'old rms':>9s} {'fused step':>11s} {'old step':>9s} {'bias':>6s} {'fixes':>6s}")
+    results = {}
+    for name, replay, path in runs:
+        r = replay(path, args.latency, args.bias, args.noise, rng)
+        results[name] = r
+        print(f"{name:32s} {r['fused_rms']:9.2f}° {r['old_rms']:8.2f}° {r['fused_max_step']:10.2f}° "
+              f"{r['old_max_step']:8.2f}° {r['bias']:6.2f} {r['updates']:3d}/{r['rejected']}")
+    return results
+
+if __name__ == "__main__":
+    main()